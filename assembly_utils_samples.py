@@ -1,7 +1,46 @@
+import math
+import mmap
+import os
+import struct
+import zlib
+
+import numpy
+try:
+    import maya.api.OpenMaya as om
+except ImportError:
+    om = None
+
+# The binary layout format written alongside the assembly XML.  Every section starts on
+# an 8 byte boundary so the arrays can be mapped straight out of the file.
+ASM_LAYOUT_EXTENSION = '.asmlayout'
+ASM_LAYOUT_MAGIC     = b'ASMLAYT1'
+# Files before version 3 had a 36 byte header, so none of their sections were aligned.
+ASM_LAYOUT_VERSION   = 3
+# magic, version, string count, string blob size, path node count, row count,
+# assembly node string index, padding out to 40 bytes
+ASM_LAYOUT_HEADER    = struct.Struct('<8sIIIIIiII')
+ASM_LAYOUT_CHANNELS  = ['translation', 'rotation', 'scale']
+# Maya's rotate orders, in the order of the rotateOrder enum.
+ASM_ROTATE_ORDERS    = ['xyz', 'yzx', 'zxy', 'xzy', 'yxz', 'zyx']
+
+# The per frame animation written alongside the layout of the first frame.  It is a run
+# of chunks of a fixed number of frames, each can be read on its own.
+ASM_ANIM_EXTENSION    = '.asmanim'
+ASM_ANIM_MAGIC        = b'ASMANIM1'
+ASM_ANIM_VERSION      = 1
+# magic, version, row count, frame count, frames per chunk, start frame, frame step,
+# index offset
+ASM_ANIM_HEADER       = struct.Struct('<8sIIIIddQ')
+# first frame, frame count, changed value count, compressed size
+ASM_ANIM_CHUNK_HEADER = struct.Struct('<IIII')
+ASM_ANIM_CHUNK_FRAMES = 24
+
 def apply_asm_publish_data(asm_node, file_location):
     """
-    Reads in the data found in the assembly XML file and applies that to the assembly
-    cache.  This is expected to be used in a shot context, i.e. in a lighting file.
+    Reads in the data found in the assembly XML file, or the binary layout next to it,
+    and applies that to the assembly cache.  This is expected to be used in a shot
+    context, i.e. in a lighting file.  Each object gets its whole transform in one
+    xform call, parents first, and the selection is left alone.
 
     :param asm_node: The name of a top level assembly node, i.e. 'testAssembly_asm_ref'.
     :type: str
@@ -25,43 +64,41 @@ def apply_asm_publish_data(asm_node, file_location):
     if not sel:
         IO.error('There is no assembly cache in the scene.')
         return None
-    # Read in the XML file and store it in a dictionary.
-    reader = XMLReader(file_location)
-    # dictionary of objects inside the assembly
-    dict = reader.read_xml()
-    # one step lower
-    asm_dict =dict.values()[0]
-    object_keys = dict.values()[0].keys()
-    for o_key in object_keys:
-        transform_dict = asm_dict[o_key]
-        transform_keys = transform_dict.keys()
-        for t_key in transform_keys:
-            transform_values = transform_dict[t_key]
-            transform_values = transform_values[1:len(transform_values)-1]
-            tranform_list = transform_values.split(',')
-            x = float(tranform_list[0])
-            y = float(tranform_list[1])
-            z = float(tranform_list[2])
-
-            # parse name select the object
-            split_list = o_key.split(":")
-            object =split_list[len(split_list)-1]
-            object_name =asm_namespace + ':' + object
-
-            cmds.select(object_name)
-
-            # apply transform to assembly objects
-            if t_key == 'rotation':
-                cmds.xform( absolute = True, rotation = (x, y, z))
-            elif t_key == 'translation':
-                cmds.xform(absolute=True, translation=(x, y, z))
-            elif t_key == 'scale':
-                cmds.xform(absolute=True, scale =(x, y, z))
-
-def publish_asm_location_data(asm_node, file_location):
+    # Use the binary layout published alongside the XML when there is one, otherwise
+    # parse the whole XML into arrays up front.
+    layout = None
+    layout_location = get_asm_layout_path(file_location)
+    if os.path.exists(layout_location):
+        layout = AssemblyLayout.read(layout_location)
+    if layout is None:
+        reader   = XMLReader(file_location)
+        xml_data = reader.read_xml()
+        layout   = AssemblyLayout.from_xml(asm_node, list(xml_data.values())[0])
+
+    # Set parents before their children so a child is never placed under a parent that
+    # is about to move.  Channels the publish did not have are NaN and left alone.
+    paths    = layout.paths
+    order    = sorted(range(len(paths)), key=lambda index: paths[index].count('|'))
+    channels = []
+    for channel in ASM_LAYOUT_CHANNELS:
+        values = getattr(layout, channel)
+        channels.append((channel, values.tolist(), ~numpy.isnan(values).any(axis=1)))
+    for index in order:
+        object_name = asm_namespace + ':' + paths[index].split(':')[-1]
+        flags = dict([(channel, rows[index]) for channel, rows, valid in channels
+                      if valid[index]])
+        # One call sets the whole local transform, nothing is selected.
+        cmds.xform(object_name, absolute=True, **flags)
+    return True
+
+def publish_asm_location_data(asm_node, file_location, write_layout=True,
+                              frame_range=None, chunk_frames=ASM_ANIM_CHUNK_FRAMES):
     """
     Writes out the location data for all of the geometry in an assembly.  This is
-    expected to be used in a shot context, i.e. from animation.
+    expected to be used in a shot context, i.e. from animation.  The same data is also
+    written as a binary layout file next to the XML, see write_asm_layout.  With a frame
+    range the XML and layout are the first frame, and every frame of the range is
+    streamed into an animation file next to them, see write_asm_animation.
 
     :param asm_node: The name of a top level assembly node, i.e. 'testAssembly_asm_ref'.
     :type: str
@@ -69,6 +106,17 @@ def publish_asm_location_data(asm_node, file_location):
     :param file_location: The location on disk to write out the assembly to.
     :type: str
 
+    :param write_layout: Whether to write the binary layout file as well.  It is always
+                         written with a frame range, the animation is stored against it.
+                         When it is not written an older layout file is removed.
+    :type: bool
+
+    :param frame_range: The (start, end) or (start, end, step) frames to publish.
+    :type: tuple
+
+    :param chunk_frames: How many frames are sampled and written at a time.
+    :type: int
+
     :return: The success of the operation.
     :type: bool
     """
@@ -82,25 +130,1189 @@ def publish_asm_location_data(asm_node, file_location):
     # if not result:
     #     return None
 
-    # Find all the translation nodes under the root node.
-    results = cmds.listRelatives(asm_node, allDescendents=True, type='transform',
-                                 fullPath=True)
-    keep    = []
-    for result in results:
-        if result.endswith(GroupNames.PROXY):
+    # Put the time back where the user had it once the frames are sampled.
+    current_time = None
+    if frame_range is not None:
+        current_time = cmds.currentTime(query=True)
+        cmds.currentTime(frame_range[0], update=True)
+    result = None
+    try:
+        # Get the location of every transform under the root node in one pass.
+        layout = AssemblyLayout.from_scene(asm_node)
+
+        # Write out the location of each, recording translation, rotation, and scale.
+        writer = XMLWriter(file_location, layout.get_xml_dict())
+        writer.write_xml()
+        # A layout or animation left by an older publish would be read in place of the
+        # new XML, so anything that is not written again is removed.
+        stale = []
+        if write_layout or frame_range is not None:
+            result = layout.write(get_asm_layout_path(file_location))
+        else:
+            stale.append(get_asm_layout_path(file_location))
+        if frame_range is None:
+            stale.append(get_asm_anim_path(file_location))
+        elif result:
+            result = write_asm_animation(layout, frame_range,
+                                         get_asm_anim_path(file_location), chunk_frames)
+        for stale_location in stale:
+            if os.path.exists(stale_location):
+                os.remove(stale_location)
+    finally:
+        if current_time is not None:
+            cmds.currentTime(current_time, update=True)
+    return result
+
+def is_asm_proxy(node_name):
+    """
+    Checks if a node is a proxy group, everything under a proxy is left out of the
+    publish.
+
+    :param node_name: The name or path of the node.
+    :type: str
+
+    :return: Whether it is a proxy.
+    :type: bool
+    """
+    return node_name.endswith(GroupNames.PROXY) or node_name.endswith(COMMON_LABELS.PROXY)
+
+def get_asm_transform_data(asm_node):
+    """
+    Gets the translation, rotation, scale and rotate order of every transform under an
+    assembly, see find_asm_transforms and sample_asm_transforms.
+
+    :param asm_node: The name of a top level assembly node, i.e. 'testAssembly_asm_ref'.
+    :type: str
+
+    :return: The full path of each transform, parents before their children, the
+             translation, rotation in degrees and scale of each as rows x 3 arrays and
+             the rotate order of each as an index into ASM_ROTATE_ORDERS.
+    :type: tuple
+    """
+    paths, transforms     = find_asm_transforms(asm_node)
+    values, rotate_orders = sample_asm_transforms(transforms)
+    return paths, values[:, 0:3], values[:, 3:6], values[:, 6:9], rotate_orders
+
+def find_asm_transforms(asm_node):
+    """
+    Finds every transform under an assembly in a single pass over the DAG with the API,
+    skipping proxy groups and everything under them as it goes.  Without the API it
+    falls back to listRelatives.
+
+    :param asm_node: The name of a top level assembly node, i.e. 'testAssembly_asm_ref'.
+    :type: str
+
+    :return: The full path of each transform, parents before their children, and what
+             sample_asm_transforms reads each one through, an MFnTransform with the API
+             or the path without it.
+    :type: tuple
+    """
+    paths      = []
+    transforms = []
+    if om is not None:
+        selection = om.MSelectionList()
+        selection.add(asm_node)
+        root = selection.getDagPath(0)
+        dag_iter = om.MItDag()
+        dag_iter.reset(root, om.MItDag.kDepthFirst, om.MFn.kTransform)
+        # The assembly node itself is not published.
+        if dag_iter.fullPathName() == root.fullPathName():
+            dag_iter.next()
+        while not dag_iter.isDone():
+            path = dag_iter.fullPathName()
+            if is_asm_proxy(path):
+                dag_iter.prune()
+                dag_iter.next()
+                continue
+            transforms.append(om.MFnTransform(dag_iter.getPath()))
+            paths.append(path)
+            dag_iter.next()
+    else:
+        results = cmds.listRelatives(asm_node, allDescendents=True, type='transform',
+                                     fullPath=True) or []
+        # listRelatives gives children first, so put parents first.
+        for result in reversed(results):
+            parts = result.split('|')
+            if [part for part in parts if part and is_asm_proxy(part)]:
+                continue
+            transforms.append(result)
+            paths.append(result)
+    return paths, transforms
+
+def sample_asm_transforms(transforms, values=None):
+    """
+    Reads the translate, rotate and scale attributes of transforms at the current time,
+    the same as the xform queries give, so pivots are kept.  Without the API it falls
+    back to one xform query per channel.
+
+    :param transforms: What find_asm_transforms gives for each transform.
+    :type: list
+
+    :param values: A rows x 9 array to read the values into, a new one by default.
+    :type: numpy.ndarray
+
+    :return: The translation, rotation in degrees and scale of each transform as a rows
+             x 9 array, and the rotate order of each as an index into
+             ASM_ROTATE_ORDERS.
+    :type: tuple
+    """
+    if values is None:
+        values = numpy.empty((len(transforms), 9))
+    rotate_orders = numpy.empty(len(transforms), dtype='i4')
+    for index, transform in enumerate(transforms):
+        if om is not None:
+            matrix   = transform.transformation()
+            rotation = matrix.rotation()
+            values[index, 0:3] = matrix.translation(om.MSpace.kTransform)
+            values[index, 3:6] = (rotation.x, rotation.y, rotation.z)
+            values[index, 6:9] = matrix.scale(om.MSpace.kTransform)
+            rotate_orders[index] = rotation.order
+        else:
+            values[index, 0:3] = cmds.xform(transform, translation=True, query=True)
+            values[index, 3:6] = cmds.xform(transform, rotation=True, query=True)
+            values[index, 6:9] = cmds.xform(transform, scale=True, relative=True,
+                                            query=True)
+            rotate_orders[index] = ASM_ROTATE_ORDERS.index(
+                cmds.xform(transform, rotateOrder=True, query=True))
+    # The API gives the rotations in radians.
+    if om is not None:
+        values[:, 3:6] = numpy.degrees(values[:, 3:6])
+    return values, rotate_orders
+
+def parse_asm_xml_data(asm_dict):
+    """
+    Parses the stringified lists read in from an assembly XML file into arrays, each
+    channel in a single pass over all of the objects.
+
+    :param asm_dict: The objects of the assembly -> {path: {channel: '[x, y, z]'}}
+    :type: dict
+
+    :return: The full path of each object, the translation, rotation and scale of each
+             as rows x 3 arrays, NaN for objects that dont have the channel, and the
+             rotate order of each as an index into ASM_ROTATE_ORDERS.
+    :type: tuple
+    """
+    paths    = list(asm_dict.keys())
+    channels = []
+    for channel in ASM_LAYOUT_CHANNELS:
+        strings = [asm_dict[path].get(channel) for path in paths]
+        valid   = numpy.array([string is not None for string in strings], dtype=bool)
+        text    = ','.join([string.strip()[1:-1] for string in strings
+                            if string is not None])
+        values  = numpy.full((len(paths), 3), numpy.nan)
+        if text:
+            values[valid] = numpy.array(text.split(','), dtype='f8').reshape(-1, 3)
+        channels.append(values)
+    # The XML does not record the rotate order, so objects are read as xyz unless it
+    # was written with one.
+    rotate_orders = numpy.array([ASM_ROTATE_ORDERS.index(
+                                     asm_dict[path].get('rotate_order', 'xyz').strip())
+                                 for path in paths], dtype='i4')
+    return (paths, channels[0], channels[1], channels[2], rotate_orders)
+
+def get_asm_rotation_matrices(rotations, rotate_orders):
+    """
+    Builds the rotation matrix of each row from its euler angles and rotate order, the
+    same as Maya does, for row vectors.
+
+    :param rotations: The [x, y, z] rotation of each row in degrees.
+    :type: numpy.ndarray
+
+    :param rotate_orders: The rotate order of each row, an index into ASM_ROTATE_ORDERS.
+    :type: numpy.ndarray
+
+    :return: A rows x 3 x 3 array.
+    :type: numpy.ndarray
+    """
+    radians  = numpy.radians(rotations)
+    cosines  = numpy.cos(radians)
+    sines    = numpy.sin(radians)
+    axes     = []
+    for axis in range(3):
+        # The matrix of each row for a rotation about this one axis.
+        first, second = (axis + 1) % 3, (axis + 2) % 3
+        matrix = numpy.zeros((len(radians), 3, 3))
+        matrix[:, axis, axis]     = 1.0
+        matrix[:, first, first]   = cosines[:, axis]
+        matrix[:, second, second] = cosines[:, axis]
+        matrix[:, first, second]  = sines[:, axis]
+        matrix[:, second, first]  = -sines[:, axis]
+        axes.append(matrix)
+    matrices = numpy.zeros((len(radians), 3, 3))
+    for index, rotate_order in enumerate(ASM_ROTATE_ORDERS):
+        rows = rotate_orders == index
+        if not rows.any():
             continue
-        if result.endswith(COMMON_LABELS.PROXY):
+        # Row vectors go through the first axis of the rotate order first.
+        first, second, third = ['xyz'.index(axis) for axis in rotate_order]
+        matrices[rows] = numpy.matmul(numpy.matmul(axes[first][rows], axes[second][rows]),
+                                      axes[third][rows])
+    return matrices
+
+def get_asm_euler_rotations(matrices, rotate_orders):
+    """
+    Gets the euler angles of each rotation matrix in its rotate order, the inverse of
+    get_asm_rotation_matrices.  At gimbal lock the last axis is left at zero.
+
+    :param matrices: A rows x 3 x 3 array of rotation matrices for row vectors.
+    :type: numpy.ndarray
+
+    :param rotate_orders: The rotate order of each row, an index into ASM_ROTATE_ORDERS.
+    :type: numpy.ndarray
+
+    :return: The [x, y, z] rotation of each row in degrees.
+    :type: numpy.ndarray
+    """
+    # Work with the matrices for column vectors, the angles are easier to read off.
+    matrices  = numpy.swapaxes(matrices, 1, 2)
+    rotations = numpy.zeros((len(matrices), 3))
+    for index, rotate_order in enumerate(ASM_ROTATE_ORDERS):
+        rows = rotate_orders == index
+        if not rows.any():
             continue
-        keep.append(result)
-
-    # Write out the location of each, recording translation, rotation, and scale.
-    xml_dict = AutoVivification()
-    for transform in keep:
-        obj_trans = cmds.xform(transform, translation=True, query=True)
-        obj_rot   = cmds.xform(transform, rotation=True, query=True)
-        obj_scale = cmds.xform(transform, scale=True, relative=True, query=True)
-        xml_dict[asm_node][transform]['translation'] = str(obj_trans)
-        xml_dict[asm_node][transform]['rotation']    = str(obj_rot)
-        xml_dict[asm_node][transform]['scale']       = str(obj_scale)
-    writer = XMLWriter(file_location, xml_dict)
-    writer.write_xml()
+        first, second, third = ['xyz'.index(axis) for axis in rotate_order]
+        parity = 1.0 if rotate_order in ASM_ROTATE_ORDERS[:3] else -1.0
+        matrix = matrices[rows]
+        cosine = numpy.hypot(matrix[:, first, first], matrix[:, second, first])
+        locked = cosine < 1e-9
+        angles = numpy.zeros((len(matrix), 3))
+        angles[:, first]  = numpy.where(
+            locked, numpy.arctan2(-parity * matrix[:, second, third],
+                                  matrix[:, second, second]),
+            numpy.arctan2(parity * matrix[:, third, second], matrix[:, third, third]))
+        angles[:, second] = numpy.arctan2(-parity * matrix[:, third, first], cosine)
+        angles[:, third]  = numpy.where(
+            locked, 0.0,
+            numpy.arctan2(parity * matrix[:, second, first], matrix[:, first, first]))
+        rotations[rows] = angles
+    return numpy.degrees(rotations)
+
+def compose_asm_matrices(translations, rotations, scales, rotate_orders):
+    """
+    Builds the local matrix of each row, scale then rotation then translation, the same
+    as Maya does for a transform without pivots or shear.
+
+    :param translations: The [x, y, z] translation of each row.
+    :type: numpy.ndarray
+
+    :param rotations: The [x, y, z] rotation of each row in degrees.
+    :type: numpy.ndarray
+
+    :param scales: The [x, y, z] scale of each row.
+    :type: numpy.ndarray
+
+    :param rotate_orders: The rotate order of each row, an index into ASM_ROTATE_ORDERS.
+    :type: numpy.ndarray
+
+    :return: A rows x 4 x 4 array of matrices for row vectors.
+    :type: numpy.ndarray
+    """
+    matrices = numpy.zeros((len(translations), 4, 4))
+    matrices[:, :3, :3] = (scales[:, :, numpy.newaxis] *
+                           get_asm_rotation_matrices(rotations, rotate_orders))
+    matrices[:, 3, :3]  = translations
+    matrices[:, 3, 3]   = 1.0
+    return matrices
+
+def decompose_asm_matrices(matrices, rotate_orders):
+    """
+    Breaks each matrix back down into translation, rotation and scale, the inverse of
+    compose_asm_matrices.  Any shear in the matrices is dropped, and a mirrored matrix
+    gets a negative x scale.
+
+    :param matrices: A rows x 4 x 4 array of matrices for row vectors.
+    :type: numpy.ndarray
+
+    :param rotate_orders: The rotate order to give each row its rotation in.
+    :type: numpy.ndarray
+
+    :return: The translation, rotation in degrees and scale of each row.
+    :type: tuple
+    """
+    axes   = matrices[:, :3, :3]
+    scales = numpy.sqrt((axes ** 2).sum(axis=2))
+    scales[numpy.linalg.det(axes) < 0, 0] *= -1.0
+    # Zero scales have no rotation to find, leave their axes as they are.
+    divisors  = numpy.where(scales == 0.0, 1.0, scales)
+    rotations = get_asm_euler_rotations(axes / divisors[:, :, numpy.newaxis],
+                                        rotate_orders)
+    return matrices[:, 3, :3].copy(), rotations, scales
+
+def get_asm_layout_path(file_location):
+    """
+    Gets where the binary layout that goes with an assembly XML file lives.
+
+    :param file_location: The location of the assembly XML file.
+    :type: str
+
+    :return: The same location with the layout extension.
+    :type: str
+    """
+    return os.path.splitext(file_location)[0] + ASM_LAYOUT_EXTENSION
+
+def get_asm_layout_offsets(string_count, blob_size, node_count, row_count):
+    """
+    Works out where each section of a layout file starts.
+
+    :param string_count: The number of interned strings.
+    :type: int
+
+    :param blob_size: The size in bytes of the interned strings.
+    :type: int
+
+    :param node_count: The number of path nodes.
+    :type: int
+
+    :param row_count: The number of transforms with data.
+    :type: int
+
+    :return: The byte offset of each section and the total size -> {section: offset}
+    :type: dict
+    """
+    sizes = [('string_offsets', 4 * (string_count + 1)),
+             ('strings', blob_size),
+             ('node_parents', 4 * node_count),
+             ('node_namespaces', 4 * node_count),
+             ('node_names', 4 * node_count),
+             ('row_nodes', 4 * row_count),
+             ('rotate_orders', 4 * row_count)]
+    sizes += [(channel, 24 * row_count) for channel in ASM_LAYOUT_CHANNELS]
+    offsets = {}
+    offset = (ASM_LAYOUT_HEADER.size + 7) & ~7
+    for section, size in sizes:
+        offsets[section] = offset
+        # Pad every section out to 8 bytes.
+        offset += (size + 7) & ~7
+    offsets['end'] = offset
+    return offsets
+
+def build_asm_path_table(paths):
+    """
+    Prefix compresses a list of DAG paths into a tree of path nodes.  Each node only
+    stores its parent node, its namespace and its short name, and every namespace and
+    name is interned once, so the long namespace prefixes are only stored one time.
+
+    :param paths: Full DAG paths, i.e. '|asm_ref|asm_ref_NS:cube_asm_ref'.
+    :type: list
+
+    :return: The strings, the parent, namespace and name index of each node, and the
+             node of each path.
+    :type: tuple
+    """
+    strings      = []
+    string_ids   = {}
+    node_ids     = {}
+    parents      = []
+    namespaces   = []
+    names        = []
+    row_nodes    = []
+
+    def intern_string(text):
+        index = string_ids.get(text)
+        if index is None:
+            index = string_ids[text] = len(strings)
+            strings.append(text)
+        return index
+
+    for path in paths:
+        node  = -1
+        parts = path.strip('|').split('|')
+        for depth in range(len(parts)):
+            key   = (node, parts[depth])
+            index = node_ids.get(key)
+            if index is None:
+                namespace, _, name = parts[depth].rpartition(':')
+                index = node_ids[key] = len(parents)
+                parents.append(node)
+                namespaces.append(intern_string(namespace) if namespace else -1)
+                names.append(intern_string(name))
+            node = index
+        row_nodes.append(node)
+    return strings, parents, namespaces, names, row_nodes
+
+def pack_asm_array(type_code, values):
+    """
+    Packs numbers into little endian bytes.
+
+    :param type_code: The array type code, 'i' or 'I' for 32 bit ints or 'd' for
+                      doubles.
+    :type: str
+
+    :param values: The numbers.
+    :type: list
+
+    :return: The packed bytes.
+    :type: bytes
+    """
+    dtype = {'i': '<i4', 'I': '<u4', 'd': '<f8'}[type_code]
+    return numpy.asarray(values, dtype=dtype).tobytes()
+
+def write_asm_layout(layout, file_location):
+    """
+    Writes an assembly layout out as a binary layout file.  The paths are stored as an
+    interned, prefix compressed table and the transforms as three contiguous float64
+    arrays, so read_asm_layout can map them without parsing.
+
+    :param layout: The location data of the assembly.
+    :type: AssemblyLayout
+
+    :param file_location: The location on disk to write out the layout to.
+    :type: str
+
+    :return: The success of the operation.
+    :type: bool
+    """
+    strings, parents, namespaces, names, row_nodes = build_asm_path_table(layout.paths)
+    asm_index = len(strings)
+    strings.append(layout.asm_node)
+
+    encoded = [text.encode('utf-8') for text in strings]
+    string_offsets = [0]
+    for text in encoded:
+        string_offsets.append(string_offsets[-1] + len(text))
+    blob = b''.join(encoded)
+
+    offsets  = get_asm_layout_offsets(len(strings), len(blob), len(parents),
+                                      len(row_nodes))
+    sections = [('string_offsets', pack_asm_array('I', string_offsets)),
+                ('strings', blob),
+                ('node_parents', pack_asm_array('i', parents)),
+                ('node_namespaces', pack_asm_array('i', namespaces)),
+                ('node_names', pack_asm_array('i', names)),
+                ('row_nodes', pack_asm_array('i', row_nodes)),
+                ('rotate_orders', pack_asm_array('i', layout.rotate_orders))]
+    sections += [(channel, pack_asm_array('d', getattr(layout, channel)))
+                 for channel in ASM_LAYOUT_CHANNELS]
+
+    # Write to a temp file and move it over so a reader never maps half a file.
+    temp_location = file_location + '.tmp'
+    with open(temp_location, 'wb') as layout_file:
+        layout_file.write(ASM_LAYOUT_HEADER.pack(ASM_LAYOUT_MAGIC, ASM_LAYOUT_VERSION,
+                                                 len(strings), len(blob), len(parents),
+                                                 len(row_nodes), asm_index, 0, 0))
+        for section, data in sections:
+            layout_file.seek(offsets[section])
+            layout_file.write(data)
+        layout_file.truncate(offsets['end'])
+    if os.path.exists(file_location):
+        os.remove(file_location)
+    os.rename(temp_location, file_location)
+    return True
+
+def map_asm_array(buffer, type_code, offset, count):
+    """
+    Gets numbers out of a mapped layout file as a read only view of the map.
+
+    :param buffer: The mapped file.
+    :type: mmap
+
+    :param type_code: The array type code, 'i' or 'I' for 32 bit ints or 'd' for
+                      doubles.
+    :type: str
+
+    :param offset: Where the numbers start.
+    :type: int
+
+    :param count: How many numbers there are.
+    :type: int
+
+    :return: The numbers.
+    :type: numpy.ndarray
+    """
+    dtype = {'i': '<i4', 'I': '<u4', 'd': '<f8'}[type_code]
+    return numpy.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+
+def read_asm_layout(file_location):
+    """
+    Maps a binary layout file written by write_asm_layout.  Nothing is parsed, the
+    transform arrays are read straight out of the mapped file and the paths are only
+    rebuilt from the path table.
+
+    :param file_location: The location of the layout file.
+    :type: str
+
+    :return: The location data of the assembly, its arrays are read only, None if the
+             file is not a layout.
+    :type: AssemblyLayout
+    """
+    with open(file_location, 'rb') as layout_file:
+        buffer = mmap.mmap(layout_file.fileno(), 0, access=mmap.ACCESS_READ)
+    (magic, version, string_count, blob_size, node_count, row_count, asm_index,
+     _, _) = ASM_LAYOUT_HEADER.unpack_from(buffer, 0)
+    # Older versions are left for the XML to be read instead, they cant be mapped.
+    if magic != ASM_LAYOUT_MAGIC or version != ASM_LAYOUT_VERSION:
+        IO.error("'%s' is not an assembly layout file." % file_location)
+        return None
+    offsets = get_asm_layout_offsets(string_count, blob_size, node_count, row_count)
+
+    # Decode the interned strings, then build each node's path from its parent's.
+    string_offsets = map_asm_array(buffer, 'I', offsets['string_offsets'],
+                                   string_count + 1).tolist()
+    blob    = buffer[offsets['strings']:offsets['strings'] + blob_size]
+    strings = [blob[string_offsets[index]:string_offsets[index + 1]].decode('utf-8')
+               for index in range(string_count)]
+    parents    = map_asm_array(buffer, 'i', offsets['node_parents'], node_count).tolist()
+    namespaces = map_asm_array(buffer, 'i', offsets['node_namespaces'],
+                               node_count).tolist()
+    names      = map_asm_array(buffer, 'i', offsets['node_names'], node_count).tolist()
+    node_paths = []
+    for index in range(node_count):
+        name = strings[names[index]]
+        if namespaces[index] >= 0:
+            name = strings[namespaces[index]] + ':' + name
+        parent = parents[index]
+        node_paths.append((node_paths[parent] if parent >= 0 else '') + '|' + name)
+    row_nodes = map_asm_array(buffer, 'i', offsets['row_nodes'], row_count).tolist()
+
+    rotate_orders = map_asm_array(buffer, 'i', offsets['rotate_orders'], row_count)
+    channels = [map_asm_array(buffer, 'd', offsets[channel],
+                              row_count * 3).reshape(row_count, 3)
+                for channel in ASM_LAYOUT_CHANNELS]
+    return AssemblyLayout(strings[asm_index], [node_paths[node] for node in row_nodes],
+                          channels[0], channels[1], channels[2], rotate_orders)
+
+def get_asm_anim_path(file_location):
+    """
+    Gets where the animation that goes with an assembly XML file lives.
+
+    :param file_location: The location of the assembly XML file.
+    :type: str
+
+    :return: The same location with the animation extension.
+    :type: str
+    """
+    return os.path.splitext(file_location)[0] + ASM_ANIM_EXTENSION
+
+def get_asm_frames(frame_range):
+    """
+    Gets the frames a frame range samples, the end frame is included.
+
+    :param frame_range: The (start, end) or (start, end, step) frames.
+    :type: tuple
+
+    :return: The start frame, the step and the number of frames.
+    :type: tuple
+    """
+    start, end = float(frame_range[0]), float(frame_range[1])
+    step = float(frame_range[2]) if len(frame_range) > 2 else 1.0
+    if step <= 0.0 or end < start:
+        raise ValueError('%r is not a frame range.' % (frame_range,))
+    return start, step, int(math.floor((end - start) / step + 1e-6)) + 1
+
+def get_asm_layout_values(layout):
+    """
+    Gets the values of a layout the way the animation stores them, the translation,
+    rotation and scale of each row one after the other.
+
+    :param layout: The layout.
+    :type: AssemblyLayout
+
+    :return: A rows * 9 array.
+    :type: numpy.ndarray
+    """
+    return numpy.hstack([getattr(layout, channel)
+                         for channel in ASM_LAYOUT_CHANNELS]).astype('<f8').ravel()
+
+def encode_asm_chunk(values, base_values):
+    """
+    Packs a chunk of frames.  Only the values that are different from the layout of the
+    first frame at some frame of the chunk are kept, each as its first value and the
+    differences from one frame to the next.  The differences are taken between the bit
+    patterns of the floats, so they add back up to exactly the same values, and close
+    values give small differences that zlib packs down well.
+
+    :param values: The frames of the chunk, a frames x (rows * 9) array.
+    :type: numpy.ndarray
+
+    :param base_values: The values of the first frame's layout.
+    :type: numpy.ndarray
+
+    :return: The indices of the kept values and the compressed bytes.
+    :type: tuple
+    """
+    bits      = values.view('<i8')
+    columns   = numpy.flatnonzero((bits != base_values.view('<i8')).any(axis=0))
+    kept      = bits[:, columns]
+    # Keep each value's frames together, they are the ones that look alike.
+    deltas    = numpy.ascontiguousarray(numpy.diff(kept, axis=0).T)
+    data      = (columns.astype('<i4').tobytes() + kept[0].astype('<i8').tobytes() +
+                 deltas.astype('<i8').tobytes())
+    return columns, zlib.compress(data)
+
+def decode_asm_chunk(data, column_count, frame_count):
+    """
+    Unpacks a chunk packed by encode_asm_chunk.
+
+    :param data: The compressed bytes.
+    :type: bytes
+
+    :param column_count: How many values the chunk kept.
+    :type: int
+
+    :param frame_count: How many frames the chunk has.
+    :type: int
+
+    :return: The indices of the kept values and their values on each frame, a frames x
+             values array.
+    :type: tuple
+    """
+    data    = zlib.decompress(data)
+    columns = numpy.frombuffer(data, dtype='<i4', count=column_count)
+    first   = numpy.frombuffer(data, dtype='<i8', count=column_count,
+                               offset=4 * column_count)
+    deltas  = numpy.frombuffer(data, dtype='<i8',
+                               count=column_count * (frame_count - 1),
+                               offset=12 * column_count)
+    bits    = numpy.empty((frame_count, column_count), dtype='<i8')
+    bits[0] = first
+    if frame_count > 1:
+        bits[1:] = first + numpy.cumsum(deltas.reshape(column_count, frame_count - 1),
+                                        axis=1).T
+    return columns, bits.view('<f8')
+
+def write_asm_animation(layout, frame_range, file_location,
+                        chunk_frames=ASM_ANIM_CHUNK_FRAMES):
+    """
+    Samples every transform of an assembly layout on every frame of a range and streams
+    the frames to an animation file.  Only one chunk of frames is held at a time, so
+    memory stays the same however long the range is.  Values that never move are only
+    stored in the layout, see encode_asm_chunk for how the rest are packed.  The time
+    is left on the last frame.
+
+    :param layout: The layout of the assembly on the first frame, the animation is read
+                   back against it.
+    :type: AssemblyLayout
+
+    :param frame_range: The (start, end) or (start, end, step) frames.
+    :type: tuple
+
+    :param file_location: The location on disk to write out the animation to.
+    :type: str
+
+    :param chunk_frames: How many frames are sampled and written at a time.
+    :type: int
+
+    :return: The success of the operation.
+    :type: bool
+    """
+    start, step, frame_count = get_asm_frames(frame_range)
+    paths, transforms = find_asm_transforms(layout.asm_node)
+    if paths != layout.paths:
+        IO.error('The transforms under %s do not match its layout.' % layout.asm_node)
+        return False
+    row_count   = len(paths)
+    base_values = get_asm_layout_values(layout)
+    moving      = numpy.zeros(row_count, dtype='u1')
+    chunk       = numpy.empty((chunk_frames, row_count * 9))
+    offsets     = []
+
+    temp_location = file_location + '.tmp'
+    with open(temp_location, 'wb') as anim_file:
+        # The header is written again once the index is where it goes.
+        anim_file.write(ASM_ANIM_HEADER.pack(ASM_ANIM_MAGIC, ASM_ANIM_VERSION,
+                                             row_count, frame_count, chunk_frames,
+                                             start, step, 0))
+        for first_frame in range(0, frame_count, chunk_frames):
+            frames = min(chunk_frames, frame_count - first_frame)
+            for index in range(frames):
+                cmds.currentTime(start + (first_frame + index) * step, update=True)
+                sample_asm_transforms(transforms, chunk[index].reshape(row_count, 9))
+            columns, data = encode_asm_chunk(chunk[:frames], base_values)
+            moving[columns // 9] = 1
+            offsets.append(anim_file.tell())
+            anim_file.write(ASM_ANIM_CHUNK_HEADER.pack(first_frame, frames,
+                                                       len(columns), len(data)))
+            anim_file.write(data)
+
+        # Start the index on an 8 byte boundary like the layout's sections.
+        anim_file.write(b'\0' * (-anim_file.tell() % 8))
+        index_offset = anim_file.tell()
+        anim_file.write(numpy.asarray(offsets, dtype='<u8').tobytes())
+        anim_file.write(moving.tobytes())
+        anim_file.seek(0)
+        anim_file.write(ASM_ANIM_HEADER.pack(ASM_ANIM_MAGIC, ASM_ANIM_VERSION,
+                                             row_count, frame_count, chunk_frames,
+                                             start, step, index_offset))
+    if os.path.exists(file_location):
+        os.remove(file_location)
+    os.rename(temp_location, file_location)
+    return True
+
+def read_asm_animation(file_location):
+    """
+    Maps an animation file written by write_asm_animation along with the layout next
+    to it.  Chunks are only decompressed when their frames are asked for.
+
+    :param file_location: The location of the animation file.
+    :type: str
+
+    :return: The animation, None if the file is not an animation or does not match
+             its layout.
+    :type: AssemblyAnimation
+    """
+    with open(file_location, 'rb') as anim_file:
+        buffer = mmap.mmap(anim_file.fileno(), 0, access=mmap.ACCESS_READ)
+    (magic, version, row_count, frame_count, chunk_frames, start, step,
+     index_offset) = ASM_ANIM_HEADER.unpack_from(buffer, 0)
+    if magic != ASM_ANIM_MAGIC or version != ASM_ANIM_VERSION:
+        IO.error("'%s' is not an assembly animation file." % file_location)
+        return None
+    layout_location = os.path.splitext(file_location)[0] + ASM_LAYOUT_EXTENSION
+    layout = read_asm_layout(layout_location) if os.path.exists(layout_location) \
+        else None
+    if layout is None or len(layout) != row_count:
+        IO.error("'%s' does not have a layout that matches it." % file_location)
+        return None
+    chunk_count = (frame_count + chunk_frames - 1) // chunk_frames
+    offsets = numpy.frombuffer(buffer, dtype='<u8', count=chunk_count,
+                               offset=index_offset).tolist()
+    moving  = numpy.frombuffer(buffer, dtype='u1', count=row_count,
+                               offset=index_offset + 8 * chunk_count).astype(bool)
+    return AssemblyAnimation(layout, start, step, frame_count, chunk_frames, moving,
+                             buffer, offsets)
+
+
+class AssemblyTransform(object):
+    """
+    The location data of one transform in an assembly layout.  It is a copy, changing
+    it does not change the layout.
+    """
+    __slots__ = ('path', 'translation', 'rotation', 'scale', 'rotate_order')
+
+    def __init__(self, path, translation, rotation, scale, rotate_order=0):
+        """
+        :param path: The full DAG path of the transform.
+        :type: str
+
+        :param translation: The [x, y, z] translation, NaN if it was not published.
+        :type: list
+
+        :param rotation: The [x, y, z] rotation in degrees, NaN if it was not published.
+        :type: list
+
+        :param scale: The [x, y, z] scale, NaN if it was not published.
+        :type: list
+
+        :param rotate_order: The rotate order, an index into ASM_ROTATE_ORDERS.
+        :type: int
+        """
+        self.path         = path
+        self.translation  = translation
+        self.rotation     = rotation
+        self.scale        = scale
+        self.rotate_order = rotate_order
+
+    def __repr__(self):
+        return 'AssemblyTransform(%r, %r, %r, %r, %r)' % (
+            self.path, self.translation, self.rotation, self.scale, self.rotate_order)
+
+
+class AssemblyLayout(object):
+    """
+    The location data of every transform in an assembly, held as a table of paths and
+    a rows x 3 NumPy array for each channel, so whole layouts can be looked up, moved,
+    cut down and compared without going through the XML dictionaries.
+
+        layout = AssemblyLayout.from_scene('testAssembly_asm_ref')
+        layout.get('|testAssembly_asm_ref|testAssembly_NS:cube_asm_ref').translation
+        props  = layout.select(namespace='props_NS')
+        moved  = layout.transformed(cmds.xform(offset, query=True, matrix=True))
+        added, removed, changed = props.compare(moved)
+    """
+    __slots__ = ('asm_node', 'paths', 'translation', 'rotation', 'scale',
+                 'rotate_orders', '_index')
+
+    def __init__(self, asm_node, paths, translation=None, rotation=None, scale=None,
+                 rotate_orders=None):
+        """
+        :param asm_node: The name of a top level assembly node, i.e.
+                         'testAssembly_asm_ref'.
+        :type: str
+
+        :param paths: The full DAG path of each transform, parents before their
+                      children.
+        :type: list
+
+        :param translation: The [x, y, z] translation of each transform, defaults to 0.
+        :type: numpy.ndarray
+
+        :param rotation: The [x, y, z] rotation of each transform in degrees, defaults
+                         to 0.
+        :type: numpy.ndarray
+
+        :param scale: The [x, y, z] scale of each transform, defaults to 1.
+        :type: numpy.ndarray
+
+        :param rotate_orders: The rotate order of each transform, an index into
+                              ASM_ROTATE_ORDERS, defaults to xyz.
+        :type: numpy.ndarray
+        """
+        count              = len(paths)
+        self.asm_node      = asm_node
+        self.paths         = list(paths)
+        self.translation   = self._get_channel(translation, count, 0.0)
+        self.rotation      = self._get_channel(rotation, count, 0.0)
+        self.scale         = self._get_channel(scale, count, 1.0)
+        self.rotate_orders = (numpy.zeros(count, dtype='i4') if rotate_orders is None
+                              else numpy.asarray(rotate_orders, dtype='i4'))
+        # Built the first time a path is looked up.
+        self._index        = None
+        if len(self.rotate_orders) != count:
+            raise ValueError('There are %d paths but %d rotate orders.' % (
+                count, len(self.rotate_orders)))
+
+    @staticmethod
+    def _get_channel(values, count, default):
+        if values is None:
+            return numpy.full((count, 3), default)
+        values = numpy.asarray(values, dtype='f8')
+        if values.shape != (count, 3):
+            raise ValueError('There are %d paths but the values are %s.' % (
+                count, 'x'.join([str(size) for size in values.shape])))
+        return values
+
+    @classmethod
+    def from_scene(cls, asm_node):
+        """
+        Gets the location data of an assembly from the scene, see
+        get_asm_transform_data.
+
+        :param asm_node: The name of a top level assembly node.
+        :type: str
+
+        :return: The layout.
+        :type: AssemblyLayout
+        """
+        return cls(asm_node, *get_asm_transform_data(asm_node))
+
+    @classmethod
+    def from_xml(cls, asm_node, asm_dict):
+        """
+        Gets the location data of an assembly from what was read in from its XML file,
+        see parse_asm_xml_data.
+
+        :param asm_node: The name of a top level assembly node.
+        :type: str
+
+        :param asm_dict: The objects of the assembly -> {path: {channel: '[x, y, z]'}}
+        :type: dict
+
+        :return: The layout.
+        :type: AssemblyLayout
+        """
+        return cls(asm_node, *parse_asm_xml_data(asm_dict))
+
+    @classmethod
+    def read(cls, file_location):
+        """
+        Maps a binary layout file, see read_asm_layout.
+
+        :param file_location: The location of the layout file.
+        :type: str
+
+        :return: The layout, None if the file is not a layout.
+        :type: AssemblyLayout
+        """
+        return read_asm_layout(file_location)
+
+    def write(self, file_location):
+        """
+        Writes the layout out as a binary layout file, see write_asm_layout.
+
+        :param file_location: The location on disk to write out the layout to.
+        :type: str
+
+        :return: The success of the operation.
+        :type: bool
+        """
+        return write_asm_layout(self, file_location)
+
+    def get_xml_dict(self):
+        """
+        Gets the layout as the dictionary the assembly XML file is written from.
+        Channels that are NaN are left out.  The rotate orders are only kept in the
+        binary layout, every key of an object in the XML is a channel.
+
+        :return: {asm_node: {path: {channel: '[x, y, z]'}}}
+        :type: AutoVivification
+        """
+        xml_dict = AutoVivification()
+        channels = [(channel, getattr(self, channel).tolist()) for channel in
+                    ASM_LAYOUT_CHANNELS]
+        for index, path in enumerate(self.paths):
+            transform_dict = xml_dict[self.asm_node][path]
+            for channel, rows in channels:
+                if not any([math.isnan(value) for value in rows[index]]):
+                    transform_dict[channel] = str(rows[index])
+        return xml_dict
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __contains__(self, path):
+        return path in self._get_index()
+
+    def __iter__(self):
+        for index in range(len(self.paths)):
+            yield self._get_transform(index)
+
+    def _get_index(self):
+        if self._index is None:
+            self._index = dict([(path, index) for index, path in enumerate(self.paths)])
+        return self._index
+
+    def _get_transform(self, index):
+        return AssemblyTransform(self.paths[index], self.translation[index].tolist(),
+                                 self.rotation[index].tolist(),
+                                 self.scale[index].tolist(),
+                                 int(self.rotate_orders[index]))
+
+    def index(self, path):
+        """
+        Gets the row of a path.
+
+        :param path: The full DAG path of the transform.
+        :type: str
+
+        :return: The row, raises a KeyError if the path is not in the layout.
+        :type: int
+        """
+        return self._get_index()[path]
+
+    def get(self, path):
+        """
+        Gets the location data of one transform.
+
+        :param path: The full DAG path of the transform.
+        :type: str
+
+        :return: The transform, None if the path is not in the layout.
+        :type: AssemblyTransform
+        """
+        index = self._get_index().get(path)
+        if index is None:
+            return None
+        return self._get_transform(index)
+
+    def take(self, rows):
+        """
+        Makes a new layout out of some of the rows of this one.
+
+        :param rows: The rows to keep, in order, or a boolean mask.
+        :type: numpy.ndarray
+
+        :return: The new layout.
+        :type: AssemblyLayout
+        """
+        rows = numpy.arange(len(self.paths))[numpy.asarray(rows)]
+        return AssemblyLayout(self.asm_node, [self.paths[index] for index in rows],
+                              self.translation[rows], self.rotation[rows],
+                              self.scale[rows], self.rotate_orders[rows])
+
+    def select(self, namespace=None, prefix=None):
+        """
+        Makes a new layout out of the transforms in a namespace, or whose paths start
+        with a prefix, or both.
+
+        :param namespace: Keeps transforms whose path has a node in this namespace or a
+                          namespace under it, i.e. 'testAssembly_NS'.
+        :type: str
+
+        :param prefix: Keeps transforms whose full DAG path starts with this, i.e.
+                       '|testAssembly_asm_ref|testAssembly_NS:props' for a group and
+                       everything under it.
+        :type: str
+
+        :return: The new layout.
+        :type: AssemblyLayout
+        """
+        keep = numpy.ones(len(self.paths), dtype=bool)
+        if prefix is not None:
+            keep &= numpy.array([path.startswith(prefix) for path in self.paths],
+                                dtype=bool)
+        if namespace is not None:
+            inside = '|' + namespace.strip(':') + ':'
+            keep  &= numpy.array([inside in path for path in self.paths], dtype=bool)
+        return self.take(keep)
+
+    def transformed(self, matrix):
+        """
+        Makes a new layout with every top level transform, the ones whose parent is not
+        in the layout, moved by a matrix.  Their children move with them so they are
+        left as they are.  Pivots are not in the layout, so the transforms are taken to
+        have them at their origins, and any shear the matrix adds is dropped.
+
+        :param matrix: A 4 x 4 matrix for row vectors in the space of the top level
+                       transforms' parents, or the 16 values cmds.xform gives.
+        :type: list
+
+        :return: The new layout.
+        :type: AssemblyLayout
+        """
+        matrix  = numpy.asarray(matrix, dtype='f8').reshape(4, 4)
+        index   = self._get_index()
+        roots   = numpy.array([path.rpartition('|')[0] not in index
+                               for path in self.paths], dtype=bool)
+        layout  = AssemblyLayout(self.asm_node, self.paths, self.translation.copy(),
+                                 self.rotation.copy(), self.scale.copy(),
+                                 self.rotate_orders.copy())
+        if not roots.any():
+            return layout
+        # Channels that were not published are taken to be at their defaults.
+        channels = []
+        for channel, default in zip(ASM_LAYOUT_CHANNELS, [0.0, 0.0, 1.0]):
+            values = getattr(self, channel)[roots]
+            channels.append(numpy.where(numpy.isnan(values), default, values))
+        local    = compose_asm_matrices(channels[0], channels[1], channels[2],
+                                        self.rotate_orders[roots])
+        (layout.translation[roots], layout.rotation[roots],
+         layout.scale[roots]) = decompose_asm_matrices(numpy.matmul(local, matrix),
+                                                       self.rotate_orders[roots])
+        return layout
+
+    def compare(self, other, tolerance=1e-6):
+        """
+        Compares this layout to another, i.e. a new publish to the last one.
+
+        :param other: The layout to compare to.
+        :type: AssemblyLayout
+
+        :param tolerance: How far apart two values can be and still be the same.
+        :type: float
+
+        :return: The paths only in the other layout, the paths only in this one, and
+                 the paths in both whose location data is different.
+        :type: tuple
+        """
+        index       = self._get_index()
+        other_index = other._get_index()
+        added       = [path for path in other.paths if path not in index]
+        removed     = [path for path in self.paths if path not in other_index]
+        shared      = [path for path in self.paths if path in other_index]
+        rows        = numpy.array([index[path] for path in shared], dtype=int)
+        other_rows  = numpy.array([other_index[path] for path in shared], dtype=int)
+        different   = (self.rotate_orders[rows] != other.rotate_orders[other_rows])
+        for channel in ASM_LAYOUT_CHANNELS:
+            values       = getattr(self, channel)[rows]
+            other_values = getattr(other, channel)[other_rows]
+            different   |= ~numpy.isclose(values, other_values, rtol=0.0,
+                                          atol=tolerance, equal_nan=True).all(axis=1)
+        changed = [shared[row] for row in numpy.flatnonzero(different)]
+        return added, removed, changed
+
+
+class AssemblyAnimation(object):
+    """
+    The per frame location data of an assembly, read out of an animation file a chunk
+    at a time.  Each frame comes back as an AssemblyLayout, so the same tools work on
+    a frame as on a static publish.
+
+        animation = AssemblyAnimation.read('asm_anim_data.asmanim')
+        layout    = animation.get_frame(1012)
+        for frame, layout in animation:
+            ...
+    """
+    __slots__ = ('layout', 'start_frame', 'step', 'frame_count', 'chunk_frames',
+                 'moving', '_buffer', '_offsets', '_base_values', '_chunk')
+
+    def __init__(self, layout, start_frame, step, frame_count, chunk_frames, moving,
+                 buffer, offsets):
+        """
+        :param layout: The layout of the first frame.
+        :type: AssemblyLayout
+
+        :param start_frame: The first frame.
+        :type: float
+
+        :param step: The frames between samples.
+        :type: float
+
+        :param frame_count: How many frames were sampled.
+        :type: int
+
+        :param chunk_frames: How many frames each chunk has.
+        :type: int
+
+        :param moving: Whether each row of the layout moves at some frame.
+        :type: numpy.ndarray
+
+        :param buffer: The mapped animation file.
+        :type: mmap
+
+        :param offsets: Where each chunk starts in the file.
+        :type: list
+        """
+        self.layout       = layout
+        self.start_frame  = start_frame
+        self.step         = step
+        self.frame_count  = frame_count
+        self.chunk_frames = chunk_frames
+        self.moving       = moving
+        self._buffer      = buffer
+        self._offsets     = offsets
+        self._base_values = get_asm_layout_values(layout)
+        # The last chunk that was decoded -> (chunk, columns, values)
+        self._chunk       = None
+
+    @classmethod
+    def read(cls, file_location):
+        """
+        Maps an animation file, see read_asm_animation.
+
+        :param file_location: The location of the animation file.
+        :type: str
+
+        :return: The animation, None if the file is not an animation.
+        :type: AssemblyAnimation
+        """
+        return read_asm_animation(file_location)
+
+    def __len__(self):
+        return self.frame_count
+
+    def __iter__(self):
+        for index in range(self.frame_count):
+            yield self.start_frame + index * self.step, self._get_layout(index)
+
+    def get_frames(self):
+        """
+        Gets the frames that were sampled.
+
+        :return: The frames.
+        :type: list
+        """
+        return [self.start_frame + index * self.step for index in range(self.frame_count)]
+
+    def get_frame(self, frame):
+        """
+        Gets the location data of the assembly on a frame.
+
+        :param frame: One of the frames that were sampled.
+        :type: float
+
+        :return: The layout of the frame.
+        :type: AssemblyLayout
+        """
+        index = int(round((frame - self.start_frame) / self.step))
+        if not 0 <= index < self.frame_count or \
+                abs(self.start_frame + index * self.step - frame) > 1e-6:
+            raise ValueError('Frame %s was not sampled.' % frame)
+        return self._get_layout(index)
+
+    def _get_layout(self, index):
+        chunk = index // self.chunk_frames
+        if self._chunk is None or self._chunk[0] != chunk:
+            offset = self._offsets[chunk]
+            (_, frames, column_count,
+             size) = ASM_ANIM_CHUNK_HEADER.unpack_from(self._buffer, offset)
+            offset += ASM_ANIM_CHUNK_HEADER.size
+            columns, values = decode_asm_chunk(self._buffer[offset:offset + size],
+                                               column_count, frames)
+            self._chunk = (chunk, columns, values)
+        _, columns, values = self._chunk
+        frame_values = self._base_values.copy()
+        frame_values[columns] = values[index % self.chunk_frames]
+        frame_values = frame_values.reshape(len(self.layout), 9)
+        return AssemblyLayout(self.layout.asm_node, self.layout.paths,
+                              frame_values[:, 0:3], frame_values[:, 3:6],
+                              frame_values[:, 6:9], self.layout.rotate_orders)
@@ -0,0 +1,353 @@
+#!/usr/bin/env python
+#SETMODE 777
+
+#----------------------------------------------------------------------------------------#
+#------------------------------------------------------------------------------ HEADER --#
+
+"""
+:author:
+    Nick Lormand & Blake Day
+
+:synopsis:
+    rigs a list of characters from the command line without the gui
+
+:description:
+    reads a json file of character specs and runs steps one to three on each one the
+    same way the gui does, in a process pool with a scene per worker. each worker runs
+    maya standalone or the in memory scene. every character is saved to its own folder
+    in the out folder, a script of the cmds calls that rebuilds it, a json of how the
+    build went and a .ma file, saved by maya or written by ma_writer from the in memory
+    scene. the run ends with the time each character took and the ones that failed.
+    with --update maya opens each character's saved .ma and only redoes what changed
+    in its spec, see incremental_build, the script then only has the calls of the
+    update. with --cache maya opens the finished rig of a character's variant from the
+    cache folder and poses it to the character's guides, see rig_cache. each build is
+    added to the build log, see build_telemetry.
+
+        python -m auto_rigger.batch_rig characters.json --out rigs
+        mayapy -m auto_rigger.batch_rig characters.json --out rigs --backend maya
+        mayapy -m auto_rigger.batch_rig characters.json --out rigs --backend maya --update
+        mayapy -m auto_rigger.batch_rig characters.json --backend maya --cache rig_cache
+
+    the spec file is a list of characters, or {'defaults': {...}, 'characters': [...]}.
+    a character has a name and any of the keys in DEFAULT_CHARACTER, the rest come from
+    the defaults. guides moves fake joints before step two -> {fake joint: [x, y, z]},
+    a relative template path is found from the spec file's folder
+
+        [{"name": "ogre", "fingers": 4, "vertebrae": 7, "template": "ogre.xml",
+          "guides": {"L_elbow_FJNT": [30.0, 140.0, -2.0]}}]
+
+:applications:
+    Maya standalone or plain python
+
+:see_also:
+    variant_sweep
+    cmds_recorder
+    incremental_build
+    rig_cache
+    build_telemetry
+    ma_writer
+    auto_rig_gui
+"""
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- IMPORTS --#
+
+# Default Python Imports
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+
+# Imports That You Wrote
+import auto_rigger.build_telemetry as build_telemetry
+import auto_rigger.cmds_backend as cmds_backend
+from auto_rigger.cmds_backend import cmds
+import auto_rigger.cmds_recorder as cmds_recorder
+import auto_rigger.incremental_build as incremental_build
+import auto_rigger.ma_writer as ma_writer
+import auto_rigger.rig_cache as rig_cache
+from maya_enums import MayaCommandEnums, NamingConventionEnums
+
+#what a character is built with when its spec leaves something out, the gui's defaults
+DEFAULT_CHARACTER = {'template': None, 'fingers': 5, 'toes': 0, 'vertebrae': 5,
+                     'left_prefix': NamingConventionEnums.LEFT,
+                     'right_prefix': NamingConventionEnums.RIGHT,
+                     'left_color': 'Red', 'right_color': 'Blue', 'center_color': 'Yellow',
+                     'fk_style': 'Circle', 'ik_style': '4-Point Star',
+                     'spine_mode': 'Ribbon', 'blend_mode': 'Classic', 'guides': {}}
+#the steps that are timed, in the order they run
+STEPS = ['step_one', 'step_two', 'step_three']
+
+#----------------------------------------------------------------------------------------#
+#--------------------------------------------------------------------------- FUNCTIONS --#
+
+def load_specs(path):
+    """
+    reads the characters from a spec file and fills in the defaults
+
+    :param path: the json spec file
+    :type: str
+
+    :return: a full spec for each character
+    :type: list
+    """
+    with open(path) as spec_file:
+        data = json.load(spec_file)
+    if isinstance(data, list):
+        data = {'characters': data}
+    defaults = dict(DEFAULT_CHARACTER)
+    defaults.update(data.get('defaults', {}))
+
+    specs = []
+    names = set()
+    for index, character in enumerate(data['characters']):
+        unknown = set(character) - set(DEFAULT_CHARACTER) - set(['name'])
+        if unknown:
+            raise ValueError('character %d has unknown keys %s' %
+                             (index, sorted(unknown)))
+        spec = dict(defaults)
+        spec.update(character)
+        spec['name'] = str(spec.get('name') or 'character_%d' % (index + 1))
+        if spec['name'] in names:
+            raise ValueError('there is more than one character named %s' % spec['name'])
+        names.add(spec['name'])
+        if spec['template']:
+            spec['template'] = os.path.join(os.path.dirname(os.path.abspath(path)),
+                                            spec['template'])
+        specs.append(spec)
+    return specs
+
+def run_batch(specs, out_dir, processes=None, backend='scene', update=False,
+              cache_dir=None):
+    """
+    rigs the characters in a process pool
+
+    :param specs: specs from load_specs
+    :type: list
+
+    :param out_dir: the folder the characters are saved in
+    :type: str
+
+    :param processes: number of worker processes, defaults to the number of cpus, 1
+                      rigs them in this process
+    :type: int
+
+    :param backend: what each worker builds in, one of MayaCommandEnums.CMDS_BACKENDS
+    :type: str
+
+    :param update: update the characters' saved scenes instead of starting new ones
+    :type: bool
+
+    :param cache_dir: the folder of rig_cache's finished rigs, None doesnt use a cache
+    :type: str
+
+    :return: a result per character from rig_character, in the order of the specs
+    :type: list
+    """
+    if backend not in MayaCommandEnums.CMDS_BACKENDS:
+        raise ValueError('%s is not a backend, use one of %s' %
+                         (backend, MayaCommandEnums.CMDS_BACKENDS))
+    if not os.path.isdir(out_dir):
+        os.makedirs(out_dir)
+    if update and cache_dir:
+        raise ValueError('a saved scene cant be updated from the cache')
+    jobs = [(spec, out_dir, update, cache_dir) for spec in specs]
+    if processes == 1:
+        init_worker(backend)
+        return [rig_job(job) for job in jobs]
+    pool = multiprocessing.Pool(processes, init_worker, (backend,))
+    try:
+        return pool.map(rig_job, jobs, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+def init_worker(backend):
+    """
+    sets up a worker process to build in maya standalone or the in memory scene
+
+    :param backend: one of MayaCommandEnums.CMDS_BACKENDS
+    :type: str
+    """
+    if backend == 'maya':
+        import maya.standalone
+        maya.standalone.initialize(name='python')
+    cmds_backend.set_backend(backend)
+
+def rig_job(job):
+    """
+    rigs one character for the pool, pool workers only take one argument
+
+    :param job: (spec, out_dir, update, cache_dir)
+    :type: tuple
+
+    :return: the result from rig_character
+    :type: dict
+    """
+    return rig_character(*job)
+
+@contextlib.contextmanager
+def new_scene(scene_path=None):
+    """
+    gives the with block an empty scene, a new file in maya or a new in memory scene
+
+    :param scene_path: a saved scene to open instead if it is there, only in maya
+    :type: str
+    """
+    if cmds_backend.get_backend_name() == 'maya':
+        if scene_path and os.path.isfile(scene_path):
+            cmds.file(scene_path, open=True, force=True)
+        else:
+            cmds.file(new=True, force=True)
+        yield
+    else:
+        with cmds_backend.using_backend('scene'):
+            yield
+
+def rig_character(spec, out_dir, update=False, cache_dir=None):
+    """
+    rigs a character in a new scene and saves it
+
+    :param spec: a spec from load_specs
+    :type: dict
+
+    :param out_dir: the folder the character's folder is made in
+    :type: str
+
+    :param update: open the character's saved scene and only redo what changed
+    :type: bool
+
+    :param cache_dir: the folder of rig_cache's finished rigs, None doesnt use a cache
+    :type: str
+
+    :return: {'name', 'backend', 'times': {step: seconds}, 'time', 'nodes',
+              'files': [saved files], 'built': what was built, 'error'}
+    :type: dict
+    """
+    result = {'name': spec['name'], 'backend': cmds_backend.get_backend_name(),
+              'times': {}, 'time': 0.0, 'nodes': 0, 'files': [], 'built': None,
+              'error': None}
+    character_dir = os.path.join(out_dir, spec['name'])
+    if not os.path.isdir(character_dir):
+        os.makedirs(character_dir)
+    scene_path = os.path.join(character_dir, spec['name'] + '.ma')
+
+    start = time.time()
+    with new_scene(scene_path if update else None):
+        with build_telemetry.record_build('batch', spec) as record:
+            record['steps'] = result['times']
+            with cmds_recorder.record_build() as recorder:
+                try:
+                    result['built'] = build_character(spec, result['times'], cache_dir)
+                except Exception:
+                    result['error'] = traceback.format_exc()
+                    record['error'] = build_telemetry.get_error_line(result['error'])
+        result['time'] = time.time() - start
+        result['nodes'] = len(cmds.ls() or [])
+
+        script_path = os.path.join(character_dir, spec['name'] + '_build.py')
+        cmds_recorder.write_script(recorder.ops, script_path)
+        result['files'].append(script_path)
+        if result['backend'] == 'maya' and not result['error']:
+            cmds.file(rename=scene_path)
+            cmds.file(save=True, type='mayaAscii', force=True)
+            result['files'].append(scene_path)
+        elif result['backend'] == 'scene' and not result['error']:
+            ma_writer.write_scene(scene_path)
+            result['files'].append(scene_path)
+
+    result_path = os.path.join(character_dir, spec['name'] + '.json')
+    result['files'].append(result_path)
+    with open(result_path, 'w') as result_file:
+        json.dump({'spec': spec, 'result': result}, result_file, indent=2,
+                  sort_keys=True, separators=(',', ': '))
+        result_file.write('\n')
+    return result
+
+def build_character(spec, times, cache_dir=None):
+    """
+    runs the steps on a character the way the gui does, only redoing what changed when
+    the scene already has the character's rig, or poses the cached rig of its variant
+
+    :param spec: a spec from load_specs
+    :type: dict
+
+    :param times: gets the seconds each step took -> {step: seconds}
+    :type: dict
+
+    :param cache_dir: the folder of rig_cache's finished rigs, None doesnt use a cache
+    :type: str
+
+    :return: what was built, from incremental_build.rebuild or rig_cache.build_character
+    :type: dict
+    """
+    if cache_dir:
+        return rig_cache.build_character(spec, cache_dir, times, undo=False)
+    return incremental_build.rebuild(spec, times, undo=False)
+
+def print_summary(results):
+    """
+    prints the time each character took and why the failed ones failed
+
+    :param results: results from run_batch
+    :type: list
+    """
+    print('%-20s' % 'character' + ''.join(['%12s' % step for step in STEPS]) +
+          '%12s %8s  %s' % ('total', 'nodes', 'status'))
+    for result in results:
+        print('%-20s' % result['name'] +
+              ''.join(['%12s' % ('%.3f' % result['times'][step]
+                                 if step in result['times'] else '-')
+                       for step in STEPS]) +
+              '%12.3f %8d  %s' % (result['time'], result['nodes'],
+                                  'FAILED' if result['error'] else 'ok'))
+    failed = [result for result in results if result['error']]
+    for result in failed:
+        print('%s failed: %s' % (result['name'],
+                                 result['error'].strip().split('\n')[-1]))
+    print('rigged %d characters in %.3f s of builds, %d failed' %
+          (len(results), sum([result['time'] for result in results]), len(failed)))
+
+def main(args=None):
+    """
+    runs the batch from the command line
+
+    :param args: the command line arguments, defaults to sys.argv
+    :type: list
+
+    :return: 1 if a character failed, else 0
+    :type: int
+    """
+    parser = argparse.ArgumentParser(description='rigs characters without the gui')
+    parser.add_argument('specs', help='json file of the characters to rig')
+    parser.add_argument('--out', default='rigs', help='folder to save the rigs in')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='worker processes, defaults to the number of cpus')
+    parser.add_argument('--backend', default='scene',
+                        choices=MayaCommandEnums.CMDS_BACKENDS,
+                        help='build in maya standalone or the in memory scene')
+    parser.add_argument('--update', action='store_true',
+                        help='only redo what changed in the saved maya scenes')
+    parser.add_argument('--cache', default=None, metavar='DIR',
+                        help='pose the finished rig of each variant from this folder')
+    options = parser.parse_args(args)
+    if options.update and options.cache:
+        parser.error('--update and --cache cant be used together')
+
+    start = time.time()
+    results = run_batch(load_specs(options.specs), options.out, options.processes,
+                        options.backend, options.update, options.cache)
+    print_summary(results)
+    print('the batch took %.3f s' % (time.time() - start))
+    return 1 if [result for result in results if result['error']] else 0
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- CLASSES --#
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+#SETMODE 777
+
+#----------------------------------------------------------------------------------------#
+#------------------------------------------------------------------------------ HEADER --#
+
+"""
+:author:
+    Nick Lormand & Blake Day
+
+:synopsis:
+    snapshots of the scene between steps so a step that fails can be run again
+
+:description:
+    a checkpoint is the scene as a step starts, so after the last step and after any
+    guides the user moved since, with whatever the caller needs to pick the build back
+    up. in maya the scene is exported to a maya binary file, the in memory scene is
+    pickled. when the step in a checkpoint block fails the scene is put back to the
+    checkpoint and the error is raised, so the step can be fixed and run again without
+    starting over from step one.
+
+        store = build_checkpoints.CheckpointStore()
+        with build_checkpoints.checkpoint(store, 'step three', {'cc_list': cc_list}):
+            step_three.run_step(cc_list, num_vertebrae)
+
+    a store only keeps its newest checkpoints, at most max_count of them and max_bytes
+    of files between them, the oldest are deleted first. the newest one is always kept
+    even if it is bigger than max_bytes
+
+:applications:
+    Maya or plain python
+
+:see_also:
+    incremental_build
+    auto_rig_gui
+    cmds_backend
+"""
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- IMPORTS --#
+
+# Default Python Imports
+import contextlib
+import os
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+import shutil
+import tempfile
+import time
+
+# Imports That You Wrote
+import auto_rigger.cmds_backend as cmds_backend
+from auto_rigger.cmds_backend import cmds
+
+#how many checkpoints a store keeps and how many bytes of files they can take up
+MAX_CHECKPOINTS = 5
+MAX_CHECKPOINT_BYTES = 256 * 1024 * 1024
+
+#----------------------------------------------------------------------------------------#
+#--------------------------------------------------------------------------- FUNCTIONS --#
+
+@contextlib.contextmanager
+def checkpoint(store, name, context=None):
+    """
+    saves a checkpoint before the with block, if the block raises the scene is put back
+    to it before the error goes on. put it outside the build session so the session's
+    undo chunk is closed before the scene is put back
+
+    :param store: where the checkpoint is kept, None runs the block without one
+    :type: CheckpointStore
+
+    :param name: what the block builds, like 'step three'
+    :type: str
+
+    :param context: what the caller needs to pick the build back up
+    :type: dict
+    """
+    if store is None:
+        yield
+        return
+    store.save(name, context)
+    try:
+        yield
+    except Exception:
+        store.restore()
+        raise
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- CLASSES --#
+
+class CheckpointStore(object):
+    """
+    the newest checkpoints of a build, oldest first, and the folder their files are in
+    """
+    def __init__(self, folder=None, max_count=MAX_CHECKPOINTS,
+                 max_bytes=MAX_CHECKPOINT_BYTES):
+        """
+        :param folder: where the files go, defaults to a new temp folder
+        :type: str
+
+        :param max_count: the most checkpoints kept
+        :type: int
+
+        :param max_bytes: the most bytes of files kept
+        :type: int
+        """
+        if max_count < 1:
+            raise ValueError('a store has to keep at least one checkpoint')
+        if folder is None:
+            folder = tempfile.mkdtemp(prefix='auto_rigger_checkpoints_')
+        elif not os.path.isdir(folder):
+            os.makedirs(folder)
+        self.folder = folder
+        self.max_count = max_count
+        self.max_bytes = max_bytes
+        #{'name', 'path', 'size', 'context', 'scene_name', 'time'} for each checkpoint
+        self.checkpoints = []
+        self.count = 0
+
+    def get_size(self):
+        """
+        gets how many bytes the checkpoints' files take up
+
+        :return: the bytes
+        :type: int
+        """
+        return sum([saved['size'] for saved in self.checkpoints])
+
+    def save(self, name, context=None):
+        """
+        saves the scene as a new checkpoint and deletes the oldest ones past the limits
+
+        :param name: what is built after it, like 'step three'
+        :type: str
+
+        :param context: what the caller needs to pick the build back up
+        :type: dict
+
+        :return: the checkpoint
+        :type: dict
+        """
+        self.count += 1
+        file_name = '%03d_%s' % (self.count, name.replace(' ', '_'))
+        saved = {'name': name, 'context': dict(context or {}), 'scene_name': None,
+                 'time': time.time()}
+
+        if cmds_backend.get_backend_name() == 'maya':
+            saved['scene_name'] = cmds.file(query=True, sceneName=True)
+            saved['path'] = os.path.join(self.folder, file_name + '.mb')
+            cmds.file(saved['path'], exportAll=True, type='mayaBinary', force=True,
+                      preserveReferences=True)
+        else:
+            saved['path'] = os.path.join(self.folder, file_name + '.scene')
+            with open(saved['path'], 'wb') as scene_file:
+                pickle.dump(cmds_backend.get_base_backend().scene, scene_file, 2)
+        saved['size'] = os.path.getsize(saved['path'])
+
+        self.checkpoints.append(saved)
+        self.prune()
+        return saved
+
+    def restore(self, saved=None):
+        """
+        puts the scene back to a checkpoint
+
+        :param saved: the checkpoint, defaults to the newest
+        :type: dict
+
+        :return: the checkpoint's context
+        :type: dict
+        """
+        if saved is None:
+            if not self.checkpoints:
+                raise RuntimeError('there is no checkpoint to go back to')
+            saved = self.checkpoints[-1]
+
+        if cmds_backend.get_backend_name() == 'maya':
+            cmds.file(saved['path'], open=True, force=True)
+            #keep the user's file name and let maya know it has changes to save
+            if saved['scene_name']:
+                cmds.file(rename=saved['scene_name'])
+            cmds.file(modified=True)
+        else:
+            with open(saved['path'], 'rb') as scene_file:
+                cmds_backend.get_base_backend().scene = pickle.load(scene_file)
+        print('went back to the checkpoint before %s' % saved['name'])
+        return dict(saved['context'])
+
+    def prune(self):
+        """
+        deletes the oldest checkpoints until the store is inside its limits
+        """
+        while len(self.checkpoints) > 1 and (len(self.checkpoints) > self.max_count or
+                                             self.get_size() > self.max_bytes):
+            saved = self.checkpoints.pop(0)
+            if os.path.isfile(saved['path']):
+                os.remove(saved['path'])
+
+    def clear(self, remove_folder=False):
+        """
+        deletes every checkpoint
+
+        :param remove_folder: delete the folder as well, the store cant save after it
+        :type: bool
+        """
+        for saved in self.checkpoints:
+            if os.path.isfile(saved['path']):
+                os.remove(saved['path'])
+        self.checkpoints = []
+        if remove_folder:
+            shutil.rmtree(self.folder, ignore_errors=True)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+#SETMODE 777
+
+#----------------------------------------------------------------------------------------#
+#------------------------------------------------------------------------------ HEADER --#
+
+"""
+:author:
+    Nick Lormand & Blake Day
+
+:synopsis:
+    checks that the tools wrapped around a build dont change what it builds
+
+:description:
+    the gui and batch_rig run each step inside the telemetry, the checkpoints, the
+    profiler and a build session, each of those puts its own object in front of the cmds
+    backend. a spec has to give the same rig when it updates an old rig as it does in
+    an empty scene. each check builds in its own in memory scene and gives a message for
+    anything that went wrong, the run exits with 1 if there are any.
+
+        python -m auto_rigger.build_checks
+
+:applications:
+    plain python
+
+:see_also:
+    build_checkpoints
+    build_telemetry
+    cmds_backend
+    incremental_build
+"""
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- IMPORTS --#
+
+# Default Python Imports
+import sys
+
+# Imports That You Wrote
+import auto_rigger.batch_rig as batch_rig
+import auto_rigger.build_checkpoints as build_checkpoints
+import auto_rigger.build_profiler as build_profiler
+import auto_rigger.build_telemetry as build_telemetry
+import auto_rigger.cmds_backend as cmds_backend
+import auto_rigger.cmds_recorder as cmds_recorder
+from auto_rigger.cmds_backend import cmds
+import auto_rigger.gen_utils as gu
+import auto_rigger.incremental_build as incremental_build
+import auto_rigger.step_one as step_one
+
+#the step one arguments the checks build with
+STEP_ONE_ARGS = (5, 5, 5, 'L_', 'R_', 'Blue', 'Red', 'Yellow')
+
+#the guide the incremental check moves between builds
+MOVED_GUIDES = {'L_elbow_FJNT': [30.0, 140.0, -2.0]}
+
+#how far apart two world matrices can be and still match
+MATRIX_TOLERANCE = 0.001
+
+#----------------------------------------------------------------------------------------#
+#--------------------------------------------------------------------------- FUNCTIONS --#
+
+def run_checks():
+    """
+    runs every check and prints what failed
+
+    :return: a message for each failure
+    :type: list
+    """
+    failures = []
+    for check in [check_gui_step, check_batch_backend, check_incremental_matches_fresh]:
+        with cmds_backend.using_backend('scene'):
+            failures.extend(['%s: %s' % (check.__name__, message)
+                             for message in check()])
+    for failure in failures:
+        print('FAILED: %s' % failure)
+    print('%d checks failed' % len(failures))
+    return failures
+
+def check_gui_step():
+    """
+    runs step one the way the gui does, in the telemetry, a checkpoint, the profiler and
+    a build session, then a step that fails the same way to see the scene go back
+
+    :return: a message for each failure
+    :type: list
+    """
+    failures = []
+    store = build_checkpoints.CheckpointStore()
+    try:
+        with build_telemetry.record_build('check', {}, 'step_one', log_path=''):
+            if cmds_backend.get_backend_name() != 'scene':
+                failures.append('the telemetry changed the backend name to %s' %
+                                cmds_backend.get_backend_name())
+            with build_checkpoints.checkpoint(store, 'stepOne'):
+                with build_profiler.profile_build('stepOne'):
+                    with gu.build_session('stepOne'):
+                        step_one.run_step(*STEP_ONE_ARGS)
+        nodes = len(cmds.ls())
+
+        try:
+            with build_telemetry.record_build('check', {}, 'step_two', log_path=''):
+                with build_checkpoints.checkpoint(store, 'stepTwo'):
+                    with gu.build_session('stepTwo'):
+                        cmds.createNode('transform', name='check_GRP')
+                        raise RuntimeError('check')
+        except RuntimeError:
+            pass
+        if cmds.objExists('check_GRP') or len(cmds.ls()) != nodes:
+            failures.append('the scene wasnt put back after a step failed')
+    except Exception as error:
+        failures.append('%s: %s' % (type(error).__name__, error))
+    finally:
+        store.clear(remove_folder=True)
+    return failures
+
+def check_batch_backend():
+    """
+    checks the backend keeps its name inside the recorder, the telemetry and the
+    profiler batch_rig builds in, rig_cache only uses the cache when it is maya
+
+    :return: a message for each failure
+    :type: list
+    """
+    name = cmds_backend.get_backend_name()
+    base = cmds_backend.get_base_backend()
+    with cmds_recorder.record_build():
+        with build_telemetry.record_build('check', {}, log_path=''):
+            with build_profiler.profile_build('check'):
+                if cmds_backend.get_backend_name() != name:
+                    return ['the backend is called %s inside the wrappers, not %s' %
+                            (cmds_backend.get_backend_name(), name)]
+                if cmds_backend.get_base_backend() is not base:
+                    return ['the wrappers dont lead back to the backend']
+    return []
+
+def check_incremental_matches_fresh():
+    """
+    builds the default spec, updates it with a moved guide and builds the moved spec in
+    an empty scene, both rigs have to have the same nodes in the same places
+
+    :return: a message for each failure
+    :type: list
+    """
+    spec = dict(batch_rig.DEFAULT_CHARACTER, name='check')
+    moved_spec = dict(spec, guides=MOVED_GUIDES)
+    incremental_build.rebuild(spec)
+    incremental_build.rebuild(moved_spec)
+    updated = get_world_matrices()
+    with cmds_backend.using_backend('scene'):
+        incremental_build.rebuild(moved_spec)
+        fresh = get_world_matrices()
+
+    failures = ['%s is only in the %s rig' % (node, 'updated' if node in updated
+                                              else 'fresh')
+                for node in sorted(set(updated) ^ set(fresh))]
+    failures.extend(['%s is in another place in the updated rig' % node
+                     for node in sorted(set(updated) & set(fresh))
+                     if max([abs(a - b) for a, b in zip(updated[node], fresh[node])]) >
+                     MATRIX_TOLERANCE])
+    return failures
+
+def get_world_matrices():
+    """
+    gets the world matrix of every transform in the scene
+
+    :return: {long name: [16 floats]}
+    :type: dict
+    """
+    return dict([(node, cmds.xform(node, query=True, worldSpace=True, matrix=True))
+                 for node in cmds.ls(type='transform', long=True) or []])
+
+def main():
+    """
+    runs the checks from the command line
+
+    :return: the exit code, 1 if a check failed
+    :type: int
+    """
+    return 1 if run_checks() else 0
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- CLASSES --#
+
+if __name__ == '__main__':
+    sys.exit(main())
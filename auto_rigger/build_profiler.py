@@ -0,0 +1,500 @@
+#!/usr/bin/env python
+#SETMODE 777
+
+#----------------------------------------------------------------------------------------#
+#------------------------------------------------------------------------------ HEADER --#
+
+"""
+:author:
+    Nick Lormand & Blake Day
+
+:synopsis:
+    profiles a build per step, per limb module and per function
+
+:description:
+    the profiler is off unless a build runs inside profile_build. while it is on each
+    build session is a step span, each module step three builds is a module span and
+    each function with the profiled decorator is a function span, all nested the way they
+    were called. spans with the same name under the same parent are merged, so a span
+    has how many times it ran, its wall time and the cmds calls made inside it. build,
+    step and module spans also have the nodes they left in the scene, function spans
+    dont since listing the scene around each of thousands of calls costs more than the
+    build. when the profiler is off the decorator only checks a dict so it can stay on
+    the functions.
+
+        with build_profiler.profile_build('biped') as profiler:
+            ...run the steps...
+        print(profiler.get_summary())
+        profiler.write_json(path)
+        profiler.write_collapsed(path)
+
+    the collapsed file has one 'step;module;function self_microseconds' line per stack
+    so flamegraph.pl or speedscope can draw it. nodes are the change in the number of
+    nodes in the scene, so a function that makes and deletes a temp node counts as 0.
+    the time spent counting nodes is taken out of the span times
+
+:applications:
+    Maya or plain python
+
+:see_also:
+    cmds_backend
+    cmds_recorder
+    gen_utils
+"""
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- IMPORTS --#
+
+# Default Python Imports
+import contextlib
+import functools
+import json
+import time
+
+# Imports That You Wrote
+import auto_rigger.cmds_backend as cmds_backend
+
+#the profiler the spans go to -> {'active': BuildProfiler or None}
+PROFILER = {'active': None}
+#the kinds of spans, outermost first
+SPAN_KINDS = ['build', 'step', 'module', 'function']
+#the kinds of spans that count the nodes they leave in the scene
+NODE_SPAN_KINDS = ['build', 'step', 'module']
+
+#----------------------------------------------------------------------------------------#
+#--------------------------------------------------------------------------- FUNCTIONS --#
+
+@contextlib.contextmanager
+def profile_build(name='build', enabled=True):
+    """
+    profiles everything the with block builds
+
+    :param name: name of the root span
+    :type: str
+
+    :param enabled: False runs the block without profiling it and yields None
+    :type: bool
+
+    :return: the profiler, it has the results once the block is done
+    :type: BuildProfiler
+    """
+    if not enabled or PROFILER['active']:
+        yield PROFILER['active'] if enabled else None
+        return
+    profiler = BuildProfiler(name, cmds_backend.get_backend())
+    with cmds_backend.using_backend(profiler.counter):
+        PROFILER['active'] = profiler
+        profiler.start()
+        try:
+            yield profiler
+        finally:
+            profiler.stop()
+            PROFILER['active'] = None
+
+def is_profiling():
+    """
+    checks if a build is being profiled
+
+    :return: if there is an active profiler
+    :type: bool
+    """
+    return PROFILER['active'] is not None
+
+@contextlib.contextmanager
+def span(name, kind='function'):
+    """
+    times the with block as a span under the current one, does nothing if the profiler
+    is off
+
+    :param name: name of the span
+    :type: str
+
+    :param kind: one of SPAN_KINDS
+    :type: str
+
+    :return: the span's stats or None
+    :type: dict
+    """
+    profiler = PROFILER['active']
+    if profiler is None:
+        yield None
+        return
+    stats = profiler.open_span(name, kind)
+    try:
+        yield stats
+    finally:
+        profiler.close_span(stats)
+
+def open_span(name, kind='function'):
+    """
+    starts a span for code that cant be put in a with block, close_span ends it
+
+    :param name: name of the span
+    :type: str
+
+    :param kind: one of SPAN_KINDS
+    :type: str
+
+    :return: the span's stats or None if the profiler is off
+    :type: dict
+    """
+    if PROFILER['active'] is None:
+        return None
+    return PROFILER['active'].open_span(name, kind)
+
+def close_span(stats):
+    """
+    ends a span from open_span
+
+    :param stats: what open_span gave back
+    :type: dict
+    """
+    if stats is not None and PROFILER['active'] is not None:
+        PROFILER['active'].close_span(stats)
+
+def profiled(function):
+    """
+    decorator that makes a function span each time the function runs while profiling
+
+    :param function: the function or method to profile
+    :type: function
+
+    :return: the wrapped function
+    :type: function
+    """
+    name = '%s.%s' % (function.__module__.split('.')[-1], function.__name__)
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        profiler = PROFILER['active']
+        if profiler is None:
+            return function(*args, **kwargs)
+        stats = profiler.open_span(name, 'function')
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profiler.close_span(stats)
+    return wrapper
+
+def new_stats(name, kind):
+    """
+    makes the stats for a span
+
+    :param name: name of the span
+    :type: str
+
+    :param kind: one of SPAN_KINDS
+    :type: str
+
+    :return: {'name', 'kind', 'calls', 'time', 'cmds', 'nodes', 'children'}, nodes is
+             None for the kinds that dont count them
+    :type: dict
+    """
+    return {'name': name, 'kind': kind, 'calls': 0, 'time': 0.0, 'cmds': 0,
+            'nodes': 0 if kind in NODE_SPAN_KINDS else None, 'children': []}
+
+def get_self_time(stats):
+    """
+    gets the time a span spent outside of its children
+
+    :param stats: the span's stats
+    :type: dict
+
+    :return: seconds
+    :type: float
+    """
+    return max(stats['time'] - sum([child['time'] for child in stats['children']]),
+               0.0)
+
+def walk_spans(stats, path=()):
+    """
+    goes through a span and everything under it
+
+    :param stats: the span to start from
+    :type: dict
+
+    :param path: names of the spans above it
+    :type: tuple
+
+    :return: yields (path including the span, span stats)
+    :type: generator
+    """
+    path = path + (stats['name'],)
+    yield path, stats
+    for child in stats['children']:
+        for item in walk_spans(child, path):
+            yield item
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- CLASSES --#
+
+class CmdsCounter(object):
+    """
+    passes cmds calls on to a backend and counts them on the open spans
+    """
+    def __init__(self, backend, profiler):
+        """
+        :param backend: the object the calls run on
+        :type: object
+
+        :param profiler: the profiler the calls are counted on
+        :type: BuildProfiler
+        """
+        self.backend = backend
+        self.profiler = profiler
+        self.commands = {}
+
+    def __getattr__(self, command):
+        if command.startswith('__'):
+            raise AttributeError(command)
+        if command not in self.commands:
+            self.commands[command] = self.wrap(command, getattr(self.backend, command))
+        return self.commands[command]
+
+    def wrap(self, command, function):
+        """
+        makes the function that runs a command and counts it
+
+        :param command: name of the command
+        :type: str
+
+        :param function: the backend's command
+        :type: function
+
+        :return: the counting function
+        :type: function
+        """
+        def counted(*args, **kwargs):
+            self.profiler.add_cmd(command)
+            return function(*args, **kwargs)
+        return counted
+
+class BuildProfiler(object):
+    """
+    keeps the tree of spans for one profiled build
+    """
+    def __init__(self, name, backend):
+        """
+        :param name: name of the root span
+        :type: str
+
+        :param backend: the object the build's cmds calls run on
+        :type: object
+        """
+        self.backend = backend
+        self.counter = CmdsCounter(backend, self)
+        self.root = new_stats(name, 'build')
+        #the open spans, each is [stats, start time, node count at the start or None,
+        # overhead at the start]
+        self.stack = []
+        #seconds spent counting nodes, taken out of the span times
+        self.overhead = 0.0
+        #calls per cmds command for the whole build
+        self.commands = {}
+
+    def count_nodes(self):
+        """
+        counts the nodes in the scene, straight on the backend so it isnt profiled, and
+        adds the time it took to the overhead
+
+        :return: number of nodes
+        :type: int
+        """
+        start = time.time()
+        count = len(self.backend.ls() or [])
+        self.overhead += time.time() - start
+        return count
+
+    def start(self):
+        """
+        opens the root span
+        """
+        self.root['calls'] += 1
+        nodes = self.count_nodes()
+        self.stack = [[self.root, time.time(), nodes, self.overhead]]
+
+    def stop(self):
+        """
+        closes the root span and any span an error left open
+        """
+        while self.stack:
+            self.close_span(self.stack[-1][0])
+
+    def open_span(self, name, kind):
+        """
+        starts a span under the innermost open span, merging it with a sibling that
+        has the same name
+
+        :param name: name of the span
+        :type: str
+
+        :param kind: one of SPAN_KINDS
+        :type: str
+
+        :return: the span's stats
+        :type: dict
+        """
+        name = str(name).replace(';', ':')
+        parent = self.stack[-1][0]
+        stats = None
+        for child in parent['children']:
+            if child['name'] == name and child['kind'] == kind:
+                stats = child
+                break
+        if stats is None:
+            stats = new_stats(name, kind)
+            parent['children'].append(stats)
+        stats['calls'] += 1
+        nodes = self.count_nodes() if kind in NODE_SPAN_KINDS else None
+        self.stack.append([stats, time.time(), nodes, self.overhead])
+        return stats
+
+    def close_span(self, stats):
+        """
+        ends a span and any spans still open inside it
+
+        :param stats: the span's stats
+        :type: dict
+        """
+        if stats not in [item[0] for item in self.stack]:
+            return
+        end = time.time()
+        overhead = self.overhead
+        nodes = None
+        while self.stack:
+            closing, start, start_nodes, start_overhead = self.stack.pop()
+            closing['time'] += end - start - (overhead - start_overhead)
+            if start_nodes is not None:
+                if nodes is None:
+                    nodes = self.count_nodes()
+                closing['nodes'] += nodes - start_nodes
+            if closing is stats:
+                break
+
+    def add_cmd(self, command):
+        """
+        counts a cmds call on every open span
+
+        :param command: name of the command
+        :type: str
+        """
+        self.commands[command] = self.commands.get(command, 0) + 1
+        for item in self.stack:
+            item[0]['cmds'] += 1
+
+    def get_totals(self, kind):
+        """
+        adds up the spans of one kind by name. a span inside one with the same name,
+        like a recursive function, isnt counted twice
+
+        :param kind: one of SPAN_KINDS
+        :type: str
+
+        :return: {name: {'calls', 'time', 'self_time', 'cmds', 'nodes'}}, nodes is None
+                 for the kinds that dont count them
+        :type: dict
+        """
+        totals = {}
+        nodes = 0 if kind in NODE_SPAN_KINDS else None
+        for path, stats in walk_spans(self.root):
+            if stats['kind'] != kind:
+                continue
+            if stats['name'] not in totals:
+                totals[stats['name']] = {'calls': 0, 'time': 0.0, 'self_time': 0.0,
+                                         'cmds': 0, 'nodes': nodes}
+            total = totals[stats['name']]
+            total['self_time'] += get_self_time(stats)
+            if stats['name'] in path[:-1]:
+                continue
+            for key in ['calls', 'time', 'cmds']:
+                total[key] += stats[key]
+            if total['nodes'] is not None:
+                total['nodes'] += stats['nodes']
+        return totals
+
+    def get_data(self):
+        """
+        gets the results as plain data
+
+        :return: {'name', 'time', 'cmds', 'nodes', 'commands', 'spans'}
+        :type: dict
+        """
+        return {'name': self.root['name'], 'time': self.root['time'],
+                'cmds': self.root['cmds'], 'nodes': self.root['nodes'],
+                'commands': dict(self.commands), 'spans': self.root}
+
+    def get_json(self):
+        """
+        gets the results as json
+
+        :return: json of get_data
+        :type: str
+        """
+        return json.dumps(self.get_data(), indent=2, sort_keys=True)
+
+    def write_json(self, path):
+        """
+        saves the results as json
+
+        :param path: where to save the .json file
+        :type: str
+        """
+        with open(path, 'w') as json_file:
+            json_file.write(self.get_json())
+
+    def get_collapsed(self):
+        """
+        gets the results in the collapsed stack format flamegraphs are made from
+
+        :return: one 'span;span;span microseconds' line per stack with self time
+        :type: str
+        """
+        lines = []
+        for path, stats in walk_spans(self.root):
+            self_time = int(round(get_self_time(stats) * 1000000.0))
+            if self_time:
+                lines.append('%s %d' % (';'.join(path), self_time))
+        return '\n'.join(lines) + '\n'
+
+    def write_collapsed(self, path):
+        """
+        saves the results in the collapsed stack format
+
+        :param path: where to save the file, usually .folded or .txt
+        :type: str
+        """
+        with open(path, 'w') as collapsed_file:
+            collapsed_file.write(self.get_collapsed())
+
+    def get_summary(self, num_functions=10):
+        """
+        gets a text summary of the build with the steps, modules and slowest functions
+
+        :param num_functions: how many functions to list
+        :type: int
+
+        :return: the summary
+        :type: str
+        """
+        lines = ['%s took %.3f s, %d cmds calls, %d nodes' %
+                 (self.root['name'], self.root['time'], self.root['cmds'],
+                  self.root['nodes'])]
+        for kind, title in [('step', 'steps'), ('module', 'modules'),
+                            ('function', 'functions (slowest self time)')]:
+            totals = self.get_totals(kind)
+            if not totals:
+                continue
+            sort_key = 'self_time' if kind == 'function' else 'time'
+            names = sorted(totals, key=lambda name: -totals[name][sort_key])
+            if kind == 'function':
+                names = names[:num_functions]
+            lines.append('')
+            lines.append('%-32s %6s %10s %10s %7s %7s' % (title, 'calls', 'time (ms)',
+                                                          'self (ms)', 'cmds', 'nodes'))
+            for name in names:
+                total = totals[name]
+                lines.append('%-32s %6d %10.1f %10.1f %7d %7s' %
+                             (name[:32], total['calls'], total['time'] * 1000.0,
+                              total['self_time'] * 1000.0, total['cmds'],
+                              '-' if total['nodes'] is None else total['nodes']))
+        return '\n'.join(lines)
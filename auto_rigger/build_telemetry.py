@@ -0,0 +1,442 @@
+#!/usr/bin/env python
+#SETMODE 777
+
+#----------------------------------------------------------------------------------------#
+#------------------------------------------------------------------------------ HEADER --#
+
+"""
+:author:
+    Nick Lormand & Blake Day
+
+:synopsis:
+    logs every build to a json lines file and reports on how long the steps take
+
+:description:
+    each build from the gui or batch_rig adds one line to the build log, what it was
+    built from, who built it and when, the seconds each step took, the cmds calls made,
+    the nodes it made and the error if it failed. a line is one write to a file opened
+    for appending so the batch workers can all log to the same file.
+
+        with build_telemetry.record_build('batch', spec) as record:
+            ...run the steps, putting their times in record['steps']...
+
+    the log is ~/.auto_rigger/build_log.jsonl, the AUTO_RIGGER_TELEMETRY environment
+    variable moves it or turns it off with off. a log that cant be written never stops
+    a build. the report groups the builds by template variant, artist or week and gives
+    the percentiles of each step, so it shows which steps get slower as the templates
+    grow
+
+        python -m auto_rigger.build_telemetry
+        python -m auto_rigger.build_telemetry --by week --since 2026-09-01
+
+:applications:
+    Maya or plain python
+
+:see_also:
+    batch_rig
+    auto_rig_gui
+    build_profiler
+"""
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- IMPORTS --#
+
+# Default Python Imports
+import argparse
+import contextlib
+import datetime
+import getpass
+import json
+import os
+import socket
+import sys
+import time
+import traceback
+
+# Imports That You Wrote
+import auto_rigger.cmds_backend as cmds_backend
+from maya_enums import MayaCommandEnums
+
+#the percentiles the report gives
+PERCENTILES = [50, 90, 99]
+#what the report can group the builds by
+GROUPS = ['variant', 'user', 'week', 'source']
+#the order steps are reported in, others go after them
+STEP_ORDER = ['step_one', 'step_two', 'step_three', 'bind', 'total']
+
+#----------------------------------------------------------------------------------------#
+#--------------------------------------------------------------------------- FUNCTIONS --#
+
+def get_log_path():
+    """
+    gets the build log from the environment or the default
+
+    :return: the path, None if the log is off
+    :type: str
+    """
+    path = os.environ.get(MayaCommandEnums.TELEMETRY_LOG_VARIABLE,
+                          MayaCommandEnums.TELEMETRY_LOG)
+    if not path or path.lower() == 'off':
+        return None
+    return os.path.expanduser(path)
+
+@contextlib.contextmanager
+def record_build(source, params, name='build', log_path=None):
+    """
+    counts the cmds calls and nodes of the with block and logs the build when it ends.
+    the block puts the seconds of each step in record['steps'], if it doesnt the whole
+    block is timed as name. an error raised in the block is logged and raised again,
+    a block that catches its own puts it in record['error']
+
+    :param source: what ran the build, like 'gui' or 'batch'
+    :type: str
+
+    :param params: what the build was made from, the keys of batch_rig's specs
+    :type: dict
+
+    :param name: the step the block runs when it is one step
+    :type: str
+
+    :param log_path: the log, defaults to get_log_path
+    :type: str
+
+    :return: the record, it is logged once the block is done
+    :type: dict
+    """
+    if log_path is None:
+        log_path = get_log_path()
+    backend = cmds_backend.get_backend()
+    tally = CmdsTally(backend)
+    record = new_record(source, params)
+    nodes = len(backend.ls() or [])
+
+    start = time.time()
+    try:
+        with cmds_backend.using_backend(tally):
+            yield record
+    except Exception:
+        record['error'] = get_error_line(traceback.format_exc())
+        raise
+    finally:
+        record['total'] = time.time() - start
+        if not record['steps']:
+            record['steps'][name] = record['total']
+        record['commands'] = dict(tally.calls)
+        record['command_count'] = sum(tally.calls.values())
+        record['nodes'] = len(backend.ls() or []) - nodes
+        if log_path:
+            append_record(record, log_path)
+
+def new_record(source, params):
+    """
+    makes the record of a build
+
+    :param source: what ran the build, like 'gui' or 'batch'
+    :type: str
+
+    :param params: what the build was made from, the keys of batch_rig's specs
+    :type: dict
+
+    :return: {'date', 'user', 'host', 'source', 'backend', 'params', 'variant',
+              'steps': {step: seconds}, 'total', 'commands': {command: calls},
+              'command_count', 'nodes', 'error'}
+    :type: dict
+    """
+    params = dict(params)
+    if params.get('template'):
+        params['template'] = os.path.basename(params['template'])
+    return {'date': datetime.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S'),
+            'user': getpass.getuser(), 'host': socket.gethostname(), 'source': source,
+            'backend': cmds_backend.get_backend_name(), 'params': params,
+            'variant': get_variant(params), 'steps': {}, 'total': 0.0, 'commands': {},
+            'command_count': 0, 'nodes': 0, 'error': None}
+
+def get_variant(params):
+    """
+    names the template variant a build was made from
+
+    :param params: what the build was made from
+    :type: dict
+
+    :return: like 'biped f5 t0 v5 Ribbon/Classic'
+    :type: str
+    """
+    template = os.path.splitext(os.path.basename(params.get('template') or
+                                                 'biped.xml'))[0]
+    return '%s f%s t%s v%s %s/%s' % (template, params.get('fingers', '-'),
+                                     params.get('toes', '-'),
+                                     params.get('vertebrae', '-'),
+                                     params.get('spine_mode') or '-',
+                                     params.get('blend_mode') or '-')
+
+def get_error_line(error):
+    """
+    gets the last line of a traceback
+
+    :param error: the traceback
+    :type: str
+
+    :return: the error, like ValueError: No object matches name: ...
+    :type: str
+    """
+    return error.strip().split('\n')[-1]
+
+def append_record(record, path):
+    """
+    adds a record to the end of the log in one write, a log that cant be written is
+    only printed about
+
+    :param record: the record from record_build
+    :type: dict
+
+    :param path: the log
+    :type: str
+    """
+    line = (json.dumps(record, sort_keys=True) + '\n').encode('utf-8')
+    try:
+        folder = os.path.dirname(path)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder)
+        log_file = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o666)
+        try:
+            os.write(log_file, line)
+        finally:
+            os.close(log_file)
+    except (IOError, OSError) as error:
+        print('the build wasnt logged to %s: %s' % (path, error))
+
+def load_records(path, since=None):
+    """
+    reads the records in a log, lines that arent json are skipped
+
+    :param path: the log
+    :type: str
+
+    :param since: only records from this day on, like '2026-09-01'
+    :type: str
+
+    :return: the records, oldest first
+    :type: list
+    """
+    records = []
+    with open(path) as log_file:
+        for line in log_file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if since and record['date'] < since:
+                continue
+            records.append(record)
+    return records
+
+def get_group(record, group):
+    """
+    gets what group a record goes in
+
+    :param record: a record from the log
+    :type: dict
+
+    :param group: one of GROUPS
+    :type: str
+
+    :return: the group's name, weeks are like '2026-W42'
+    :type: str
+    """
+    if group == 'week':
+        date = datetime.datetime.strptime(record['date'], '%Y-%m-%dT%H:%M:%S')
+        year, week = date.isocalendar()[:2]
+        return '%d-W%02d' % (year, week)
+    return str(record[group])
+
+def get_percentile(values, percent):
+    """
+    gets a percentile of some values, between the two closest when it falls between them
+
+    :param values: the values, sorted
+    :type: list
+
+    :param percent: 0 to 100
+    :type: float
+
+    :return: the percentile
+    :type: float
+    """
+    position = (len(values) - 1) * percent / 100.0
+    index = int(position)
+    if index + 1 >= len(values):
+        return values[-1]
+    return values[index] + (values[index + 1] - values[index]) * (position - index)
+
+def get_report(records, group='variant'):
+    """
+    works out the percentiles of each step of each group, only builds that didnt fail
+    are timed
+
+    :param records: records from load_records
+    :type: list
+
+    :param group: one of GROUPS
+    :type: str
+
+    :return: [{'group', 'step', 'builds', 'failed', 'p50', 'p90', 'p99', 'max',
+              'commands', 'nodes'}] sorted by group then step
+    :type: list
+    """
+    stats = {}
+    for record in records:
+        name = get_group(record, group)
+        steps = dict(record['steps'])
+        steps['total'] = record['total']
+        for step in steps:
+            step_stats = stats.setdefault((name, step), {'times': [], 'failed': 0,
+                                                         'commands': [], 'nodes': []})
+            if record['error']:
+                step_stats['failed'] += 1
+                continue
+            step_stats['times'].append(steps[step])
+            if step == 'total':
+                step_stats['commands'].append(record['command_count'])
+                step_stats['nodes'].append(record['nodes'])
+
+    rows = []
+    for name, step in sorted(stats, key=lambda key: (key[0], get_step_index(key[1]))):
+        step_stats = stats[(name, step)]
+        times = sorted(step_stats['times'])
+        row = {'group': name, 'step': step, 'builds': len(times),
+               'failed': step_stats['failed'], 'max': times[-1] if times else None,
+               'commands': get_mean(step_stats['commands']),
+               'nodes': get_mean(step_stats['nodes'])}
+        for percent in PERCENTILES:
+            row['p%d' % percent] = get_percentile(times, percent) if times else None
+        rows.append(row)
+    return rows
+
+def get_step_index(step):
+    """
+    gets where a step goes in the report
+
+    :param step: the step
+    :type: str
+
+    :return: its place in STEP_ORDER, steps that arent in it go after
+    :type: int
+    """
+    if step in STEP_ORDER:
+        return STEP_ORDER.index(step)
+    return len(STEP_ORDER)
+
+def get_mean(values):
+    """
+    gets the mean of some values
+
+    :param values: the values
+    :type: list
+
+    :return: the mean, None if there arent any
+    :type: float
+    """
+    if not values:
+        return None
+    return float(sum(values)) / len(values)
+
+def print_report(rows, group='variant'):
+    """
+    prints the rows of a report, times in seconds
+
+    :param rows: rows from get_report
+    :type: list
+
+    :param group: what the rows are grouped by
+    :type: str
+    """
+    def cell(value, pattern):
+        return pattern % value if value is not None else '-'
+
+    print('%-32s %-12s %7s %7s' % (group, 'step', 'builds', 'failed') +
+          ''.join(['%9s' % ('p%d' % percent) for percent in PERCENTILES]) +
+          '%9s %9s %8s' % ('max', 'cmds', 'nodes'))
+    for row in rows:
+        print('%-32s %-12s %7d %7d' % (row['group'][:32], row['step'], row['builds'],
+                                       row['failed']) +
+              ''.join(['%9s' % cell(row['p%d' % percent], '%.3f')
+                       for percent in PERCENTILES]) +
+              '%9s %9s %8s' % (cell(row['max'], '%.3f'), cell(row['commands'], '%d'),
+                               cell(row['nodes'], '%d')))
+
+def main(args=None):
+    """
+    prints the report of a build log from the command line
+
+    :param args: the command line arguments, defaults to sys.argv
+    :type: list
+
+    :return: 1 if there was no log to report on, else 0
+    :type: int
+    """
+    parser = argparse.ArgumentParser(description='reports how long the builds take')
+    parser.add_argument('--log', default=None, help='the build log, defaults to '
+                        '$%s or %s' % (MayaCommandEnums.TELEMETRY_LOG_VARIABLE,
+                                       MayaCommandEnums.TELEMETRY_LOG))
+    parser.add_argument('--by', default='variant', choices=GROUPS,
+                        help='what to group the builds by')
+    parser.add_argument('--since', default=None,
+                        help='only builds from this day on, like 2026-09-01')
+    options = parser.parse_args(args)
+
+    path = options.log or get_log_path()
+    if not path or not os.path.isfile(path):
+        print('there is no build log at %s' % path)
+        return 1
+    records = load_records(path, options.since)
+    print_report(get_report(records, options.by), options.by)
+    print('%d builds, %d failed' % (len(records),
+                                    len([record for record in records
+                                         if record['error']])))
+    return 0
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- CLASSES --#
+
+class CmdsTally(object):
+    """
+    passes cmds calls on to a backend and counts them per command
+    """
+    def __init__(self, backend):
+        """
+        :param backend: the object the calls run on
+        :type: object
+        """
+        self.backend = backend
+        self.calls = {}
+        self.commands = {}
+
+    def __getattr__(self, command):
+        if command.startswith('__'):
+            raise AttributeError(command)
+        if command not in self.commands:
+            self.commands[command] = self.wrap(command, getattr(self.backend, command))
+        return self.commands[command]
+
+    def wrap(self, command, function):
+        """
+        makes the function that runs a command and counts it
+
+        :param command: name of the command
+        :type: str
+
+        :param function: the backend's command
+        :type: function
+
+        :return: the counting function
+        :type: function
+        """
+        calls = self.calls
+
+        def counted(*args, **kwargs):
+            calls[command] = calls.get(command, 0) + 1
+            return function(*args, **kwargs)
+        return counted
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+#SETMODE 777
+
+#----------------------------------------------------------------------------------------#
+#------------------------------------------------------------------------------ HEADER --#
+
+"""
+:author:
+    Nick Lormand & Blake Day
+
+:synopsis:
+    picks what the auto rigger's cmds calls run on
+
+:description:
+    every module imports cmds from here instead of maya.cmds. cmds passes each call on
+    to the current backend, maya.cmds inside maya or the in memory scene from scene_cmds
+    anywhere else, so the steps build the same way without maya for ci and profiling.
+    the backend is picked from the AUTO_RIGGER_BACKEND environment variable, then maya if
+    it can be imported, then the scene. set_backend changes it at any time and takes
+    'maya', 'scene' or any object with the commands on it. an object that passes the
+    calls on to another backend, like the recorder, keeps it as its backend attribute,
+    the name is the one of the backend at the bottom so a recorded maya build is still
+    'maya'
+
+:applications:
+    Maya or plain python
+
+:see_also:
+    scene_cmds
+    gen_utils
+"""
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- IMPORTS --#
+
+# Default Python Imports
+import contextlib
+import os
+
+# Imports That You Wrote
+from maya_enums import MayaCommandEnums
+
+#the current backend -> {'name': backend name, 'cmds': object the calls go to}
+BACKEND = {'name': None, 'cmds': None}
+
+#----------------------------------------------------------------------------------------#
+#--------------------------------------------------------------------------- FUNCTIONS --#
+
+def set_backend(backend):
+    """
+    changes what the cmds calls run on
+
+    :param backend: 'maya', 'scene' or an object with the commands on it
+    :type: str or object
+
+    :return: the object the calls go to now
+    :type: object
+    """
+    if backend == 'maya':
+        import maya.cmds
+        BACKEND['name'], BACKEND['cmds'] = 'maya', maya.cmds
+    elif backend == 'scene':
+        from auto_rigger.scene_cmds import SceneCmds
+        BACKEND['name'], BACKEND['cmds'] = 'scene', SceneCmds()
+    elif isinstance(backend, (type(''), type(u''))):
+        raise ValueError('%s is not a backend, use one of %s' %
+                         (backend, MayaCommandEnums.CMDS_BACKENDS))
+    else:
+        BACKEND['name'], BACKEND['cmds'] = get_name(get_base_backend(backend)), backend
+    return BACKEND['cmds']
+
+def get_base_backend(backend=None):
+    """
+    gets the backend the calls end up on, under any objects that pass them on
+
+    :param backend: the backend to start from, defaults to the current one
+    :type: object
+
+    :return: maya.cmds, a SceneCmds or a custom backend
+    :type: object
+    """
+    if backend is None:
+        backend = get_backend()
+    #the wrappers keep what they pass the calls on to as an instance attribute, vars
+    # doesnt go through their __getattr__
+    while 'backend' in getattr(backend, '__dict__', {}):
+        backend = vars(backend)['backend']
+    return backend
+
+def get_name(backend):
+    """
+    gets the name of a backend
+
+    :param backend: maya.cmds, a SceneCmds or a custom backend
+    :type: object
+
+    :return: 'maya', 'scene' or the class name of a custom backend
+    :type: str
+    """
+    if getattr(backend, '__name__', None) == 'maya.cmds':
+        return 'maya'
+    from auto_rigger.scene_cmds import SceneCmds
+    if isinstance(backend, SceneCmds):
+        return 'scene'
+    return type(backend).__name__
+
+def get_backend():
+    """
+    gets the object the cmds calls go to, picking the default one the first time
+
+    :return: maya.cmds, a SceneCmds or whatever set_backend was given
+    :type: object
+    """
+    if BACKEND['cmds'] is None:
+        backend = os.environ.get(MayaCommandEnums.CMDS_BACKEND_VARIABLE)
+        if not backend:
+            try:
+                import maya.cmds
+                backend = 'maya'
+            except ImportError:
+                backend = 'scene'
+        set_backend(backend)
+    return BACKEND['cmds']
+
+def get_backend_name():
+    """
+    gets the name of the current backend, the one under any objects that pass the calls
+    on
+
+    :return: 'maya', 'scene' or the class name of a custom backend
+    :type: str
+    """
+    get_backend()
+    return BACKEND['name']
+
+@contextlib.contextmanager
+def using_backend(backend):
+    """
+    runs the cmds calls in the with block on another backend then puts the old one back
+
+    :param backend: 'maya', 'scene' or an object with the commands on it
+    :type: str or object
+
+    :return: the object the calls go to in the block
+    :type: object
+    """
+    get_backend()
+    previous = dict(BACKEND)
+    try:
+        yield set_backend(backend)
+    finally:
+        BACKEND.update(previous)
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- CLASSES --#
+
+class CmdsProxy(object):
+    """
+    stands in for maya.cmds and passes each call on to the current backend
+    """
+    def __getattr__(self, command):
+        return getattr(get_backend(), command)
+
+cmds = CmdsProxy()
@@ -0,0 +1,319 @@
+#!/usr/bin/env python
+#SETMODE 777
+
+#----------------------------------------------------------------------------------------#
+#------------------------------------------------------------------------------ HEADER --#
+
+"""
+:author:
+    Nick Lormand & Blake Day
+
+:synopsis:
+    records the cmds calls of a build so it can be replayed without the steps
+
+:description:
+    CmdsRecorder sits in front of a cmds backend and passes every call on. each call
+    that changes the scene goes in an op log with its arguments, the nodes it touched and
+    how long it took, queries only go in the profile. the op log is plain data, it saves
+    to json and turns into one script of cmds calls, so the same template builds again
+    without any of the python that worked out what to make. every call is counted and
+    timed per command, so the log is also a profile of the build.
+
+        with cmds_recorder.record_build() as recorder:
+            ...run the steps...
+        recorder.print_profile()
+        cmds_recorder.write_script(recorder.ops, path)
+
+    replays have to start from the same scene the recording did, names are written as
+    they were made
+
+:applications:
+    Maya or plain python
+
+:see_also:
+    cmds_backend
+    spine_benchmark
+"""
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- IMPORTS --#
+
+# Default Python Imports
+import contextlib
+import json
+import time
+
+# Imports That You Wrote
+import auto_rigger.cmds_backend as cmds_backend
+from auto_rigger.cmds_backend import cmds
+
+#commands that dont change the scene, they are profiled but left out of the op log
+QUERY_COMMANDS = ['attributeQuery', 'exactWorldBoundingBox', 'getAttr',
+                  'listConnections', 'listRelatives', 'ls', 'nodeType', 'objExists']
+#commands that only change maya's session, not the scene
+SESSION_COMMANDS = ['evaluationManager', 'refresh', 'undoInfo']
+#flags whose values are node names
+NODE_FLAGS = ['endEffector', 'name', 'node', 'parent', 'startJoint', 'worldUpObject']
+
+#----------------------------------------------------------------------------------------#
+#--------------------------------------------------------------------------- FUNCTIONS --#
+
+@contextlib.contextmanager
+def record_build(backend=None):
+    """
+    records every cmds call made in the with block
+
+    :param backend: the object the calls run on, defaults to the current backend
+    :type: object
+
+    :return: the recorder
+    :type: CmdsRecorder
+    """
+    if backend is None:
+        backend = cmds_backend.get_backend()
+    recorder = CmdsRecorder(backend)
+    with cmds_backend.using_backend(recorder):
+        yield recorder
+
+def is_mutation(command, kwargs):
+    """
+    checks if a cmds call changes the scene
+
+    :param command: name of the command
+    :type: str
+
+    :param kwargs: flags it was called with
+    :type: dict
+
+    :return: if it goes in the op log
+    :type: bool
+    """
+    if command in QUERY_COMMANDS or command in SESSION_COMMANDS:
+        return False
+    return not (kwargs.get('query') or kwargs.get('q'))
+
+def get_touched_nodes(args, kwargs, result):
+    """
+    gets the names of the nodes a call was given or made
+
+    :param args: the call's arguments
+    :type: list
+
+    :param kwargs: the call's flags
+    :type: dict
+
+    :param result: what the call gave back
+    :type: object
+
+    :return: node names without attributes or components, in the order they came
+    :type: list
+    """
+    values = list(args) + [kwargs[flag] for flag in NODE_FLAGS if flag in kwargs]
+    values.append(result)
+    nodes = []
+    while values:
+        value = values.pop(0)
+        if isinstance(value, (list, tuple)):
+            values[0:0] = list(value)
+        elif isinstance(value, (type(''), type(u''))):
+            node = value.partition('.')[0]
+            if node and node not in nodes:
+                nodes.append(node)
+    return nodes
+
+def format_call(op):
+    """
+    writes an op as a line of python
+
+    :param op: an op from the log
+    :type: dict
+
+    :return: 'cmds.command(args, flag=value)'
+    :type: str
+    """
+    arguments = [repr(arg) for arg in op['args']]
+    arguments.extend(['%s=%r' % (flag, op['kwargs'][flag])
+                      for flag in sorted(op['kwargs'])])
+    return 'cmds.%s(%s)' % (op['command'], ', '.join(arguments))
+
+def get_script(ops):
+    """
+    turns an op log into a script that makes the same calls
+
+    :param ops: the op log
+    :type: list
+
+    :return: the script
+    :type: str
+    """
+    lines = ['"""',
+             'rebuilds a rig from %d recorded cmds calls, made by cmds_recorder' %
+             len(ops),
+             '"""',
+             'from auto_rigger.cmds_backend import cmds',
+             '']
+    lines.extend([format_call(op) for op in ops])
+    return '\n'.join(lines) + '\n'
+
+def write_script(ops, path):
+    """
+    saves an op log as a script
+
+    :param ops: the op log
+    :type: list
+
+    :param path: where to save the .py file
+    :type: str
+    """
+    with open(path, 'w') as script_file:
+        script_file.write(get_script(ops))
+
+def run_script(path):
+    """
+    runs a script from write_script on the current backend
+
+    :param path: the .py file
+    :type: str
+    """
+    with open(path) as script_file:
+        code = compile(script_file.read(), path, 'exec')
+    exec(code, {'__name__': '__replay__'})
+
+def save_log(ops, path):
+    """
+    saves an op log as json, one op per line
+
+    :param ops: the op log
+    :type: list
+
+    :param path: where to save it
+    :type: str
+    """
+    with open(path, 'w') as log_file:
+        for op in ops:
+            log_file.write(json.dumps(op, sort_keys=True) + '\n')
+
+def load_log(path):
+    """
+    loads an op log that save_log wrote
+
+    :param path: the log file
+    :type: str
+
+    :return: the op log
+    :type: list
+    """
+    ops = []
+    with open(path) as log_file:
+        for line in log_file:
+            if line.strip():
+                op = json.loads(line)
+                op['kwargs'] = dict([(str(flag), value)
+                                     for flag, value in op['kwargs'].items()])
+                ops.append(op)
+    return ops
+
+def replay(ops):
+    """
+    makes the calls in an op log on the current backend
+
+    :param ops: the op log
+    :type: list
+
+    :return: seconds it took
+    :type: float
+    """
+    start = time.time()
+    for op in ops:
+        getattr(cmds, op['command'])(*op['args'], **op['kwargs'])
+    return time.time() - start
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- CLASSES --#
+
+class CmdsRecorder(object):
+    """
+    passes cmds calls on to a backend and records them
+    """
+    def __init__(self, backend):
+        """
+        :param backend: the object the calls run on, maya.cmds or a SceneCmds
+        :type: object
+        """
+        self.backend = backend
+        self.ops = []
+        self.profile = {}
+        self.commands = {}
+
+    def __getattr__(self, command):
+        if command.startswith('__'):
+            raise AttributeError(command)
+        if command not in self.commands:
+            self.commands[command] = self.wrap(command,
+                                               getattr(self.backend, command))
+        return self.commands[command]
+
+    def wrap(self, command, function):
+        """
+        makes the function that runs a command and records it
+
+        :param command: name of the command
+        :type: str
+
+        :param function: the backend's command
+        :type: function
+
+        :return: the recording function
+        :type: function
+        """
+        def recorded(*args, **kwargs):
+            start = time.time()
+            result = function(*args, **kwargs)
+            duration = time.time() - start
+            mutation = is_mutation(command, kwargs)
+            self.add_call(command, duration, mutation)
+            if mutation:
+                self.ops.append({'command': command, 'args': list(args),
+                                 'kwargs': kwargs,
+                                 'nodes': get_touched_nodes(args, kwargs, result),
+                                 'time': duration})
+            return result
+        return recorded
+
+    def add_call(self, command, duration, mutation):
+        """
+        counts a call in the profile
+
+        :param command: name of the command
+        :type: str
+
+        :param duration: seconds it took
+        :type: float
+
+        :param mutation: if it changed the scene
+        :type: bool
+        """
+        if command not in self.profile:
+            self.profile[command] = {'calls': 0, 'mutations': 0, 'time': 0.0}
+        stats = self.profile[command]
+        stats['calls'] += 1
+        stats['time'] += duration
+        if mutation:
+            stats['mutations'] += 1
+
+    def print_profile(self):
+        """
+        prints the calls per command, slowest first
+        """
+        total = sum([stats['time'] for stats in self.profile.values()]) or 1.0
+        print('%-24s %8s %10s %12s %7s' % ('command', 'calls', 'mutations', 'time (ms)',
+                                           '%'))
+        for command in sorted(self.profile, key=lambda name: -self.profile[name]['time']):
+            stats = self.profile[command]
+            print('%-24s %8d %10d %12.3f %7.1f' % (command, stats['calls'],
+                                                   stats['mutations'],
+                                                   stats['time'] * 1000.0,
+                                                   stats['time'] / total * 100.0))
+        print('%d calls, %d ops in the log' % (sum([stats['calls'] for stats in
+                                                     self.profile.values()]),
+                                                len(self.ops)))
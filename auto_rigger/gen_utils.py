@@ -17,9 +17,12 @@
     create circle controls, create arrow controls, create star controls, creates finger
     controls, creates foot control, creates fake joints and connectors, create buffers for
     maya objs, changes shape colors, mirrors objs, rename objs, makes objs display as
-    template, lock and unlock channels, places pole vectors, makes and ik fk switch,
-    makes fk controls, create the hierarchy, replace fake joints with real joints,
-    get the joint list out of the maya scene
+    template, lock and unlock channels, places pole vectors, multiplies, inverts and
+    blends matrices, finds uvs on a surface, creates follicles, makes and ik fk switch,
+    makes fk controls, makes controls by style, clones joint chains, create the
+    hierarchy, replace fake joints with real joints, get the joint list out of the maya
+    scene, save and restore the selection, run a build as one undo chunk with the
+    viewport and evaluation paused
 
 :applications:
     Maya
@@ -36,15 +39,28 @@
 #----------------------------------------------------------------------------- IMPORTS --#
 
 # Default Python Imports
-import maya.cmds as cmds
-from maya import OpenMaya as om
+import contextlib
+import hashlib
+import json
 import math
+import time
 
 # Imports That You Wrote
+import auto_rigger.build_profiler as build_profiler
+from auto_rigger.build_profiler import profiled
+from auto_rigger.cmds_backend import cmds
+from auto_rigger.naming_context import DEFAULT_NAMING
 from maya_enums import MayaCommandEnums, NamingConventionEnums
+
+#how many build sessions are open, only the outer one changes maya's settings
+BUILD_SESSION = {'depth': 0}
+#the styles create_control can make
+CONTROL_STYLES = ['Circle', '4-Point Star', '4-Point Arrow', 'Box', 'finger', 'PV',
+                  'Foot']
 #----------------------------------------------------------------------------------------#
 #--------------------------------------------------------------------------- FUNCTIONS --#
 # parent constraint
+@profiled
 def parent_const(parent_obj, child_obj, const_name, maintain_offset=False, tx=True,
                  ty=True, tz=True, rx=True, ry=True, rz=True):
     """
@@ -106,6 +122,7 @@ def parent_const(parent_obj, child_obj, const_name, maintain_offset=False, tx=Tr
         exec (to_run)
 
 # point constraint
+@profiled
 def point_const(parent_obj, child_obj, const_name, maintain_offset=False, tx=True,
                 ty=True, tz=True):
     """
@@ -152,6 +169,7 @@ def point_const(parent_obj, child_obj, const_name, maintain_offset=False, tx=Tru
         exec (to_run)
 
 # aim constraint
+@profiled
 def aim_const(parent_obj, child_obj, const_name, aimVector = (1,0,0), upVector = (0,1,0),
               worldUpType = None, worldUpObject = None,
               maintain_offset=False, tx=True, ty=True, tz=True):
@@ -208,6 +226,7 @@ def aim_const(parent_obj, child_obj, const_name, aimVector = (1,0,0), upVector =
         exec (to_run)
 
 # orient constraint
+@profiled
 def orient_const(parent_obj, child_obj, const_name, maintain_offset=False, rx=True,
                  ry=True, rz=True):
     """
@@ -254,6 +273,7 @@ def orient_const(parent_obj, child_obj, const_name, maintain_offset=False, rx=Tr
         exec (to_run)
 
 # scale constraint
+@profiled
 def scale_const(parent_obj, child_obj, const_name, maintain_offset=False, sx=True,
                 sy=True, sz=True):
     """
@@ -300,6 +320,7 @@ def scale_const(parent_obj, child_obj, const_name, maintain_offset=False, sx=Tru
         exec (to_run)
 
 # move onto
+@profiled
 def place_on(to_move_obj, target_obj, scale = False):
     """
     moves an object to the same position as another object by making a parent constraint
@@ -322,6 +343,7 @@ def place_on(to_move_obj, target_obj, scale = False):
 
 
 
+@profiled
 def orient_joints(root_jnt, main_axis, secondary_axis, extra_axis, secondary_axis_orient):
     """
     orients joints based off the given info
@@ -383,8 +405,7 @@ def create_box(obj_name):
     cmds.addAttr('|' + obj_name, longName=NamingConventionEnums.GLOBAL_ATTR_NAME,
                  attributeType='bool')
     #clear history
-    cmds.select(obj_name)
-    cmds.DeleteHistory()
+    cmds.delete(obj_name, constructionHistory=True)
     return obj_name
 
 def create_foot_CC(obj_name):
@@ -405,13 +426,11 @@ def create_foot_CC(obj_name):
                name=obj_name)
     cmds.xform(obj_name, absolute=True, scale=[4,3,10])
 
-    cmds.select(obj_name + '.cv[0:1]',obj_name+".cv[4:5]", obj_name+".cv[8:12]")
-    cmds.xform(scale=[.6, 1, 1], relative=True)
-    cmds.select(obj_name + '.cv[0:1]', obj_name + ".cv[4]", obj_name + ".cv[8]",
-                obj_name + ".cv[11]")
-    cmds.xform(translation=[0, -.55, 0], relative=True)
+    cmds.xform(obj_name + '.cv[0:1]',obj_name+".cv[4:5]", obj_name+".cv[8:12]",
+               scale=[.6, 1, 1], relative=True)
+    cmds.xform(obj_name + '.cv[0:1]', obj_name + ".cv[4]", obj_name + ".cv[8]",
+               obj_name + ".cv[11]", translation=[0, -.55, 0], relative=True)
 
-    cmds.select(obj_name)
     cmds.xform(obj_name, relative=True, scale=[1.5, 1.5, 1.5])
     #cmds.xform(obj_name, absolute=True, rotation=[0, 0, 0])
     #cmds.xform(obj_name, a=True, t=[2, 0, 0])
@@ -421,8 +440,7 @@ def create_foot_CC(obj_name):
     cmds.addAttr('|' + obj_name, longName=NamingConventionEnums.GLOBAL_ATTR_NAME,
                  attributeType='bool')
     #clear history
-    cmds.select(obj_name)
-    cmds.DeleteHistory()
+    cmds.delete(obj_name, constructionHistory=True)
     return obj_name
 
 def create_circle(obj_name, normal_x=0, normal_y=0, normal_z=0):
@@ -448,13 +466,12 @@ def create_circle(obj_name, normal_x=0, normal_y=0, normal_z=0):
     cmds.addAttr('|' + obj_name, longName=NamingConventionEnums.GLOBAL_ATTR_NAME,
                  attributeType='bool')
 
-    cmds.xform(scale = (3,3,3))
+    cmds.xform(obj_name, scale = (3,3,3))
 
     cmds.makeIdentity(obj_name, apply=True, translate=True, rotate=True, scale=True,
                       normal=False, preserveNormals=1)
     #clear history
-    cmds.select(obj_name)
-    cmds.DeleteHistory()
+    cmds.delete(obj_name, constructionHistory=True)
     return obj_name
 
 def create_finger_tweaker(obj_name):
@@ -467,9 +484,8 @@ def create_finger_tweaker(obj_name):
     # makes and moves a circle a little bit off origin
     circ = cmds.circle(center=[0, 0, 0], normal=[1, 0, 0], sweep=360, radius=.5,
                        degree=3, useTolerance=0, tolerance=0, sections=8, caching=1)[0]
-    cmds.select(circ + '.cv[0:7]')
-    cmds.xform(translation=[0, 2, 0], relative=True)
-    cmds.xform(absolute=True, worldSpace=True, pivots=[0, 0, 0])
+    cmds.xform(circ + '.cv[0:7]', translation=[0, 2, 0], relative=True)
+    cmds.xform(circ, absolute=True, worldSpace=True, pivots=[0, 0, 0])
     cmds.makeIdentity(circ, apply=True, translate=True, rotate=True, scale=True,
                       normal=False, preserveNormals=1)
     # cmds.makeIdentity(apply=True, t=1, r=1, s=1, n=0, pn=1)
@@ -486,8 +502,7 @@ def create_finger_tweaker(obj_name):
 
     cmds.delete(circ, line)
     #clear history
-    cmds.select(obj_name)
-    cmds.DeleteHistory()
+    cmds.delete(obj_name, constructionHistory=True)
 
     # adds the globabl attr
     cmds.addAttr('|' + obj_name, longName=NamingConventionEnums.GLOBAL_ATTR_NAME,
@@ -501,19 +516,14 @@ def create_star_control(obj_name):
     :type: str
     """
     create_circle(obj_name, normal_x=1)
-    cmds.select(obj_name+".cv[0]", obj_name+".cv[2]",
-                obj_name+".cv[4]",obj_name+".cv[6]")
-    cmds.scale(0.19, 0.19, 0.19, relative= True)
-    cmds.select(clear=True)
+    cmds.scale(0.19, 0.19, 0.19, obj_name+".cv[0]", obj_name+".cv[2]",
+               obj_name+".cv[4]",obj_name+".cv[6]", relative= True)
     cmds.xform(obj_name, scale = (1.27, 1.27, 1.27))
-    cmds.select(obj_name)
-    cmds.xform(scale=(3, 3, 3))
+    cmds.xform(obj_name, scale=(3, 3, 3))
     cmds.makeIdentity(obj_name, apply=True, translate=True, rotate=True, scale=True,
                       normal=False, preserveNormals=1)
-    cmds.makeIdentity(apply=True, translate=1, rotate=1, scale=1, normal=0, pn=1)
     #clear history
-    cmds.select(obj_name)
-    cmds.DeleteHistory()
+    cmds.delete(obj_name, constructionHistory=True)
 
 def create_four_point_arrow(obj_name):
     """
@@ -529,8 +539,8 @@ def create_four_point_arrow(obj_name):
                       (-3, 0, 0), (-1, 0, 0), (-1, 0, -2)],
             knot=[0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19,
                   20, 21, 22, 23, 24], name = obj_name)
-    cmds.CenterPivot()
-    cmds.xform(relative=True, translation=(0, 0, -1), scale= (10, 10, 10))
+    cmds.xform(obj_name, centerPivots=True)
+    cmds.xform(obj_name, relative=True, translation=(0, 0, -1), scale= (10, 10, 10))
     cmds.makeIdentity(obj_name, apply=True, translate=True, rotate=True, scale=True,
                       normal=False, preserveNormals=1)
 
@@ -549,8 +559,8 @@ def create_two_point_arrow(obj_name):
                            (-4, 0, 0)], knot=[0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
               name = obj_name)
 
-    cmds.CenterPivot()
-    cmds.xform(relative=True, rotation = (90,0,90), scale= (3, 3, 3))
+    cmds.xform(obj_name, centerPivots=True)
+    cmds.xform(obj_name, relative=True, rotation = (90,0,90), scale= (3, 3, 3))
     cmds.makeIdentity(obj_name, apply=True, translate=True, rotate=True, scale=True,
                       normal=False, preserveNormals=1)
 
@@ -561,6 +571,7 @@ def create_two_point_arrow(obj_name):
     return obj_name
 
 
+@profiled
 def create_fake_joint( name, tx, ty, tz, rx, ry, rz):
     """
     creates a fake joint curve and adds it to the display layer
@@ -571,17 +582,13 @@ def create_fake_joint( name, tx, ty, tz, rx, ry, rz):
     :return: name of the fake joint
     """
     # creates 3 nurbs circles and rotates them to look like a joint
-    cmds.circle(normal=(0, 1, 0), center=(0, 0, 0))
-    cmds.xform(absolute=True, translation=(tx, ty, tz))
-    obj1 = cmds.ls(selection=True)
-    cmds.circle(normal=(0, 0, 1), center=(0, 0, 0))
-    cmds.xform(absolute=True, translation=(tx, ty, tz))
-    obj2 = cmds.ls(selection=True)
-    obj2shape = cmds.listRelatives(shapes=True)
-    cmds.xform(absolute=True, translation=(tx, ty, tz))
-    cmds.circle(normal=(1, 0, 0), center=(0, 0, 0))
-    obj3 = cmds.ls(selection=True)
-    obj3shape = cmds.listRelatives(shapes=True)
+    obj1 = cmds.circle(normal=(0, 1, 0), center=(0, 0, 0))[0]
+    cmds.xform(obj1, absolute=True, translation=(tx, ty, tz))
+    obj2 = cmds.circle(normal=(0, 0, 1), center=(0, 0, 0))[0]
+    cmds.xform(obj2, absolute=True, translation=(tx, ty, tz))
+    obj2shape = cmds.listRelatives(obj2, shapes=True)
+    obj3 = cmds.circle(normal=(1, 0, 0), center=(0, 0, 0))[0]
+    obj3shape = cmds.listRelatives(obj3, shapes=True)
 
     # add shapes of two of the circles to the last one to make it one object
     cmds.parent(obj2shape, obj1, add=True, shape=True)
@@ -590,23 +597,24 @@ def create_fake_joint( name, tx, ty, tz, rx, ry, rz):
     # delete the leftover circles
     cmds.delete(obj2)
     cmds.delete(obj3)
-    cmds.select(obj1, replace=True)
     # move the fake joint to the specified spot in the xml
-    cmds.xform( absolute=True, rotation =(rx, ry, rz))
-    cmds.rename(name)
+    cmds.xform(obj1, absolute=True, rotation =(rx, ry, rz))
+    cmds.rename(obj1, name)
 
     # adds the globabl attr
     cmds.addAttr('|' + name, longName = NamingConventionEnums.GLOBAL_ATTR_NAME,
                  attributeType = 'bool')
 
-def create_connection_curve(parent_obj, child_obj):
+@profiled
+def create_connection_curve(parent_obj, child_obj, naming=DEFAULT_NAMING):
     """
     creates a connection curve in the middle of two fake joints
     :param parent_obj: the parent joint
     :param child_obj: the child joint
+    :param naming: the NamingContext of the build
     :return: name of the connection
     """
-    cmds.curve(degree=1,
+    curve = cmds.curve(degree=1,
                point=[(0, -1, 1), (-5, 0, 0), (0, -1, -1), (1, 0, 0), (0, 1, -1),
                   (-5, 0, 0),  (0, 1, 1), (1, 0, 0), (0, -1, 1), (0, -1, -1), (0, 1, -1),
                   (0, 1, 1), (0, -1, 1)], knot=[0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12])
@@ -615,7 +623,7 @@ def create_connection_curve(parent_obj, child_obj):
     #cmds.xform(r = True, ro = (0, 180, 0))
     #cmds.makeIdentity(apply=True, t=1, r=1, s=1, n=0)
 
-    name = cmds.rename(parent_obj+"__"+child_obj)
+    name = cmds.rename(curve, parent_obj+"__"+child_obj)
 
     #adds the globabl attr
     cmds.addAttr('|'+name, longName=NamingConventionEnums.GLOBAL_ATTR_NAME,
@@ -630,7 +638,7 @@ def create_connection_curve(parent_obj, child_obj):
     parent_name = parent_cluster[1]
 
     # move pivot so the connection curve starts at the center of the parent joint
-    cmds.xform(pivots=(1, 0, 0))
+    cmds.xform(parent_name, pivots=(1, 0, 0))
 
     # creates a locator to use for parenting the control curve
     # will only create the locator for the first
@@ -645,7 +653,7 @@ def create_connection_curve(parent_obj, child_obj):
         cmds.spaceLocator(name = locator_name, position=(0, 0, 0))
         cmds.parent(locator_name, parent_name)
         cmds.xform(locator_name, translation = (1, 0,0))
-        if locator_name.startswith(NamingConventionEnums.RIGHT):
+        if locator_name.startswith(naming.right):
             cmds.xform(locator_name, rotation = (0,0,180))
 
     # constrain clusters so that they connect the joints
@@ -702,6 +710,7 @@ def set_color(selection, new_color):
         # Recolor curve/wireframe to Red
         cmds.setAttr((item + ".overrideColor"), color_index)
 
+@profiled
 def mirror(to_mirror, axis, group_name, to_find, replace_with, mirror_space = 'w'):
     """
     mirrors the given objects across the given axis by grouping and scaling the group -1
@@ -809,6 +818,7 @@ def toggle_template(obj_shape):
         cmds.setAttr((obj_shape + ".overrideDisplayType"), 0)
 
 
+@profiled
 def create_buffer(obj_name):
     """
     creates a buffer group above the given obj so that the obj can have 0 transforms
@@ -821,7 +831,7 @@ def create_buffer(obj_name):
     """
     #creates a new group with pivot at world origin
     group_name = cmds.group(obj_name, name=obj_name + NamingConventionEnums.GROUP_SUFFIX)
-    cmds.xform(pivots=(0, 0, 0))
+    cmds.xform(group_name, pivots=(0, 0, 0))
 
     #freeze the scale on the obj so that there is no weird scale later
     cmds.makeIdentity(obj_name, apply=True, scale=True)
@@ -902,6 +912,7 @@ def lock_all_channels(obj_name):
     cmds.setAttr(obj_name + ".sz", lock = True, keyable = False, channelBox = False)
     cmds.setAttr(obj_name + ".visibility", lock=True, keyable=False, channelBox=False)
 
+@profiled
 def place_pole_vector(start_obj, mid_obj, end_obj):
     """
     https://vimeo.com/66262994 by Marco Giordano
@@ -923,65 +934,265 @@ def place_pole_vector(start_obj, mid_obj, end_obj):
     mid = cmds.xform(mid_obj, query=1, worldSpace=1, translation=1)
     end = cmds.xform(end_obj, query=1, worldSpace=1, translation=1)
 
-    #convert those locations into vectors
-    startV = om.MVector(start[0], start[1], start[2])
-    midV = om.MVector(mid[0], mid[1], mid[2])
-    endV = om.MVector(end[0], end[1], end[2])
-
     #get the first to last obj vector and the first to mid obj vector
-    startEnd = endV - startV
-    startMid = midV - startV
+    startEnd = [end[i] - start[i] for i in range(3)]
+    startMid = [mid[i] - start[i] for i in range(3)]
 
     #find the projection point on startEnd vector fo the PV vector
-    dotP = startMid * startEnd
-    proj = float(dotP) / float(startEnd.length())
-    startEndN = startEnd.normal()
-    projV = startEndN * proj
+    dotP = sum([startMid[i] * startEnd[i] for i in range(3)])
+    proj = float(dotP) / vector_length(startEnd)
+    startEndN = normalize_vector(startEnd)
+    projV = [value * proj for value in startEndN]
 
     #create the pv vector and move it to the mid obj
-    arrowV = startMid - projV
+    arrowV = [startMid[i] - projV[i] for i in range(3)]
 
     #make the distance from mid joint equal to total length of the 3 joints
-    start_to_mid_length = (midV - startV).length()
-    mid_to_end_length = (endV - midV).length()
+    start_to_mid_length = vector_length(startMid)
+    mid_to_end_length = vector_length([end[i] - mid[i] for i in range(3)])
     total_length = start_to_mid_length + mid_to_end_length
-    arrowV = arrowV.normal() * total_length
+    arrowV = [value * total_length for value in normalize_vector(arrowV)]
 
-    finalV = arrowV + midV
+    finalV = [arrowV[i] + mid[i] for i in range(3)]
 
     #finds the cross product of the plane to orient the pole vector control's y axis
-    cross1 = startEnd ^ startMid
-    cross1.normalize()
+    cross1 = normalize_vector(cross_product(startEnd, startMid))
 
     # finds the cross product of the plane to orient the pole vector control's z axis
-    cross2 = cross1 ^ arrowV
-    cross2.normalize()
-    arrowV.normalize()
+    cross2 = normalize_vector(cross_product(cross1, arrowV))
+    arrowV = normalize_vector(arrowV)
 
     #creates a matrix of the above orientations
-    matrixV = [arrowV.x, arrowV.y, arrowV.z, 0,
-               cross1.x, cross1.y, cross1.z, 0,
-               cross2.x, cross2.y, cross2.z, 0,
-               0, 0, 0, 1]
+    matrixV = arrowV + [0] + cross1 + [0] + cross2 + [0] + [0, 0, 0, 1]
 
-    matrixM = om.MMatrix()
+    #pulls the rotation out of the matrix in degrees
+    rotation = matrix_to_euler(matrixV)
 
-    om.MScriptUtil.createMatrixFromList(matrixV, matrixM)
+    #set the translation
+    translation = finalV
 
-    matrixFn = om.MTransformationMatrix(matrixM)
+    return {'rot' : rotation, 'trans' : translation}
 
-    #pulls the rotation out of the matrix and converts it to degrees
-    rot = matrixFn.eulerRotation()
-    rotation = [(rot.x / math.pi * 180.0), (rot.y / math.pi * 180.0),
-                (rot.z / math.pi * 180.0)]
+def vector_length(vector):
+    """
+    gets the length of a vector
 
-    #set the translation
-    translation = [finalV.x, finalV.y, finalV.z]
+    :param vector: x, y, z
+    :type: list
 
-    return {'rot' : rotation, 'trans' : translation}
+    :return: the length
+    :type: float
+    """
+    return math.sqrt(sum([value * value for value in vector]))
 
+def normalize_vector(vector):
+    """
+    scales a vector to a length of 1
 
-def ik_fk_switch(blend_objs, ik_objs, fk_objs, switch_obj, pole_vector_obj):
+    :param vector: x, y, z
+    :type: list
+
+    :return: the normalized vector, or the vector itself if it has no length
+    :type: list
+    """
+    length = vector_length(vector)
+    if not length:
+        return list(vector)
+    return [value / length for value in vector]
+
+def cross_product(vector_a, vector_b):
+    """
+    gets the cross product of two vectors
+
+    :param vector_a: x, y, z
+    :type: list
+
+    :param vector_b: x, y, z
+    :type: list
+
+    :return: vector_a ^ vector_b
+    :type: list
+    """
+    return [vector_a[1] * vector_b[2] - vector_a[2] * vector_b[1],
+            vector_a[2] * vector_b[0] - vector_a[0] * vector_b[2],
+            vector_a[0] * vector_b[1] - vector_a[1] * vector_b[0]]
+
+def matrix_to_euler(matrix):
+    """
+    gets the xyz euler rotation of a flat 4x4 matrix whose rows are normalized
+
+    :param matrix: 16 values
+    :type: list
+
+    :return: x, y, z rotation in degrees
+    :type: list
+    """
+    rot_x = math.atan2(matrix[6], matrix[10])
+    rot_y = math.atan2(-matrix[2], math.sqrt(matrix[0] ** 2 + matrix[1] ** 2))
+    rot_z = math.atan2(matrix[1], matrix[0])
+    #straight up or down, put all of the twist in x
+    if math.sqrt(matrix[0] ** 2 + matrix[1] ** 2) < 1e-6:
+        rot_x = math.atan2(-matrix[9], matrix[5])
+        rot_z = 0.0
+    return [math.degrees(rot_x), math.degrees(rot_y), math.degrees(rot_z)]
+
+def mult_matrix(matrix_a, matrix_b):
+    """
+    multiplies two flat 4x4 matrices the same way maya does -> matrix_a * matrix_b
+
+    :param matrix_a: 16 values of the first matrix, like the ones from xform
+    :type: list
+
+    :param matrix_b: 16 values of the second matrix
+    :type: list
+
+    :return: 16 values of the resulting matrix
+    :type: list
+    """
+    result = []
+    for row in range(4):
+        for col in range(4):
+            result.append(sum([matrix_a[row * 4 + i] * matrix_b[i * 4 + col]
+                               for i in range(4)]))
+    return result
+
+def inverse_matrix(matrix):
+    """
+    inverts a flat 4x4 transform matrix, the last column has to be 0, 0, 0, 1 like all
+    of maya's transform matrices
+
+    :param matrix: 16 values of the matrix to invert
+    :type: list
+
+    :return: 16 values of the inverted matrix
+    :type: list
+    """
+    a, b, c = matrix[0:3]
+    d, e, f = matrix[4:7]
+    g, h, i = matrix[8:11]
+
+    #invert the 3x3 part with the cofactors
+    det = float(a * (e * i - f * h) - b * (d * i - f * g) + c * (d * h - e * g))
+    inv = [(e * i - f * h) / det, (c * h - b * i) / det, (b * f - c * e) / det,
+           (f * g - d * i) / det, (a * i - c * g) / det, (c * d - a * f) / det,
+           (d * h - e * g) / det, (b * g - a * h) / det, (a * e - b * d) / det]
+
+    #move the translation back through the inverted 3x3
+    tx, ty, tz = matrix[12:15]
+    inv_t = [-(tx * inv[0] + ty * inv[3] + tz * inv[6]),
+             -(tx * inv[1] + ty * inv[4] + tz * inv[7]),
+             -(tx * inv[2] + ty * inv[5] + tz * inv[8])]
+
+    return [inv[0], inv[1], inv[2], 0,
+            inv[3], inv[4], inv[5], 0,
+            inv[6], inv[7], inv[8], 0,
+            inv_t[0], inv_t[1], inv_t[2], 1]
+
+def blend_matrices(matrices, weights):
+    """
+    adds the given matrices together with their weights, the same as a wtAddMatrix node
+
+    :param matrices: list of flat 4x4 matrices
+    :type: list
+
+    :param weights: one weight for each matrix
+    :type: list
+
+    :return: 16 values of the blended matrix
+    :type: list
+    """
+    result = [0.0] * 16
+    for matrix, weight in zip(matrices, weights):
+        for i in range(16):
+            result[i] += matrix[i] * weight
+    return result
+
+@profiled
+def get_surface_uv(surface_name, positions):
+    """
+    finds the closest uv parameters on a nurbs surface for each of the given world
+    positions using one temporary closestPointOnSurface node. the parameters are
+    normalized from 0 to 1 the way a follicle takes them
+
+    :param surface_name: name of the nurbs surface transform
+    :type: str
+
+    :param positions: list of world space positions -> [(x, y, z), ...]
+    :type: list
+
+    :return: list of [u, v] parameters, one for each position
+    :type: list
+    """
+    shape = cmds.listRelatives(surface_name, shapes=True)[0]
+    closest_point_node = cmds.createNode('closestPointOnSurface',
+                                         name=surface_name + '_temp_CPOS')
+    cmds.connectAttr(shape + '.worldSpace[0]', closest_point_node + '.inputSurface')
+
+    #closestPointOnSurface gives the parameters in the surface's own range
+    ranges = [cmds.getAttr(shape + '.minMaxRange' + axis)[0] for axis in 'UV']
+
+    #set each position on the node and read the uv back
+    uv_list = []
+    for pos in positions:
+        cmds.setAttr(closest_point_node + '.inPosition', pos[0], pos[1], pos[2],
+                     type='double3')
+        uv_list.append([(cmds.getAttr(closest_point_node + '.parameter' + axis) - low) /
+                        (high - low) for axis, (low, high) in zip('UV', ranges)])
+
+    cmds.delete(closest_point_node)
+    return uv_list
+
+@profiled
+def create_follicle(surface_name, u, v, name, parent=None):
+    """
+    creates a follicle stuck to the given nurbs surface at the given uv parameters
+
+    :param surface_name: name of the nurbs surface transform
+    :type: str
+
+    :param u: u parameter on the surface, from 0 to 1
+    :type: float
+
+    :param v: v parameter on the surface, from 0 to 1
+    :type: float
+
+    :param name: name of the follicle transform
+    :type: str
+
+    :param parent: optional group to parent the follicle under
+    :type: str
+
+    :return: name of the follicle transform
+    :type: str
+    """
+    shape = cmds.listRelatives(surface_name, shapes=True)[0]
+
+    #make the follicle shape and get the transform that maya makes with it
+    fol_transform = cmds.createNode('transform', name=name)
+    fol_shape = cmds.createNode('follicle', name=name + 'Shape', parent=fol_transform)
+
+    #connect the surface into the follicle and the follicle out to its transform
+    cmds.connectAttr(shape + '.local', fol_shape + '.inputSurface')
+    cmds.connectAttr(shape + '.worldMatrix[0]', fol_shape + '.inputWorldMatrix')
+    cmds.connectAttr(fol_shape + '.outTranslate', fol_transform + '.translate')
+    cmds.connectAttr(fol_shape + '.outRotate', fol_transform + '.rotate')
+
+    #stick it to the uv
+    cmds.setAttr(fol_shape + '.parameterU', u)
+    cmds.setAttr(fol_shape + '.parameterV', v)
+
+    if parent:
+        cmds.parent(fol_transform, parent)
+
+    #the follicle drives its own transform so the user shouldnt touch it
+    cmds.setAttr(fol_transform + '.inheritsTransform', 0)
+
+    return fol_transform
+
+
+@profiled
+def ik_fk_switch(blend_objs, ik_objs, fk_objs, switch_obj, pole_vector_obj,
+                 blend_mode='Classic'):
     """
     creates an ik fk switch between the given objects
 
@@ -999,22 +1210,25 @@ def ik_fk_switch(blend_objs, ik_objs, fk_objs, switch_obj, pole_vector_obj):
 
     :param pole_vector_obj: name of the obj to be the pole vector
     :type: str
+
+    :param blend_mode: 'Classic' for a blendColors per joint and a reverse node or 'Lean'
+                       for a pairBlend per joint that also drives the fk visibility
+    :type: str
+
+    :return: the utility nodes made for the blend, len() of it is the node cost
+    :type: list
     """
     #first  create the ik handle
-    cmds.select(ik_objs[0], replace = True)
-    cmds.select(ik_objs[-1], add = True)
-    ik_names = cmds.ikHandle()
+    ik_names = cmds.ikHandle(startJoint=ik_objs[0], endEffector=ik_objs[-1])
     #rename the objs that the ik handle makes
-    base = ik_objs[-1].rsplit('_', 1)[0]
+    base = blend_objs[-1].rsplit('_', 1)[0]
     ik_handle = cmds.rename(ik_names[0], base + '_RPIK')
     cmds.rename(ik_names[1], base + '_Effector')
 
     #parent the ik handle to the cc and the pv to the ik
     ik_cc = base + '_IK' +NamingConventionEnums.CONTROL_CURVE_SUFFIX
     cmds.parent(ik_handle, ik_cc)
-    cmds.select(pole_vector_obj, replace = True)
-    cmds.select(ik_handle, add = True)
-    cmds.PoleVectorConstraint()
+    cmds.poleVectorConstraint(pole_vector_obj, ik_handle)
 
     #orient the wrist to the IK control so the rotation follows it
     orient_const(ik_cc,ik_objs[-1],
@@ -1026,29 +1240,35 @@ def ik_fk_switch(blend_objs, ik_objs, fk_objs, switch_obj, pole_vector_obj):
     cmds.connectAttr(switch_obj + '.ikFkSwitch', ik_cc + '.visibility')
     cmds.connectAttr(switch_obj + '.ikFkSwitch', pole_vector_obj + '.visibility')
 
-    #create the FK controls
-    for fk_jnt in fk_objs:
-        create_fk_control(fk_jnt)
-
-    #set the vis of the FK controls
-    rev = cmds.shadingNode('reverse', asUtility=True, name= blend_objs[-1] + '_REV')
-    cmds.connectAttr(switch_obj + '.ikFkSwitch', rev + '.inputX')
-    cmds.connectAttr(rev + '.outputX', fk_objs[0] + '.visibility')
+    #create the FK controls, named after the blend joints
+    fk_ccs = [jnt.rsplit('_', 1)[0] + '_FK' + NamingConventionEnums.CONTROL_CURVE_SUFFIX
+              for jnt in blend_objs]
+    create_fk_controls(fk_objs, fk_ccs=fk_ccs)
 
+    if blend_mode == 'Lean':
+        blend_nodes = lean_ik_fk_blend(blend_objs, ik_objs, fk_objs, switch_obj)
+    else:
+        #set the vis of the FK controls
+        rev = cmds.shadingNode('reverse', asUtility=True,
+                               name= blend_objs[-1] + '_REV')
+        cmds.connectAttr(switch_obj + '.ikFkSwitch', rev + '.inputX')
+        cmds.connectAttr(rev + '.outputX', fk_objs[0] + '.visibility')
+        blend_nodes = [rev]
 
-    #blend the ik and fk joints to the main chain
-    for i in range(len(blend_objs)):
-        #create the blend colors
-        bc = cmds.shadingNode('blendColors', asUtility = True,
-                              name = blend_objs[i] + '_BC')
+        #blend the ik and fk joints to the main chain
+        for i in range(len(blend_objs)):
+            #create the blend colors
+            bc = cmds.shadingNode('blendColors', asUtility = True,
+                                  name = blend_objs[i] + '_BC')
 
-        #connect everything
-        cmds.connectAttr(fk_objs[i] + '.rotate', bc + '.color2')
-        cmds.connectAttr(ik_objs[i] + '.rotate', bc + '.color1')
-        cmds.connectAttr(bc + '.output', blend_objs[i] + '.rotate')
+            #connect everything
+            cmds.connectAttr(fk_objs[i] + '.rotate', bc + '.color2')
+            cmds.connectAttr(ik_objs[i] + '.rotate', bc + '.color1')
+            cmds.connectAttr(bc + '.output', blend_objs[i] + '.rotate')
 
-        #connect the switch obj
-        cmds.connectAttr(switch_obj + '.ikFkSwitch', bc + '.blender')
+            #connect the switch obj
+            cmds.connectAttr(switch_obj + '.ikFkSwitch', bc + '.blender')
+            blend_nodes.append(bc)
 
 
     group_name = blend_objs[0].replace(NamingConventionEnums.JOINT_SUFFIX,
@@ -1067,54 +1287,196 @@ def ik_fk_switch(blend_objs, ik_objs, fk_objs, switch_obj, pole_vector_obj):
     #hide the ik handles
     cmds.setAttr(ik_handle + '.visibility', 0)
 
+    return blend_nodes
 
-def create_fk_control(fk_jnt):
+@profiled
+def lean_ik_fk_blend(blend_objs, ik_objs, fk_objs, switch_obj):
     """
-    creates and fk control on the given jnt with the parent add shape command
+    blends the ik and fk joints to the main chain with one pairBlend per joint. the
+    pairBlend on the root also has its translate x set to 1 for fk and 0 for ik so it
+    gives the inverse of the switch for the fk visibility and no reverse node is needed
+
+    :param blend_objs: the objs to be driven by the ik and fk
+    :type: list
+
+    :param ik_objs: list of the ik objs
+    :type: list
+
+    :param fk_objs: list of fk objs
+    :type: list
+
+    :param switch_obj: name of object with the ik fk switch
+    :type: str
+
+    :return: the pairBlend nodes
+    :type: list
+    """
+    #make all the nodes first then wire them up in one go
+    blend_nodes = [cmds.createNode('pairBlend', name=jnt + '_PB') for jnt in blend_objs]
+    cmds.setAttr(blend_nodes[0] + '.inTranslateX1', 1)
+    cmds.setAttr(blend_nodes[0] + '.inTranslateX2', 0)
+
+    #input 1 is fk and input 2 is ik so a weight of 1 is ik like the blendColors
+    for i in range(len(blend_objs)):
+        cmds.connectAttr(fk_objs[i] + '.rotate', blend_nodes[i] + '.inRotate1')
+        cmds.connectAttr(ik_objs[i] + '.rotate', blend_nodes[i] + '.inRotate2')
+        cmds.connectAttr(switch_obj + '.ikFkSwitch', blend_nodes[i] + '.weight')
+        cmds.connectAttr(blend_nodes[i] + '.outRotate', blend_objs[i] + '.rotate')
+
+    #set the vis of the FK controls
+    cmds.connectAttr(blend_nodes[0] + '.outTranslateX', fk_objs[0] + '.visibility')
+
+    return blend_nodes
+
+def create_fk_control(fk_jnt, fk_cc=None):
+    """
+    creates and fk control on the given jnt, see create_fk_controls
 
     :param fk_jnt: name of the joint to become fk
     :type: str
+
+    :param fk_cc: name of the control to use, defaults to the joint's name with _FK_CC
+    :type: str
+    """
+    create_fk_controls([fk_jnt], fk_ccs=[fk_cc])
+
+@profiled
+def create_fk_controls(fk_jnts, style=None, fk_ccs=None):
+    """
+    turns the given joints into fk controls by putting a control shape right under each
+    joint. if the control is already in the scene its shape keeps its world placement,
+    if not a new one of the given style is made in the joint's space
+
+    :param fk_jnts: names of the joints to become fk
+    :type: list
+
+    :param style: style of the controls to make for joints that dont have one yet, one
+                  of CONTROL_STYLES
+    :type: str
+
+    :param fk_ccs: names of the controls to use, a None in the list or no list at all
+                   uses the joint's name with _FK_CC
+    :type: list
     """
-    fk_cc_base = fk_jnt.rsplit('_', 1)[0]
-    fk_cc = fk_cc_base + '_FK' + NamingConventionEnums.CONTROL_CURVE_SUFFIX
+    if not fk_ccs:
+        fk_ccs = [None] * len(fk_jnts)
+    fk_ccs = [fk_cc or fk_jnt.rsplit('_', 1)[0] + '_FK' +
+              NamingConventionEnums.CONTROL_CURVE_SUFFIX
+              for fk_jnt, fk_cc in zip(fk_jnts, fk_ccs)]
+
+    #check the style before anything moves, a new control cant be made without one
+    missing = [fk_cc for fk_cc in fk_ccs if not cmds.objExists(fk_cc)]
+    if missing and style not in CONTROL_STYLES:
+        raise ValueError('%r is not a control style, one of %s is needed to make %s' %
+                         (style, ', '.join(CONTROL_STYLES), ', '.join(missing)))
+
+    # put every control under its joint, old controls keep their world spot and new
+    # ones line up with the joint
+    for fk_jnt, fk_cc in zip(fk_jnts, fk_ccs):
+        if cmds.objExists(fk_cc):
+            unlock_all_channels(fk_cc)
+            cmds.parent(fk_cc, fk_jnt)
+        else:
+            create_control(fk_cc, style)
+            cmds.parent(fk_cc, fk_jnt, relative=True)
 
-    # unlocks all the channels and then freezes them on the fk joint so that it
-    # preserves the transforms when parented
-    unlock_all_channels(fk_cc)
-    cmds.parent(fk_cc, fk_jnt)
-    cmds.makeIdentity(fk_cc, apply=True, translate=True, rotate=True, scale=True,
+    # freeze them all at once so the shapes are in the joint's space, then the shapes
+    # can move to the joints as they are
+    cmds.makeIdentity(fk_ccs, apply=True, translate=True, rotate=True, scale=True,
                       normal=False, preserveNormals=1)
-    cmds.parent(fk_cc, world=True)
+    for fk_jnt, fk_cc in zip(fk_jnts, fk_ccs):
+        shapes = cmds.listRelatives(fk_cc, shapes=True, fullPath=True)
+        cmds.parent(shapes, fk_jnt, relative=True, shape=True)
+    cmds.delete(fk_ccs)
+
+    # lock the fk joints channels, the extra ones on the knees and elbows and the
+    # standard fk ones
+    standard_channels = MayaCommandEnums.SCALE + MayaCommandEnums.TRANSLATION
+    for fk_jnt in fk_jnts:
+        channels = list(standard_channels)
+        for cc_type in NamingConventionEnums.LOCK_CHANNLES:
+            if fk_jnt.find(cc_type) != -1:
+                channels.extend([channel for channel in
+                                 NamingConventionEnums.LOCK_CHANNLES[cc_type]
+                                 if channel not in channels])
+        for channel in channels:
+            lock_channels(fk_jnt, channel)
+        lock_channels(fk_jnt, 'visibility', False, False)
+        lock_channels(fk_jnt, 'radi', False, False)
+
+@profiled
+def create_control(obj_name, style):
+    """
+    creates the control of the given style at the origin
+
+    :param obj_name: name of the control
+    :type: str
 
-    # get the shape node of the control curve
-    cmds.select(fk_cc)
-    cmds.pickWalk(direction='down')
-    shape = cmds.ls(selection=True)[0]
+    :param style: what way to make the control
+    :type: str
+    """
+    #checks the style then calls corresponding create function
+    if style == 'Circle':
+        create_circle(obj_name, normal_x = 1)
+    elif style == '4-Point Star':
+        create_star_control(obj_name)
+    elif style == '4-Point Arrow':
+        create_four_point_arrow(obj_name)
+    elif style == 'Box':
+        create_box(obj_name)
+    elif style == 'finger':
+        create_finger_tweaker(obj_name)
+    elif style == 'PV':
+        create_box(obj_name)
+    elif style == 'Foot':
+        create_foot_CC(obj_name)
+
+@profiled
+def clone_joint_chain(chain, suffix):
+    """
+    builds a new joint chain with its final names that lines up with the given chain.
+    each new joint gets the same parent space, translation, rotation, orientation,
+    scale and preferred angle as the joint it copies, so an ik chain built on it bends
+    the same way as the original. the joints' scales feed the inverse scale of the
+    joints under them
+
+    :param chain: list of joints from the root down, each the child of the one before
+    :type: list
 
-    # parent the shape node to the fk jnt
-    cmds.parent(shape, fk_jnt, add=True, shape=True)
+    :param suffix: added before the joint suffix, '_IK' makes L_elbow_JNT ->
+                   L_elbow_IK_JNT
+    :type: str
 
-    # delete the old transform node
-    cmds.delete(fk_cc)
+    :return: list of the new joints
+    :type: list
+    """
+    parent = cmds.listRelatives(chain[0], parent=True)
+    new_chain = []
+    for jnt in chain:
+        new_name = jnt.replace(NamingConventionEnums.JOINT_SUFFIX,
+                               suffix + NamingConventionEnums.JOINT_SUFFIX)
+        if parent:
+            new_jnt = cmds.createNode('joint', name=new_name, parent=parent[0])
+        else:
+            new_jnt = cmds.createNode('joint', name=new_name)
 
-    # lock the fk joints channels
-    # lock the extra channels on the knees and elbows
-    for cc_type in NamingConventionEnums.LOCK_CHANNLES:
-        if fk_jnt.find(cc_type) != -1:
-            for channel in NamingConventionEnums.LOCK_CHANNLES[cc_type]:
-                lock_channels(fk_jnt, channel)
+        #copy the local values so it sits right on top of the original
+        for attr in ['translate', 'rotate', 'jointOrient', 'scale', 'preferredAngle']:
+            value = cmds.getAttr(jnt + '.' + attr)[0]
+            cmds.setAttr(new_jnt + '.' + attr, value[0], value[1], value[2])
+        cmds.setAttr(new_jnt + '.rotateOrder', cmds.getAttr(jnt + '.rotateOrder'))
+        cmds.setAttr(new_jnt + '.radius', cmds.getAttr(jnt + '.radius'))
 
-    # lock the standard fk channels
-    for channel in MayaCommandEnums.SCALE:
-        lock_channels(fk_jnt, channel)
-    for channel in MayaCommandEnums.TRANSLATION:
-        lock_channels(fk_jnt, channel)
-    lock_channels(fk_jnt, 'visibility', False, False)
-    lock_channels(fk_jnt, 'radi', False, False)
+        #createNode doesnt hook up the inverse scale like joint and duplicate do,
+        # without it scaling a joint shears the ones under it
+        if new_chain:
+            cmds.connectAttr(new_chain[-1] + '.scale', new_jnt + '.inverseScale')
 
-    cmds.parent(fk_jnt, world=True)
-    cmds.undo()
+        new_chain.append(new_jnt)
+        parent = [new_jnt]
+    return new_chain
 
+@profiled
 def create_hierarchy(rig_dict = NamingConventionEnums.RIG_HIERARCHY_DICT,
                      parent_path = "" ):
     """
@@ -1149,6 +1511,7 @@ def create_hierarchy(rig_dict = NamingConventionEnums.RIG_HIERARCHY_DICT,
                     longName=NamingConventionEnums.STEP_THREE_ATTR, attributeType='bool')
 
 
+@profiled
 def create_real_skeleton(joint = None):
     """
     Looks at the fake joint curves in the hierarchy and creates a matching skeleton
@@ -1160,16 +1523,11 @@ def create_real_skeleton(joint = None):
     # if its the first joint to be created (its the pelvis)
     if joint is None:
         joint = 'pelvis'+NamingConventionEnums.FAKE_JOINT_SUFFIX
-        # create a temporary group so that we wont get any errors
-        cmds.group(name = 'temp'+ NamingConventionEnums.GROUP_SUFFIX,
-                   parent = "fake_rig"+NamingConventionEnums.CONTROL_CURVE_SUFFIX
-                    ,empty = True)
 
-    # creates the joint and renames it to the FakeJointStructure object name
+    # creates the joint in the world with the FakeJointStructure object name
     joint_name = joint.replace(NamingConventionEnums.FAKE_JOINT_SUFFIX,
                                    NamingConventionEnums.JOINT_SUFFIX)
-    temp_name = cmds.joint(p=(0, 0, 0))
-    cmds.rename(temp_name, joint_name)
+    cmds.createNode('joint', name=joint_name)
 
     # if the joint is a Tip, reverse foot joint, wrist, or pelvis
     # place the joint on the actual joint
@@ -1181,9 +1539,6 @@ def create_real_skeleton(joint = None):
     else:
         place_on(joint_name, joint + '_locator')
 
-    #move joint to world
-    cmds.parent(joint_name, world=True)
-
     # if not a tip
     if 'Tip' not in joint_name:
         children = cmds.listRelatives(joint, shapes = False, children = True)
@@ -1213,6 +1568,227 @@ def get_joint_list(step = 2):
     list.reverse()
     return list
 
+def get_guides(joint_list=None):
+    """
+    gets the world positions of the fake joints, rounded so they hash the same when
+    nothing was moved
+
+    :param joint_list: the fake joints, defaults to all of them
+    :type: list
+
+    :return: {fake joint: [x, y, z]}
+    :type: dict
+    """
+    if joint_list is None:
+        joint_list = get_joint_list()
+    return dict([(jnt, round_position(cmds.xform(jnt, query=True, worldSpace=True,
+                                                 translation=True)))
+                 for jnt in joint_list])
+
+def round_position(position):
+    """
+    rounds a guide position to NamingConventionEnums.GUIDE_PRECISION
+
+    :param position: [x, y, z]
+    :type: list
+
+    :return: the rounded position, without -0.0
+    :type: list
+    """
+    return [round(value, NamingConventionEnums.GUIDE_PRECISION) + 0.0
+            for value in position]
+
+def place_guides(guides):
+    """
+    moves fake joints to the given world positions, parents before children so moving
+    a parent doesnt move a child off its spot
+
+    :param guides: {fake joint: [x, y, z]}
+    :type: dict
+    """
+    missing = [name for name in guides if not cmds.objExists(name)]
+    if missing:
+        raise ValueError('the guides %s are not fake joints in the template' %
+                         sorted(missing))
+    for jnt in get_joint_list():
+        if jnt in guides:
+            cmds.xform(jnt, worldSpace=True, translation=guides[jnt])
+
+def get_input_hash(inputs):
+    """
+    hashes the inputs of a step so a re-run can tell if anything changed
+
+    :param inputs: plain data, dicts lists strings and numbers
+    :type: dict
+
+    :return: sha1 hex digest
+    :type: str
+    """
+    return hashlib.sha1(json.dumps(inputs, sort_keys=True).encode('utf-8')).hexdigest()
+
+def get_file_hash(path):
+    """
+    hashes the contents of a file
+
+    :param path: the file
+    :type: str
+
+    :return: sha1 hex digest
+    :type: str
+    """
+    with open(path, 'rb') as hashed_file:
+        return hashlib.sha1(hashed_file.read()).hexdigest()
+
+def get_string_attr(obj_name, attr):
+    """
+    gets a string attr, or None if the obj or attr isnt there
+
+    :param obj_name: the node
+    :type: str
+
+    :param attr: name of the attr
+    :type: str
+
+    :return: the value
+    :type: str
+    """
+    if not cmds.objExists(obj_name) or not cmds.attributeQuery(attr, node=obj_name,
+                                                               exists=True):
+        return None
+    return cmds.getAttr(obj_name + '.' + attr)
+
+def set_string_attr(obj_name, attr, value):
+    """
+    sets a string attr, adding it first if it isnt there
+
+    :param obj_name: the node
+    :type: str
+
+    :param attr: name of the attr
+    :type: str
+
+    :param value: the value
+    :type: str
+    """
+    if not cmds.attributeQuery(attr, node=obj_name, exists=True):
+        cmds.addAttr(obj_name, longName=attr, dataType='string')
+    cmds.setAttr(obj_name + '.' + attr, value, type='string')
+
+def get_dict_attr(obj_name, attr):
+    """
+    gets a dict saved with set_dict_attr
+
+    :param obj_name: the node
+    :type: str
+
+    :param attr: name of the attr
+    :type: str
+
+    :return: the dict, empty if the attr isnt there
+    :type: dict
+    """
+    saved = get_string_attr(obj_name, attr)
+    return dict([item.split(':', 1) for item in saved.split()]) if saved else {}
+
+def set_dict_attr(obj_name, attr, values):
+    """
+    saves a dict of names as a string attr like 'key:value key:value', the same way
+    the joint modules are saved
+
+    :param obj_name: the node
+    :type: str
+
+    :param attr: name of the attr
+    :type: str
+
+    :param values: {name: name}, neither can have spaces
+    :type: dict
+    """
+    set_string_attr(obj_name, attr, ' '.join([key + ':' + values[key]
+                                              for key in sorted(values)]))
+
+def get_selection():
+    """
+    gets the current selection as uuids so it can be put back after a build even if the
+    nodes were renamed or moved in the hierarchy
+
+    :return: uuids of the selected nodes
+    :type: list
+    """
+    return cmds.ls(selection=True, uuid=True) or []
+
+def restore_selection(selection):
+    """
+    selects the nodes from get_selection that still exist, or clears the selection
+
+    :param selection: uuids from get_selection
+    :type: list
+    """
+    nodes = cmds.ls(selection, long=True) if selection else []
+    if nodes:
+        cmds.select(nodes, replace=True)
+    else:
+        cmds.select(clear=True)
+
+@contextlib.contextmanager
+def build_session(name, undo=True):
+    """
+    runs the code inside it as one build. the whole build is one undo chunk, or undo is
+    off if undo is False, the viewport doesnt refresh and the evaluation manager is off.
+    what it changed is put back when it ends even if there was an error. sessions inside
+    another session only time themselves. if the build is profiled the session is a step
+    span
+
+    :param name: name of the build, used for the undo chunk and the timing
+    :type: str
+
+    :param undo: False turns undo off for the build to make batch builds faster
+    :type: bool
+
+    :return: yields a dict that gets the seconds the build took -> {'time': seconds}
+    :type: dict
+    """
+    session = {'name': name, 'time': None}
+    outer = BUILD_SESSION['depth'] == 0
+    #what the session changed so only that is put back if the setup fails part way
+    changed = []
+    start = time.time()
+    step_span = None
+    BUILD_SESSION['depth'] += 1
+    try:
+        if outer:
+            undo_state = cmds.undoInfo(query=True, state=True)
+            if not undo:
+                cmds.undoInfo(stateWithoutFlush=False)
+                changed.append('undo')
+            elif undo_state:
+                cmds.undoInfo(openChunk=True, chunkName=name)
+                changed.append('chunk')
+            cmds.refresh(suspend=True)
+            changed.append('refresh')
+            eval_mode = cmds.evaluationManager(query=True, mode=True)[0]
+            cmds.evaluationManager(mode='off')
+            changed.append('evaluation')
+
+        start = time.time()
+        step_span = build_profiler.open_span(name, 'step')
+        yield session
+    finally:
+        if step_span is not None:
+            build_profiler.close_span(step_span)
+        session['time'] = time.time() - start
+        BUILD_SESSION['depth'] -= 1
+        if 'evaluation' in changed:
+            cmds.evaluationManager(mode=eval_mode)
+        if 'refresh' in changed:
+            cmds.refresh(suspend=False)
+            cmds.refresh()
+        if 'undo' in changed:
+            cmds.undoInfo(stateWithoutFlush=undo_state)
+        elif 'chunk' in changed:
+            cmds.undoInfo(closeChunk=True)
+        print('%s took %.3f s' % (name, session['time']))
+
 #----------------------------------------------------------------------------------------#
 #----------------------------------------------------------------------------- CLASSES --#
 
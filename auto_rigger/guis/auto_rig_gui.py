@@ -35,13 +35,17 @@ from PySide2.QtCore import Qt
 from PySide2 import QtWidgets, QtGui
 from maya import OpenMayaUI as omui
 from shiboken2 import wrapInstance
-import maya.cmds as cmds
 
 # Imports That You Wrote
+import auto_rigger.build_checkpoints as build_checkpoints
+import auto_rigger.build_profiler as build_profiler
+import auto_rigger.build_telemetry as build_telemetry
+from auto_rigger.cmds_backend import cmds
 import auto_rigger.step_one as step_one
 import auto_rigger.step_two as step_two
 import auto_rigger.step_three as step_three
 import auto_rigger.gen_utils as gu
+from auto_rigger.naming_context import get_rig_naming, NamingContext
 from auto_rigger.maya_enums import MayaCommandEnums, NamingConventionEnums
 #----------------------------------------------------------------------------------------#
 #--------------------------------------------------------------------------- FUNCTIONS --#
@@ -61,6 +65,14 @@ class AutoRiggerGUI(QtWidgets.QDialog):
     """
     This class builds the GUI for the auto rigger
     """
+    #what the steps save on the gui, put back with the scene when a step fails
+    BUILD_STATE = ['naming', 'left_prefix', 'right_prefix', 'left_side_color',
+                   'right_side_color', 'center_color', 'num_vertebrae',
+                   'joint_structure', 'joint_list', 'cc_list']
+    #what each step's button is called in the build log
+    STEP_NAMES = {'stepOne': 'step_one', 'stepTwo': 'step_two',
+                  'stepThree': 'step_three', 'bind': 'bind'}
+
     def __init__(self):
         QtWidgets.QDialog.__init__(self, parent=get_maya_window())
         #make the line edits to intake the prefixes
@@ -69,6 +81,8 @@ class AutoRiggerGUI(QtWidgets.QDialog):
         #a variable to save the prefix choice
         self.left_prefix = None
         self.right_prefix = None
+        #the prefixes of the rig being built and the names made from them
+        self.naming = get_rig_naming()
         #make the spin to intake the number of joints to make
         self.num_fingers_sb = None
         self.num_toes_sb = None
@@ -86,6 +100,12 @@ class AutoRiggerGUI(QtWidgets.QDialog):
         # make the comboboxes to intake the control style choices
         self.fk_control_style_cb = None
         self.ik_control_style_cb = None
+        # make the combobox to intake the spine style
+        self.spine_mode_cb = None
+        # make the combobox to intake the ik fk blend style
+        self.blend_mode_cb = None
+        # make the checkboxes to pick which modules step three builds
+        self.module_cbs = {}
         #variables to save the outputs from steps 1 and 2 for later use
         self.joint_structure = None
         self.joint_list = None
@@ -102,6 +122,10 @@ class AutoRiggerGUI(QtWidgets.QDialog):
         self.xray_objs = []
         self.xray_on = False
         self.bind_btn = None
+        #makes the checkbox to profile the steps
+        self.profile_cb = None
+        #the scene before each step, a step that fails goes back to it
+        self.checkpoints = build_checkpoints.CheckpointStore()
 
         self.step = ''
 
@@ -112,8 +136,9 @@ class AutoRiggerGUI(QtWidgets.QDialog):
         #checks to see if there are items in the scene that were made by the tool
         main_cc = 'fake_rig' + NamingConventionEnums.CONTROL_CURVE_SUFFIX
         master_group = NamingConventionEnums.RIG_HIERARCHY[0]
-        #checks if the master_group has been made from step 3 and sets step to bind
-        if cmds.objExists(master_group):
+        #checks if the master_group has been made from step 3 and sets step to bind, if
+        # the main_cc is still there only some of the modules have been built
+        if cmds.objExists(master_group) and not cmds.objExists(main_cc):
             self.step = 'bind'
         #if the master node hasn't been made then check if the main_cc has been made
         elif cmds.objExists(main_cc):
@@ -121,8 +146,7 @@ class AutoRiggerGUI(QtWidgets.QDialog):
             # them to the class variables
             self.right_prefix = cmds.getAttr(main_cc + '.right_prefix')
             self.left_prefix = cmds.getAttr(main_cc + '.left_prefix')
-            NamingConventionEnums.LEFT = self.left_prefix
-            NamingConventionEnums.RIGHT = self.right_prefix
+            self.naming = NamingContext(self.left_prefix, self.right_prefix)
 
             self.left_side_color = cmds.getAttr(main_cc + '.left_side_color')
             self.right_side_color = cmds.getAttr(main_cc + '.right_side_color')
@@ -157,10 +181,12 @@ class AutoRiggerGUI(QtWidgets.QDialog):
 
         #mirror buttons
         self.mirror_l_to_r_btn = QtWidgets.QPushButton('Mirror L -> R')
-        self.mirror_l_to_r_btn.clicked.connect(self.mirror_l_to_r)
+        self.mirror_l_to_r_btn.setObjectName('mirror_l_to_r')
+        self.mirror_l_to_r_btn.clicked.connect(self.run_mirror)
 
         self.mirror_r_to_l_btn = QtWidgets.QPushButton('Mirror R -> L')
-        self.mirror_r_to_l_btn.clicked.connect(self.mirror_r_to_l)
+        self.mirror_r_to_l_btn.setObjectName('mirror_r_to_l')
+        self.mirror_r_to_l_btn.clicked.connect(self.run_mirror)
 
         self.mirror_vb = QtWidgets.QHBoxLayout()
         self.mirror_vb.addWidget(self.mirror_l_to_r_btn)
@@ -175,17 +201,24 @@ class AutoRiggerGUI(QtWidgets.QDialog):
         self.xray_vb.addWidget(self.xray_btn)
         self.disable_layout(self.xray_vb)
 
+        #profiles each step and shows where the time went when it is done
+        self.profile_cb = QtWidgets.QCheckBox('Profile Build')
+
         #creates the extra buttons
         cancel_btn = QtWidgets.QPushButton('Cancel')
         cancel_btn.setStyleSheet('background-color: red')
         cancel_btn.clicked.connect(self.close)
 
+        #the checkpoints are only kept while the dialog is open
+        self.finished.connect(self.clear_checkpoints)
+
         #creates the layout main
         self.main_vb.addLayout(self.step_one_layout)
         self.main_vb.addLayout(self.mirror_vb)
         self.main_vb.addLayout(self.xray_vb)
         self.main_vb.addLayout(self.step_two_layout)
         self.main_vb.addLayout(self.step_three_layout)
+        self.main_vb.addWidget(self.profile_cb)
         self.main_vb.addWidget(cancel_btn)
 
         #add min/max
@@ -208,7 +241,11 @@ class AutoRiggerGUI(QtWidgets.QDialog):
             self.enable_layout(self.xray_vb)
         elif self.step == '3':
             self.disable_layout(self.step_one_layout)
-            self.disable_layout(self.step_two_layout)
+            #step 2 can run again until step 3 has replaced the fake rig
+            if not cmds.objExists(master_group):
+                self.enable_layout(self.step_two_layout)
+            else:
+                self.disable_layout(self.step_two_layout)
             self.enable_layout(self.step_three_layout)
             self.bind_btn.setEnabled(False)
             self.mirror_vb.setEnabled(True)
@@ -254,7 +291,7 @@ class AutoRiggerGUI(QtWidgets.QDialog):
         num_fingers_lbl = QtWidgets.QLabel('Number of Fingers: ')
         self.num_fingers_sb = QtWidgets.QSpinBox()
         self.num_fingers_sb.setValue(5)
-        self.num_fingers_sb.setRange(0, 5)
+        self.num_fingers_sb.setRange(*NamingConventionEnums.FINGER_RANGE)
         num_fingers_hb = QtWidgets.QHBoxLayout()
         num_fingers_hb.addWidget(num_fingers_lbl)
         num_fingers_hb.addWidget(self.num_fingers_sb)
@@ -262,7 +299,7 @@ class AutoRiggerGUI(QtWidgets.QDialog):
         num_toes_lbl = QtWidgets.QLabel('Number of Toes: ')
         self.num_toes_sb = QtWidgets.QSpinBox()
         self.num_toes_sb.setValue(0)
-        self.num_toes_sb.setRange(0, 5)
+        self.num_toes_sb.setRange(*NamingConventionEnums.TOE_RANGE)
         num_toe_hb = QtWidgets.QHBoxLayout()
         num_toe_hb.addWidget(num_toes_lbl)
         num_toe_hb.addWidget(self.num_toes_sb)
@@ -270,7 +307,7 @@ class AutoRiggerGUI(QtWidgets.QDialog):
         num_vertebrae_lbl = QtWidgets.QLabel('Number of Vertebrae: ')
         self.num_vertebrae_sb = QtWidgets.QSpinBox()
         self.num_vertebrae_sb.setValue(5)
-        self.num_vertebrae_sb.setRange(3, 7)
+        self.num_vertebrae_sb.setRange(*NamingConventionEnums.VERTEBRAE_RANGE)
         num_vertebrae_hb = QtWidgets.QHBoxLayout()
         num_vertebrae_hb.addWidget(num_vertebrae_lbl)
         num_vertebrae_hb.addWidget(self.num_vertebrae_sb)
@@ -369,6 +406,33 @@ class AutoRiggerGUI(QtWidgets.QDialog):
         """
         # third Step Layout
         step_three_lbl = QtWidgets.QLabel('Step 3: Make Rig!')
+
+        # creates combo box to get the spine style
+        spine_mode_lbl = QtWidgets.QLabel('Spine Style:')
+        self.spine_mode_cb = QtWidgets.QComboBox()
+        self.spine_mode_cb.addItems(NamingConventionEnums.SPINE_MODES)
+        spine_mode_hb = QtWidgets.QHBoxLayout()
+        spine_mode_hb.addWidget(spine_mode_lbl)
+        spine_mode_hb.addWidget(self.spine_mode_cb)
+
+        # creates combo box to get the ik fk blend style
+        blend_mode_lbl = QtWidgets.QLabel('IK/FK Blend:')
+        self.blend_mode_cb = QtWidgets.QComboBox()
+        self.blend_mode_cb.addItems(NamingConventionEnums.IK_FK_BLEND_MODES)
+        blend_mode_hb = QtWidgets.QHBoxLayout()
+        blend_mode_hb.addWidget(blend_mode_lbl)
+        blend_mode_hb.addWidget(self.blend_mode_cb)
+
+        # creates a checkbox for each module so only some of them can be built, checking
+        # a module that is built already tears it down and builds it again
+        modules_lbl = QtWidgets.QLabel('Modules:')
+        modules_hb = QtWidgets.QHBoxLayout()
+        modules_hb.addWidget(modules_lbl)
+        for label in self.get_module_labels():
+            self.module_cbs[label] = QtWidgets.QCheckBox(label)
+            self.module_cbs[label].setChecked(True)
+            modules_hb.addWidget(self.module_cbs[label])
+
         step_three_btn = QtWidgets.QPushButton('Step Three')
         step_three_btn.setObjectName('stepThree')
         step_three_btn.clicked.connect(self.run_step)
@@ -382,6 +446,9 @@ class AutoRiggerGUI(QtWidgets.QDialog):
         # add everything to layout that gets returned
         step_three_vb = QtWidgets.QVBoxLayout()
         step_three_vb.addWidget(step_three_lbl)
+        step_three_vb.addLayout(spine_mode_hb)
+        step_three_vb.addLayout(blend_mode_hb)
+        step_three_vb.addLayout(modules_hb)
         step_three_vb.addWidget(step_three_btn)
         step_three_vb.addWidget(self.bind_btn)
 
@@ -390,7 +457,11 @@ class AutoRiggerGUI(QtWidgets.QDialog):
 
     def run_step(self):
         """
-        Runs the step that was clicked
+        Runs the step that was clicked in a build session so it is one undo chunk and
+        maya doesnt refresh while it runs, then shows the step's message if it has one
+        and the profile if profile build is checked. a step that fails puts the scene
+        back to how it was before it so it can be run again. each step is added to the
+        build log
         """
 
         #check to see if sender exist
@@ -398,151 +469,257 @@ class AutoRiggerGUI(QtWidgets.QDialog):
         if sender:
             #check the name of sender and add the string to the correct line edit
             obj_name = str(sender.objectName())
-            if obj_name == 'stepOne':
-                #sets the naming convention and the colors
-                self.right_prefix = self.right_prefix_le.text()
-                self.left_prefix = self.left_prefix_le.text()
-                NamingConventionEnums.LEFT = self.left_prefix
-                NamingConventionEnums.RIGHT = self.right_prefix
-
-                self.left_side_color = self.left_side_color_cb.currentText()
-                self.right_side_color = self.right_side_color_cb.currentText()
-                self.center_color = self.center_color_cb.currentText()
-                self.num_vertebrae = self.num_vertebrae_sb.value()
-
-                root = step_one.read_xml()
-                self.joint_structure = step_one.Skeleton(root, self.num_fingers_sb.value()
-                                    ,self.num_toes_sb.value(),
-                                    self.num_vertebrae).joint_structure
-                self.joint_structure.group()
-                # colors the joints based on side
-                self.joint_list = self.joint_structure.get_joint_list()
-                #loop through joint list to color the joints based on side
-                for item in self.joint_list:
-                    # color based on the side
-                    if item.startswith(NamingConventionEnums.RIGHT):
-                        gu.set_color(item, self.right_side_color)
-                    elif item.startswith(NamingConventionEnums.LEFT):
-                        gu.set_color(item, self.left_side_color)
-                    else:
-                        gu.set_color(item, self.center_color)
-
-                #add the user inputs to the main_cc so that if closed and reopened we
-                #can still read it
-                main_cc = 'fake_rig' + NamingConventionEnums.CONTROL_CURVE_SUFFIX
-                cmds.addAttr('|' + main_cc, longName='num_vertebrae',
-                             attributeType='float')
-                cmds.setAttr(main_cc+'.num_vertebrae', self.num_vertebrae)
-
-                cmds.addAttr('|' + main_cc, longName='left_side_color',
-                             dataType='string')
-                cmds.setAttr(main_cc + '.left_side_color', self.left_side_color,
-                             type='string')
-
-                cmds.addAttr('|' + main_cc, longName='right_side_color',
-                             dataType='string')
-                cmds.setAttr(main_cc + '.right_side_color', self.right_side_color,
-                             type='string')
-
-                cmds.addAttr('|' + main_cc, longName='center_color',
-                             dataType='string')
-                cmds.setAttr(main_cc + '.center_color', self.center_color, type='string')
-
-                cmds.addAttr('|' + main_cc, longName='left_prefix',
-                             dataType='string')
-                cmds.setAttr(main_cc + '.left_prefix', self.left_prefix, type='string')
-
-                cmds.addAttr('|' + main_cc, longName='right_prefix',
-                             dataType='string')
-                cmds.setAttr(main_cc + '.right_prefix', self.right_prefix, type='string')
-
-                #disables step one and enables step 2
-                self.disable_layout(self.step_one_layout)
-                self.enable_layout(self.step_two_layout)
-                self.enable_layout(self.mirror_vb)
-                self.enable_layout(self.xray_vb)
+            #save the selection so the steps can give it back when they are done
+            selection = gu.get_selection()
+            store = self.checkpoints if obj_name != 'bind' else None
+            try:
+                with build_telemetry.record_build('gui', self.get_params(),
+                                                  self.STEP_NAMES.get(obj_name,
+                                                                      obj_name)):
+                    with build_checkpoints.checkpoint(store, obj_name,
+                                                      self.get_build_state()):
+                        with build_profiler.profile_build(obj_name,
+                                                          self.profile_cb.isChecked()) \
+                                as profiler:
+                            with gu.build_session(obj_name):
+                                message = self.build_step(obj_name)
+            except Exception as error:
+                if store is not None and store.checkpoints:
+                    self.set_build_state(store.checkpoints[-1]['context'])
+                    self.warn_user('Auto Rigger', '%s failed: %s\nThe scene is back to '
+                                   'how it was before it, fix the problem and run it '
+                                   'again' % (obj_name, error))
+                raise
+            gu.restore_selection(selection)
+
+            #tell the user once maya is refreshing again
+            if message:
+                self.warn_user('Auto Rigger', message)
+            if profiler:
+                self.show_profile(profiler)
+
+    def build_step(self, obj_name):
+        """
+        Runs the step with the given name
 
-            elif obj_name == 'stepTwo':
-                #call step 2 run step and save the cc list
-                self.cc_list = step_two.run_step(gu.get_joint_list(),
-                              self.right_side_color, self.left_side_color,
-                              self.center_color,self.fk_control_style_cb.currentText(),
-                              self.ik_control_style_cb.currentText(), self.num_vertebrae)
+        :param obj_name: object name of the button that was clicked
+        :type: str
 
-                #lock transforms on the main cc
-                main_cc = 'fake_rig' + NamingConventionEnums.CONTROL_CURVE_SUFFIX
-                gu.lock_all_channels(main_cc)
+        :return: a message for the user or None
+        :type: str
+        """
+        if obj_name == 'stepOne':
+            #sets the naming convention and the colors
+            self.right_prefix = self.right_prefix_le.text()
+            self.left_prefix = self.left_prefix_le.text()
+            self.naming = NamingContext(self.left_prefix, self.right_prefix)
+
+            self.left_side_color = self.left_side_color_cb.currentText()
+            self.right_side_color = self.right_side_color_cb.currentText()
+            self.center_color = self.center_color_cb.currentText()
+            self.num_vertebrae = self.num_vertebrae_sb.value()
+
+            #build the fake skeleton and save the settings on the main cc
+            self.joint_structure = step_one.run_step(self.num_fingers_sb.value(),
+                                                     self.num_toes_sb.value(),
+                                                     self.num_vertebrae,
+                                                     self.left_prefix, self.right_prefix,
+                                                     self.left_side_color,
+                                                     self.right_side_color,
+                                                     self.center_color)
+            self.joint_list = self.joint_structure.get_joint_list()
+
+            #disables step one and enables step 2
+            self.disable_layout(self.step_one_layout)
+            self.enable_layout(self.step_two_layout)
+            self.enable_layout(self.mirror_vb)
+            self.enable_layout(self.xray_vb)
 
-                #disables step 2 and enables step 3
-                self.disable_layout(self.step_two_layout)
-                self.enable_layout(self.step_three_layout)
-                self.bind_btn.setEnabled(False)
+        elif obj_name == 'stepTwo':
+            #on a re-run only the controls whose inputs changed are rebuilt
+            step_two_args = (self.right_side_color, self.left_side_color,
+                             self.center_color, self.fk_control_style_cb.currentText(),
+                             self.ik_control_style_cb.currentText(), self.num_vertebrae)
+            rebuilt = None
+            if step_two.is_built():
+                rebuilt = step_two.get_changed_modules(gu.get_joint_list(),
+                                                       *step_two_args,
+                                                       naming=self.naming)
+
+            #call step 2 run step and save the cc list
+            self.cc_list = step_two.run_step(gu.get_joint_list(), *step_two_args,
+                                             naming=self.naming)
+
+            #lock transforms on the main cc
+            main_cc = 'fake_rig' + NamingConventionEnums.CONTROL_CURVE_SUFFIX
+            gu.lock_all_channels(main_cc)
+
+            #enables step 3, step 2 stays on so moved guides can be picked up
+            self.enable_layout(self.step_three_layout)
+            self.bind_btn.setEnabled(False)
+            if rebuilt is not None:
+                if not rebuilt:
+                    return 'Nothing has changed since the controls were built'
+                return 'Rebuilt the controls of: ' + ', '.join(rebuilt)
+
+        elif obj_name == 'stepThree':
+            #create the rig structure if this is the first module being built
+            if not cmds.objExists(NamingConventionEnums.RIG_HIERARCHY[0]):
+                gu.create_hierarchy()
+            #run step three
+            step_three.run_step(self.cc_list, self.num_vertebrae,
+                                self.spine_mode_cb.currentText(),
+                                self.blend_mode_cb.currentText(),
+                                self.get_modules(), naming=self.naming)
 
-            elif obj_name == 'stepThree':
+            #the fake rig is gone after the first run so step 2 cant run again
+            self.disable_layout(self.step_two_layout)
 
-                #create the rig structure
-                gu.create_hierarchy()
-                #run step three
-                step_three.run_step(self.cc_list, self.num_vertebrae)
+            #uncheck the modules that are built so the next run only rebuilds the ones
+            # checked again
+            built_modules = step_three.get_built_modules()
+            for label, module in zip(self.get_module_labels(),
+                                     step_three.get_rig_modules(self.naming)):
+                if module in built_modules:
+                    self.module_cbs[label].setChecked(False)
+
+            #wait until every module is built before finishing the rig
+            left_modules = [module for module in step_three.get_rig_modules(self.naming)
+                            if module not in built_modules]
+            if left_modules:
+                return 'Still to build: ' + ', '.join(left_modules)
+
+            # swap the fake rig control for the move scale rotate control
+            step_three.finish_rig()
 
-                # create the move scale rotate control
-                main_cc = 'fake_rig' + NamingConventionEnums.CONTROL_CURVE_SUFFIX
-                cmds.delete(main_cc)
+            # setup the gui for the binding step
+            self.mirror_vb.setEnabled(False)
+            self.mirror_l_to_r_btn.setEnabled(False)
+            self.mirror_r_to_l_btn.setEnabled(False)
+            self.disable_layout(self.step_three_layout)
 
-                # create global controller and set color
-                new_cc_name = "moveScaleRotate01_shape"
-                gu.create_four_point_arrow(new_cc_name)
-                gu.set_color(new_cc_name, 'green')
+            self.bind_btn.setEnabled(True)
+            return 'The rig is complete!'
+
+
+        #run if the bind button is called
+        elif obj_name== 'bind':
+            #selects all the joints
+            sel = cmds.ls( type='joint')
+            bind_list = []
+
+            #makes a new list of all the joints that are BIND joints
+            for joint in sel:
+                if joint.find(NamingConventionEnums.BIND_JOINT_SUFFIX) != -1:
+                    bind_list.append(joint)
+
+            #gets the selected mesh
+            mesh_list = cmds.ls( selection=True )
+
+            #if there was a mesh selected call bind with the BIND joints and mesh
+            if len(mesh_list) > 0:
+                self.bind(bind_list, mesh_list)
+                #the rig is done so there is nothing left to go back to
+                self.clear_checkpoints()
+                self.close()
+                return 'Your geometry has been bound to your new rig!'
+            else:
+                return 'Please select geometry to bind'
 
-                # rescale global controller based off of pelvis_CC
-                pelvis_bbox = cmds.exactWorldBoundingBox('pelvis_CC')
-                cc_bbox = cmds.exactWorldBoundingBox(new_cc_name)
 
-                x_scale = (pelvis_bbox[3]-pelvis_bbox[0])/(cc_bbox[3]-cc_bbox[0])
-                cmds.xform(new_cc_name, scale = (x_scale, 1, x_scale), relative = True)
-                cmds.makeIdentity(apply=True, translate=1, rotate=1, scale=1, normal=0)
+    def clear_checkpoints(self):
+        """
+        Deletes the checkpoints and their folder so the exported scenes dont pile up in
+        the temp folder
+        """
+        self.checkpoints.clear(remove_folder=True)
 
-                # parent controller scape to moveScaleRotate01 and delete leftover curve
-                obj_shape = cmds.listRelatives(shapes=True)
-                cmds.parent(obj_shape, 'moveScaleRotate01', add=True, shape=True)
-                cmds.delete("moveScaleRotate01_shape")
+    def get_build_state(self):
+        """
+        gets what the steps saved on the gui for a checkpoint
 
-                #clean the outliner
-                cmds.delete(cmds.ls('transform*', assemblies=True))
+        :return: {attribute: value}
+        :type: dict
+        """
+        state = {}
+        for attr in self.BUILD_STATE:
+            value = getattr(self, attr)
+            state[attr] = list(value) if isinstance(value, list) else value
+        return state
 
-                # setup the gui for the binding step
-                self.mirror_vb.setEnabled(False)
-                self.mirror_l_to_r_btn.setEnabled(False)
-                self.mirror_r_to_l_btn.setEnabled(False)
-                self.disable_layout(self.step_three_layout)
+    def get_params(self):
+        """
+        gets what the rig is built from for the build log, with the keys of batch_rig's
+        specs
 
-                self.warn_user('Auto Rigger', 'The rig is complete!')
-                self.bind_btn.setEnabled(True)
+        :return: {key: value}
+        :type: dict
+        """
+        return {'template': None, 'fingers': self.num_fingers_sb.value(),
+                'toes': self.num_toes_sb.value(),
+                'vertebrae': self.num_vertebrae_sb.value(),
+                'left_prefix': self.left_prefix_le.text(),
+                'right_prefix': self.right_prefix_le.text(),
+                'left_color': self.left_side_color_cb.currentText(),
+                'right_color': self.right_side_color_cb.currentText(),
+                'center_color': self.center_color_cb.currentText(),
+                'fk_style': self.fk_control_style_cb.currentText(),
+                'ik_style': self.ik_control_style_cb.currentText(),
+                'spine_mode': self.spine_mode_cb.currentText(),
+                'blend_mode': self.blend_mode_cb.currentText()}
+
+    def set_build_state(self, state):
+        """
+        puts back what the steps saved on the gui from a checkpoint
 
+        :param state: {attribute: value} from get_build_state
+        :type: dict
+        """
+        for attr in self.BUILD_STATE:
+            setattr(self, attr, state[attr])
 
-            #run if the bind button is called
-            elif obj_name== 'bind':
-                #selects all the joints
-                sel = cmds.ls( type='joint')
-                bind_list = []
+    @classmethod
+    def get_module_labels(cls):
+        """
+        gets the checkbox labels for the modules in the same order as
+        step_three.get_rig_modules()
 
-                #makes a new list of all the joints that are BIND joints
-                for joint in sel:
-                    if joint.find(NamingConventionEnums.BIND_JOINT_SUFFIX) != -1:
-                        bind_list.append(joint)
+        :return: list of labels like 'Left Arm'
+        :type: list
+        """
+        labels = []
+        for part in NamingConventionEnums.RIG_MODULES:
+            if part in NamingConventionEnums.SIDED_MODULES:
+                labels.append('Left ' + part.title())
+                labels.append('Right ' + part.title())
+            else:
+                labels.append(part.title())
+        return labels
 
-                #gets the selected mesh
-                mesh_list = cmds.ls( selection=True )
+    def get_modules(self):
+        """
+        gets the modules whose checkboxes are checked
 
-                #if there was a mesh selected call bind with the BIND joints and mesh
-                if len(mesh_list) > 0:
-                    self.bind(bind_list, mesh_list)
-                    self.warn_user('Auto Rigger',
-                              'Your geometry has been bound to your new rig!')
-                    self.close()
-                else:
-                    self.warn_user('Auto Rigger', 'Please select geometry to bind')
+        :return: list of module names for step_three.run_step
+        :type: list
+        """
+        return [module for label, module in zip(self.get_module_labels(),
+                                                step_three.get_rig_modules(self.naming))
+                if self.module_cbs[label].isChecked()]
 
+    def run_mirror(self):
+        """
+        Runs the mirror that was clicked and shows the profile if profile build is
+        checked
+        """
+        sender = self.sender()
+        if sender:
+            obj_name = str(sender.objectName())
+            with build_profiler.profile_build(obj_name, self.profile_cb.isChecked()) \
+                    as profiler:
+                getattr(self, obj_name)()
+            if profiler:
+                self.show_profile(profiler)
 
     def mirror_l_to_r(self):
         """
@@ -552,26 +729,26 @@ class AutoRiggerGUI(QtWidgets.QDialog):
         if self.joint_structure:
             for item in self.joint_list:
                 # get the opposite side of the jnt
-                if item.startswith(NamingConventionEnums.LEFT):
+                if item.startswith(self.naming.left):
                     # get the opposite side of the jnt
-                    jnt = item.replace(NamingConventionEnums.LEFT,'', 1)
+                    jnt = item.replace(self.naming.left,'', 1)
                 # makes a temp object that is a mirrored version then moves the matching
                     # right side obj to the temp
-                    gu.mirror(item, 'x', 'TEMP_Mirror_GRP', NamingConventionEnums.LEFT,
+                    gu.mirror(item, 'x', 'TEMP_Mirror_GRP', self.naming.left,
                               'TEMP_',
                               'fake_rig' + NamingConventionEnums.CONTROL_CURVE_SUFFIX)
                     mirror_item = cmds.listRelatives('TEMP_Mirror_GRP', children=True)[0]
-                    gu.place_on(NamingConventionEnums.RIGHT + jnt, mirror_item)
+                    gu.place_on(self.naming.right + jnt, mirror_item)
                     cmds.delete('TEMP_Mirror_GRP')
         # checks if the cc list has values
         if self.cc_list:
             for item in self.cc_list:
-                if item.startswith(NamingConventionEnums.LEFT):
+                if item.startswith(self.naming.left):
                     # get the opposite side of the jnt
-                    cc = item.replace(NamingConventionEnums.LEFT, '', 1)
+                    cc = item.replace(self.naming.left, '', 1)
                 # makes a temp object that is a mirrored version then moves the matching
                     # right side obj to the temp
-                    gu.mirror(item, 'x', 'TEMP_Mirror_GRP', NamingConventionEnums.LEFT,
+                    gu.mirror(item, 'x', 'TEMP_Mirror_GRP', self.naming.left,
                               'TEMP_',
                               'fake_rig' + NamingConventionEnums.CONTROL_CURVE_SUFFIX)
                     mirror_item = cmds.listRelatives('TEMP_Mirror_GRP', children=True)[0]
@@ -580,14 +757,14 @@ class AutoRiggerGUI(QtWidgets.QDialog):
                     if cc.find('foot') != -1:
                         cmds.parent(mirror_item, world = True)
 
-                    gu.place_on(NamingConventionEnums.RIGHT + cc, mirror_item, True)
+                    gu.place_on(self.naming.right + cc, mirror_item, True)
                     cmds.delete(mirror_item)
                     cmds.delete('TEMP_Mirror_GRP')
 
                     # fix the fingers mirroring
                     for finger_name in NamingConventionEnums.DIGITS:
                         if cc.find(finger_name) != -1:
-                            cmds.xform(NamingConventionEnums.RIGHT + cc, scale=(1, -1, 1),
+                            cmds.xform(self.naming.right + cc, scale=(1, -1, 1),
                                        relative = True)
 
 
@@ -602,25 +779,25 @@ class AutoRiggerGUI(QtWidgets.QDialog):
         if self.joint_structure:
             for item in self.joint_list:
                 # get the opposite side of the jnt
-                if item.startswith(NamingConventionEnums.RIGHT):
+                if item.startswith(self.naming.right):
                     # get the opposite side of the jnt
-                    jnt = item.replace(NamingConventionEnums.RIGHT, '', 1)
+                    jnt = item.replace(self.naming.right, '', 1)
                 # makes a temp object that is a mirrored version then moves the matching
                     # right side obj to the temp
-                    gu.mirror(item, 'x', 'TEMP_Mirror_GRP', NamingConventionEnums.RIGHT,
+                    gu.mirror(item, 'x', 'TEMP_Mirror_GRP', self.naming.right,
                               'TEMP_',
                               'fake_rig' + NamingConventionEnums.CONTROL_CURVE_SUFFIX)
                     mirror_item = cmds.listRelatives('TEMP_Mirror_GRP', children=True)[0]
-                    gu.place_on(NamingConventionEnums.LEFT + jnt, mirror_item)
+                    gu.place_on(self.naming.left + jnt, mirror_item)
                     cmds.delete('TEMP_Mirror_GRP')
         if self.cc_list:
             for item in self.cc_list:
-                if item.startswith(NamingConventionEnums.RIGHT):
+                if item.startswith(self.naming.right):
                     # get the opposite side of the jnt
-                    cc = item.replace(NamingConventionEnums.RIGHT, '')
+                    cc = item.replace(self.naming.right, '')
                  # makes a temp object that is a mirrored version then moves the matching
                     # right side obj to the temp
-                    gu.mirror(item, 'x', 'TEMP_Mirror_GRP', NamingConventionEnums.RIGHT,
+                    gu.mirror(item, 'x', 'TEMP_Mirror_GRP', self.naming.right,
                               'TEMP_',
                               'fake_rig' + NamingConventionEnums.CONTROL_CURVE_SUFFIX)
                     mirror_item = cmds.listRelatives('TEMP_Mirror_GRP', children=True)[0]
@@ -629,7 +806,7 @@ class AutoRiggerGUI(QtWidgets.QDialog):
                     if cc.find('foot') != -1:
                         cmds.parent(mirror_item, world=True)
 
-                    gu.place_on(NamingConventionEnums.LEFT + cc, mirror_item, True)
+                    gu.place_on(self.naming.left + cc, mirror_item, True)
 
                     cmds.delete(mirror_item)
                     cmds.delete('TEMP_Mirror_GRP')
@@ -637,7 +814,7 @@ class AutoRiggerGUI(QtWidgets.QDialog):
                     #fix the fingers mirroring
                     for finger_name in NamingConventionEnums.DIGITS:
                         if cc.find(finger_name) != -1:
-                            cmds.xform(NamingConventionEnums.LEFT + cc, scale=(1, 1, 1),
+                            cmds.xform(self.naming.left + cc, scale=(1, 1, 1),
                                        relative = True)
 
     def bind(self, joint_list, mesh_list):
@@ -705,6 +882,31 @@ class AutoRiggerGUI(QtWidgets.QDialog):
                 self.warn_user('Warning', 'There is no geometry in the scene')
 
 
+    def show_profile(self, profiler):
+        """
+        shows the summary of a profiled step and lets the user save the whole profile
+
+        :param profiler: the profiler the step ran in
+        :type: BuildProfiler
+        """
+        summary = profiler.get_summary()
+        message_box = QtWidgets.QMessageBox()
+        message_box.setWindowTitle('Build Profile')
+        message_box.setText(summary.split('\n')[0])
+        message_box.setDetailedText(summary)
+        save_btn = message_box.addButton('Save...', QtWidgets.QMessageBox.ActionRole)
+        message_box.addButton(QtWidgets.QMessageBox.Close)
+        message_box.exec_()
+
+        #saves the json and the collapsed stacks for a flamegraph next to it
+        if message_box.clickedButton() == save_btn:
+            path = QtWidgets.QFileDialog.getSaveFileName(self, 'Save Profile',
+                                                         profiler.root['name'] + '.json',
+                                                         'JSON (*.json)')[0]
+            if path:
+                profiler.write_json(path)
+                profiler.write_collapsed(path.rsplit('.', 1)[0] + '.folded')
+
     @classmethod
     def warn_user(cls, title, message):
         """
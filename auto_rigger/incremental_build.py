@@ -0,0 +1,380 @@
+#!/usr/bin/env python
+#SETMODE 777
+
+#----------------------------------------------------------------------------------------#
+#------------------------------------------------------------------------------ HEADER --#
+
+"""
+:author:
+    Nick Lormand & Blake Day
+
+:synopsis:
+    builds a character, or brings a rig built before up to date with its spec
+
+:description:
+    each step saves a hash of what it was built from on the rig. step one hashes the
+    template's contents, the counts, the prefixes and the colors, step two hashes the
+    colors and styles and each module's guide positions, step three hashes what built
+    each module. rebuild works out the hashes for a spec and only redoes what changed.
+
+        a change to step one builds the fake rig again and puts the guides back
+        a moved guide only rebuilds the controls of its modules
+        a change to the colors or styles rebuilds the controls
+        modules step three hasnt built yet are built
+
+    once step three has started a change to step one or two tears the rig down and
+    builds it again from the saved guides. a moved guide or a new spine or blend mode
+    only tears down the modules built from it, a finished rig gets a new fake rig to
+    build them again from. the other modules hang off the spine, so a change to it
+    still builds the whole rig again. the spec is the same as batch_rig's. with a
+    CheckpointStore a step that fails puts the scene back to how it was when the step
+    started
+
+        report = incremental_build.rebuild(spec)
+        report = incremental_build.rebuild(spec, checkpoints=CheckpointStore())
+
+:applications:
+    Maya or plain python
+
+:see_also:
+    batch_rig
+    build_checkpoints
+    step_one
+    step_two
+    step_three
+"""
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- IMPORTS --#
+
+# Default Python Imports
+import json
+import time
+
+# Imports That You Wrote
+import auto_rigger.build_checkpoints as build_checkpoints
+from auto_rigger.cmds_backend import cmds
+import auto_rigger.gen_utils as gu
+from auto_rigger.naming_context import NamingContext
+import auto_rigger.step_one as step_one
+import auto_rigger.step_two as step_two
+import auto_rigger.step_three as step_three
+from maya_enums import NamingConventionEnums
+
+#----------------------------------------------------------------------------------------#
+#--------------------------------------------------------------------------- FUNCTIONS --#
+
+def rebuild(spec, times=None, undo=True, checkpoints=None):
+    """
+    builds the character in the current scene, redoing only the steps and modules whose
+    inputs are different from the ones saved on the rig
+
+    :param spec: a full spec, like batch_rig.load_specs gives
+    :type: dict
+
+    :param times: gets the seconds each step took -> {step: seconds}
+    :type: dict
+
+    :param undo: False turns undo off while steps two and three build
+    :type: bool
+
+    :param checkpoints: saves the scene before each step and puts it back if the step
+                        fails, so the next rebuild picks up from there
+    :type: CheckpointStore
+
+    :return: {'torn_down': if the old rig was deleted, 'step_one': if the fake rig was
+              built, 'step_two': modules whose controls were built, 'step_three':
+              modules that were built or built again}
+    :type: dict
+    """
+    if times is None:
+        times = {}
+    report = {'torn_down': False, 'step_one': False, 'step_two': [], 'step_three': []}
+    naming = NamingContext(spec['left_prefix'], spec['right_prefix'])
+    main_cc = naming.main_cc
+    step_one_args, step_two_args = get_step_args(spec)
+    step_one_hash = gu.get_input_hash(step_one.get_inputs(*step_one_args))
+
+    #the saved guides, then the ones the user moved, then the spec's. only the moved
+    #and the spec's guides get placed, the rest follow their parents like a fresh build
+    saved_guides = get_saved_guides()
+    guides = dict(saved_guides)
+    placed_guides = {}
+    if cmds.objExists('pelvis' + NamingConventionEnums.FAKE_JOINT_SUFFIX):
+        placed_guides = dict([(jnt, position) for jnt, position in gu.get_guides().items()
+                              if saved_guides.get(jnt) != position])
+    spec_guides = dict([(jnt, gu.round_position(spec['guides'][jnt]))
+                        for jnt in spec['guides']])
+    placed_guides.update(spec_guides)
+    guides.update(placed_guides)
+
+    start = time.time()
+    stale_modules = []
+    with build_checkpoints.checkpoint(checkpoints, 'step one'):
+        if is_stale(step_one_hash, step_two_args, guides):
+            teardown()
+            report['torn_down'] = True
+        elif is_finished() and (guides != saved_guides or
+                                step_three.get_stale_modules(spec['spine_mode'],
+                                                             spec['blend_mode'])):
+            #the fake rig is gone, build it again to build the stale modules from
+            step_one.run_step(*step_one_args)
+            gu.place_guides(dict([(jnt, placed_guides[jnt]) for jnt in placed_guides
+                                  if jnt in spec_guides or cmds.objExists(jnt)]))
+            report['step_one'] = True
+            stale_modules = get_stale_modules(spec, naming)
+            if 'spine' in stale_modules:
+                teardown()
+                report['torn_down'] = True
+                stale_modules = []
+        if not cmds.objExists(main_cc) and not is_prepared():
+            step_one.run_step(*step_one_args)
+            gu.place_guides(dict([(jnt, placed_guides[jnt]) for jnt in placed_guides
+                                  if jnt in spec_guides or cmds.objExists(jnt)]))
+            report['step_one'] = True
+        elif not is_prepared():
+            gu.place_guides(spec_guides)
+    times['step_one'] = time.time() - start
+
+    start = time.time()
+    if not is_prepared():
+        with build_checkpoints.checkpoint(checkpoints, 'step two'):
+            joint_list = gu.get_joint_list()
+            modules = None
+            if step_two.is_built():
+                modules = step_two.get_changed_modules(joint_list, *step_two_args,
+                                                       naming=naming)
+            if modules is None:
+                modules = step_three.get_rig_modules(naming)
+            report['step_two'] = modules
+            step_two.run_step(joint_list, *step_two_args, undo=undo, naming=naming)
+            gu.lock_all_channels(main_cc)
+    times['step_two'] = time.time() - start
+
+    start = time.time()
+    if stale_modules:
+        with build_checkpoints.checkpoint(checkpoints, 'step three'):
+            rebuild_modules(stale_modules, step_two_args, spec, undo, naming)
+            report['step_three'] = stale_modules
+    elif cmds.objExists(main_cc):
+        with build_checkpoints.checkpoint(checkpoints, 'step three'):
+            if not cmds.objExists(NamingConventionEnums.RIG_HIERARCHY[0]):
+                gu.create_hierarchy()
+            #build the modules that arent built yet and again the ones that are stale
+            built_modules = step_three.get_built_modules()
+            modules = [module for module in step_three.get_rig_modules(naming)
+                       if module not in built_modules]
+            modules.extend(step_three.get_stale_modules(spec['spine_mode'],
+                                                        spec['blend_mode']))
+            cc_list = [cc for cc, jnt in step_two.get_control_joints()]
+            step_three.run_step(cc_list, spec['vertebrae'], spec['spine_mode'],
+                                spec['blend_mode'], modules, undo=undo, naming=naming)
+            report['step_three'] = modules
+            step_three.finish_rig()
+    times['step_three'] = time.time() - start
+
+    return report
+
+def get_step_args(spec):
+    """
+    gets the arguments steps one and two are run with for a spec
+
+    :param spec: a full spec, like batch_rig.load_specs gives
+    :type: dict
+
+    :return: (step one's arguments, step two's colors, styles and vertebrae)
+    :type: tuple
+    """
+    step_one_args = (spec['fingers'], spec['toes'], spec['vertebrae'],
+                     spec['left_prefix'], spec['right_prefix'], spec['left_color'],
+                     spec['right_color'], spec['center_color'], spec['template'])
+    step_two_args = (spec['right_color'], spec['left_color'], spec['center_color'],
+                     spec['fk_style'], spec['ik_style'], spec['vertebrae'])
+    return step_one_args, step_two_args
+
+def is_stale(step_one_hash, step_two_args, guides):
+    """
+    checks if the rig in the scene has to be torn down. before step three only a change
+    to step one does, after it a change to step one or two does. a moved guide only
+    does before the rig is finished, when there are modules left to build from the old
+    guides, or when a rebuild of the modules didnt finish
+
+    :param step_one_hash: the hash of step one's inputs for the spec
+    :type: str
+
+    :param step_two_args: step two's colors, styles and vertebrae for the spec
+    :type: tuple
+
+    :param guides: every guide position -> {fake joint: [x, y, z]}
+    :type: dict
+
+    :return: if the rig has to be built again from step one
+    :type: bool
+    """
+    main_cc = 'fake_rig' + NamingConventionEnums.CONTROL_CURVE_SUFFIX
+    if not is_prepared():
+        return cmds.objExists(main_cc) and step_one_hash != gu.get_string_attr(
+            main_cc, NamingConventionEnums.STEP_ONE_HASH_ATTR)
+
+    master = NamingConventionEnums.RIG_HIERARCHY[0]
+    step_two_hash = gu.get_input_hash(step_two.get_inputs(step_one_hash,
+                                                          *step_two_args))
+    return (step_one_hash != gu.get_string_attr(
+                master, NamingConventionEnums.STEP_ONE_HASH_ATTR) or
+            step_two_hash != gu.get_string_attr(
+                master, NamingConventionEnums.STEP_TWO_HASH_ATTR) or
+            (cmds.objExists(main_cc) and (
+                guides != get_saved_guides() or
+                cmds.objExists('pelvis' + NamingConventionEnums.FAKE_JOINT_SUFFIX))))
+
+def is_prepared():
+    """
+    checks if step three has turned the fake rig into real joints
+
+    :return: if the master node has the joint modules
+    :type: bool
+    """
+    master = NamingConventionEnums.RIG_HIERARCHY[0]
+    return gu.get_string_attr(master, NamingConventionEnums.JOINT_MODULES_ATTR) \
+        is not None
+
+def is_finished():
+    """
+    checks if step three has built every module and deleted the fake rig
+
+    :return: if the rig is finished
+    :type: bool
+    """
+    return is_prepared() and not cmds.objExists(
+        'fake_rig' + NamingConventionEnums.CONTROL_CURVE_SUFFIX)
+
+def get_stale_modules(spec, naming=None):
+    """
+    finds the modules of a finished rig that have to be built again, the ones whose
+    guides moved and the ones built with another spine or blend mode. the fake rig has
+    to be built again and its guides placed first
+
+    :param spec: the spec being built
+    :type: dict
+
+    :param naming: the NamingContext of the build, defaults to the rig's
+    :type: NamingContext
+
+    :return: list of module names
+    :type: list
+    """
+    master = NamingConventionEnums.RIG_HIERARCHY[0]
+    saved_hashes = gu.get_dict_attr(master, NamingConventionEnums.GUIDE_HASHES_ATTR)
+    guide_hashes = step_two.get_guide_hashes(gu.get_guides(), naming)
+    stale_modules = step_three.get_stale_modules(spec['spine_mode'], spec['blend_mode'])
+    stale_modules.extend([module for module in step_three.get_built_modules()
+                          if saved_hashes.get(module) != guide_hashes.get(module) and
+                          module not in stale_modules])
+    return stale_modules
+
+def rebuild_modules(modules, step_two_args, spec, undo=True, naming=None):
+    """
+    builds modules of a finished rig again from a fake rig that was built again. the
+    old modules are torn down, their controls and joints are made from the fake rig
+    like steps two and three make them, then they are built and the fake rig is deleted
+
+    :param modules: the module names, not the spine since the rest hangs off it
+    :type: list
+
+    :param step_two_args: step two's colors, styles and vertebrae for the spec
+    :type: tuple
+
+    :param spec: the spec being built
+    :type: dict
+
+    :param undo: False turns undo off while it builds
+    :type: bool
+
+    :param naming: the NamingContext of the build, defaults to the rig's
+    :type: NamingContext
+    """
+    right_color, left_color, center_color, fk_style, ik_style, num_vertebrae = \
+        step_two_args
+    master = NamingConventionEnums.RIG_HIERARCHY[0]
+    with gu.build_session('step three', undo):
+        step_three.teardown_modules(modules)
+
+        #the modules are built from the new guides
+        guides = gu.get_guides()
+        gu.set_dict_attr(master, NamingConventionEnums.GUIDE_HASHES_ATTR,
+                         step_two.get_guide_hashes(guides, naming))
+        gu.set_string_attr(master, NamingConventionEnums.GUIDES_ATTR,
+                           json.dumps(guides, sort_keys=True))
+
+        #make the controls of the modules like step two does
+        joint_list = [jnt for jnt in gu.get_joint_list()
+                      if step_three.get_module(jnt, naming) in modules]
+        control_joints = step_two.make_controls(joint_list, fk_style, ik_style,
+                                                num_vertebrae, naming)
+        cc_list = [cc for cc, jnt in control_joints]
+        step_two.style_controls(cc_list, right_color, left_color, center_color, naming)
+        cmds.parent(cmds.group(cc_list, name=naming.controls_group), naming.main_cc)
+        step_three.prepare_controls(cc_list)
+
+        #make the real joints of the modules under the joints they hang off
+        for jnt in joint_list:
+            parent = cmds.listRelatives(jnt, parent=True)[0]
+            if step_three.get_module(parent, naming) not in modules:
+                root = gu.create_real_skeleton(jnt)
+                cmds.parent(root, parent.replace(NamingConventionEnums.FAKE_JOINT_SUFFIX,
+                                                 NamingConventionEnums.JOINT_SUFFIX))
+                cmds.makeIdentity(root, apply=True)
+        cmds.delete(naming.connectors_group,
+                    'pelvis' + NamingConventionEnums.FAKE_JOINT_SUFFIX)
+
+        step_three.save_unbuilt_nodes([(jnt, module) for jnt, module
+                                       in step_three.get_joint_modules()
+                                       if module in modules], dict(control_joints))
+        step_three.run_step(cc_list, spec['vertebrae'], spec['spine_mode'],
+                            spec['blend_mode'], modules, undo, naming)
+        step_three.delete_fake_rig()
+
+def get_saved_guides():
+    """
+    gets the guide positions step two saved, from the master node once step three has
+    started or the main cc before it
+
+    :return: {fake joint: [x, y, z]}
+    :type: dict
+    """
+    for node in [NamingConventionEnums.RIG_HIERARCHY[0],
+                 'fake_rig' + NamingConventionEnums.CONTROL_CURVE_SUFFIX]:
+        saved = gu.get_string_attr(node, NamingConventionEnums.GUIDES_ATTR)
+        if saved:
+            return dict([(str(jnt), position)
+                         for jnt, position in json.loads(saved).items()])
+    return {}
+
+def teardown():
+    """
+    deletes the fake rig, the rig and the utility nodes wired into them so the
+    character can be built again from step one
+    """
+    roots = [node for node in ['fake_rig' + NamingConventionEnums.CONTROL_CURVE_SUFFIX,
+                               NamingConventionEnums.RIG_HIERARCHY[0]]
+             if cmds.objExists(node)]
+    if not roots:
+        return
+    nodes = roots + (cmds.listRelatives(roots, allDescendents=True, fullPath=True) or [])
+
+    #follow the connections out to every utility node, utilities feed each other too
+    utilities = []
+    connected = nodes
+    while connected:
+        connected = cmds.ls(cmds.listConnections(connected) or [],
+                            type=NamingConventionEnums.RIG_UTILITY_TYPES)
+        connected = [node for node in set(connected) if node not in utilities]
+        utilities.extend(connected)
+
+    cmds.delete(roots)
+    utilities = [node for node in utilities if cmds.objExists(node)]
+    if utilities:
+        cmds.delete(utilities)
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- CLASSES --#
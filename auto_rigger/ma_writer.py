@@ -0,0 +1,532 @@
+#!/usr/bin/env python
+#SETMODE 777
+
+#----------------------------------------------------------------------------------------#
+#------------------------------------------------------------------------------ HEADER --#
+
+"""
+:author:
+    Nick Lormand & Blake Day
+
+:synopsis:
+    writes the in memory scene out as a maya ascii file without maya
+
+:description:
+    the steps build the whole rig in scene_cmds when they run without maya, every node,
+    its attributes, its shape and its connections. write_scene writes that scene as a
+    .ma file that opens in maya as the same rig, so rigs can be made on machines that
+    dont have maya.
+
+        ma_writer.export_character(spec, 'ogre.ma')
+
+    or after a build on the scene backend
+
+        ma_writer.write_scene('ogre.ma')
+
+    the scene doesnt keep the connections maya makes on its own, a joint's parent scale
+    into its inverse scale, the ik solver and the end joint into the effector or what
+    the constraints read from their targets and the node they drive, so they are added
+    as it is written. a skinCluster is written as the skinCluster command at the end of
+    the file, maya works out the weights when it opens the file like it does in the
+    build. batch_rig writes one for each character it builds without maya
+
+:applications:
+    plain python
+
+:see_also:
+    scene_cmds
+    batch_rig
+    incremental_build
+"""
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- IMPORTS --#
+
+# Default Python Imports
+import os
+
+# Imports That You Wrote
+import auto_rigger.cmds_backend as cmds_backend
+import auto_rigger.incremental_build as incremental_build
+from auto_rigger.scene_cmds import COMPOUND_ATTRS, COMPOUND_PARENTS, JOINT_ATTRS, \
+    SHAPE_ATTRS, STRING_TYPES, TRANSFORM_ATTRS, get_knots
+
+#the maya version the files are written for
+MAYA_VERSION = '2018'
+#node types that come from a plugin -> {node type: plugin}
+PLUGIN_TYPES = {'composeMatrix': 'matrixNodes', 'decomposeMatrix': 'matrixNodes',
+                'inverseMatrix': 'matrixNodes', 'transposeMatrix': 'matrixNodes'}
+#attribute types addAttr takes as a data type instead of an attribute type
+DATA_TYPES = ['string', 'stringArray', 'matrix', 'doubleArray', 'nurbsCurve']
+#node types written as the command that makes them instead of their nodes
+REPLAYED_TYPES = ['skinCluster']
+#what each constraint reads from its targets -> {type: [(target attr, constraint attr)]}
+CONSTRAINT_TARGET_ATTRS = {
+    'parentConstraint': [('translate', 'targetTranslate'),
+                         ('rotatePivot', 'targetRotatePivot'),
+                         ('rotatePivotTranslate', 'targetRotateTranslate'),
+                         ('rotate', 'targetRotate'), ('rotateOrder', 'targetRotateOrder'),
+                         ('scale', 'targetScale'), ('jointOrient', 'targetJointOrient'),
+                         ('segmentScaleCompensate', 'targetScaleCompensate'),
+                         ('inverseScale', 'targetInverseScale')],
+    'pointConstraint': [('translate', 'targetTranslate'),
+                        ('rotatePivot', 'targetRotatePivot'),
+                        ('rotatePivotTranslate', 'targetRotateTranslate')],
+    'aimConstraint': [('translate', 'targetTranslate'),
+                      ('rotatePivot', 'targetRotatePivot'),
+                      ('rotatePivotTranslate', 'targetRotateTranslate')],
+    'poleVectorConstraint': [('translate', 'targetTranslate'),
+                             ('rotatePivot', 'targetRotatePivot'),
+                             ('rotatePivotTranslate', 'targetRotateTranslate')],
+    'orientConstraint': [('rotate', 'targetRotate'), ('rotateOrder', 'targetRotateOrder'),
+                         ('jointOrient', 'targetJointOrient')],
+    'scaleConstraint': [('scale', 'targetScale')]}
+#what each constraint reads from the node it drives -> {type: [(attr, constraint attr)]}
+CONSTRAINT_NODE_ATTRS = {
+    'parentConstraint': [('rotatePivot', 'constraintRotatePivot'),
+                         ('rotatePivotTranslate', 'constraintRotateTranslate'),
+                         ('rotateOrder', 'constraintRotateOrder'),
+                         ('jointOrient', 'constraintJointOrient')],
+    'pointConstraint': [('rotatePivot', 'constraintRotatePivot'),
+                        ('rotatePivotTranslate', 'constraintRotateTranslate')],
+    'aimConstraint': [('translate', 'constraintTranslate'),
+                      ('rotatePivot', 'constraintRotatePivot'),
+                      ('rotatePivotTranslate', 'constraintRotateTranslate'),
+                      ('rotateOrder', 'constraintRotateOrder'),
+                      ('jointOrient', 'constraintJointOrient')],
+    'orientConstraint': [('rotateOrder', 'constraintRotateOrder'),
+                         ('jointOrient', 'constraintJointOrient')],
+    'scaleConstraint': [],
+    'poleVectorConstraint': []}
+#attributes only joints have
+JOINT_ONLY_ATTRS = ['jointOrient', 'segmentScaleCompensate', 'inverseScale']
+
+#----------------------------------------------------------------------------------------#
+#--------------------------------------------------------------------------- FUNCTIONS --#
+
+def export_character(spec, path):
+    """
+    builds a character in a new in memory scene and writes it as a .ma file
+
+    :param spec: a full spec, like batch_rig.load_specs gives
+    :type: dict
+
+    :param path: the .ma file to write
+    :type: str
+
+    :return: what was built, from incremental_build.rebuild
+    :type: dict
+    """
+    with cmds_backend.using_backend('scene') as scene_cmds:
+        report = incremental_build.rebuild(spec, undo=False)
+        write_scene(path, scene_cmds.scene)
+    return report
+
+def write_scene(path, scene=None):
+    """
+    writes the in memory scene as a maya ascii file
+
+    :param path: the .ma file to write
+    :type: str
+
+    :param scene: the scene to write, defaults to the scene of the current backend
+    :type: Scene
+
+    :return: the path
+    :type: str
+    """
+    if scene is None:
+        backend = cmds_backend.get_base_backend()
+        if not hasattr(backend, 'scene'):
+            raise ValueError('only the in memory scene can be written, the backend is '
+                             '%s' % cmds_backend.get_backend_name())
+        scene = backend.scene
+    lines = get_scene_lines(scene, os.path.basename(path))
+    with open(path, 'w') as ma_file:
+        ma_file.write('\n'.join(lines) + '\n')
+    return path
+
+def get_scene_lines(scene, file_name):
+    """
+    gets the lines of the .ma file of a scene
+
+    :param scene: the scene
+    :type: Scene
+
+    :param file_name: the name of the file the lines are written to
+    :type: str
+
+    :return: the lines
+    :type: list
+    """
+    nodes = get_node_order(scene)
+    lines = ['//Maya ASCII %s scene' % MAYA_VERSION, '//Name: %s' % file_name,
+             '//Codeset: UTF-8', 'requires maya "%s";' % MAYA_VERSION]
+    for plugin in sorted(set([PLUGIN_TYPES[node.type] for node in nodes
+                              if node.type in PLUGIN_TYPES])):
+        lines.append('requires "%s" "1.0";' % plugin)
+    lines.extend(['currentUnit -l centimeter -a degree -t film;',
+                  'fileInfo "application" "maya";',
+                  'fileInfo "product" "Maya %s";' % MAYA_VERSION,
+                  'fileInfo "version" "%s";' % MAYA_VERSION])
+
+    for node in nodes:
+        lines.extend(get_node_lines(scene, node))
+    for solver in sorted(set([node.data.get('solver', 'ikRPsolver') for node in nodes
+                              if node.type == 'ikHandle'])):
+        lines.append('createNode %s -n "%s";' % (solver, solver))
+
+    for source, destination in get_connections(scene, nodes):
+        lines.append('connectAttr "%s" "%s";' % (source, destination))
+    lines.extend(get_replay_lines(scene))
+    lines.append('// End of %s' % file_name)
+    return lines
+
+def get_node_order(scene):
+    """
+    gets the nodes in the order they are written, parents before their children then
+    the nodes that arent in the hierarchy
+
+    :param scene: the scene
+    :type: Scene
+
+    :return: the nodes, without the ones that are replayed
+    :type: list
+    """
+    nodes = []
+    roots = [node for node in scene.nodes.values() if node.is_dag and node.parent is None]
+    for root in roots:
+        nodes.extend([root] + scene.get_descendants(root))
+    nodes.extend([node for node in scene.nodes.values() if not node.is_dag])
+    return [node for node in nodes if node.type not in REPLAYED_TYPES]
+
+def get_node_lines(scene, node):
+    """
+    gets the lines that make a node and set its attributes
+
+    :param scene: the scene
+    :type: Scene
+
+    :param node: the node
+    :type: SceneNode
+
+    :return: the lines
+    :type: list
+    """
+    create = 'createNode %s -n "%s"' % (node.type, node.name)
+    if node.parent is not None:
+        create += ' -p "%s"' % scene.get_path(node.parent)
+    lines = [create + ';']
+
+    for attr in node.user_attrs:
+        attr_type = node.attr_types.get(attr, 'double')
+        type_flag = '-dt' if attr_type in DATA_TYPES else '-at'
+        line = '\taddAttr -ci true -sn "%s" -ln "%s" %s "%s"' % (attr, attr, type_flag,
+                                                                 attr_type)
+        if attr_type == 'enum':
+            line += ' -en "%s"' % node.data.get('enums', {}).get(attr, '')
+        lines.append(line + ';')
+
+    lines.extend(get_attr_lines(node))
+    lines.extend(get_geometry_lines(node))
+
+    for attr in sorted(node.locked):
+        lines.append('\tsetAttr -l on ".%s";' % attr)
+    for attr in sorted(node.hidden_channels):
+        keyable, channel_box = node.hidden_channels[attr]
+        lines.append('\tsetAttr -k %s ".%s";' % ('on' if keyable else 'off', attr))
+        if channel_box and not keyable:
+            lines.append('\tsetAttr -cb on ".%s";' % attr)
+    return lines
+
+def get_attr_lines(node):
+    """
+    gets the setAttr lines of the attributes that arent at their defaults, the children
+    of a compound are set together
+
+    :param node: the node
+    :type: SceneNode
+
+    :return: the lines
+    :type: list
+    """
+    defaults = {}
+    if node.is_transform:
+        defaults.update(TRANSFORM_ATTRS)
+    if node.type == 'joint':
+        defaults.update(JOINT_ATTRS)
+    if node.is_shape:
+        defaults.update(SHAPE_ATTRS)
+
+    lines = []
+    compounds = set()
+    for attr in sorted(node.attrs):
+        value = node.attrs[attr]
+        compound = COMPOUND_PARENTS.get(attr)
+        if compound and compound not in node.attrs:
+            #the children of a compound are set together
+            if compound in compounds:
+                continue
+            compounds.add(compound)
+            attr = compound
+            value = [node.attrs.get(child_attr, defaults.get(child_attr, 0.0))
+                     for child_attr in COMPOUND_ATTRS[compound]]
+            if value == [defaults.get(child_attr) for child_attr in
+                         COMPOUND_ATTRS[compound]]:
+                continue
+        elif isinstance(node.attrs.get(attr[:-1]), list) and attr[-1] in 'XYZ':
+            #setAttr -type double3 keeps the children and the list, only set the list
+            continue
+        elif value is None or (attr in defaults and value == defaults[attr]):
+            continue
+        lines.append('\tsetAttr ".%s"%s;' % (attr, get_value_string(value)))
+    return lines
+
+def get_value_string(value):
+    """
+    gets how a value is written after the plug of a setAttr
+
+    :param value: the value
+    :type: object
+
+    :return: like ' -type "double3" 0 1 0' or ' yes'
+    :type: str
+    """
+    if isinstance(value, list):
+        data_type = {16: 'matrix', 3: 'double3', 2: 'double2'}.get(len(value))
+        if data_type is None:
+            raise ValueError('dont know how to write %r' % (value,))
+        return ' -type "%s" %s' % (data_type, ' '.join([format_number(item)
+                                                        for item in value]))
+    if isinstance(value, STRING_TYPES):
+        return ' -type "string" "%s"' % escape_string(value)
+    if isinstance(value, bool):
+        return ' yes' if value else ' no'
+    return ' ' + format_number(value)
+
+def format_number(value):
+    """
+    writes a number the way maya reads it
+
+    :param value: the number
+    :type: float
+
+    :return: the number with up to 12 significant digits
+    :type: str
+    """
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, int):
+        return str(value)
+    return '%.12g' % value
+
+def escape_string(value):
+    """
+    escapes a string so it can go between the quotes of a mel string
+
+    :param value: the string
+    :type: str
+
+    :return: the escaped string
+    :type: str
+    """
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def get_geometry_lines(node):
+    """
+    gets the lines that set the cvs of a curve or surface and the keys of an anim curve
+
+    :param node: the node
+    :type: SceneNode
+
+    :return: the lines
+    :type: list
+    """
+    if 'cvs' in node.data:
+        cvs = list(node.data['cvs'])
+        degree = node.data['degree']
+        if node.data.get('form') == 'periodic':
+            #a periodic curve repeats its first cvs and its knots run past each end
+            spans = len(cvs)
+            cvs += cvs[:degree]
+            knots = list(range(1 - degree, spans + degree))
+            form = 2
+        else:
+            spans = len(cvs) - degree
+            knots = node.data.get('knots') or get_knots(len(cvs), degree)
+            form = 0
+        return ['\tsetAttr ".cached" -type "nurbsCurve"',
+                '\t\t%d %d %d no 3' % (degree, spans, form),
+                '\t\t%d %s' % (len(knots), ' '.join([format_number(knot)
+                                                     for knot in knots])),
+                '\t\t%d' % len(cvs)] + \
+               ['\t\t%s' % ' '.join([format_number(value) for value in cv])
+                for cv in cvs] + ['\t\t;']
+
+    if 'rows' in node.data:
+        #the surface is ruled between its rows, the curves it was lofted from
+        rows = node.data['rows']
+        row_degree, row_knots = 1, get_knots(len(rows), 1)
+        degree, knots = node.data['degree'], node.data['knots']
+        if node.data.get('swap_uv'):
+            degrees = (row_degree, degree)
+            knot_lists = [row_knots, knots]
+            cvs = [cv for row in rows for cv in row]
+        else:
+            degrees = (degree, row_degree)
+            knot_lists = [knots, row_knots]
+            cvs = [row[index] for index in range(len(rows[0])) for row in rows]
+        return ['\tsetAttr ".cached" -type "nurbsSurface"',
+                '\t\t%d %d 0 0 no' % degrees] + \
+               ['\t\t%d %s' % (len(knot_list), ' '.join([format_number(knot)
+                                                         for knot in knot_list]))
+                for knot_list in knot_lists] + \
+               ['\t\t', '\t\t%d' % len(cvs)] + \
+               ['\t\t%s' % ' '.join([format_number(value) for value in cv])
+                for cv in cvs] + ['\t\t;']
+
+    if 'keys' in node.data:
+        times = sorted(node.data['keys'])
+        return ['\tsetAttr -s %d ".keyTimeValue[0:%d]" %s;' % (
+            len(times), len(times) - 1,
+            ' '.join(['%s %s' % (format_number(time),
+                                 format_number(node.data['keys'][time]))
+                      for time in times]))]
+    return []
+
+def get_connections(scene, nodes):
+    """
+    gets the connections of the written nodes and the ones maya makes on its own
+
+    :param scene: the scene
+    :type: Scene
+
+    :param nodes: the nodes that are written
+    :type: list
+
+    :return: [(source plug, destination plug)]
+    :type: list
+    """
+    written = set([node.uuid for node in nodes])
+    connections = []
+    for node in nodes:
+        for attr in sorted(node.inputs):
+            source, source_attr = node.inputs[attr]
+            if source.uuid in written:
+                connections.append((get_plug(scene, source, source_attr),
+                                    get_plug(scene, node, attr)))
+    for source, source_attr, node, attr in get_implicit_connections(scene, nodes):
+        if attr not in node.inputs:
+            connections.append((get_plug(scene, source, source_attr),
+                                get_plug(scene, node, attr)))
+    return connections
+
+def get_implicit_connections(scene, nodes):
+    """
+    gets the connections maya makes on its own that the scene doesnt keep
+
+    :param scene: the scene
+    :type: Scene
+
+    :param nodes: the nodes that are written
+    :type: list
+
+    :return: [(source, source attr, destination, destination attr)], the solvers are
+             their names
+    :type: list
+    """
+    connections = []
+    for node in nodes:
+        if node.type == 'joint' and node.parent is not None and \
+                node.parent.type == 'joint':
+            connections.append((node.parent, 'scale', node, 'inverseScale'))
+
+        elif node.type == 'ikHandle':
+            connections.append((node.data.get('solver', 'ikRPsolver'), 'message', node,
+                                'ikSolver'))
+
+        elif node.type == 'ikEffector':
+            end_joint = node.data.get('end_joint')
+            if end_joint is not None and end_joint.uuid in scene.nodes:
+                for axis in 'XYZ':
+                    connections.append((end_joint, 'translate' + axis, node,
+                                        'translate' + axis))
+
+        elif node.type in CONSTRAINT_TARGET_ATTRS:
+            for attr in sorted(node.inputs):
+                if not attr.endswith('.targetParentMatrix'):
+                    continue
+                target = node.inputs[attr][0]
+                target_plug = attr.split('.')[0] + '.'
+                for target_attr, constraint_attr in CONSTRAINT_TARGET_ATTRS[node.type]:
+                    if target_attr not in JOINT_ONLY_ATTRS or target.type == 'joint':
+                        connections.append((target, target_attr, node,
+                                            target_plug + constraint_attr))
+
+            if node.type == 'poleVectorConstraint':
+                #the pole vector is worked out from the start joint of the handle
+                handle = node.parent
+                start_joint = handle.inputs['startJoint'][0]
+                connections.extend([
+                    (handle, 'parentInverseMatrix[0]', node,
+                     'constraintParentInverseMatrix'),
+                    (start_joint, 'parentMatrix[0]', node, 'pivotSpace'),
+                    (start_joint, 'translate', node, 'constraintRotatePivot')])
+                continue
+            driven = node.inputs.get('constraintParentInverseMatrix')
+            if driven is None:
+                continue
+            for attr, constraint_attr in CONSTRAINT_NODE_ATTRS[node.type]:
+                if attr not in JOINT_ONLY_ATTRS or driven[0].type == 'joint':
+                    connections.append((driven[0], attr, node, constraint_attr))
+    return connections
+
+def get_plug(scene, node, attr):
+    """
+    gets the name of a plug in the file
+
+    :param scene: the scene
+    :type: Scene
+
+    :param node: the node, or the name of a node that isnt in the scene
+    :type: SceneNode
+
+    :param attr: long attribute name
+    :type: str
+
+    :return: 'node.attr', dag nodes by their full path
+    :type: str
+    """
+    if isinstance(node, STRING_TYPES):
+        return '%s.%s' % (node, attr)
+    return '%s.%s' % (scene.get_path(node), attr)
+
+def get_replay_lines(scene):
+    """
+    gets the commands that make the replayed nodes, after everything they need is made
+
+    :param scene: the scene
+    :type: Scene
+
+    :return: the lines
+    :type: list
+    """
+    lines = []
+    for node in scene.nodes.values():
+        if node.type != 'skinCluster':
+            continue
+        influences = sorted([(int(attr[7:-1]), source) for attr, (source, source_attr)
+                             in node.inputs.items() if attr.startswith('matrix[')])
+        geometry = [destination.parent if destination.is_shape else destination
+                    for destination, attr in node.outputs.get('outputGeometry[0]', [])]
+        if not influences or not geometry:
+            continue
+        lines.append('skinCluster -tsb -bm %d -mi %d -n "%s" %s;' % (
+            node.attrs.get('bindMethod', 0), node.attrs.get('maxInfluences', 5),
+            node.name, ' '.join(['"%s"' % scene.get_path(item) for item in
+                                 [source for index, source in influences] +
+                                 geometry[:1]])))
+    return lines
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- CLASSES --#
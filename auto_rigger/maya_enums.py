@@ -46,6 +46,12 @@ class MayaCommandEnums(object):
     SCALE_Z = 'sz'
     SCALE = ['sx', 'sy', 'sz']
     COLORS = {"blue": 6, "red": 13, "green": 14, "yellow": 17}
+    #what the cmds calls can run on, see cmds_backend
+    CMDS_BACKENDS = ['maya', 'scene']
+    CMDS_BACKEND_VARIABLE = 'AUTO_RIGGER_BACKEND'
+    #the build log every build adds a line to, off turns it off, see build_telemetry
+    TELEMETRY_LOG_VARIABLE = 'AUTO_RIGGER_TELEMETRY'
+    TELEMETRY_LOG = '~/.auto_rigger/build_log.jsonl'
 
 # used for naming objects in outliner
 class NamingConventionEnums(object):
@@ -99,6 +105,31 @@ class NamingConventionEnums(object):
     STEP_ONE_ATTR = 'step_1'
     STEP_TWO_ATTR = 'step_2'
     STEP_THREE_ATTR = 'step_3'
+    #attrs on the master node that remember which modules step three has built
+    BUILT_MODULES_ATTR = 'built_modules'
+    JOINT_MODULES_ATTR = 'joint_modules'
+    #the nodes each module was built from and made, saved by uuid, and the hidden group
+    # with a copy of each module's unbuilt joints and controls so it can be built again
+    MODULE_NODES_ATTR = 'module_nodes'
+    STASH_GROUP = 'stash_GRP'
+    STASHED_NAMES_ATTR = 'stashed_names'
+    STASHED_PARENTS_ATTR = 'stashed_parents'
+    #attrs that save what the steps were built from so a re-run only redoes the steps
+    # and modules whose inputs changed. a hash of each step's inputs, a hash of each
+    # module's guides and of what built each module, which joint each control was made
+    # for and the guide positions
+    STEP_ONE_HASH_ATTR = 'step_1_hash'
+    STEP_TWO_HASH_ATTR = 'step_2_hash'
+    GUIDE_HASHES_ATTR = 'guide_hashes'
+    MODULE_HASHES_ATTR = 'module_hashes'
+    CONTROL_JOINTS_ATTR = 'control_joints'
+    GUIDES_ATTR = 'guides'
+    #decimal places the guide positions are hashed at, so float noise isnt a change
+    GUIDE_PRECISION = 3
+    #the utility nodes step three makes, a teardown deletes the ones wired to the rig
+    RIG_UTILITY_TYPES = ['blendColors', 'closestPointOnSurface', 'decomposeMatrix',
+                         'multMatrix', 'multiplyDivide', 'pairBlend', 'plusMinusAverage',
+                         'reverse', 'wtAddMatrix']
 
     #which type of control everything gets
     IK_OBJS = ['wrist', 'ankle']
@@ -131,6 +162,26 @@ class NamingConventionEnums(object):
                              'fingerSpread', 'thumbCurl'],
                    'foot' : ['ballRoll', 'toeRoll', 'heelRoll', 'toePivot', 'heelPivot',
                              'bank']}
+    #attrs on the back control, sets of low mid and high for each direction
+    BACK_ATTRS = [['backLoCurl', 'backMidCurl', 'backHiCurl'],
+                  ['backLoSide', 'backMidSide', 'backHiSide'],
+                  ['backLoTwist', 'backMidTwist', 'backHiTwist'],
+                  ['revBackLoCurl', 'revBackMidCurl', 'revBackHiCurl'],
+                  ['revBackLoSide', 'revBackMidSide', 'revBackHiSide'],
+                  ['revBackLoTwist', 'revBackMidTwist', 'revBackHiTwist']]
+    #the counts the gui lets the user pick -> (min, max)
+    FINGER_RANGE = (0, 5)
+    TOE_RANGE = (0, 5)
+    VERTEBRAE_RANGE = (3, 7)
+    #the ways the spine can be built
+    SPINE_MODES = ['Ribbon', 'Lean']
+    #the ways the ik fk blend can be built
+    IK_FK_BLEND_MODES = ['Classic', 'Lean']
+    #the parts of the rig step three can build on their own, the sided ones get the side
+    # prefix and a joint belongs to the module of the first root joint above it
+    RIG_MODULES = ['arm', 'leg', 'head', 'spine']
+    SIDED_MODULES = ['arm', 'leg']
+    MODULE_ROOTS = {'clavicle': 'arm', 'hip': 'leg', 'neck': 'head'}
     #the joints that mark the start of the ik and the joint at the end
     IK_JOINTS = {'shoulder' : 'palm', 'hip' : 'ball'}
 
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+#SETMODE 777
+
+#----------------------------------------------------------------------------------------#
+#------------------------------------------------------------------------------ HEADER --#
+
+"""
+:author:
+    Nick Lormand & Blake Day
+
+:synopsis:
+    the side prefixes of one build and the names made from them
+
+:description:
+    a NamingContext is made once per character from its left and right prefixes and
+    passed through the steps, so nothing changes NamingConventionEnums while it builds.
+    it cant be changed once it is made, a character with other prefixes gets its own
+    context, so characters built one after the other or in the same process at once
+    dont pick up each other's prefixes. the names every build uses are made when the
+    context is, the rest are made the first time they are asked for and kept, all of
+    them interned so the build loops compare and hash the same string objects.
+
+        naming = NamingContext('Lf_', 'Rt_')
+        naming.get_side('Lf_elbow_FJNT')                -> 'Lf_'
+        naming.get_name('Lf_', 'digits', '_GRP')        -> 'Lf_digits_GRP'
+
+    steps two and three use get_rig_naming when they arent given a context, it reads
+    the prefixes step one saved on the rig
+
+:applications:
+    Maya or plain python
+
+:see_also:
+    maya_enums
+    step_one
+    step_two
+    step_three
+"""
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- IMPORTS --#
+
+# Default Python Imports
+try:
+    from sys import intern
+except ImportError:
+    pass
+
+# Imports That You Wrote
+from auto_rigger.cmds_backend import cmds
+from maya_enums import NamingConventionEnums
+
+#----------------------------------------------------------------------------------------#
+#--------------------------------------------------------------------------- FUNCTIONS --#
+
+def get_rig_naming():
+    """
+    makes the context of the rig in the scene from the prefixes step one saved on the
+    main cc, or the master node once the main cc is gone
+
+    :return: the rig's context, the default prefixes if there is no rig
+    :type: NamingContext
+    """
+    for node in ['fake_rig' + NamingConventionEnums.CONTROL_CURVE_SUFFIX,
+                 NamingConventionEnums.RIG_HIERARCHY[0]]:
+        if cmds.objExists(node) and cmds.attributeQuery('left_prefix', node=node,
+                                                        exists=True):
+            return NamingContext(cmds.getAttr(node + '.left_prefix'),
+                                 cmds.getAttr(node + '.right_prefix'))
+    return DEFAULT_NAMING
+
+def intern_name(name):
+    """
+    interns a name so every copy of it is the same string
+
+    :param name: the name
+    :type: str
+
+    :return: the interned name
+    :type: str
+    """
+    return intern(str(name))
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- CLASSES --#
+
+class NamingContext(object):
+    """
+    the side prefixes of one build and the names made from them, it cant be changed
+    """
+    __slots__ = ['left', 'right', 'sides', 'modules', 'main_cc', 'joints_group',
+                 'connectors_group', 'controls_group', '_names']
+
+    def __init__(self, left=NamingConventionEnums.LEFT,
+                 right=NamingConventionEnums.RIGHT):
+        """
+        :param left: prefix for the left side
+        :type: str
+
+        :param right: prefix for the right side
+        :type: str
+        """
+        if not left or not right or left == right:
+            raise ValueError('the side prefixes have to be two different non empty '
+                             'strings, not %r and %r' % (left, right))
+        init = object.__setattr__
+        init(self, '_names', {})
+        init(self, 'left', intern_name(left))
+        init(self, 'right', intern_name(right))
+        init(self, 'sides', (self.left, self.right))
+
+        #the modules step three builds, the sided ones for each side
+        modules = []
+        for part in NamingConventionEnums.RIG_MODULES:
+            if part in NamingConventionEnums.SIDED_MODULES:
+                modules.extend([self.get_name(side, part) for side in self.sides])
+            else:
+                modules.append(self.get_name(part))
+        init(self, 'modules', tuple(modules))
+
+        #the groups every build makes
+        init(self, 'main_cc', self.get_name('fake_rig',
+                                            NamingConventionEnums.CONTROL_CURVE_SUFFIX))
+        init(self, 'joints_group', self.get_name('joints',
+                                                 NamingConventionEnums.GROUP_SUFFIX))
+        init(self, 'connectors_group', self.get_name('connectors',
+                                                     NamingConventionEnums.GROUP_SUFFIX))
+        init(self, 'controls_group', self.get_name('controls',
+                                                   NamingConventionEnums.GROUP_SUFFIX))
+        #the hand groups of each side
+        for side in self.sides:
+            self.get_name(side, 'digits', NamingConventionEnums.GROUP_SUFFIX)
+            self.get_name(side, 'palm', NamingConventionEnums.CONTROL_CURVE_SUFFIX,
+                          NamingConventionEnums.GROUP_SUFFIX)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('a NamingContext cant be changed, make a new one')
+
+    def __delattr__(self, name):
+        raise AttributeError('a NamingContext cant be changed, make a new one')
+
+    def __eq__(self, other):
+        return isinstance(other, NamingContext) and self.sides == other.sides
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.sides)
+
+    def __repr__(self):
+        return 'NamingContext(%r, %r)' % self.sides
+
+    def get_name(self, *parts):
+        """
+        joins the parts into a name, each name is only made once
+
+        :param parts: the pieces of the name in order
+        :type: str
+
+        :return: the interned name
+        :type: str
+        """
+        name = self._names.get(parts)
+        if name is None:
+            name = self._names[parts] = intern_name(''.join(parts))
+        return name
+
+    def get_side(self, name):
+        """
+        gets the side prefix a name starts with
+
+        :param name: a node name
+        :type: str
+
+        :return: the left or right prefix, empty for the middle
+        :type: str
+        """
+        if name.startswith(self.right):
+            return self.right
+        if name.startswith(self.left):
+            return self.left
+        return ''
+
+#the context of the default prefixes in maya_enums
+DEFAULT_NAMING = NamingContext()
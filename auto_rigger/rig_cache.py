@@ -0,0 +1,368 @@
+#!/usr/bin/env python
+#SETMODE 777
+
+#----------------------------------------------------------------------------------------#
+#------------------------------------------------------------------------------ HEADER --#
+
+"""
+:author:
+    Nick Lormand & Blake Day
+
+:synopsis:
+    keeps finished rigs by variant so maya only builds each variant once
+
+:description:
+    a variant is everything a rig is built from besides the guides, the template, the
+    counts, the prefixes, the colors, the control styles and the spine and blend modes,
+    and the steps' code. moving guides only changes attribute values, the nodes and
+    connections are the same, so a character whose variant is in the cache doesnt have
+    to be built in maya. the cached scene is opened and posed to the new guides.
+
+    the values come from building the character in the in memory scene, which takes a
+    fraction of what the build takes in maya. the same build of the cached rig is kept
+    next to its scene, the two are compared and only the values that changed are set in
+    maya, the transforms, the control cvs, the constraint offsets, the utility values
+    and the attributes the steps save. anything that is driven by a connection is left
+    for maya to work out.
+
+        report = rig_cache.build_character(spec, 'rig_cache')
+
+    a skinned surface, like the ribbon spine's, is unbound while its cvs are posed and
+    bound again to the same joints once they are posed too, the same way the build binds
+    it. the cache only saves time in maya, in the in memory scene the build already is
+    the values so it just builds
+
+:applications:
+    Maya standalone or plain python
+
+:see_also:
+    batch_rig
+    incremental_build
+    ma_writer
+"""
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- IMPORTS --#
+
+# Default Python Imports
+import os
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+import time
+
+# Imports That You Wrote
+import auto_rigger.cmds_backend as cmds_backend
+from auto_rigger.cmds_backend import cmds
+import auto_rigger.gen_utils as gu
+import auto_rigger.incremental_build as incremental_build
+import auto_rigger.ma_writer as ma_writer
+import auto_rigger.scene_cmds as scene_cmds
+from auto_rigger.scene_cmds import SceneCmds, STRING_TYPES
+import auto_rigger.step_one as step_one
+import auto_rigger.step_two as step_two
+import auto_rigger.step_three as step_three
+import auto_rigger.variant_sweep as variant_sweep
+
+#the modules whose code builds the rig or works out its values, a change to them is a
+#new variant
+BUILD_MODULES = [gu, step_one, step_two, step_three, scene_cmds]
+
+#----------------------------------------------------------------------------------------#
+#--------------------------------------------------------------------------- FUNCTIONS --#
+
+def build_character(spec, cache_dir, times=None, undo=False):
+    """
+    builds a character in maya from the cache when its variant is there, otherwise
+    builds it and adds it to the cache
+
+    :param spec: a full spec, like batch_rig.load_specs gives
+    :type: dict
+
+    :param cache_dir: the folder the cached rigs are kept in
+    :type: str
+
+    :param times: gets the seconds each part took -> {part: seconds}
+    :type: dict
+
+    :param undo: False turns undo off while steps two and three build
+    :type: bool
+
+    :return: the report from incremental_build.rebuild, with 'cached' if the rig came
+             from the cache and 'reposed' the number of values that were set
+    :type: dict
+    """
+    if times is None:
+        times = {}
+    if cmds_backend.get_backend_name() != 'maya':
+        report = incremental_build.rebuild(spec, times, undo)
+        report.update({'cached': False, 'reposed': 0})
+        return report
+
+    start = time.time()
+    values, report = build_values(spec)
+    times['values'] = time.time() - start
+    scene_path, values_path = get_cache_paths(cache_dir, get_variant_key(spec))
+
+    if os.path.isfile(scene_path) and os.path.isfile(values_path):
+        start = time.time()
+        cached = load_values(values_path)
+        if get_fingerprint(cached) == get_fingerprint(values):
+            cmds.file(scene_path, open=True, force=True)
+            reposed = repose(cached, values)
+            if reposed is not None:
+                times['repose'] = time.time() - start
+                report.update({'cached': True, 'reposed': reposed})
+                return report
+            cmds.file(new=True, force=True)
+
+    report = incremental_build.rebuild(spec, times, undo)
+    report.update({'cached': False, 'reposed': 0})
+    save_to_cache(scene_path, values_path, values)
+    return report
+
+def get_variant_key(spec):
+    """
+    hashes everything a character is built from besides its guides
+
+    :param spec: a full spec, like batch_rig.load_specs gives
+    :type: dict
+
+    :return: sha1 hex digest
+    :type: str
+    """
+    step_one_args, step_two_args = incremental_build.get_step_args(spec)
+    step_one_hash = gu.get_input_hash(step_one.get_inputs(*step_one_args))
+    code = [gu.get_file_hash(os.path.splitext(module.__file__)[0] + '.py')
+            for module in BUILD_MODULES]
+    return gu.get_input_hash({'step_two': step_two.get_inputs(step_one_hash,
+                                                              *step_two_args),
+                              'spine_mode': spec['spine_mode'],
+                              'blend_mode': spec['blend_mode'], 'code': code})
+
+def get_cache_paths(cache_dir, key):
+    """
+    gets where a variant is kept in the cache
+
+    :param cache_dir: the cache folder
+    :type: str
+
+    :param key: the variant's key from get_variant_key
+    :type: str
+
+    :return: (the maya scene, the in memory scene of the same build)
+    :type: tuple
+    """
+    return (os.path.join(cache_dir, key + '.ma'),
+            os.path.join(cache_dir, key + '.scene'))
+
+def build_values(spec):
+    """
+    builds a character in a new in memory scene
+
+    :param spec: a full spec, like batch_rig.load_specs gives
+    :type: dict
+
+    :return: (the scene, the report from incremental_build.rebuild)
+    :type: tuple
+    """
+    with cmds_backend.using_backend('scene') as scene_cmds:
+        report = incremental_build.rebuild(spec, undo=False)
+    return scene_cmds.scene, report
+
+def get_fingerprint(scene):
+    """
+    hashes the nodes and connections of an in memory scene
+
+    :param scene: the scene
+    :type: Scene
+
+    :return: the fingerprint from variant_sweep.get_fingerprint
+    :type: str
+    """
+    scene_cmds = SceneCmds()
+    scene_cmds.scene = scene
+    with cmds_backend.using_backend(scene_cmds):
+        return variant_sweep.get_fingerprint()
+
+def save_to_cache(scene_path, values_path, values):
+    """
+    saves the scene maya built and the in memory build of the same character, each is
+    written next to where it goes then moved there so other workers never read half a
+    file
+
+    :param scene_path: where the maya scene goes
+    :type: str
+
+    :param values_path: where the in memory scene goes
+    :type: str
+
+    :param values: the in memory scene
+    :type: Scene
+    """
+    cache_dir = os.path.dirname(scene_path)
+    if not os.path.isdir(cache_dir):
+        try:
+            os.makedirs(cache_dir)
+        except OSError:
+            #another worker made it first
+            pass
+    temp_suffix = '.%d.tmp' % os.getpid()
+
+    scene_name = cmds.file(query=True, sceneName=True)
+    cmds.file(rename=scene_path + temp_suffix + '.ma')
+    cmds.file(save=True, type='mayaAscii', force=True)
+    if scene_name:
+        cmds.file(rename=scene_name)
+    os.rename(scene_path + temp_suffix + '.ma', scene_path)
+
+    with open(values_path + temp_suffix, 'wb') as values_file:
+        pickle.dump(values, values_file, 2)
+    os.rename(values_path + temp_suffix, values_path)
+
+def load_values(values_path):
+    """
+    loads the in memory scene save_to_cache saved
+
+    :param values_path: the file
+    :type: str
+
+    :return: the scene
+    :type: Scene
+    """
+    with open(values_path, 'rb') as values_file:
+        return pickle.load(values_file)
+
+def repose(cached, values):
+    """
+    sets the values that changed between two builds of the same variant on the scene of
+    the first one
+
+    :param cached: the in memory build of the rig in the scene
+    :type: Scene
+
+    :param values: the in memory build of the character it is posed to
+    :type: Scene
+
+    :return: the number of values that were set, None if the rig cant be posed
+    :type: int
+    """
+    changes = get_changes(cached, values)
+    if changes is None:
+        return None
+
+    #unbind the skinned surfaces that move so their cvs can be set
+    surfaces = set([plug.split('.cv[')[0] for plug, value, locked in changes
+                    if '.cv[' in plug])
+    skins = [skin for skin in get_skins(values) if skin[1][-1] in surfaces]
+    for skin, nodes, bind_method, max_influences in skins:
+        cmds.skinCluster(skin, edit=True, unbind=True)
+
+    for plug, value, locked in changes:
+        if locked:
+            cmds.setAttr(plug, lock=False)
+        if '.cv[' in plug:
+            cmds.xform(plug, objectSpace=True, translation=value)
+        elif isinstance(value, STRING_TYPES):
+            cmds.setAttr(plug, value, type='string')
+        elif isinstance(value, list):
+            cmds.setAttr(plug, *value, type={16: 'matrix', 3: 'double3',
+                                             2: 'double2'}[len(value)])
+        else:
+            cmds.setAttr(plug, value)
+        if locked:
+            cmds.setAttr(plug, lock=True)
+
+    #bind them again now the joints are where they go
+    for skin, nodes, bind_method, max_influences in skins:
+        cmds.skinCluster(nodes, toSelectedBones=True, bindMethod=bind_method,
+                         maximumInfluences=max_influences, name=skin.split('|')[-1])
+    return len(changes)
+
+def get_changes(cached, values):
+    """
+    finds the values that are different between two builds of the same variant
+
+    :param cached: the build the scene has
+    :type: Scene
+
+    :param values: the build it is posed to
+    :type: Scene
+
+    :return: [(plug, value, if it is locked)], cvs are plugs like 'shape.cv[3]' and
+             surface cvs like 'shape.cv[3][1]', None if the keys of an anim curve or
+             how many cvs a surface has changed
+    :type: list
+    """
+    driven = get_driven_plugs(values)
+    changes = []
+    for node in values.nodes.values():
+        path = values.get_path(node)
+        cached_node = cached.find_node(path)
+        if 'keys' in node.data and node.data['keys'] != cached_node.data.get('keys'):
+            return None
+        if 'rows' in node.data:
+            rows = node.data['rows']
+            cached_rows = cached_node.data.get('rows') or []
+            if [len(row) for row in rows] != [len(row) for row in cached_rows]:
+                return None
+            #u runs down the rows when the uvs are swapped, the same as ma_writer
+            for row_index, row in enumerate(rows):
+                for index, cv in enumerate(row):
+                    if cv != cached_rows[row_index][index]:
+                        u, v = (row_index, index) if node.data['swap_uv'] else \
+                            (index, row_index)
+                        changes.append(('%s.cv[%d][%d]' % (path, u, v), cv, False))
+        if 'cvs' in node.data:
+            for index, cv in enumerate(node.data['cvs']):
+                if cv != cached_node.data['cvs'][index]:
+                    changes.append(('%s.cv[%d]' % (path, index), cv, False))
+        for attr in sorted(node.attrs):
+            value = node.attrs[attr]
+            if value == cached_node.attrs.get(attr) or (path, attr) in driven or \
+                    values.is_connected(node, attr) or value is None:
+                continue
+            changes.append(('%s.%s' % (path, attr), value, values.is_locked(node, attr)))
+    return changes
+
+def get_skins(scene):
+    """
+    gets how each skinCluster in a scene was bound
+
+    :param scene: the scene
+    :type: Scene
+
+    :return: [(skinCluster, [joints and the geometry], bindMethod, maxInfluences)]
+    :type: list
+    """
+    skins = []
+    for node in scene.nodes.values():
+        if node.type != 'skinCluster':
+            continue
+        influences = sorted([(int(attr[7:-1]), scene.get_path(source))
+                             for attr, (source, source_attr) in node.inputs.items()
+                             if attr.startswith('matrix[')])
+        shapes = [shape for shape, attr in node.outputs.get('outputGeometry[0]', [])]
+        skins.append((scene.get_path(node),
+                      [path for index, path in influences] +
+                      [scene.get_path(shape) for shape in shapes],
+                      node.attrs['bindMethod'], node.attrs['maxInfluences']))
+    return skins
+
+def get_driven_plugs(scene):
+    """
+    gets the plugs maya drives that the scene doesnt have connections for
+
+    :param scene: the scene
+    :type: Scene
+
+    :return: set of (node path, attribute)
+    :type: set
+    """
+    nodes = ma_writer.get_node_order(scene)
+    return set([(scene.get_path(node), attr) for source, source_attr, node, attr in
+                ma_writer.get_implicit_connections(scene, nodes)])
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- CLASSES --#
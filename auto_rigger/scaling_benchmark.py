@@ -0,0 +1,689 @@
+#!/usr/bin/env python
+#SETMODE 777
+
+#----------------------------------------------------------------------------------------#
+#------------------------------------------------------------------------------ HEADER --#
+
+"""
+:author:
+    Nick Lormand & Blake Day
+
+:synopsis:
+    times how each step of the build scales with the number of joints
+
+:description:
+    makes synthetic templates in the biped.xml format from the biped, with longer
+    spines, more and longer fingers and extra limbs on the spine, up to thousands of
+    joints. each template is built in its own in memory scene and template load, step
+    one, step two and step three are timed. the results show the seconds per stage for
+    each template and how each stage scales with the joints, as the exponent of a fit
+    of time against joint count, 1 is linear and 2 is quadratic.
+
+    the times are checked against the baselines saved in scaling_baselines.json, a stage
+    fails if it takes longer than its baseline times the tolerance or if its exponent
+    grows by more than the exponent tolerance. run it from the repo root with
+
+        python -m auto_rigger.scaling_benchmark
+        python -m auto_rigger.scaling_benchmark --update
+
+    --update saves the new times as the baselines. the times depend on the machine, so
+    before they are checked the baselines are scaled by how much slower or faster
+    many_digits builds than it did when they were saved. the biped builds too fast to
+    tell much, many_digits takes a few seconds. it is built again after every template
+    and the median of those builds is used, so a machine that speeds up or slows down
+    during the run doesnt throw the limits off. a run without many_digits only checks
+    the exponents, they dont depend on the machine
+
+:applications:
+    plain python
+
+:see_also:
+    spine_benchmark
+    scene_cmds
+    step_one
+"""
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- IMPORTS --#
+
+# Default Python Imports
+import copy
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as et
+
+# Imports That You Wrote
+import auto_rigger.cmds_backend as cmds_backend
+from auto_rigger.cmds_backend import cmds
+import auto_rigger.gen_utils as gu
+import auto_rigger.step_one as step_one
+import auto_rigger.step_two as step_two
+import auto_rigger.step_three as step_three
+from maya_enums import MayaCommandEnums
+
+#the stages of a build that are timed, in the order they run
+STAGES = ['load', 'step_one', 'step_two', 'step_three']
+#the synthetic templates, smallest first. vertebrae is the count the gui takes,
+# digit_joints is the joints in each finger before the tip, extra_digits is extra fingers
+# on each hand and limbs are extra chains of limb_joints joints on the spine
+TEMPLATES = [{'name': 'biped', 'vertebrae': 7, 'digit_joints': 3, 'extra_digits': 0,
+              'limbs': 0, 'limb_joints': 0},
+             {'name': 'long_spine', 'vertebrae': 40, 'digit_joints': 3,
+              'extra_digits': 0, 'limbs': 0, 'limb_joints': 0},
+             {'name': 'many_digits', 'vertebrae': 7, 'digit_joints': 8,
+              'extra_digits': 10, 'limbs': 0, 'limb_joints': 0},
+             {'name': 'multi_limb', 'vertebrae': 12, 'digit_joints': 3,
+              'extra_digits': 0, 'limbs': 8, 'limb_joints': 12},
+             {'name': 'creature_1000', 'vertebrae': 20, 'digit_joints': 4,
+              'extra_digits': 4, 'limbs': 40, 'limb_joints': 20},
+             {'name': 'creature_2000', 'vertebrae': 30, 'digit_joints': 4,
+              'extra_digits': 4, 'limbs': 80, 'limb_joints': 22}]
+#fingers that extra fingers are copied from, the letters keep their names apart
+EXTRA_DIGIT_SOURCES = ['index', 'middle', 'ring', 'pinky']
+EXTRA_DIGIT_LETTERS = 'BCDEGHJLMNOQRSTUVWXYZ'
+#where the baselines are saved
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              'scaling_baselines.json')
+#how much slower than its baseline a stage can be, and how much its exponent can grow
+TOLERANCE = 1.5
+EXPONENT_TOLERANCE = 0.3
+#stages faster than this are only noise, they arent checked against the time baselines
+MIN_CHECKED_TIME = 0.05
+#the template the times are scaled to, how long it takes is how fast the machine is
+CALIBRATION_TEMPLATE = 'many_digits'
+
+#----------------------------------------------------------------------------------------#
+#--------------------------------------------------------------------------- FUNCTIONS --#
+
+def run_suite(templates=None, update=False, baselines_path=BASELINES_PATH,
+              spine_mode='Ribbon'):
+    """
+    builds every template, prints how the stages scale and checks them against the
+    baselines
+
+    :param templates: template settings like TEMPLATES, defaults to TEMPLATES
+    :type: list
+
+    :param update: saves the results as the new baselines instead of checking them
+    :type: bool
+
+    :param baselines_path: the baselines json file
+    :type: str
+
+    :param spine_mode: which spine to build, one of NamingConventionEnums.SPINE_MODES
+    :type: str
+
+    :return: {'results': [result per template], 'exponents': {stage: exponent},
+              'calibration': median seconds of the calibration builds, 'failures':
+              [messages]}
+    :type: dict
+    """
+    if templates is None:
+        templates = TEMPLATES
+    temp_dir = tempfile.mkdtemp(prefix='auto_rigger_scaling_')
+    results = []
+    calibration_times = []
+    calibration_settings = [settings for settings in templates
+                            if settings['name'] == CALIBRATION_TEMPLATE]
+    try:
+        calibration_path = os.path.join(temp_dir, 'calibration.xml')
+        if calibration_settings:
+            write_template(make_template(**get_template_args(calibration_settings[0])),
+                           calibration_path)
+        for settings in templates:
+            path = os.path.join(temp_dir, settings['name'] + '.xml')
+            write_template(make_template(**get_template_args(settings)), path)
+            result = build_template(path, settings, spine_mode)
+            results.append(result)
+            print('%-16s %6d joints built in %.3f s' % (result['name'], result['joints'],
+                                                        sum(result['times'].values())))
+
+            #build the calibration template between the others to follow the machine
+            # through the whole run
+            if calibration_settings:
+                calibration_times.append(sum(build_template(
+                    calibration_path, calibration_settings[0],
+                    spine_mode)['times'].values()))
+    finally:
+        shutil.rmtree(temp_dir)
+    calibration = get_median(calibration_times)
+
+    exponents = get_exponents(results)
+    print_results(results, exponents)
+
+    failures = []
+    if update:
+        save_baselines(results, exponents, calibration, baselines_path)
+        print('saved the baselines to %s' % baselines_path)
+    elif os.path.exists(baselines_path):
+        failures = check_baselines(results, exponents, calibration,
+                                   load_baselines(baselines_path))
+        for failure in failures:
+            print('FAILED: %s' % failure)
+        print('%d stages regressed' % len(failures))
+    else:
+        print('there are no baselines at %s, run with --update to save them' %
+              baselines_path)
+    return {'results': results, 'exponents': exponents, 'calibration': calibration,
+            'failures': failures}
+
+def get_template_args(settings):
+    """
+    gets the make_template arguments out of a template's settings
+
+    :param settings: a template like the ones in TEMPLATES
+    :type: dict
+
+    :return: keyword arguments for make_template
+    :type: dict
+    """
+    return dict([(key, settings[key]) for key in
+                 ['vertebrae', 'digit_joints', 'extra_digits', 'limbs', 'limb_joints']])
+
+def make_template(vertebrae=7, digit_joints=3, extra_digits=0, limbs=0, limb_joints=0):
+    """
+    makes a template from the biped with a different spine, fingers and extra limbs
+
+    :param vertebrae: vertebrae count like the gui takes, the spine gets one less joint
+    :type: int
+
+    :param digit_joints: joints in each finger before the tip, up to 9 so the finger
+                         setup can still tell them apart
+    :type: int
+
+    :param extra_digits: extra fingers on each hand, copied from the other fingers
+    :type: int
+
+    :param limbs: extra limbs spread along the spine, every other one on the right
+    :type: int
+
+    :param limb_joints: joints in each extra limb before the tip
+    :type: int
+
+    :return: the xml root of the template
+    :type: Element
+    """
+    if not 3 <= vertebrae or not 1 <= digit_joints <= 9:
+        raise ValueError('a template needs at least 3 vertebrae and 1 to 9 digit joints')
+    root = copy.deepcopy(step_one.read_xml())
+    spine_elements = rebuild_spine(root[0], vertebrae)
+    for palm in [element for element in root.iter()
+                 if element.tag.endswith('palm__JOINT__')]:
+        rebuild_digits(palm, digit_joints, extra_digits)
+    for index in range(limbs):
+        side = '__LEFT__' if index % 2 == 0 else '__RIGHT__'
+        attach = spine_elements[(index // 2) % len(spine_elements)]
+        add_chain(attach, '%slimb%d' % (side, index + 1),
+                  get_position(attach), (1 if index % 2 == 0 else -1,
+                                         -0.2, 0.1 * ((index // 2) % 5 - 2)),
+                  limb_joints, 4.0)
+    return root
+
+def make_joint(tag, position, rotation=(0, 0, 0)):
+    """
+    makes a joint element the way biped.xml has them
+
+    :param tag: the joint's tag, like __LEFT__elbow__JOINT__
+    :type: str
+
+    :param position: translation of the joint
+    :type: list
+
+    :param rotation: rotation of the joint
+    :type: list
+
+    :return: the joint element, its children element is index 9
+    :type: Element
+    """
+    element = et.Element(tag)
+    channels = MayaCommandEnums.TRANSLATION + MayaCommandEnums.ROTATION + \
+        MayaCommandEnums.SCALE
+    values = list(position) + list(rotation) + [1.0, 1.0, 1.0]
+    for channel, value in zip(channels, values):
+        et.SubElement(element, channel, value=repr(float(value)))
+    et.SubElement(element, 'children')
+    return element
+
+def get_position(element):
+    """
+    gets the translation of a joint element
+
+    :param element: the joint element
+    :type: Element
+
+    :return: [tx, ty, tz]
+    :type: list
+    """
+    return [float(element[index].attrib['value']) for index in range(3)]
+
+def get_rotation(element):
+    """
+    gets the rotation of a joint element
+
+    :param element: the joint element
+    :type: Element
+
+    :return: [rx, ry, rz]
+    :type: list
+    """
+    return [float(element[index].attrib['value']) for index in range(3, 6)]
+
+def get_chain(element):
+    """
+    follows the first child of each joint to the end of the chain
+
+    :param element: the first joint of the chain
+    :type: Element
+
+    :return: the joints in the chain
+    :type: list
+    """
+    chain = [element]
+    while len(chain[-1][9]):
+        chain.append(chain[-1][9][0])
+    return chain
+
+def lerp(pos_a, pos_b, weight):
+    """
+    blends between two positions
+
+    :param pos_a: the position at weight 0
+    :type: list
+
+    :param pos_b: the position at weight 1
+    :type: list
+
+    :param weight: how far to go from a to b
+    :type: float
+
+    :return: the position
+    :type: list
+    """
+    return [a + (b - a) * weight for a, b in zip(pos_a, pos_b)]
+
+def rebuild_spine(pelvis, vertebrae):
+    """
+    swaps the biped's spine for one with vertebrae - 1 joints spread between the first
+    and last spine joints. the new joints dont have the vertebrae prefixes, so step one
+    builds all of them
+
+    :param pelvis: the pelvis element
+    :type: Element
+
+    :param vertebrae: vertebrae count like the gui takes
+    :type: int
+
+    :return: the new spine elements, bottom to top
+    :type: list
+    """
+    old_spine = [element for element in get_chain(pelvis[9][0])
+                 if 'spine' in element.tag]
+    bottom, top = get_position(old_spine[0]), get_position(old_spine[-1])
+    num_joints = vertebrae - 1
+    spine_elements = []
+    for index in range(num_joints):
+        element = make_joint('spine_%d__JOINT__' % (index + 1),
+                             lerp(bottom, top, index / float(max(num_joints - 1, 1))),
+                             get_rotation(old_spine[0]))
+        if spine_elements:
+            spine_elements[-1][9].append(element)
+        spine_elements.append(element)
+    #the top of the new spine gets the neck and the arms
+    spine_elements[-1][9].extend(list(old_spine[-1][9]))
+    pelvis[9].remove(old_spine[0])
+    pelvis[9].insert(0, spine_elements[0])
+    return spine_elements
+
+def rebuild_digits(palm, digit_joints, extra_digits):
+    """
+    gives every finger on the hand digit_joints joints and adds extra fingers
+
+    :param palm: the palm element
+    :type: Element
+
+    :param digit_joints: joints in each finger before the tip
+    :type: int
+
+    :param extra_digits: extra fingers to add
+    :type: int
+    """
+    fingers = {}
+    for finger in list(palm[9]):
+        chain = get_chain(finger)
+        #the tag without the joint number, like __SECOND_FINGER____LEFT__index
+        base = chain[0].tag.replace('_1__JOINT__', '')
+        fingers[base.split('__')[-1]] = (base, chain)
+        palm[9].remove(finger)
+        add_chain(palm, base, get_position(chain[0]),
+                  get_direction(chain), digit_joints, get_length(chain) / digit_joints,
+                  get_rotation(chain[0]))
+
+    side = '__LEFT__' if '__LEFT__' in palm.tag else '__RIGHT__'
+    sources = [name for name in EXTRA_DIGIT_SOURCES if name in fingers]
+    for index in range(extra_digits):
+        name = sources[index % len(sources)]
+        chain = fingers[name][1]
+        letter = EXTRA_DIGIT_LETTERS[index // len(sources)]
+        #fan the copies out a little behind the finger they came from
+        offset = 0.6 * (index // len(sources) + 1)
+        start = [value + offset for value in get_position(chain[0])]
+        add_chain(palm, side + name + letter, start, get_direction(chain), digit_joints,
+                  get_length(chain) / digit_joints, get_rotation(chain[0]))
+
+def get_direction(chain):
+    """
+    gets the direction from the start of a chain to its end
+
+    :param chain: joint elements from get_chain
+    :type: list
+
+    :return: unit vector
+    :type: list
+    """
+    return gu.normalize_vector([b - a for a, b in zip(get_position(chain[0]),
+                                                      get_position(chain[-1]))])
+
+def get_length(chain):
+    """
+    gets the distance from the start of a chain to its end
+
+    :param chain: joint elements from get_chain
+    :type: list
+
+    :return: the length
+    :type: float
+    """
+    return step_three.get_distance(get_position(chain[0]), get_position(chain[-1]))
+
+def add_chain(parent, base, start, direction, num_joints, spacing, rotation=(0, 0, 0)):
+    """
+    adds a chain of joints named base_1, base_2... and base_Tip under a joint element
+
+    :param parent: the joint element to add the chain to
+    :type: Element
+
+    :param base: the start of the tags, like __LEFT__limb1
+    :type: str
+
+    :param start: position of the first joint
+    :type: list
+
+    :param direction: direction the chain goes in
+    :type: list
+
+    :param num_joints: joints before the tip
+    :type: int
+
+    :param spacing: distance between the joints
+    :type: float
+
+    :param rotation: rotation for every joint
+    :type: list
+    """
+    direction = gu.normalize_vector(direction)
+    names = ['%d' % (index + 1) for index in range(num_joints)] + ['Tip']
+    for index, name in enumerate(names):
+        position = [value + axis * spacing * index
+                    for value, axis in zip(start, direction)]
+        element = make_joint('%s_%s__JOINT__' % (base, name), position, rotation)
+        parent[9].append(element)
+        parent = element
+
+def write_template(root, path):
+    """
+    saves a template as xml
+
+    :param root: the xml root
+    :type: Element
+
+    :param path: where to save it
+    :type: str
+    """
+    et.ElementTree(root).write(path)
+
+def count_joints(root):
+    """
+    counts the joints in a template
+
+    :param root: the xml root
+    :type: Element
+
+    :return: number of joints
+    :type: int
+    """
+    return len([element for element in root.iter()
+                if element.tag.endswith('__JOINT__')])
+
+def build_template(path, settings, spine_mode='Ribbon'):
+    """
+    builds a template through all of the steps in a new in memory scene and times each
+    stage
+
+    :param path: the template's xml file
+    :type: str
+
+    :param settings: the template's settings from TEMPLATES
+    :type: dict
+
+    :param spine_mode: which spine to build, one of NamingConventionEnums.SPINE_MODES
+    :type: str
+
+    :return: {'name', 'joints', 'nodes', 'times': {stage: seconds}}
+    :type: dict
+    """
+    vertebrae = settings['vertebrae']
+    times = {}
+    with cmds_backend.using_backend('scene'):
+        start = time.time()
+        root = step_one.read_xml(path)
+        times['load'] = time.time() - start
+
+        start = time.time()
+        step_one.Skeleton(root, 5, 5, vertebrae).joint_structure.group()
+        times['step_one'] = time.time() - start
+
+        start = time.time()
+        cc_list = step_two.run_step(gu.get_joint_list(), 'Blue', 'Red', 'Yellow',
+                                    'Circle', '4-Point Star', vertebrae, False)
+        times['step_two'] = time.time() - start
+
+        start = time.time()
+        gu.create_hierarchy()
+        step_three.run_step(cc_list, vertebrae, spine_mode, undo=False)
+        times['step_three'] = time.time() - start
+
+        nodes = len(cmds.ls())
+    return {'name': settings['name'], 'joints': count_joints(root), 'nodes': nodes,
+            'times': times}
+
+def get_median(values):
+    """
+    gets the middle value, one slow or fast build doesnt move it
+
+    :param values: the numbers
+    :type: list
+
+    :return: the median, None if there arent any values
+    :type: float
+    """
+    if not values:
+        return None
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2.0
+
+def get_exponents(results):
+    """
+    fits time = a * joints ^ exponent to each stage with least squares on the logs
+
+    :param results: results from build_template
+    :type: list
+
+    :return: {stage: exponent}, None for a stage that cant be fit
+    :type: dict
+    """
+    exponents = {}
+    for stage in STAGES:
+        points = [(math.log(result['joints']), math.log(result['times'][stage]))
+                  for result in results if result['times'][stage] > 0]
+        if len(points) < 2:
+            exponents[stage] = None
+            continue
+        mean_x = sum([x for x, y in points]) / len(points)
+        mean_y = sum([y for x, y in points]) / len(points)
+        spread = sum([(x - mean_x) ** 2 for x, y in points])
+        if not spread:
+            exponents[stage] = None
+            continue
+        exponents[stage] = sum([(x - mean_x) * (y - mean_y)
+                                for x, y in points]) / spread
+    return exponents
+
+def print_results(results, exponents):
+    """
+    prints the seconds per stage for each template and each stage's exponent
+
+    :param results: results from build_template
+    :type: list
+
+    :param exponents: exponents from get_exponents
+    :type: dict
+    """
+    print('%-16s %7s %8s' % ('template', 'joints', 'nodes') +
+          ''.join(['%12s' % stage for stage in STAGES]))
+    for result in results:
+        print('%-16s %7d %8d' % (result['name'], result['joints'], result['nodes']) +
+              ''.join(['%12.3f' % result['times'][stage] for stage in STAGES]))
+    print('%-33s' % 'exponent' +
+          ''.join(['%12s' % ('-' if exponents[stage] is None else
+                             '%.2f' % exponents[stage]) for stage in STAGES]))
+
+def save_baselines(results, exponents, calibration=None, path=BASELINES_PATH):
+    """
+    saves the results as the baselines
+
+    :param results: results from build_template
+    :type: list
+
+    :param exponents: exponents from get_exponents
+    :type: dict
+
+    :param calibration: the median seconds of the calibration builds
+    :type: float
+
+    :param path: the baselines json file
+    :type: str
+    """
+    baselines = {'templates': {}, 'exponents': {}}
+    if calibration is not None:
+        baselines['calibration'] = round(calibration, 4)
+    for result in results:
+        baselines['templates'][result['name']] = dict(
+            [(stage, round(seconds, 4)) for stage, seconds in result['times'].items()])
+    for stage in exponents:
+        if exponents[stage] is not None:
+            baselines['exponents'][stage] = round(exponents[stage], 3)
+    with open(path, 'w') as baselines_file:
+        json.dump(baselines, baselines_file, indent=2, sort_keys=True,
+                  separators=(',', ': '))
+        baselines_file.write('\n')
+
+def load_baselines(path=BASELINES_PATH):
+    """
+    loads the baselines
+
+    :param path: the baselines json file
+    :type: str
+
+    :return: {'templates': {name: {stage: seconds}}, 'exponents': {stage: exponent},
+              'calibration': seconds}
+    :type: dict
+    """
+    with open(path) as baselines_file:
+        return json.load(baselines_file)
+
+def get_speed(calibration, baselines):
+    """
+    gets how much slower this machine is than the one the baselines were saved on from
+    how long the calibration template took on each
+
+    :param calibration: the median seconds of the calibration builds
+    :type: float
+
+    :param baselines: baselines from load_baselines
+    :type: dict
+
+    :return: this run's time over the baseline's, None if either doesnt have the
+             calibration time
+    :type: float
+    """
+    if calibration is None or not baselines.get('calibration'):
+        return None
+    return calibration / baselines['calibration']
+
+def check_baselines(results, exponents, calibration, baselines, tolerance=TOLERANCE,
+                    exponent_tolerance=EXPONENT_TOLERANCE):
+    """
+    finds the stages that got slower than their baselines
+
+    :param results: results from build_template
+    :type: list
+
+    :param exponents: exponents from get_exponents
+    :type: dict
+
+    :param calibration: the median seconds of the calibration builds
+    :type: float
+
+    :param baselines: baselines from load_baselines
+    :type: dict
+
+    :param tolerance: how many times slower than its baseline a stage can be
+    :type: float
+
+    :param exponent_tolerance: how much a stage's exponent can grow
+    :type: float
+
+    :return: a message for each regression
+    :type: list
+    """
+    failures = []
+    #the baseline times are scaled to this machine, without the calibration template
+    # only the exponents are checked
+    speed = get_speed(calibration, baselines)
+    for result in results:
+        baseline = baselines['templates'].get(result['name'])
+        if not baseline or speed is None:
+            continue
+        for stage in STAGES:
+            limit = baseline[stage] * speed * tolerance
+            if result['times'][stage] > max(limit, MIN_CHECKED_TIME):
+                failures.append('%s %s took %.3f s, the baseline is %.3f s on this '
+                                'machine' % (result['name'], stage,
+                                             result['times'][stage],
+                                             baseline[stage] * speed))
+    #the exponents only compare when the same templates were fit
+    if set([result['name'] for result in results]) != set(baselines['templates']):
+        return failures
+    for stage in STAGES:
+        baseline = baselines['exponents'].get(stage)
+        if baseline is None or exponents[stage] is None:
+            continue
+        if exponents[stage] > baseline + exponent_tolerance:
+            failures.append('%s scales with joints ^ %.2f, the baseline is ^ %.2f' %
+                            (stage, exponents[stage], baseline))
+    return failures
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- CLASSES --#
+
+if __name__ == '__main__':
+    suite = run_suite(update='--update' in sys.argv[1:])
+    sys.exit(1 if suite['failures'] else 0)
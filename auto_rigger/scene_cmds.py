@@ -0,0 +1,3136 @@
+#!/usr/bin/env python
+#SETMODE 777
+
+#----------------------------------------------------------------------------------------#
+#------------------------------------------------------------------------------ HEADER --#
+
+"""
+:author:
+    Nick Lormand & Blake Day
+
+:synopsis:
+    an in memory stand in for the part of maya.cmds the auto rigger uses
+
+:description:
+    SceneCmds keeps a small scene graph in python, nodes with names, uuids, parents,
+    attributes and connections, and answers the commands the rigger calls on maya.cmds
+    with the same flags and return values. transforms and joints get real local and
+    world matrices so xform, parent, makeIdentity and the constraints put things where
+    maya would.
+
+    it doesnt evaluate the dependency graph, connections are only recorded. a constraint
+    places its object once when it is made, the same place maya would put it, or keeps
+    the offsets maya would when it maintains the offset, and utility nodes never
+    compute. closestPointOnSurface is the one exception, its parameters are worked out
+    when they are queried since the ribbon spine reads them back. names are always
+    unique here, maya only needs them unique under the same parent.
+
+    use it through cmds_backend.set_backend('scene')
+
+:applications:
+    None, it runs in plain python
+
+:see_also:
+    cmds_backend
+    gen_utils
+"""
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- IMPORTS --#
+
+# Default Python Imports
+import collections
+import copy
+import fnmatch
+import math
+import re
+
+try:
+    STRING_TYPES = (basestring,)
+except NameError:
+    STRING_TYPES = (str,)
+
+#the long names the short attribute names stand for
+ATTR_ALIASES = {'t': 'translate', 'tx': 'translateX', 'ty': 'translateY',
+                'tz': 'translateZ', 'r': 'rotate', 'rx': 'rotateX', 'ry': 'rotateY',
+                'rz': 'rotateZ', 's': 'scale', 'sx': 'scaleX', 'sy': 'scaleY',
+                'sz': 'scaleZ', 'v': 'visibility', 'ro': 'rotateOrder',
+                'jo': 'jointOrient', 'jox': 'jointOrientX', 'joy': 'jointOrientY',
+                'joz': 'jointOrientZ', 'radi': 'radius', 'rp': 'rotatePivot',
+                'rpx': 'rotatePivotX', 'rpy': 'rotatePivotY', 'rpz': 'rotatePivotZ',
+                'sp': 'scalePivot', 'spx': 'scalePivotX', 'spy': 'scalePivotY',
+                'spz': 'scalePivotZ', 'rpt': 'rotatePivotTranslate',
+                'spt': 'scalePivotTranslate', 'it': 'inheritsTransform',
+                'ssc': 'segmentScaleCompensate', 'pa': 'preferredAngle',
+                'is': 'inverseScale', 'isx': 'inverseScaleX', 'isy': 'inverseScaleY',
+                'isz': 'inverseScaleZ',
+                'm': 'matrix', 'wm': 'worldMatrix', 'wim': 'worldInverseMatrix',
+                'pm': 'parentMatrix', 'pim': 'parentInverseMatrix',
+                'ove': 'overrideEnabled', 'ovc': 'overrideColor',
+                'ovdt': 'overrideDisplayType', 'msg': 'message'}
+
+#attributes made of three children
+COMPOUND_ATTRS = {}
+for compound_attr in ['translate', 'rotate', 'scale', 'jointOrient', 'rotatePivot',
+                      'scalePivot', 'rotatePivotTranslate', 'scalePivotTranslate',
+                      'preferredAngle', 'inverseScale']:
+    COMPOUND_ATTRS[compound_attr] = [compound_attr + axis for axis in 'XYZ']
+
+#the compound each child attribute belongs to
+COMPOUND_PARENTS = {}
+for compound_attr in COMPOUND_ATTRS:
+    for child_attr in COMPOUND_ATTRS[compound_attr]:
+        COMPOUND_PARENTS[child_attr] = compound_attr
+
+#the attributes a transform starts with and their values
+TRANSFORM_ATTRS = {'visibility': True, 'rotateOrder': 0, 'inheritsTransform': True,
+                   'overrideEnabled': False, 'overrideDisplayType': 0,
+                   'overrideColor': 0, 'template': False}
+for compound_attr in ['translate', 'rotate', 'rotatePivot', 'scalePivot',
+                      'rotatePivotTranslate', 'scalePivotTranslate']:
+    for child_attr in COMPOUND_ATTRS[compound_attr]:
+        TRANSFORM_ATTRS[child_attr] = 0.0
+for child_attr in COMPOUND_ATTRS['scale']:
+    TRANSFORM_ATTRS[child_attr] = 1.0
+
+#the extra attributes a joint has
+JOINT_ATTRS = {'radius': 1.0, 'segmentScaleCompensate': True, 'drawStyle': 0,
+               'side': 0, 'type': 0, 'otherType': ''}
+for compound_attr in ['jointOrient', 'preferredAngle']:
+    for child_attr in COMPOUND_ATTRS[compound_attr]:
+        JOINT_ATTRS[child_attr] = 0.0
+for child_attr in COMPOUND_ATTRS['inverseScale']:
+    JOINT_ATTRS[child_attr] = 1.0
+
+#the attributes every shape starts with
+SHAPE_ATTRS = {'visibility': True, 'overrideEnabled': False, 'overrideDisplayType': 0,
+               'overrideColor': 0, 'template': False, 'intermediateObject': False}
+
+#attributes that move a transform when they change
+MATRIX_ATTRS = set(['rotateOrder', 'inheritsTransform', 'segmentScaleCompensate'] +
+                   [child_attr for child_attr in COMPOUND_PARENTS
+                    if not child_attr.startswith('preferredAngle')])
+
+#plugs every dag node has that are worked out from its matrices
+MATRIX_PLUGS = set(['matrix', 'worldMatrix', 'worldInverseMatrix', 'parentMatrix',
+                    'parentInverseMatrix'])
+
+#node types and the type they come from, type filters match the whole chain
+NODE_TYPE_PARENTS = {'dagNode': None,
+                     'transform': 'dagNode',
+                     'joint': 'transform',
+                     'ikHandle': 'transform',
+                     'ikEffector': 'transform',
+                     'constraint': 'transform',
+                     'parentConstraint': 'constraint',
+                     'pointConstraint': 'constraint',
+                     'orientConstraint': 'constraint',
+                     'scaleConstraint': 'constraint',
+                     'aimConstraint': 'constraint',
+                     'poleVectorConstraint': 'pointConstraint',
+                     'shape': 'dagNode',
+                     'geometryShape': 'shape',
+                     'controlPoint': 'geometryShape',
+                     'curveShape': 'controlPoint',
+                     'nurbsCurve': 'curveShape',
+                     'surfaceShape': 'controlPoint',
+                     'nurbsSurface': 'surfaceShape',
+                     'mesh': 'surfaceShape',
+                     'locator': 'geometryShape',
+                     'follicle': 'shape',
+                     'clusterHandle': 'shape'}
+
+#only these types complain about attributes they dont have, every other node takes
+# whatever it is given since this scene doesnt know their attributes
+STRICT_TYPES = ('transform', 'joint')
+
+#maya's rotate orders in the order of the rotateOrder enum
+ROTATE_ORDERS = ['xyz', 'yzx', 'zxy', 'xzy', 'yxz', 'zyx']
+
+#the aim constraint's up types in the order of the worldUpType enum
+WORLD_UP_TYPES = ['scene', 'object', 'objectrotation', 'vector', 'none']
+
+#the cvs of maya's default circle, the normal is z
+CIRCLE_POINTS = [(0.783612, -0.783612, 0.0), (0.0, -1.108194, 0.0),
+                 (-0.783612, -0.783612, 0.0), (-1.108194, 0.0, 0.0),
+                 (-0.783612, 0.783612, 0.0), (0.0, 1.108194, 0.0),
+                 (0.783612, 0.783612, 0.0), (1.108194, 0.0, 0.0)]
+
+#the flags of each command -> {short name: long name}, long names are added below
+COMMAND_FLAGS = {
+    'addAttr': {'ln': 'longName', 'sn': 'shortName', 'at': 'attributeType',
+                'dt': 'dataType', 'en': 'enumName', 'dv': 'defaultValue',
+                'min': 'minValue', 'max': 'maxValue', 'k': 'keyable', 'h': 'hidden',
+                'nn': 'niceName'},
+    'aimConstraint': {'mo': 'maintainOffset', 'n': 'name', 'aim': 'aimVector',
+                      'u': 'upVector', 'wut': 'worldUpType', 'wu': 'worldUpVector',
+                      'wuo': 'worldUpObject', 'sk': 'skip', 'w': 'weight',
+                      'o': 'offset'},
+    'attributeQuery': {'n': 'node', 'ex': 'exists', 'k': 'keyable',
+                       'at': 'attributeType'},
+    'circle': {'nr': 'normal', 'c': 'center', 'r': 'radius', 'sw': 'sweep',
+               'd': 'degree', 'ut': 'useTolerance', 'tol': 'tolerance',
+               's': 'sections', 'ch': 'constructionHistory', 'cch': 'caching',
+               'n': 'name', 'o': 'object'},
+    'cluster': {'n': 'name', 'rel': 'relative', 'en': 'envelope'},
+    'connectAttr': {'f': 'force', 'l': 'lock'},
+    'createNode': {'n': 'name', 'p': 'parent', 'ss': 'skipSelect', 's': 'shared'},
+    'currentTime': {'q': 'query', 'e': 'edit', 'u': 'update'},
+    'curve': {'d': 'degree', 'p': 'point', 'k': 'knot', 'n': 'name', 'per': 'periodic',
+              'ws': 'worldSpace', 'os': 'objectSpace'},
+    'delete': {'ch': 'constructionHistory'},
+    'deleteAttr': {'at': 'attribute'},
+    'disconnectAttr': {'na': 'nextAvailable'},
+    'duplicate': {'rc': 'renameChildren', 'n': 'name', 'po': 'parentOnly',
+                  'rr': 'returnRootsOnly'},
+    'evaluationManager': {'q': 'query', 'm': 'mode'},
+    'exactWorldBoundingBox': {'ii': 'ignoreInvisible', 'ce': 'calculateExactly'},
+    'file': {'new': 'new', 'f': 'force', 'o': 'open', 'q': 'query', 'sn': 'sceneName'},
+    'getAttr': {'l': 'lock', 'k': 'keyable', 'cb': 'channelBox', 'typ': 'type',
+                'sl': 'silent', 't': 'time'},
+    'group': {'em': 'empty', 'n': 'name', 'w': 'world', 'p': 'parent', 'r': 'relative',
+              'a': 'absolute'},
+    'ikHandle': {'sj': 'startJoint', 'ee': 'endEffector', 'sol': 'solver', 'n': 'name',
+                 'p': 'priority', 'w': 'weight'},
+    'joint': {'e': 'edit', 'n': 'name', 'p': 'position', 'a': 'absolute',
+              'r': 'relative', 'o': 'orientation', 'oj': 'orientJoint',
+              'sao': 'secondaryAxisOrient', 'ch': 'children', 'zso': 'zeroScaleOrient',
+              'rad': 'radius', 'roo': 'rotationOrder'},
+    'listConnections': {'s': 'source', 'd': 'destination', 'p': 'plugs',
+                        'c': 'connections', 't': 'type', 'scn': 'skipConversionNodes',
+                        'sh': 'shapes'},
+    'listRelatives': {'c': 'children', 'ad': 'allDescendents', 'p': 'parent',
+                      's': 'shapes', 'typ': 'type', 'f': 'fullPath', 'pa': 'path',
+                      'ni': 'noIntermediate', 'ap': 'allParents'},
+    'loadPlugin': {'qt': 'quiet'},
+    'loft': {'ch': 'constructionHistory', 'u': 'uniform', 'c': 'close',
+             'ar': 'autoReverse', 'd': 'degree', 'ss': 'sectionSpans', 'rn': 'range',
+             'po': 'polygon', 'rsn': 'reverseSurfaceNormals', 'n': 'name',
+             'o': 'object'},
+    'ls': {'sl': 'selection', 'typ': 'type', 'tr': 'transforms', 's': 'shapes',
+           'uid': 'uuid', 'l': 'long', 'as': 'assemblies', 'dag': 'dagObjects',
+           'ap': 'allPaths', 'o': 'objectsOnly', 'sn': 'shortNames'},
+    'makeIdentity': {'a': 'apply', 't': 'translate', 'r': 'rotate', 's': 'scale',
+                     'n': 'normal', 'pn': 'preserveNormals', 'jo': 'jointOrient'},
+    'nodeType': {'i': 'inherited'},
+    'objExists': {},
+    'parent': {'w': 'world', 'r': 'relative', 'a': 'absolute', 's': 'shape',
+               'add': 'addObject', 'nis': 'noInvScale'},
+    'parentConstraint': {'mo': 'maintainOffset', 'n': 'name', 'st': 'skipTranslate',
+                         'sr': 'skipRotate', 'w': 'weight'},
+    'pointConstraint': {'mo': 'maintainOffset', 'n': 'name', 'sk': 'skip',
+                        'w': 'weight', 'o': 'offset'},
+    'orientConstraint': {'mo': 'maintainOffset', 'n': 'name', 'sk': 'skip',
+                         'w': 'weight', 'o': 'offset'},
+    'scaleConstraint': {'mo': 'maintainOffset', 'n': 'name', 'sk': 'skip',
+                        'w': 'weight', 'o': 'offset'},
+    'poleVectorConstraint': {'n': 'name', 'w': 'weight'},
+    'refresh': {'su': 'suspend', 'f': 'force', 'cv': 'currentView'},
+    'rename': {'is': 'ignoreShape'},
+    'reroot': {},
+    'scale': {'r': 'relative', 'a': 'absolute', 'p': 'pivot', 'os': 'objectSpace',
+              'ws': 'worldSpace'},
+    'select': {'r': 'replace', 'add': 'add', 'd': 'deselect', 'cl': 'clear',
+               'ne': 'noExpand'},
+    'setAttr': {'l': 'lock', 'k': 'keyable', 'cb': 'channelBox', 'typ': 'type',
+                'cl': 'clamp'},
+    'setKeyframe': {'at': 'attribute', 't': 'time', 'v': 'value',
+                    'itt': 'inTangentType', 'ott': 'outTangentType'},
+    'shadingNode': {'au': 'asUtility', 'at': 'asTexture', 'asShader': 'asShader',
+                    'n': 'name', 'ss': 'skipSelect'},
+    'skinCluster': {'tsb': 'toSelectedBones', 'bm': 'bindMethod',
+                    'mi': 'maximumInfluences', 'n': 'name', 'dr': 'dropoffRate',
+                    'omi': 'obeyMaxInfluences', 'nw': 'normalizeWeights',
+                    'sm': 'skinMethod', 'e': 'edit', 'ub': 'unbind'},
+    'spaceLocator': {'n': 'name', 'p': 'position', 'a': 'absolute', 'r': 'relative'},
+    'transformLimits': {},
+    'undoInfo': {'q': 'query', 'st': 'state', 'swf': 'stateWithoutFlush',
+                 'ock': 'openChunk', 'cck': 'closeChunk', 'cn': 'chunkName'},
+    'xform': {'q': 'query', 'ws': 'worldSpace', 'os': 'objectSpace', 't': 'translation',
+              'ro': 'rotation', 's': 'scale', 'm': 'matrix', 'piv': 'pivots',
+              'rp': 'rotatePivot', 'sp': 'scalePivot', 'cp': 'centerPivots',
+              'r': 'relative', 'a': 'absolute', 'roo': 'rotateOrder',
+              'bb': 'boundingBox', 'p': 'preserve'}}
+for axis in 'XYZ':
+    for limit_type, short_type in [('translation', 't'), ('rotation', 'r'),
+                                   ('scale', 's')]:
+        COMMAND_FLAGS['transformLimits'][short_type + axis.lower()] = limit_type + axis
+        COMMAND_FLAGS['transformLimits']['e' + short_type + axis.lower()] = (
+            'enable' + limit_type[0].upper() + limit_type[1:] + axis)
+for command_flags in COMMAND_FLAGS.values():
+    command_flags.update([(long_name, long_name) for long_name in command_flags.values()])
+
+#----------------------------------------------------------------------------------------#
+#--------------------------------------------------------------------------- FUNCTIONS --#
+
+def get_flags(command, kwargs):
+    """
+    turns the flags a command was given into their long names
+
+    :param command: name of the command
+    :type: str
+
+    :param kwargs: the flags the command got
+    :type: dict
+
+    :return: the flags by long name
+    :type: dict
+    """
+    command_flags = COMMAND_FLAGS[command]
+    flags = {}
+    for flag, value in kwargs.items():
+        if flag not in command_flags:
+            raise TypeError('Invalid flag \'%s\' for %s' % (flag, command))
+        flags[command_flags[flag]] = value
+    return flags
+
+def flatten(args):
+    """
+    flattens the lists and tuples commands can be given into one list of names
+
+    :param args: names or lists of names
+    :type: list
+
+    :return: the names
+    :type: list
+    """
+    names = []
+    for arg in args:
+        if isinstance(arg, (list, tuple)):
+            names.extend(flatten(arg))
+        elif arg is not None:
+            names.append(arg)
+    return names
+
+def get_type_chain(node_type):
+    """
+    gets a node type and every type it comes from
+
+    :param node_type: the node type
+    :type: str
+
+    :return: the types starting with node_type
+    :type: list
+    """
+    types = [node_type]
+    while NODE_TYPE_PARENTS.get(types[-1]):
+        types.append(NODE_TYPE_PARENTS[types[-1]])
+    return types
+
+def get_long_attr(attr):
+    """
+    swaps the first part of an attribute for its long name, 'tx' -> 'translateX'
+
+    :param attr: the attribute, can be 'worldMatrix[0]' or 'input3D[0].input3Dx'
+    :type: str
+
+    :return: the attribute with its long name
+    :type: str
+    """
+    if attr in ATTR_ALIASES:
+        return ATTR_ALIASES[attr]
+    head, dot, rest = attr.partition('.')
+    base, bracket, index = head.partition('[')
+    if base in ATTR_ALIASES:
+        return ATTR_ALIASES[base] + bracket + index + dot + rest
+    return attr
+
+def get_base_attr(attr):
+    """
+    gets the top attribute of a plug's attribute, 'worldMatrix[0]' -> 'worldMatrix'
+
+    :param attr: the attribute
+    :type: str
+
+    :return: the top attribute
+    :type: str
+    """
+    return attr.partition('.')[0].partition('[')[0]
+
+def get_shape_name(name):
+    """
+    gets the name maya gives the shape of a transform, 'curve1' -> 'curveShape1'
+
+    :param name: name of the transform
+    :type: str
+
+    :return: name for the shape
+    :type: str
+    """
+    match = re.match(r'(.*?)(\d*)$', name)
+    return match.group(1) + 'Shape' + match.group(2)
+
+def identity_matrix():
+    """
+    makes an identity matrix
+
+    :return: the matrix, 16 values with the translation in 12-14
+    :type: list
+    """
+    return [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0,
+            0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0]
+
+def is_identity(matrix):
+    """
+    checks if a matrix is the identity
+
+    :param matrix: the matrix
+    :type: list
+
+    :return: if it is the identity
+    :type: bool
+    """
+    for value, identity_value in zip(matrix, identity_matrix()):
+        if abs(value - identity_value) > 1e-9:
+            return False
+    return True
+
+def mult_matrix(matrix_a, matrix_b):
+    """
+    multiplies two matrices the way maya does, matrix_a is applied first
+
+    :param matrix_a: the first matrix
+    :type: list
+
+    :param matrix_b: the second matrix
+    :type: list
+
+    :return: matrix_a * matrix_b
+    :type: list
+    """
+    b = matrix_b
+    result = []
+    for row in (0, 4, 8, 12):
+        a0, a1, a2, a3 = matrix_a[row:row + 4]
+        result.extend([a0 * b[0] + a1 * b[4] + a2 * b[8] + a3 * b[12],
+                       a0 * b[1] + a1 * b[5] + a2 * b[9] + a3 * b[13],
+                       a0 * b[2] + a1 * b[6] + a2 * b[10] + a3 * b[14],
+                       a0 * b[3] + a1 * b[7] + a2 * b[11] + a3 * b[15]])
+    return result
+
+def inverse_matrix(matrix):
+    """
+    inverts a transform matrix, the last column has to be 0, 0, 0, 1
+
+    :param matrix: the matrix
+    :type: list
+
+    :return: the inverse
+    :type: list
+    """
+    a, b, c = matrix[0:3]
+    d, e, f = matrix[4:7]
+    g, h, i = matrix[8:11]
+    x, y, z = matrix[12:15]
+    co_a = e * i - f * h
+    co_b = f * g - d * i
+    co_c = d * h - e * g
+    det = a * co_a + b * co_b + c * co_c
+    if abs(det) < 1e-12:
+        return identity_matrix()
+    inv = 1.0 / det
+    rows = [[co_a * inv, (c * h - b * i) * inv, (b * f - c * e) * inv],
+            [co_b * inv, (a * i - c * g) * inv, (c * d - a * f) * inv],
+            [co_c * inv, (b * g - a * h) * inv, (a * e - b * d) * inv]]
+    translation = [-(x * rows[0][col] + y * rows[1][col] + z * rows[2][col])
+                   for col in range(3)]
+    return (rows[0] + [0.0] + rows[1] + [0.0] + rows[2] + [0.0] +
+            translation + [1.0])
+
+def transform_point(point, matrix):
+    """
+    moves a point by a matrix
+
+    :param point: the point
+    :type: list
+
+    :param matrix: the matrix
+    :type: list
+
+    :return: the moved point
+    :type: list
+    """
+    x, y, z = point
+    return [x * matrix[0] + y * matrix[4] + z * matrix[8] + matrix[12],
+            x * matrix[1] + y * matrix[5] + z * matrix[9] + matrix[13],
+            x * matrix[2] + y * matrix[6] + z * matrix[10] + matrix[14]]
+
+def transform_vector(vector, matrix):
+    """
+    turns a direction by a matrix, the translation is left out
+
+    :param vector: the direction
+    :type: list
+
+    :param matrix: the matrix
+    :type: list
+
+    :return: the turned direction
+    :type: list
+    """
+    x, y, z = vector
+    return [x * matrix[0] + y * matrix[4] + z * matrix[8],
+            x * matrix[1] + y * matrix[5] + z * matrix[9],
+            x * matrix[2] + y * matrix[6] + z * matrix[10]]
+
+def rotation_matrix(rotation, rotate_order=0):
+    """
+    makes the rotation matrix for euler angles
+
+    :param rotation: x, y and z rotation in degrees
+    :type: list
+
+    :param rotate_order: index into ROTATE_ORDERS
+    :type: int
+
+    :return: the rotation matrix
+    :type: list
+    """
+    if not (rotation[0] or rotation[1] or rotation[2]):
+        return identity_matrix()
+    rx, ry, rz = [math.radians(angle) for angle in rotation]
+    cx, sx = math.cos(rx), math.sin(rx)
+    cy, sy = math.cos(ry), math.sin(ry)
+    cz, sz = math.cos(rz), math.sin(rz)
+    axis_matrices = {'x': [1.0, 0.0, 0.0, 0.0, 0.0, cx, sx, 0.0,
+                           0.0, -sx, cx, 0.0, 0.0, 0.0, 0.0, 1.0],
+                     'y': [cy, 0.0, -sy, 0.0, 0.0, 1.0, 0.0, 0.0,
+                           sy, 0.0, cy, 0.0, 0.0, 0.0, 0.0, 1.0],
+                     'z': [cz, sz, 0.0, 0.0, -sz, cz, 0.0, 0.0,
+                           0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0]}
+    order = ROTATE_ORDERS[rotate_order]
+    return mult_matrix(mult_matrix(axis_matrices[order[0]], axis_matrices[order[1]]),
+                       axis_matrices[order[2]])
+
+def matrix_to_euler(matrix, rotate_order=0):
+    """
+    gets the euler angles of a rotation matrix
+
+    :param matrix: the rotation matrix, its rows have to be normalized
+    :type: list
+
+    :param rotate_order: index into ROTATE_ORDERS
+    :type: int
+
+    :return: x, y and z rotation in degrees
+    :type: list
+    """
+    order = ROTATE_ORDERS[rotate_order]
+    i, j, k = ['xyz'.index(axis) for axis in order]
+    #the orders that arent a cycle of xyz flip the signs
+    sign = 1.0 if order in ('xyz', 'yzx', 'zxy') else -1.0
+    cos_b = math.sqrt(matrix[i * 4 + i] ** 2 + matrix[i * 4 + j] ** 2)
+    if cos_b > 1e-6:
+        first = math.atan2(sign * matrix[j * 4 + k], matrix[k * 4 + k])
+        third = math.atan2(sign * matrix[i * 4 + j], matrix[i * 4 + i])
+    else:
+        first = math.atan2(-sign * matrix[k * 4 + j], matrix[j * 4 + j])
+        third = 0.0
+    second = math.atan2(-sign * matrix[i * 4 + k], cos_b)
+    rotation = [0.0, 0.0, 0.0]
+    rotation[i] = math.degrees(first)
+    rotation[j] = math.degrees(second)
+    rotation[k] = math.degrees(third)
+    return rotation
+
+def decompose_matrix(matrix):
+    """
+    splits a matrix into scale, rotation and translation
+
+    :param matrix: the matrix
+    :type: list
+
+    :return: [scale, rotation matrix with normalized rows, translation]
+    :type: list
+    """
+    rows = [matrix[0:3], matrix[4:7], matrix[8:11]]
+    scale = [math.sqrt(x * x + y * y + z * z) for x, y, z in rows]
+    det = (rows[0][0] * (rows[1][1] * rows[2][2] - rows[1][2] * rows[2][1]) -
+           rows[0][1] * (rows[1][0] * rows[2][2] - rows[1][2] * rows[2][0]) +
+           rows[0][2] * (rows[1][0] * rows[2][1] - rows[1][1] * rows[2][0]))
+    if det < 0:
+        scale[0] = -scale[0]
+    rotation = []
+    for index, row in enumerate(rows):
+        if abs(scale[index]) < 1e-12:
+            axis_row = [0.0, 0.0, 0.0]
+            axis_row[index] = 1.0
+            rotation.extend(axis_row + [0.0])
+        else:
+            rotation.extend([value / scale[index] for value in row] + [0.0])
+    rotation.extend([0.0, 0.0, 0.0, 1.0])
+    return [scale, rotation, list(matrix[12:15])]
+
+def normalize_vector(vector):
+    """
+    scales a vector to a length of 1
+
+    :param vector: the vector
+    :type: list
+
+    :return: the normalized vector, or the vector if it has no length
+    :type: list
+    """
+    length = math.sqrt(sum([value * value for value in vector]))
+    if length < 1e-12:
+        return list(vector)
+    return [value / length for value in vector]
+
+def cross_product(vector_a, vector_b):
+    """
+    gets the cross product of two vectors
+
+    :param vector_a: the first vector
+    :type: list
+
+    :param vector_b: the second vector
+    :type: list
+
+    :return: vector_a ^ vector_b
+    :type: list
+    """
+    return [vector_a[1] * vector_b[2] - vector_a[2] * vector_b[1],
+            vector_a[2] * vector_b[0] - vector_a[0] * vector_b[2],
+            vector_a[0] * vector_b[1] - vector_a[1] * vector_b[0]]
+
+def get_knots(num_cvs, degree):
+    """
+    makes maya's knots for an open curve
+
+    :param num_cvs: number of cvs
+    :type: int
+
+    :param degree: degree of the curve
+    :type: int
+
+    :return: the knots, num_cvs + degree - 1 of them
+    :type: list
+    """
+    spans = num_cvs - degree
+    return ([0.0] * (degree - 1) + [float(value) for value in range(spans + 1)] +
+            [float(spans)] * (degree - 1))
+
+def evaluate_curve(cvs, degree, knots, param):
+    """
+    gets the point on an open b-spline curve at a parameter
+
+    :param cvs: the cvs of the curve
+    :type: list
+
+    :param degree: degree of the curve
+    :type: int
+
+    :param knots: the knots in maya's form
+    :type: list
+
+    :param param: parameter on the curve
+    :type: float
+
+    :return: the point
+    :type: list
+    """
+    #maya leaves off the first and last knot that the algorithm needs
+    knots = [knots[0]] + list(knots) + [knots[-1]]
+    param = min(max(param, knots[degree]), knots[len(cvs)])
+    span = degree
+    while span < len(cvs) - 1 and param >= knots[span + 1]:
+        span += 1
+    points = [list(cvs[span - degree + index]) for index in range(degree + 1)]
+    for level in range(1, degree + 1):
+        for index in range(degree, level - 1, -1):
+            knot_index = span - degree + index
+            width = knots[knot_index + degree - level + 1] - knots[knot_index]
+            alpha = 0.0 if width == 0 else (param - knots[knot_index]) / width
+            points[index] = [(1.0 - alpha) * a + alpha * b
+                             for a, b in zip(points[index - 1], points[index])]
+    return points[degree]
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- CLASSES --#
+
+class SceneNode(object):
+    """
+    one node in the scene, its attributes and the connections in and out of it
+    """
+    def __init__(self, name, node_type, uuid):
+        """
+        :param name: short name of the node
+        :type: str
+
+        :param node_type: maya node type
+        :type: str
+
+        :param uuid: the node's uuid
+        :type: str
+        """
+        self.name = name
+        self.type = node_type
+        self.uuid = uuid
+        self.types = get_type_chain(node_type)
+        self.is_dag = 'dagNode' in self.types
+        self.is_transform = 'transform' in self.types
+        self.is_shape = 'shape' in self.types
+        self.is_strict = node_type in STRICT_TYPES
+        self.parent = None
+        self.children = []
+        self.attrs = {}
+        self.attr_types = {}
+        self.user_attrs = []
+        self.locked = set()
+        self.hidden_channels = {}
+        self.inputs = {}
+        self.outputs = {}
+        self.data = {}
+        self.local_matrix = None
+        self.world_matrix = None
+
+        if self.is_transform:
+            self.attrs.update(TRANSFORM_ATTRS)
+        if node_type == 'joint':
+            self.attrs.update(JOINT_ATTRS)
+        if self.is_shape:
+            self.attrs.update(SHAPE_ATTRS)
+
+    def __reduce__(self):
+        #the scene pickles what is in a node, see Scene.__getstate__
+        return (SceneNode, (self.name, self.type, self.uuid))
+
+class Scene(object):
+    """
+    the nodes of a scene and the work the commands share
+    """
+    def __init__(self):
+        self.nodes = collections.OrderedDict()
+        self.names = {}
+        self.selection = []
+        self.uuid_count = 0
+        self.time = 1.0
+
+    def __getstate__(self):
+        """
+        pickles every node before what is in them, the nodes point at each other so
+        pickling them with what is in them goes as deep as the longest chain of parents
+        and connections
+        """
+        state = dict(self.__dict__)
+        state['node_states'] = [node.__dict__ for node in self.nodes.values()]
+        return state
+
+    def __setstate__(self, state):
+        node_states = state.pop('node_states')
+        self.__dict__.update(state)
+        for node, node_state in zip(self.nodes.values(), node_states):
+            node.__dict__.update(node_state)
+
+    def find_node(self, name):
+        """
+        finds a node by its name or path
+
+        :param name: short name, partial path or full path
+        :type: str
+
+        :return: the node or None
+        :type: SceneNode
+        """
+        if '|' not in name:
+            return self.names.get(name)
+        if '||' in name:
+            #maya reads empty parts of a path as nothing
+            name = re.sub(r'\|+', '|', name)
+        parts = name.split('|')
+        node = self.names.get(parts[-1])
+        if node is None:
+            return None
+        path = self.get_path(node)
+        if name.startswith('|'):
+            return node if path == name else None
+        return node if path.endswith('|' + name) else None
+
+    def get_node(self, name):
+        """
+        gets a node by its name or path and errors like maya if it isnt there
+
+        :param name: short name, partial path or full path
+        :type: str
+
+        :return: the node
+        :type: SceneNode
+        """
+        node = self.find_node(name)
+        if node is None:
+            raise ValueError('No object matches name: %s' % name)
+        return node
+
+    def get_plug(self, plug):
+        """
+        splits a plug into its node and long attribute name
+
+        :param plug: 'node.attr'
+        :type: str
+
+        :return: [node, attribute]
+        :type: list
+        """
+        name, dot, attr = plug.partition('.')
+        if not attr:
+            raise ValueError('No object matches name: %s' % plug)
+        return [self.get_node(name), get_long_attr(attr)]
+
+    def get_path(self, node):
+        """
+        gets the full path of a node
+
+        :param node: the node
+        :type: SceneNode
+
+        :return: '|parent|node' for dag nodes, the name for others
+        :type: str
+        """
+        if not node.is_dag:
+            return node.name
+        names = []
+        while node is not None:
+            names.append(node.name)
+            node = node.parent
+        return '|' + '|'.join(reversed(names))
+
+    def unique_name(self, name):
+        """
+        gets a name no other node has by counting up the number at the end like maya
+
+        :param name: the name that is wanted
+        :type: str
+
+        :return: the name or the next free one, 'foo' -> 'foo1', 'foo1' -> 'foo2'
+        :type: str
+        """
+        if name not in self.names:
+            return name
+        base = name.rstrip('0123456789')
+        number = 1
+        while base + str(number) in self.names:
+            number += 1
+        return base + str(number)
+
+    def create_node(self, node_type, name=None, parent=None):
+        """
+        makes a node
+
+        :param node_type: maya node type
+        :type: str
+
+        :param name: name for it, gets made unique, defaults to the type and a number
+        :type: str
+
+        :param parent: node to put a dag node under
+        :type: SceneNode
+
+        :return: the new node
+        :type: SceneNode
+        """
+        self.uuid_count += 1
+        uuid = '00000000-0000-0000-0000-%012X' % self.uuid_count
+        node = SceneNode(self.unique_name(name or node_type + '1'), node_type, uuid)
+        self.nodes[uuid] = node
+        self.names[node.name] = node
+        if parent is not None:
+            node.parent = parent
+            parent.children.append(node)
+        return node
+
+    def rename_node(self, node, name):
+        """
+        renames a node
+
+        :param node: the node
+        :type: SceneNode
+
+        :param name: the new name, gets made unique
+        :type: str
+
+        :return: the name it got
+        :type: str
+        """
+        if name == node.name:
+            return name
+        del self.names[node.name]
+        node.name = self.unique_name(name)
+        self.names[node.name] = node
+        return node.name
+
+    def get_descendants(self, node):
+        """
+        gets everything under a node, parents before their children
+
+        :param node: the node
+        :type: SceneNode
+
+        :return: the nodes
+        :type: list
+        """
+        descendants = []
+        stack = list(reversed(node.children))
+        while stack:
+            child = stack.pop()
+            descendants.append(child)
+            stack.extend(reversed(child.children))
+        return descendants
+
+    def delete_nodes(self, nodes):
+        """
+        deletes nodes, what is under them and the nodes that only exist for them
+
+        :param nodes: the nodes
+        :type: list
+        """
+        to_delete = []
+        seen = set()
+        for node in nodes:
+            for item in [node] + self.get_descendants(node):
+                for owned in [item] + item.data.get('history', []) + \
+                        item.data.get('dependents', []):
+                    if owned.uuid not in seen and owned.uuid in self.nodes:
+                        seen.add(owned.uuid)
+                        to_delete.append(owned)
+
+        for node in to_delete:
+            for attr, (source, source_attr) in list(node.inputs.items()):
+                self.disconnect(source, source_attr, node, attr)
+            for attr, destinations in list(node.outputs.items()):
+                for destination, destination_attr in list(destinations):
+                    self.disconnect(node, attr, destination, destination_attr)
+        for node in to_delete:
+            if node.parent is not None and node.parent.uuid not in seen:
+                node.parent.children.remove(node)
+            del self.nodes[node.uuid]
+            del self.names[node.name]
+        self.selection = [node for node in self.selection if node.uuid not in seen]
+
+    def invalidate(self, node):
+        """
+        clears the cached matrices of a node and everything under it
+
+        :param node: the node that moved
+        :type: SceneNode
+        """
+        node.local_matrix = None
+        node.world_matrix = None
+        stack = list(node.children)
+        while stack:
+            child = stack.pop()
+            child.local_matrix = None
+            child.world_matrix = None
+            stack.extend(child.children)
+
+    def get_pivot_offset(self, node, scale, rotation):
+        """
+        gets the translation the pivots add to a transform's matrix
+
+        :param node: the transform
+        :type: SceneNode
+
+        :param scale: the scale to use
+        :type: list
+
+        :param rotation: the rotation matrix to use
+        :type: list
+
+        :return: the offset
+        :type: list
+        """
+        attrs = node.attrs
+        rp = [attrs['rotatePivotX'], attrs['rotatePivotY'], attrs['rotatePivotZ']]
+        sp = [attrs['scalePivotX'], attrs['scalePivotY'], attrs['scalePivotZ']]
+        if node.type == 'joint' or not (rp[0] or rp[1] or rp[2] or sp[0] or sp[1] or
+                                        sp[2] or attrs['rotatePivotTranslateX'] or
+                                        attrs['rotatePivotTranslateY'] or
+                                        attrs['rotatePivotTranslateZ'] or
+                                        attrs['scalePivotTranslateX'] or
+                                        attrs['scalePivotTranslateY'] or
+                                        attrs['scalePivotTranslateZ']):
+            return [0.0, 0.0, 0.0]
+        rpt = [attrs['rotatePivotTranslate' + axis] for axis in 'XYZ']
+        spt = [attrs['scalePivotTranslate' + axis] for axis in 'XYZ']
+        before = [sp[index] - sp[index] * scale[index] + spt[index] - rp[index]
+                  for index in range(3)]
+        rotated = transform_vector(before, rotation)
+        return [rotated[index] + rp[index] + rpt[index] for index in range(3)]
+
+    def get_local_matrix(self, node):
+        """
+        gets the matrix of a transform relative to its parent
+
+        :param node: the node
+        :type: SceneNode
+
+        :return: the matrix
+        :type: list
+        """
+        if node.local_matrix is not None:
+            return node.local_matrix
+        if not node.is_transform:
+            node.local_matrix = identity_matrix()
+            return node.local_matrix
+
+        attrs = node.attrs
+        scale = [attrs['scaleX'], attrs['scaleY'], attrs['scaleZ']]
+        rotation = rotation_matrix([attrs['rotateX'], attrs['rotateY'],
+                                    attrs['rotateZ']], attrs['rotateOrder'])
+        translate = [attrs['translateX'], attrs['translateY'], attrs['translateZ']]
+        if node.type == 'joint':
+            rotation = mult_matrix(rotation, rotation_matrix(
+                [attrs['jointOrientX'], attrs['jointOrientY'], attrs['jointOrientZ']]))
+        matrix = []
+        for index in range(3):
+            matrix.extend([value * scale[index]
+                           for value in rotation[index * 4:index * 4 + 3]] + [0.0])
+
+        #a joint takes its parent joint's scale back off
+        parent = node.parent
+        if node.type == 'joint' and parent is not None and parent.type == 'joint' and \
+                attrs['segmentScaleCompensate']:
+            parent_scale = [parent.attrs['scaleX'], parent.attrs['scaleY'],
+                            parent.attrs['scaleZ']]
+            for index in range(12):
+                if index % 4 < 3 and parent_scale[index % 4]:
+                    matrix[index] /= parent_scale[index % 4]
+
+        offset = self.get_pivot_offset(node, scale, rotation)
+        matrix.extend([offset[index] + translate[index] for index in range(3)] + [1.0])
+        node.local_matrix = matrix
+        return matrix
+
+    def get_parent_matrix(self, node):
+        """
+        gets the world matrix a node's local matrix is relative to
+
+        :param node: the node
+        :type: SceneNode
+
+        :return: the matrix
+        :type: list
+        """
+        if node.parent is None or (node.is_transform and
+                                   not node.attrs['inheritsTransform']):
+            return identity_matrix()
+        return self.get_world_matrix(node.parent)
+
+    def get_world_matrix(self, node):
+        """
+        gets the world matrix of a node, shapes use their transform's
+
+        :param node: the node
+        :type: SceneNode
+
+        :return: the matrix
+        :type: list
+        """
+        if node.world_matrix is not None:
+            return node.world_matrix
+        if not node.is_dag:
+            return identity_matrix()
+        if node.is_transform:
+            local = self.get_local_matrix(node)
+            if node.parent is None or not node.attrs['inheritsTransform']:
+                node.world_matrix = local
+            else:
+                node.world_matrix = mult_matrix(local,
+                                                self.get_world_matrix(node.parent))
+        else:
+            node.world_matrix = self.get_parent_matrix(node)
+        return node.world_matrix
+
+    def get_pivot_position(self, node):
+        """
+        gets where a node's rotate pivot is in the world
+
+        :param node: the node
+        :type: SceneNode
+
+        :return: the position
+        :type: list
+        """
+        if not node.is_transform:
+            return self.get_world_matrix(node)[12:15]
+        attrs = node.attrs
+        if node.type == 'joint':
+            local = [attrs['translate' + axis] for axis in 'XYZ']
+        else:
+            local = [attrs['rotatePivot' + axis] + attrs['rotatePivotTranslate' + axis] +
+                     attrs['translate' + axis] for axis in 'XYZ']
+        return transform_point(local, self.get_parent_matrix(node))
+
+    def get_world_rotation(self, node):
+        """
+        gets the rotation of a node in the world with the scale taken off
+
+        :param node: the node
+        :type: SceneNode
+
+        :return: rotation matrix
+        :type: list
+        """
+        return decompose_matrix(self.get_world_matrix(node))[1]
+
+    def set_channels(self, node, channels):
+        """
+        sets transform channels without the lock and connection checks
+
+        :param node: the transform
+        :type: SceneNode
+
+        :param channels: {long attribute name: value}
+        :type: dict
+        """
+        node.attrs.update(channels)
+        self.invalidate(node)
+
+    def set_local_rotation(self, node, rotation, keep_rotate=False):
+        """
+        gets the channels that give a transform a rotation relative to its parent
+
+        :param node: the transform
+        :type: SceneNode
+
+        :param rotation: rotation matrix relative to the parent with normalized rows
+        :type: list
+
+        :param keep_rotate: joints keep their rotate and the difference goes into the
+                            joint orient instead
+        :type: bool
+
+        :return: {long attribute name: value}
+        :type: dict
+        """
+        attrs = node.attrs
+        channels = {}
+        if node.type == 'joint':
+            orient = rotation_matrix([attrs['jointOrientX'], attrs['jointOrientY'],
+                                      attrs['jointOrientZ']])
+            rotate = rotation_matrix([attrs['rotateX'], attrs['rotateY'],
+                                      attrs['rotateZ']], attrs['rotateOrder'])
+            if keep_rotate:
+                orient = mult_matrix(inverse_matrix(rotate), rotation)
+                for axis, value in zip('XYZ', matrix_to_euler(orient)):
+                    channels['jointOrient' + axis] = value
+                return channels
+            rotation = mult_matrix(rotation, inverse_matrix(orient))
+        for axis, value in zip('XYZ', matrix_to_euler(rotation, attrs['rotateOrder'])):
+            channels['rotate' + axis] = value
+        return channels
+
+    def set_local_matrix(self, node, matrix, keep_rotate=False):
+        """
+        sets a transform's channels so its local matrix is matrix
+
+        :param node: the transform
+        :type: SceneNode
+
+        :param matrix: the matrix relative to the parent
+        :type: list
+
+        :param keep_rotate: joints keep their rotate and change their joint orient
+        :type: bool
+        """
+        parent = node.parent
+        if node.type == 'joint' and parent is not None and parent.type == 'joint' and \
+                node.attrs['segmentScaleCompensate']:
+            matrix = list(matrix)
+            for index in range(12):
+                if index % 4 < 3:
+                    matrix[index] *= parent.attrs['scale' + 'XYZ'[index % 4]]
+        scale, rotation, translation = decompose_matrix(matrix)
+        channels = self.set_local_rotation(node, rotation, keep_rotate)
+        for axis, value in zip('XYZ', scale):
+            channels['scale' + axis] = value
+        self.set_channels(node, channels)
+        offset = self.get_pivot_offset(node, scale, self.get_local_rotation(node))
+        self.set_channels(node, dict([('translate' + axis, translation[index] -
+                                       offset[index])
+                                      for index, axis in enumerate('XYZ')]))
+
+    def get_local_rotation(self, node):
+        """
+        gets the rotation matrix of a transform's rotate and joint orient
+
+        :param node: the transform
+        :type: SceneNode
+
+        :return: the rotation matrix
+        :type: list
+        """
+        attrs = node.attrs
+        rotation = rotation_matrix([attrs['rotateX'], attrs['rotateY'],
+                                    attrs['rotateZ']], attrs['rotateOrder'])
+        if node.type == 'joint':
+            rotation = mult_matrix(rotation, rotation_matrix(
+                [attrs['jointOrientX'], attrs['jointOrientY'], attrs['jointOrientZ']]))
+        return rotation
+
+    def set_world_matrix(self, node, matrix, keep_rotate=False):
+        """
+        sets a transform's channels so its world matrix is matrix
+
+        :param node: the transform
+        :type: SceneNode
+
+        :param matrix: the world matrix
+        :type: list
+
+        :param keep_rotate: joints keep their rotate and change their joint orient
+        :type: bool
+        """
+        local = mult_matrix(matrix, inverse_matrix(self.get_parent_matrix(node)))
+        self.set_local_matrix(node, local, keep_rotate)
+
+    def set_parent(self, node, parent, relative=False):
+        """
+        moves a node under another one
+
+        :param node: the node to move
+        :type: SceneNode
+
+        :param parent: the new parent, None for the world
+        :type: SceneNode
+
+        :param relative: keep the local values instead of the world position
+        :type: bool
+        """
+        check = parent
+        while check is not None:
+            if check is node:
+                raise RuntimeError('Cannot parent %s under itself or its children' %
+                                   node.name)
+            check = check.parent
+        if node.parent is parent:
+            return
+        world = None
+        if node.is_transform and not relative:
+            world = self.get_world_matrix(node)
+        if node.parent is not None:
+            node.parent.children.remove(node)
+        node.parent = parent
+        if parent is not None:
+            parent.children.append(node)
+        self.invalidate(node)
+        if world is not None:
+            self.set_world_matrix(node, world, keep_rotate=True)
+
+    def freeze(self, node, translate, rotate, scale, parent_bake=None):
+        """
+        puts a transform's values into its shapes and children like makeIdentity -apply
+
+        :param node: the node
+        :type: SceneNode
+
+        :param translate: freeze the translation
+        :type: bool
+
+        :param rotate: freeze the rotation
+        :type: bool
+
+        :param scale: freeze the scale
+        :type: bool
+
+        :param parent_bake: what the frozen parent passes down
+        :type: list
+        """
+        if node.is_shape:
+            if parent_bake is not None:
+                self.bake_shape(node, parent_bake)
+            return
+        if not node.is_transform:
+            return
+
+        old_local = self.get_local_matrix(node)
+        full = old_local if parent_bake is None else mult_matrix(old_local, parent_bake)
+        full_scale, full_rotation, full_translation = decompose_matrix(full)
+        channels = {}
+        if node.type == 'joint':
+            #joints keep their translation and put their rotation in the joint orient
+            if rotate:
+                for axis, value in zip('XYZ', matrix_to_euler(full_rotation)):
+                    channels['jointOrient' + axis] = value
+                    channels['rotate' + axis] = 0.0
+            else:
+                channels.update(self.set_local_rotation(node, full_rotation, True))
+            for index, axis in enumerate('XYZ'):
+                channels['translate' + axis] = full_translation[index]
+                channels['scale' + axis] = 1.0 if scale else full_scale[index]
+        else:
+            euler = matrix_to_euler(full_rotation, node.attrs['rotateOrder'])
+            for index, axis in enumerate('XYZ'):
+                channels['translate' + axis] = 0.0 if translate else \
+                    full_translation[index]
+                channels['rotate' + axis] = 0.0 if rotate else euler[index]
+                channels['scale' + axis] = 1.0 if scale else full_scale[index]
+            if rotate and scale:
+                #the pivots stay where they are in the world
+                for pivot in ['rotatePivot', 'scalePivot']:
+                    position = transform_point([node.attrs[pivot + axis]
+                                                for axis in 'XYZ'], full)
+                    for index, axis in enumerate('XYZ'):
+                        channels[pivot + axis] = position[index]
+                        channels[pivot + 'Translate' + axis] = 0.0
+                if not translate:
+                    for index, axis in enumerate('XYZ'):
+                        channels['rotatePivot' + axis] -= channels['translate' + axis]
+                        channels['scalePivot' + axis] -= channels['translate' + axis]
+        self.set_channels(node, channels)
+
+        bake = mult_matrix(full, inverse_matrix(self.get_local_matrix(node)))
+        if is_identity(bake):
+            bake = None
+        for child in list(node.children):
+            self.freeze(child, translate, rotate, scale, bake)
+
+    def bake_shape(self, node, matrix):
+        """
+        moves the points of a shape by a matrix
+
+        :param node: the shape
+        :type: SceneNode
+
+        :param matrix: the matrix
+        :type: list
+        """
+        if 'cvs' in node.data:
+            node.data['cvs'] = [transform_point(cv, matrix) for cv in node.data['cvs']]
+        if 'rows' in node.data:
+            node.data['rows'] = [[transform_point(cv, matrix) for cv in row]
+                                 for row in node.data['rows']]
+        if node.type == 'locator':
+            position = transform_point([node.attrs.get('localPosition' + axis, 0.0)
+                                        for axis in 'XYZ'], matrix)
+            for index, axis in enumerate('XYZ'):
+                node.attrs['localPosition' + axis] = position[index]
+
+    def get_shape_points(self, node, space=None):
+        """
+        gets the points of the shapes at and under a node
+
+        :param node: the node
+        :type: SceneNode
+
+        :param space: matrix to put the points in, None for world space
+        :type: list
+
+        :return: the points
+        :type: list
+        """
+        points = []
+        for item in [node] + self.get_descendants(node):
+            if not item.is_shape:
+                continue
+            item_points = list(item.data.get('cvs', []))
+            for row in item.data.get('rows', []):
+                item_points.extend(row)
+            if item.type == 'locator':
+                item_points.append([item.attrs.get('localPosition' + axis, 0.0)
+                                    for axis in 'XYZ'])
+            matrix = self.get_world_matrix(item)
+            if space is not None:
+                matrix = mult_matrix(matrix, space)
+            points.extend([transform_point(point, matrix) for point in item_points])
+        return points
+
+    def is_locked(self, node, attr):
+        """
+        checks if an attribute, its compound or one of its children is locked
+
+        :param node: the node
+        :type: SceneNode
+
+        :param attr: long attribute name
+        :type: str
+
+        :return: if it is locked
+        :type: bool
+        """
+        if not node.locked:
+            return False
+        if attr in node.locked or COMPOUND_PARENTS.get(attr) in node.locked:
+            return True
+        for child_attr in COMPOUND_ATTRS.get(attr, []):
+            if child_attr in node.locked:
+                return True
+        return False
+
+    def is_connected(self, node, attr):
+        """
+        checks if an attribute, its compound or one of its children has an input
+
+        :param node: the node
+        :type: SceneNode
+
+        :param attr: long attribute name
+        :type: str
+
+        :return: if it is driven
+        :type: bool
+        """
+        if not node.inputs:
+            return False
+        if attr in node.inputs or COMPOUND_PARENTS.get(attr) in node.inputs:
+            return True
+        for child_attr in COMPOUND_ATTRS.get(attr, []):
+            if child_attr in node.inputs:
+                return True
+        return False
+
+    def has_attr(self, node, attr):
+        """
+        checks if a node has an attribute, nodes that arent strict have everything
+
+        :param node: the node
+        :type: SceneNode
+
+        :param attr: long attribute name
+        :type: str
+
+        :return: if it has it
+        :type: bool
+        """
+        base = get_base_attr(attr)
+        if base in node.attrs or base == 'message':
+            return True
+        if base in COMPOUND_ATTRS:
+            return not node.is_strict or COMPOUND_ATTRS[base][0] in node.attrs
+        if node.is_dag and base in MATRIX_PLUGS:
+            return True
+        return not node.is_strict
+
+    def get_attr(self, node, attr):
+        """
+        gets the value of an attribute
+
+        :param node: the node
+        :type: SceneNode
+
+        :param attr: long attribute name
+        :type: str
+
+        :return: the value, compounds come back as [(x, y, z)]
+        :type: object
+        """
+        if node.is_dag and get_base_attr(attr) in MATRIX_PLUGS:
+            base = get_base_attr(attr)
+            if base == 'matrix':
+                return list(self.get_local_matrix(node))
+            if base == 'worldMatrix':
+                return list(self.get_world_matrix(node))
+            if base == 'worldInverseMatrix':
+                return inverse_matrix(self.get_world_matrix(node))
+            if base == 'parentMatrix':
+                return list(self.get_parent_matrix(node))
+            return inverse_matrix(self.get_parent_matrix(node))
+        if attr in COMPOUND_ATTRS and COMPOUND_ATTRS[attr][0] in node.attrs:
+            return [tuple([node.attrs[child_attr]
+                           for child_attr in COMPOUND_ATTRS[attr]])]
+        if attr in node.attrs:
+            value = node.attrs[attr]
+            return list(value) if isinstance(value, list) else value
+        if not self.has_attr(node, attr):
+            raise ValueError('No object matches name: %s.%s' % (node.name, attr))
+        return 0.0
+
+    def set_attr(self, node, attr, value, check=True):
+        """
+        sets the value of an attribute
+
+        :param node: the node
+        :type: SceneNode
+
+        :param attr: long attribute name
+        :type: str
+
+        :param value: the value, compounds take a list of three
+        :type: object
+
+        :param check: error like maya if the attribute is locked or connected
+        :type: bool
+        """
+        if check:
+            if not self.has_attr(node, attr):
+                raise ValueError('No object matches name: %s.%s' % (node.name, attr))
+            if self.is_locked(node, attr) or self.is_connected(node, attr):
+                raise RuntimeError('setAttr: The attribute \'%s.%s\' is locked or '
+                                   'connected and cannot be modified.' %
+                                   (node.name, attr))
+        if attr in COMPOUND_ATTRS and (COMPOUND_ATTRS[attr][0] in node.attrs or
+                                       not node.is_strict):
+            for child_attr, child_value in zip(COMPOUND_ATTRS[attr], value):
+                self.set_attr(node, child_attr, child_value, False)
+            return
+        attr_type = node.attr_types.get(attr)
+        if attr_type == 'bool' or isinstance(node.attrs.get(attr), bool):
+            value = bool(value)
+        elif attr_type in ('enum', 'long', 'short') or attr == 'rotateOrder':
+            value = int(value)
+        elif isinstance(value, int) and not isinstance(value, bool) and \
+                attr_type != 'string':
+            value = float(value)
+        node.attrs[attr] = value
+        if attr in MATRIX_ATTRS and node.is_transform:
+            self.invalidate(node)
+
+    def connect(self, source, source_attr, destination, destination_attr, force=False):
+        """
+        connects two attributes
+
+        :param source: the node the value comes from
+        :type: SceneNode
+
+        :param source_attr: long attribute name on the source
+        :type: str
+
+        :param destination: the node the value goes to
+        :type: SceneNode
+
+        :param destination_attr: long attribute name on the destination
+        :type: str
+
+        :param force: replace a connection the destination already has
+        :type: bool
+        """
+        for node, attr in [(source, source_attr), (destination, destination_attr)]:
+            if not self.has_attr(node, attr):
+                raise ValueError('No object matches name: %s.%s' % (node.name, attr))
+        current = destination.inputs.get(destination_attr)
+        if current == (source, source_attr):
+            return
+        if self.is_locked(destination, destination_attr):
+            raise RuntimeError('The destination attribute \'%s.%s\' is locked and '
+                               'cannot be connected.' %
+                               (destination.name, destination_attr))
+        if current is not None:
+            if not force:
+                raise RuntimeError('\'%s.%s\' already has an incoming connection from '
+                                   '\'%s.%s\'.' % (destination.name, destination_attr,
+                                                   current[0].name, current[1]))
+            self.disconnect(current[0], current[1], destination, destination_attr)
+        destination.inputs[destination_attr] = (source, source_attr)
+        source.outputs.setdefault(source_attr, []).append((destination,
+                                                           destination_attr))
+
+    def disconnect(self, source, source_attr, destination, destination_attr):
+        """
+        breaks a connection
+
+        :param source: the node the value comes from
+        :type: SceneNode
+
+        :param source_attr: long attribute name on the source
+        :type: str
+
+        :param destination: the node the value goes to
+        :type: SceneNode
+
+        :param destination_attr: long attribute name on the destination
+        :type: str
+        """
+        if destination.inputs.get(destination_attr) != (source, source_attr):
+            raise RuntimeError('There is no connection from \'%s.%s\' to \'%s.%s\' to '
+                               'disconnect' % (source.name, source_attr,
+                                               destination.name, destination_attr))
+        del destination.inputs[destination_attr]
+        source.outputs[source_attr].remove((destination, destination_attr))
+        if not source.outputs[source_attr]:
+            del source.outputs[source_attr]
+
+    def constrain(self, constraint_type, targets, node, flags):
+        """
+        makes a constraint, moves the node to its targets like maya does when the
+        constraint is made and connects the constraint to the node's channels
+
+        :param constraint_type: the constraint node type
+        :type: str
+
+        :param targets: the nodes that drive it
+        :type: list
+
+        :param node: the node being constrained
+        :type: SceneNode
+
+        :param flags: the constraint command's flags by long name
+        :type: dict
+
+        :return: the constraint
+        :type: SceneNode
+        """
+        channels = {'parentConstraint': ['translate', 'rotate'],
+                    'pointConstraint': ['translate'],
+                    'orientConstraint': ['rotate'],
+                    'aimConstraint': ['rotate'],
+                    'scaleConstraint': ['scale']}[constraint_type]
+        skips = {'translate': flags.get('skipTranslate', flags.get('skip', [])),
+                 'rotate': flags.get('skipRotate', flags.get('skip', [])),
+                 'scale': flags.get('skip', [])}
+        allowed = []
+        for channel in channels:
+            for axis in 'XYZ':
+                if axis.lower() not in flatten([skips[channel]]) and \
+                        'none' not in flatten([skips[channel]]) and \
+                        not self.is_locked(node, channel + axis):
+                    allowed.append(channel + axis)
+
+        offsets = {}
+        if flags.get('maintainOffset'):
+            offsets = self.get_constraint_offsets(constraint_type, targets, node, flags)
+        else:
+            goal = self.get_constraint_goal(constraint_type, targets, node, flags)
+            self.set_channels(node, dict([(attr, goal[attr]) for attr in allowed
+                                          if attr in goal]))
+
+        name = flags.get('name') or '%s_%s1' % (node.name, constraint_type)
+        constraint = self.create_node(constraint_type, name, node)
+        constraint.attrs.update(offsets)
+        if constraint_type == 'aimConstraint':
+            #keep the vectors so the constraint aims the same way when maya builds it
+            up_type = flags.get('worldUpType', 'vector')
+            constraint.attrs.update({
+                'aimVector': [float(value) for value in
+                              flags.get('aimVector', (1.0, 0.0, 0.0))],
+                'upVector': [float(value) for value in
+                             flags.get('upVector', (0.0, 1.0, 0.0))],
+                'worldUpVector': [float(value) for value in
+                                  flags.get('worldUpVector', (0.0, 1.0, 0.0))],
+                'worldUpType': WORLD_UP_TYPES.index(up_type)})
+            if up_type in ('object', 'objectrotation'):
+                self.connect(self.get_node(flags['worldUpObject']), 'worldMatrix[0]',
+                             constraint, 'worldUpMatrix')
+        for index, target in enumerate(targets):
+            weight_attr = '%sW%d' % (target.name, index)
+            constraint.attrs[weight_attr] = float(flags.get('weight', 1.0))
+            constraint.attr_types[weight_attr] = 'double'
+            constraint.user_attrs.append(weight_attr)
+            target_plug = 'target[%d].' % index
+            self.connect(target, 'parentMatrix[0]', constraint,
+                         target_plug + 'targetParentMatrix')
+            self.connect(constraint, weight_attr, constraint,
+                         target_plug + 'targetWeight')
+        self.connect(node, 'parentInverseMatrix[0]', constraint,
+                     'constraintParentInverseMatrix')
+        for attr in allowed:
+            self.connect(constraint, 'constraint' + attr[0].upper() + attr[1:], node,
+                         attr)
+        return constraint
+
+    def get_constraint_goal(self, constraint_type, targets, node, flags):
+        """
+        works out the channels that put a node where a new constraint puts it
+
+        :param constraint_type: the constraint node type
+        :type: str
+
+        :param targets: the nodes that drive it
+        :type: list
+
+        :param node: the node being constrained
+        :type: SceneNode
+
+        :param flags: the constraint command's flags by long name
+        :type: dict
+
+        :return: {long attribute name: value}
+        :type: dict
+        """
+        goal = {}
+        parent_matrix = self.get_parent_matrix(node)
+        parent_inverse = inverse_matrix(parent_matrix)
+        positions = [self.get_pivot_position(target) for target in targets]
+        position = [sum([point[index] for point in positions]) / len(positions)
+                    for index in range(3)]
+
+        if constraint_type in ('parentConstraint', 'pointConstraint'):
+            local = transform_point(position, parent_inverse)
+            for index, axis in enumerate('XYZ'):
+                if node.type != 'joint':
+                    local[index] -= (node.attrs['rotatePivot' + axis] +
+                                     node.attrs['rotatePivotTranslate' + axis])
+                goal['translate' + axis] = local[index]
+
+        world_rotation = None
+        if constraint_type in ('parentConstraint', 'orientConstraint'):
+            world_rotation = self.get_world_rotation(targets[0])
+        elif constraint_type == 'aimConstraint':
+            world_rotation = self.get_aim_rotation(node, position, flags)
+        if world_rotation is not None:
+            parent_rotation = decompose_matrix(parent_matrix)[1]
+            local_rotation = mult_matrix(world_rotation, inverse_matrix(parent_rotation))
+            goal.update(self.set_local_rotation(node, local_rotation))
+
+        if constraint_type == 'scaleConstraint':
+            target_scale = decompose_matrix(self.get_world_matrix(targets[0]))[0]
+            parent_scale = decompose_matrix(parent_matrix)[0]
+            for index, axis in enumerate('XYZ'):
+                goal['scale' + axis] = target_scale[index] / (parent_scale[index] or 1.0)
+        return goal
+
+    def get_constraint_offsets(self, constraint_type, targets, node, flags):
+        """
+        works out the offsets maya keeps on a constraint made with maintainOffset, so
+        the node stays where it is
+
+        :param constraint_type: the constraint node type
+        :type: str
+
+        :param targets: the nodes that drive it
+        :type: list
+
+        :param node: the node being constrained
+        :type: SceneNode
+
+        :param flags: the constraint command's flags by long name
+        :type: dict
+
+        :return: {long attribute name on the constraint: value}
+        :type: dict
+        """
+        offsets = {}
+        if constraint_type == 'parentConstraint':
+            #each target keeps where the node is in its space
+            world_matrix = self.get_world_matrix(node)
+            for index, target in enumerate(targets):
+                offset = mult_matrix(world_matrix,
+                                     inverse_matrix(self.get_world_matrix(target)))
+                rotation = matrix_to_euler(decompose_matrix(offset)[1])
+                for axis_index, axis in enumerate('XYZ'):
+                    plug = 'target[%d].targetOffset' % index
+                    offsets[plug + 'Translate' + axis] = offset[12 + axis_index]
+                    offsets[plug + 'Rotate' + axis] = rotation[axis_index]
+            return offsets
+
+        goal = self.get_constraint_goal(constraint_type, targets, node, flags)
+        if constraint_type == 'pointConstraint':
+            for axis in 'XYZ':
+                offsets['offset' + axis] = node.attrs['translate' + axis] - \
+                    goal['translate' + axis]
+        elif constraint_type == 'scaleConstraint':
+            for axis in 'XYZ':
+                offsets['offset' + axis] = node.attrs['scale' + axis] / \
+                    (goal['scale' + axis] or 1.0)
+        else:
+            if constraint_type == 'orientConstraint':
+                target_rotation = self.get_world_rotation(targets[0])
+            else:
+                positions = [self.get_pivot_position(target) for target in targets]
+                target_rotation = self.get_aim_rotation(
+                    node, [sum([point[index] for point in positions]) / len(positions)
+                           for index in range(3)], flags)
+            if target_rotation is not None:
+                rotation = matrix_to_euler(mult_matrix(self.get_world_rotation(node),
+                                                       inverse_matrix(target_rotation)))
+                for index, axis in enumerate('XYZ'):
+                    offsets['offset' + axis] = rotation[index]
+        return offsets
+
+    def get_aim_rotation(self, node, position, flags):
+        """
+        works out the world rotation an aim constraint gives a node
+
+        :param node: the node being constrained
+        :type: SceneNode
+
+        :param position: where it aims
+        :type: list
+
+        :param flags: the aimConstraint flags by long name
+        :type: dict
+
+        :return: rotation matrix, None if the node is on the target
+        :type: list
+        """
+        origin = self.get_pivot_position(node)
+        aim = normalize_vector([position[index] - origin[index] for index in range(3)])
+        if not any(aim):
+            return None
+        up_type = flags.get('worldUpType', 'vector')
+        world_up = list(flags.get('worldUpVector', (0.0, 1.0, 0.0)))
+        if up_type == 'scene':
+            world_up = [0.0, 1.0, 0.0]
+        elif up_type == 'object':
+            up_position = self.get_pivot_position(
+                self.get_node(flags['worldUpObject']))
+            world_up = [up_position[index] - origin[index] for index in range(3)]
+        elif up_type == 'objectrotation':
+            world_up = transform_vector(world_up, self.get_world_matrix(
+                self.get_node(flags['worldUpObject'])))
+
+        #the frame that lines the aim vector up with aim and the up vector with up
+        side = normalize_vector(cross_product(aim, world_up))
+        if not any(side):
+            return None
+        up = cross_product(side, aim)
+        aim_vector = normalize_vector(list(flags.get('aimVector', (1.0, 0.0, 0.0))))
+        up_vector = list(flags.get('upVector', (0.0, 1.0, 0.0)))
+        up_vector = normalize_vector([up_vector[index] - aim_vector[index] *
+                                      sum([a * b for a, b in zip(up_vector, aim_vector)])
+                                      for index in range(3)])
+        side_vector = cross_product(aim_vector, up_vector)
+        local_frame = aim_vector + [0.0] + up_vector + [0.0] + side_vector + [0.0] + \
+            [0.0, 0.0, 0.0, 1.0]
+        world_frame = aim + [0.0] + up + [0.0] + side + [0.0] + [0.0, 0.0, 0.0, 1.0]
+        return mult_matrix(inverse_matrix(local_frame), world_frame)
+
+    def get_closest_uv(self, node):
+        """
+        works out the surface parameters a closestPointOnSurface node gives back
+
+        :param node: the closestPointOnSurface node
+        :type: SceneNode
+
+        :return: [u, v, position]
+        :type: list
+        """
+        source = node.inputs.get('inputSurface')
+        if source is None:
+            return [0.0, 0.0, [0.0, 0.0, 0.0]]
+        surface = source[0]
+        matrix = self.get_world_matrix(surface)
+        rows = [[transform_point(cv, matrix) for cv in row]
+                for row in surface.data['rows']]
+        degree = surface.data['degree']
+        knots = surface.data['knots']
+        point = [node.attrs.get('inPosition' + axis, 0.0) for axis in 'XYZ']
+
+        #the surface is ruled between two curves, get the closest v for each u
+        def closest_at(param):
+            start = evaluate_curve(rows[0], degree, knots, param)
+            end = evaluate_curve(rows[-1], degree, knots, param)
+            direction = [end[index] - start[index] for index in range(3)]
+            length = sum([value * value for value in direction])
+            v_param = 0.0
+            if length > 1e-12:
+                v_param = sum([(point[index] - start[index]) * direction[index]
+                               for index in range(3)]) / length
+                v_param = min(max(v_param, 0.0), 1.0)
+            position = [start[index] + direction[index] * v_param for index in range(3)]
+            distance = sum([(position[index] - point[index]) ** 2 for index in range(3)])
+            return [distance, param, v_param, position]
+
+        low, high = knots[0], knots[-1]
+        samples = max(int(high - low), 1) * 16
+        step = (high - low) / samples
+        best = min([closest_at(low + step * index) for index in range(samples + 1)])
+        low, high = max(best[1] - step, knots[0]), min(best[1] + step, knots[-1])
+        for index in range(40):
+            third = (high - low) / 3.0
+            if closest_at(low + third)[0] < closest_at(high - third)[0]:
+                high -= third
+            else:
+                low += third
+        best = min(best, closest_at((low + high) / 2.0))
+        if surface.data.get('swap_uv'):
+            return [best[2], best[1], best[3]]
+        return [best[1], best[2], best[3]]
+
+    def set_time(self, time):
+        """
+        moves to a frame and puts the keyed values into their attributes
+
+        :param time: the frame
+        :type: float
+        """
+        self.time = float(time)
+        for node in list(self.nodes.values()):
+            keys = node.data.get('keys')
+            if not keys:
+                continue
+            frames = sorted(keys)
+            if self.time <= frames[0]:
+                value = keys[frames[0]]
+            elif self.time >= frames[-1]:
+                value = keys[frames[-1]]
+            else:
+                index = 1
+                while frames[index] < self.time:
+                    index += 1
+                start, end = frames[index - 1], frames[index]
+                blend = (self.time - start) / (end - start)
+                value = keys[start] + (keys[end] - keys[start]) * blend
+            for destination, destination_attr in node.outputs.get('output', []):
+                self.set_attr(destination, destination_attr, value, False)
+
+class SceneCmds(object):
+    """
+    the maya.cmds calls the auto rigger makes, answered from an in memory Scene
+    """
+    def __init__(self):
+        self.scene = Scene()
+        self.undo_state = True
+        self.undo_chunks = 0
+        self.evaluation_mode = 'parallel'
+        self.suspended = False
+
+    def get_nodes(self, args):
+        """
+        gets the nodes named in a command's arguments, or the selection if there are none
+
+        :param args: the command's arguments
+        :type: list
+
+        :return: the nodes
+        :type: list
+        """
+        names = flatten(args)
+        if not names:
+            return list(self.scene.selection)
+        return [self.scene.get_node(name) for name in names]
+
+    def get_name(self, node, full_path=False):
+        """
+        gets the name a command gives back for a node
+
+        :param node: the node
+        :type: SceneNode
+
+        :param full_path: give the full path of dag nodes
+        :type: bool
+
+        :return: the name
+        :type: str
+        """
+        if full_path:
+            return self.scene.get_path(node)
+        return node.name
+
+    def select_nodes(self, nodes):
+        """
+        sets the selection the way the creation commands do
+
+        :param nodes: the nodes to select
+        :type: list
+        """
+        self.scene.selection = list(nodes)
+
+    def get_components(self, name):
+        """
+        gets the shape and cv indices of a component name like 'curve1.cv[0:7]', a
+        surface cv like 'surface1.cv[2][1]' gets its [u, v] pair
+
+        :param name: the component name
+        :type: str
+
+        :return: [shape node, indices] or None if it isnt a component
+        :type: list
+        """
+        match = re.match(r'(.+)\.cv\[(\d+)\]\[(\d+)\]$', name)
+        if match is not None:
+            node = self.scene.get_node(match.group(1))
+            if not node.is_shape:
+                shapes = [child for child in node.children if 'rows' in child.data]
+                if not shapes:
+                    raise ValueError('No object matches name: %s' % name)
+                node = shapes[0]
+            return [node, [(int(match.group(2)), int(match.group(3)))]]
+        match = re.match(r'(.+)\.cv\[(\*|\d+)(?::(\d+))?\]$', name)
+        if match is None:
+            return None
+        node = self.scene.get_node(match.group(1))
+        if not node.is_shape:
+            shapes = [child for child in node.children if 'cvs' in child.data]
+            if not shapes:
+                raise ValueError('No object matches name: %s' % name)
+            node = shapes[0]
+        if match.group(2) == '*':
+            return [node, list(range(len(node.data['cvs'])))]
+        start = int(match.group(2))
+        end = int(match.group(3)) if match.group(3) else start
+        return [node, list(range(start, end + 1))]
+
+    def make_shape(self, transform, shape_type):
+        """
+        makes a shape under a transform with the name maya would give it
+
+        :param transform: the transform
+        :type: SceneNode
+
+        :param shape_type: type of the shape
+        :type: str
+
+        :return: the shape
+        :type: SceneNode
+        """
+        return self.scene.create_node(shape_type, get_shape_name(transform.name),
+                                      transform)
+
+    def addAttr(self, *args, **kwargs):
+        """
+        adds an attribute, bool, enum, string and number types are kept
+        """
+        flags = get_flags('addAttr', kwargs)
+        for node in self.get_nodes(args):
+            attr = flags['longName']
+            if attr in node.attrs or attr in COMPOUND_ATTRS:
+                raise RuntimeError('Found a conflict with the attribute name \'%s\' on '
+                                   '%s' % (attr, node.name))
+            attr_type = flags.get('attributeType', flags.get('dataType', 'double'))
+            default = flags.get('defaultValue')
+            if attr_type == 'string':
+                value = default
+            elif attr_type == 'bool':
+                value = bool(default)
+            elif attr_type in ('enum', 'long', 'short'):
+                value = int(default or 0)
+            else:
+                value = float(default or 0.0)
+            node.attrs[attr] = value
+            node.attr_types[attr] = attr_type
+            node.user_attrs.append(attr)
+            if attr_type == 'enum':
+                node.data.setdefault('enums', {})[attr] = flags.get('enumName', '')
+            if flags.get('keyable'):
+                node.hidden_channels[attr] = [True, True]
+
+    def aimConstraint(self, *args, **kwargs):
+        """
+        makes an aimConstraint, the aim and up vectors and worldUpType are used
+        """
+        return self.make_constraint('aimConstraint', args, kwargs)
+
+    def attributeQuery(self, attr, **kwargs):
+        """
+        answers exists, attributeType and keyable
+        """
+        flags = get_flags('attributeQuery', kwargs)
+        node = self.scene.get_node(flags['node'])
+        attr = get_long_attr(attr)
+        if flags.get('exists'):
+            return attr in node.attrs or (attr in COMPOUND_ATTRS and
+                                          COMPOUND_ATTRS[attr][0] in node.attrs)
+        if flags.get('attributeType'):
+            return node.attr_types.get(attr, 'double')
+        if flags.get('keyable'):
+            return self.getAttr(node.name + '.' + attr, keyable=True)
+        raise RuntimeError('attributeQuery needs exists, attributeType or keyable')
+
+    def circle(self, *args, **kwargs):
+        """
+        makes a nurbs circle with maya's cvs and a makeNurbCircle history node
+        """
+        flags = get_flags('circle', kwargs)
+        radius = float(flags.get('radius', 1.0))
+        center = list(flags.get('center', (0.0, 0.0, 0.0)))
+        normal = normalize_vector(list(flags.get('normal', (0.0, 0.0, 1.0))))
+        sections = int(flags.get('sections', 8))
+        #the plane of the circle, maya's default lies flat on z
+        helper = [0.0, 0.0, 1.0] if abs(normal[2]) < 0.9 else [1.0, 0.0, 0.0]
+        first_axis = normalize_vector(cross_product(helper, normal))
+        second_axis = cross_product(normal, first_axis)
+        if abs(normal[2]) > 0.9:
+            first_axis, second_axis = [1.0, 0.0, 0.0], [0.0, normal[2] > 0 and 1.0 or
+                                                        -1.0, 0.0]
+        if sections == 8:
+            points = CIRCLE_POINTS
+        else:
+            points = [(1.108194 * math.cos(2 * math.pi * index / sections),
+                       1.108194 * math.sin(2 * math.pi * index / sections), 0.0)
+                      for index in range(sections)]
+        cvs = [[center[index] + radius * (x * first_axis[index] + y * second_axis[index])
+                for index in range(3)] for x, y, z in points]
+
+        transform = self.scene.create_node('transform', flags.get('name', 'nurbsCircle1'))
+        shape = self.make_shape(transform, 'nurbsCurve')
+        shape.data.update({'cvs': cvs, 'degree': int(flags.get('degree', 3)),
+                           'form': 'periodic'})
+        history = self.scene.create_node('makeNurbCircle')
+        history.attrs.update({'radius': radius, 'sections': sections})
+        self.scene.connect(history, 'outputCurve', shape, 'create')
+        shape.data['history'] = [history]
+        self.select_nodes([transform])
+        return [transform.name, history.name]
+
+    def cluster(self, *args, **kwargs):
+        """
+        makes a cluster and its handle, the handle's pivot is the middle of the cvs
+        """
+        flags = get_flags('cluster', kwargs)
+        members = []
+        for name in flatten(args):
+            components = self.get_components(name)
+            if components is None:
+                node = self.scene.get_node(name)
+                shapes = [node] if node.is_shape else [child for child in node.children
+                                                      if 'cvs' in child.data]
+                components = [shapes[0], list(range(len(shapes[0].data['cvs'])))]
+            members.append(components)
+        points = []
+        for shape, indices in members:
+            matrix = self.scene.get_world_matrix(shape)
+            points.extend([transform_point(shape.data['cvs'][index], matrix)
+                           for index in indices])
+        center = [sum([point[index] for point in points]) / len(points)
+                  for index in range(3)]
+
+        deformer = self.scene.create_node('cluster', flags.get('name', 'cluster1'))
+        handle = self.scene.create_node('transform', deformer.name + 'Handle')
+        handle_shape = self.make_shape(handle, 'clusterHandle')
+        for index, axis in enumerate('XYZ'):
+            handle.attrs['rotatePivot' + axis] = center[index]
+            handle.attrs['scalePivot' + axis] = center[index]
+            handle_shape.attrs['origin' + axis] = center[index]
+        deformer.data['members'] = members
+        handle.data['dependents'] = [deformer]
+        self.scene.connect(handle, 'worldMatrix[0]', deformer, 'matrix')
+        self.select_nodes([handle])
+        return [deformer.name, handle.name]
+
+    def connectAttr(self, source, destination, **kwargs):
+        """
+        connects two plugs
+        """
+        flags = get_flags('connectAttr', kwargs)
+        source_node, source_attr = self.scene.get_plug(source)
+        destination_node, destination_attr = self.scene.get_plug(destination)
+        self.scene.connect(source_node, source_attr, destination_node, destination_attr,
+                           flags.get('force', False))
+
+    def createNode(self, node_type, **kwargs):
+        """
+        makes a node, a shape on its own gets a transform like in maya
+        """
+        flags = get_flags('createNode', kwargs)
+        parent = None
+        if flags.get('parent'):
+            parent = self.scene.get_node(flags['parent'])
+        if 'shape' in get_type_chain(node_type) and parent is None:
+            #a shape on its own gets a transform made for it
+            parent = self.scene.create_node('transform', node_type + '1')
+            node = self.make_shape(parent, node_type)
+            if flags.get('name'):
+                self.scene.rename_node(node, flags['name'])
+        else:
+            node = self.scene.create_node(node_type, flags.get('name'), parent)
+        if not flags.get('skipSelect'):
+            self.select_nodes([node])
+        return node.name
+
+    def currentTime(self, *args, **kwargs):
+        """
+        queries or moves the current frame
+        """
+        flags = get_flags('currentTime', kwargs)
+        if flags.get('query'):
+            return self.scene.time
+        self.scene.set_time(args[0])
+        return self.scene.time
+
+    def curve(self, *args, **kwargs):
+        """
+        makes an open nurbs curve from points
+        """
+        flags = get_flags('curve', kwargs)
+        points = [list(point) for point in flags['point']]
+        degree = int(flags.get('degree', 3))
+        if len(points) <= degree:
+            raise RuntimeError('curve: A degree %d curve needs at least %d points' %
+                               (degree, degree + 1))
+        knots = flags.get('knot') or get_knots(len(points), degree)
+        transform = self.scene.create_node('transform', flags.get('name', 'curve1'))
+        shape = self.make_shape(transform, 'nurbsCurve')
+        shape.data.update({'cvs': points, 'degree': degree,
+                           'knots': [float(knot) for knot in knots], 'form': 'open'})
+        self.select_nodes([transform])
+        return transform.name
+
+    def delete(self, *args, **kwargs):
+        """
+        deletes nodes or their construction history
+        """
+        flags = get_flags('delete', kwargs)
+        nodes = self.get_nodes(args)
+        if flags.get('constructionHistory'):
+            history = []
+            for node in nodes:
+                for item in [node] + node.children:
+                    history.extend(item.data.pop('history', []))
+            self.scene.delete_nodes(history)
+            return
+        self.scene.delete_nodes(nodes)
+
+    def deleteAttr(self, *args, **kwargs):
+        """
+        deletes an attribute that addAttr made
+        """
+        flags = get_flags('deleteAttr', kwargs)
+        if flags.get('attribute'):
+            node, attr = self.scene.get_node(args[0]), flags['attribute']
+        else:
+            node, attr = self.scene.get_plug(args[0])
+        if attr not in node.user_attrs:
+            raise RuntimeError('Cannot delete %s.%s, it isnt a dynamic attribute' %
+                               (node.name, attr))
+        for source, source_attr in [node.inputs[attr]] if attr in node.inputs else []:
+            self.scene.disconnect(source, source_attr, node, attr)
+        for destination, destination_attr in list(node.outputs.get(attr, [])):
+            self.scene.disconnect(node, attr, destination, destination_attr)
+        node.user_attrs.remove(attr)
+        node.locked.discard(attr)
+        node.hidden_channels.pop(attr, None)
+        del node.attrs[attr]
+        del node.attr_types[attr]
+
+    def disconnectAttr(self, source, destination, **kwargs):
+        """
+        breaks a connection between two plugs
+        """
+        get_flags('disconnectAttr', kwargs)
+        source_node, source_attr = self.scene.get_plug(source)
+        destination_node, destination_attr = self.scene.get_plug(destination)
+        self.scene.disconnect(source_node, source_attr, destination_node,
+                              destination_attr)
+
+    def duplicate(self, *args, **kwargs):
+        """
+        copies nodes with everything under them, connections arent copied
+        """
+        flags = get_flags('duplicate', kwargs)
+        roots = []
+        children = []
+        for node in self.get_nodes(args):
+            copies = {}
+            items = [node] if flags.get('parentOnly') else \
+                [node] + self.scene.get_descendants(node)
+            for item in items:
+                parent = copies.get(item.parent, item.parent)
+                if item is node:
+                    name = flags.get('name') or item.name
+                elif item.is_shape and item.name == get_shape_name(item.parent.name):
+                    name = get_shape_name(parent.name)
+                else:
+                    name = item.name
+                new_node = self.scene.create_node(item.type, name, parent)
+                new_node.attrs = copy.deepcopy(item.attrs)
+                new_node.attr_types = dict(item.attr_types)
+                new_node.user_attrs = list(item.user_attrs)
+                new_node.locked = set(item.locked)
+                new_node.hidden_channels = copy.deepcopy(item.hidden_channels)
+                for key in ['cvs', 'rows', 'degree', 'knots', 'form', 'enums']:
+                    if key in item.data:
+                        new_node.data[key] = copy.deepcopy(item.data[key])
+                copies[item] = new_node
+                if item is node:
+                    roots.append(new_node)
+                else:
+                    children.append(new_node)
+        self.select_nodes(roots)
+        #maya only lists the children when it renamed them
+        if flags.get('returnRootsOnly') or not flags.get('renameChildren'):
+            return [node.name for node in roots]
+        return [node.name for node in roots + children]
+
+    def evaluationManager(self, **kwargs):
+        """
+        queries or sets the evaluation mode, it is only stored
+        """
+        flags = get_flags('evaluationManager', kwargs)
+        if flags.get('query'):
+            return [self.evaluation_mode]
+        if 'mode' in flags:
+            self.evaluation_mode = flags['mode']
+
+    def exactWorldBoundingBox(self, *args, **kwargs):
+        """
+        gets the world bounding box of the shapes under the nodes
+        """
+        get_flags('exactWorldBoundingBox', kwargs)
+        points = []
+        for node in self.get_nodes(args):
+            points.extend(self.scene.get_shape_points(node))
+        if not points:
+            return [0.0] * 6
+        return ([min([point[index] for point in points]) for index in range(3)] +
+                [max([point[index] for point in points]) for index in range(3)])
+
+    def file(self, *args, **kwargs):
+        """
+        only makes a new scene
+        """
+        flags = get_flags('file', kwargs)
+        if flags.get('new'):
+            self.scene = Scene()
+            return 'untitled'
+        if flags.get('query') and flags.get('sceneName'):
+            return ''
+        raise RuntimeError('The scene backend only makes new scenes')
+
+    def getAttr(self, plug, **kwargs):
+        """
+        gets the value, lock, keyable, channelBox or type of an attribute
+        """
+        flags = get_flags('getAttr', kwargs)
+        node, attr = self.scene.get_plug(plug)
+        if flags.get('lock'):
+            return self.scene.is_locked(node, attr)
+        if flags.get('keyable') or flags.get('channelBox'):
+            keyable, channel_box = node.hidden_channels.get(
+                attr, [attr in TRANSFORM_ATTRS and attr not in
+                       ['rotateOrder', 'inheritsTransform', 'overrideEnabled',
+                        'overrideDisplayType', 'overrideColor', 'template'] and
+                       not attr.startswith('rotatePivot') and
+                       not attr.startswith('scalePivot'), False])
+            return keyable if flags.get('keyable') else channel_box
+        if flags.get('type'):
+            if attr in COMPOUND_ATTRS:
+                return 'double3'
+            return node.attr_types.get(attr, 'double')
+        if node.type == 'closestPointOnSurface' and attr in (
+                'parameterU', 'parameterV', 'position', 'positionX', 'positionY',
+                'positionZ', 'result.parameterU', 'result.parameterV'):
+            u_param, v_param, position = self.scene.get_closest_uv(node)
+            if attr.endswith('parameterU'):
+                return u_param
+            if attr.endswith('parameterV'):
+                return v_param
+            if attr == 'position':
+                return [tuple(position)]
+            return position['XYZ'.index(attr[-1])]
+        if 'rows' in node.data and attr in ('minMaxRangeU', 'minMaxRangeV'):
+            #the surface's u runs along its curves' knots and its v from 0 to 1
+            ranges = [(node.data['knots'][0], node.data['knots'][-1]), (0.0, 1.0)]
+            if node.data.get('swap_uv'):
+                ranges.reverse()
+            return [ranges[attr.endswith('V')]]
+        return self.scene.get_attr(node, attr)
+
+    def group(self, *args, **kwargs):
+        """
+        groups nodes or makes an empty group
+        """
+        flags = get_flags('group', kwargs)
+        parent = None
+        if flags.get('parent'):
+            parent = self.scene.get_node(flags['parent'])
+        nodes = [] if flags.get('empty') else self.get_nodes(args)
+        if nodes and not flags.get('world') and parent is None:
+            #the group goes where the first object was
+            parent = nodes[0].parent
+        group_node = self.scene.create_node('transform', flags.get('name', 'group1'),
+                                            parent)
+        for node in nodes:
+            self.scene.set_parent(node, group_node, flags.get('relative', False))
+        self.select_nodes([group_node])
+        return group_node.name
+
+    def ikHandle(self, *args, **kwargs):
+        """
+        makes an ik handle at the end joint and an effector, nothing is solved
+        """
+        flags = get_flags('ikHandle', kwargs)
+        start_joint = self.scene.get_node(flags['startJoint'])
+        end_joint = self.scene.get_node(flags['endEffector'])
+        handle = self.scene.create_node('ikHandle', flags.get('name', 'ikHandle1'))
+        position = self.scene.get_world_matrix(end_joint)[12:15]
+        effector = self.scene.create_node('ikEffector', 'effector1', end_joint.parent)
+        for index, axis in enumerate('XYZ'):
+            handle.attrs['translate' + axis] = position[index]
+            effector.attrs['translate' + axis] = end_joint.attrs['translate' + axis]
+        effector.attrs['visibility'] = False
+        effector.data['end_joint'] = end_joint
+        handle.data['solver'] = flags.get('solver', 'ikRPsolver')
+        for axis, value in zip('XYZ', [0.0, 0.0, 1.0]):
+            handle.attrs['poleVector' + axis] = value
+        self.scene.connect(start_joint, 'message', handle, 'startJoint')
+        self.scene.connect(effector, 'handlePath[0]', handle, 'endEffector')
+        self.select_nodes([handle])
+        return [handle.name, effector.name]
+
+    def joint(self, *args, **kwargs):
+        """
+        makes a joint under the selected joint or edits joints with orientJoint
+        """
+        flags = get_flags('joint', kwargs)
+        if flags.get('edit'):
+            for node in self.get_nodes(args):
+                if 'orientJoint' in flags:
+                    self.orient_joint(node, flags)
+                if 'position' in flags:
+                    self.scene.set_world_matrix(node, self.scene.get_world_matrix(
+                        node)[:12] + list(flags['position']) + [1.0], keep_rotate=True)
+                if 'radius' in flags:
+                    node.attrs['radius'] = float(flags['radius'])
+            return
+
+        selected = [node for node in self.scene.selection if node.type == 'joint']
+        parent = selected[0] if selected else None
+        node = self.scene.create_node('joint', flags.get('name', 'joint1'), parent)
+        if 'radius' in flags:
+            node.attrs['radius'] = float(flags['radius'])
+        if 'orientation' in flags:
+            for axis, value in zip('XYZ', flags['orientation']):
+                node.attrs['jointOrient' + axis] = float(value)
+        if 'position' in flags:
+            position = list(flags['position'])
+            if not flags.get('relative'):
+                position = transform_point(position, inverse_matrix(
+                    self.scene.get_parent_matrix(node)))
+            for axis, value in zip('XYZ', position):
+                node.attrs['translate' + axis] = value
+        self.scene.invalidate(node)
+        self.select_nodes([node])
+        return node.name
+
+    def orient_joint(self, node, flags):
+        """
+        points a joint's first axis at its child like joint -edit -orientJoint
+
+        :param node: the joint
+        :type: SceneNode
+
+        :param flags: the joint flags by long name
+        :type: dict
+        """
+        children = [child for child in node.children if child.type == 'joint']
+        targets = children[:1] if not flags.get('children') else children
+        world = self.scene.get_world_matrix(node)
+        if flags['orientJoint'] == 'none' or not targets:
+            rotation = decompose_matrix(world)[1]
+        else:
+            order = flags['orientJoint']
+            child_position = self.scene.get_world_matrix(targets[0])[12:15]
+            aim = normalize_vector([child_position[index] - world[12 + index]
+                                    for index in range(3)])
+            up_name = flags.get('secondaryAxisOrient', 'yup')
+            world_up = [0.0, 0.0, 0.0]
+            world_up['xyz'.index(up_name[0])] = -1.0 if up_name.endswith('down') else 1.0
+            third = normalize_vector(cross_product(aim, world_up))
+            second = cross_product(third, aim)
+            if order[1:2] == 'z':
+                third, second = [-value for value in second], third
+            axes = {}
+            axes[order[0]], axes[order[1]], axes[order[2]] = aim, second, third
+            rotation = axes['x'] + [0.0] + axes['y'] + [0.0] + axes['z'] + [0.0] + \
+                [0.0, 0.0, 0.0, 1.0]
+        children_worlds = [(child, self.scene.get_world_matrix(child))
+                           for child in node.children if child.is_transform]
+        parent_rotation = decompose_matrix(self.scene.get_parent_matrix(node))[1]
+        orient = matrix_to_euler(mult_matrix(rotation, inverse_matrix(parent_rotation)))
+        channels = {}
+        for axis, value in zip('XYZ', orient):
+            channels['jointOrient' + axis] = value
+            channels['rotate' + axis] = 0.0
+        self.scene.set_channels(node, channels)
+        for child, child_world in children_worlds:
+            self.scene.set_world_matrix(child, child_world, keep_rotate=True)
+
+    def listConnections(self, *args, **kwargs):
+        """
+        lists the nodes or plugs connected to a node or plug
+        """
+        flags = get_flags('listConnections', kwargs)
+        source = flags.get('source', True)
+        destination = flags.get('destination', True)
+        results = []
+        for name in flatten(args):
+            if '.' in name:
+                node, attr = self.scene.get_plug(name)
+                attrs = [attr]
+            else:
+                node = self.scene.get_node(name)
+                attrs = None
+            found = []
+            if source:
+                for attr, (other, other_attr) in node.inputs.items():
+                    if attrs is None or attr in attrs:
+                        found.append((attr, other, other_attr))
+            if destination:
+                for attr, outputs in node.outputs.items():
+                    if attrs is None or attr in attrs:
+                        found.extend([(attr, other, other_attr)
+                                      for other, other_attr in outputs])
+            for attr, other, other_attr in found:
+                if flags.get('type') and flags['type'] not in other.types:
+                    continue
+                if flags.get('connections'):
+                    results.append(node.name + '.' + attr)
+                if flags.get('plugs'):
+                    results.append(other.name + '.' + other_attr)
+                else:
+                    results.append(other.name)
+        return results or None
+
+    def listRelatives(self, *args, **kwargs):
+        """
+        lists the children, descendents, shapes or parent of nodes
+        """
+        flags = get_flags('listRelatives', kwargs)
+        node_types = flatten([flags.get('type', [])])
+        results = []
+        for node in self.get_nodes(args):
+            if flags.get('parent') or flags.get('allParents'):
+                relatives = [node.parent] if node.parent is not None else []
+            elif flags.get('allDescendents'):
+                #maya lists the deepest nodes first
+                relatives = list(reversed(self.scene.get_descendants(node)))
+            else:
+                relatives = list(node.children)
+            if flags.get('shapes'):
+                relatives = [relative for relative in relatives if relative.is_shape]
+            if node_types:
+                relatives = [relative for relative in relatives
+                             if set(node_types).intersection(relative.types)]
+            results.extend([self.get_name(relative, flags.get('fullPath') or
+                                          flags.get('path'))
+                            for relative in relatives])
+        return results or None
+
+    def loadPlugin(self, *args, **kwargs):
+        """
+        does nothing, the scene doesnt need plugins
+        """
+        get_flags('loadPlugin', kwargs)
+        return flatten(args)
+
+    def loft(self, *args, **kwargs):
+        """
+        makes a nurbs surface between curves and a loft history node
+        """
+        flags = get_flags('loft', kwargs)
+        curves = []
+        for node in self.get_nodes(args):
+            curves.extend([node] if node.is_shape else
+                          [child for child in node.children if 'cvs' in child.data])
+        rows = []
+        for shape in curves:
+            matrix = self.scene.get_world_matrix(shape)
+            rows.append([transform_point(cv, matrix) for cv in shape.data['cvs']])
+        transform = self.scene.create_node('transform', flags.get('name',
+                                                                  'loftedSurface1'))
+        shape = self.make_shape(transform, 'nurbsSurface')
+        shape.data.update({'rows': rows, 'degree': curves[0].data['degree'],
+                           'knots': list(curves[0].data.get('knots') or get_knots(
+                               len(rows[0]), curves[0].data['degree'])),
+                           'swap_uv': bool(flags.get('reverseSurfaceNormals'))})
+        history = self.scene.create_node('loft')
+        for index, curve_shape in enumerate(curves):
+            self.scene.connect(curve_shape, 'worldSpace[0]', history,
+                               'inputCurve[%d]' % index)
+        self.scene.connect(history, 'outputSurface', shape, 'create')
+        shape.data['history'] = [history]
+        self.select_nodes([transform])
+        return [transform.name, history.name]
+
+    def ls(self, *args, **kwargs):
+        """
+        lists nodes by name, wildcard, uuid, type or selection
+        """
+        flags = get_flags('ls', kwargs)
+        names = flatten(args)
+        if flags.get('selection'):
+            nodes = list(self.scene.selection)
+        elif not names:
+            nodes = list(self.scene.nodes.values())
+        else:
+            nodes = []
+            all_nodes = None
+            for name in names:
+                if name in self.scene.nodes:
+                    nodes.append(self.scene.nodes[name])
+                elif '*' in name or '?' in name:
+                    if all_nodes is None:
+                        all_nodes = list(self.scene.nodes.values())
+                    use_path = '|' in name
+                    nodes.extend([node for node in all_nodes if fnmatch.fnmatchcase(
+                        self.scene.get_path(node) if use_path else node.name, name)])
+                else:
+                    node = self.scene.find_node(name)
+                    if node is not None:
+                        nodes.append(node)
+
+        node_types = flatten([flags.get('type', [])])
+        if node_types:
+            nodes = [node for node in nodes if set(node_types).intersection(node.types)]
+        if flags.get('transforms'):
+            nodes = [node for node in nodes if node.is_transform]
+        if flags.get('shapes'):
+            nodes = [node for node in nodes if node.is_shape]
+        if flags.get('dagObjects'):
+            nodes = [node for node in nodes if node.is_dag]
+        if flags.get('assemblies'):
+            nodes = [node for node in nodes if node.is_dag and node.parent is None]
+        if flags.get('uuid'):
+            return [node.uuid for node in nodes]
+        return [self.get_name(node, flags.get('long')) for node in nodes]
+
+    def makeIdentity(self, *args, **kwargs):
+        """
+        freezes or resets transforms and everything under them
+        """
+        flags = get_flags('makeIdentity', kwargs)
+        #with no channel flags maya does all of them
+        channel_flags = [flags.get(channel) for channel in ['translate', 'rotate',
+                                                            'scale']]
+        if not [value for value in channel_flags if value is not None]:
+            channel_flags = [True, True, True]
+        translate, rotate, scale = [bool(value) for value in channel_flags]
+        for node in self.get_nodes(args):
+            if flags.get('apply'):
+                self.scene.freeze(node, translate, rotate, scale)
+                continue
+            channels = {}
+            for axis in 'XYZ':
+                if translate:
+                    channels['translate' + axis] = 0.0
+                if rotate:
+                    channels['rotate' + axis] = 0.0
+                    if node.type == 'joint' and flags.get('jointOrient'):
+                        channels['jointOrient' + axis] = 0.0
+                if scale:
+                    channels['scale' + axis] = 1.0
+            self.scene.set_channels(node, channels)
+
+    def make_constraint(self, constraint_type, args, kwargs):
+        """
+        makes a constraint for one of the constraint commands
+
+        :param constraint_type: the constraint node type
+        :type: str
+
+        :param args: the targets then the node being constrained
+        :type: list
+
+        :param kwargs: the command's flags
+        :type: dict
+
+        :return: [constraint name]
+        :type: list
+        """
+        flags = get_flags(constraint_type, kwargs)
+        nodes = self.get_nodes(args)
+        targets, node = nodes[:-1], nodes[-1]
+        constraint = self.scene.constrain(constraint_type, targets, node, flags)
+        return [constraint.name]
+
+    def nodeType(self, name, **kwargs):
+        """
+        gets the type of a node
+        """
+        flags = get_flags('nodeType', kwargs)
+        node = self.scene.get_node(name)
+        if flags.get('inherited'):
+            return list(reversed(node.types))
+        return node.type
+
+    def objExists(self, name):
+        """
+        checks if a node or plug exists
+        """
+        node_name, dot, attr = name.partition('.')
+        node = self.scene.find_node(node_name)
+        if node is None or not attr:
+            return node is not None
+        attr = get_long_attr(attr)
+        return attr in node.attrs or (node.is_dag and get_base_attr(attr) in
+                                      MATRIX_PLUGS)
+
+    def orientConstraint(self, *args, **kwargs):
+        """
+        makes an orientConstraint
+        """
+        return self.make_constraint('orientConstraint', args, kwargs)
+
+    def parent(self, *args, **kwargs):
+        """
+        parents nodes, shapes move as they are
+        """
+        flags = get_flags('parent', kwargs)
+        nodes = self.get_nodes(args)
+        if flags.get('world'):
+            parent, children = None, nodes
+        else:
+            parent, children = nodes[-1], nodes[:-1]
+        for child in children:
+            if child.is_shape:
+                if parent is None:
+                    raise RuntimeError('A shape cannot be parented to the world')
+                self.scene.set_parent(child, parent, True)
+            else:
+                self.scene.set_parent(child, parent, flags.get('relative', False))
+        self.select_nodes(children)
+        return [child.name for child in children]
+
+    def parentConstraint(self, *args, **kwargs):
+        """
+        makes a parentConstraint
+        """
+        return self.make_constraint('parentConstraint', args, kwargs)
+
+    def pointConstraint(self, *args, **kwargs):
+        """
+        makes a pointConstraint
+        """
+        return self.make_constraint('pointConstraint', args, kwargs)
+
+    def poleVectorConstraint(self, *args, **kwargs):
+        """
+        makes a poleVectorConstraint and sets the handle's pole vector
+        """
+        flags = get_flags('poleVectorConstraint', kwargs)
+        nodes = self.get_nodes(args)
+        targets, handle = nodes[:-1], nodes[-1]
+        start_joint = handle.inputs['startJoint'][0]
+        start = self.scene.get_world_matrix(start_joint)[12:15]
+        position = self.scene.get_pivot_position(targets[0])
+        name = flags.get('name') or '%s_poleVectorConstraint1' % handle.name
+        constraint = self.scene.create_node('poleVectorConstraint', name, handle)
+        for index, target in enumerate(targets):
+            weight_attr = '%sW%d' % (target.name, index)
+            constraint.attrs[weight_attr] = float(flags.get('weight', 1.0))
+            constraint.attr_types[weight_attr] = 'double'
+            constraint.user_attrs.append(weight_attr)
+            self.scene.connect(target, 'parentMatrix[0]', constraint,
+                               'target[%d].targetParentMatrix' % index)
+        for index, axis in enumerate('XYZ'):
+            handle.attrs['poleVector' + axis] = position[index] - start[index]
+            self.scene.connect(constraint, 'constraintTranslate' + axis, handle,
+                               'poleVector' + axis)
+        return [constraint.name]
+
+    def refresh(self, **kwargs):
+        """
+        does nothing, there is no viewport
+        """
+        flags = get_flags('refresh', kwargs)
+        if 'suspend' in flags:
+            self.suspended = bool(flags['suspend'])
+
+    def rename(self, *args, **kwargs):
+        """
+        renames a node and the shape named after it
+        """
+        flags = get_flags('rename', kwargs)
+        if len(args) == 1:
+            node, name = self.scene.selection[0], args[0]
+        else:
+            node, name = self.scene.get_node(args[0]), args[1]
+        old_name = node.name
+        new_name = self.scene.rename_node(node, name)
+        if not flags.get('ignoreShape'):
+            for child in node.children:
+                if child.is_shape and child.name == get_shape_name(old_name):
+                    self.scene.rename_node(child, get_shape_name(new_name))
+        return new_name
+
+    def reroot(self, name):
+        """
+        makes a joint the root of its chain, the joints keep their world positions
+        """
+        node = self.scene.get_node(name)
+        chain = [node]
+        while chain[-1].parent is not None and chain[-1].parent.type == 'joint':
+            chain.append(chain[-1].parent)
+        top_parent = chain[-1].parent
+        worlds = [self.scene.get_world_matrix(item) for item in chain]
+        self.scene.set_parent(node, top_parent)
+        for index in range(1, len(chain)):
+            self.scene.set_parent(chain[index], chain[index - 1], True)
+            self.scene.set_world_matrix(chain[index], worlds[index], keep_rotate=True)
+
+    def scale(self, x_value, y_value, z_value, *args, **kwargs):
+        """
+        scales nodes or cvs
+        """
+        flags = get_flags('scale', kwargs)
+        values = [x_value, y_value, z_value]
+        for name in flatten(args) or [node.name for node in self.scene.selection]:
+            components = self.get_components(name)
+            if components is not None:
+                self.scale_components(components, values, flags.get('pivot'))
+                continue
+            node = self.scene.get_node(name)
+            channels = {}
+            for axis, value in zip('XYZ', values):
+                if flags.get('relative'):
+                    value *= node.attrs['scale' + axis]
+                channels['scale' + axis] = value
+            self.scene.set_channels(node, channels)
+
+    def scale_components(self, components, values, pivot=None):
+        """
+        scales cvs about a pivot in the shape's space
+
+        :param components: [shape node, indices]
+        :type: list
+
+        :param values: x, y and z scale
+        :type: list
+
+        :param pivot: point to scale about, defaults to the transform's scale pivot
+        :type: list
+        """
+        shape, indices = components
+        if pivot is None:
+            pivot = [shape.parent.attrs.get('scalePivot' + axis, 0.0) for axis in 'XYZ']
+        cvs = shape.data['cvs']
+        for index in indices:
+            cvs[index] = [pivot[axis] + (cvs[index][axis] - pivot[axis]) * values[axis]
+                          for axis in range(3)]
+
+    def scaleConstraint(self, *args, **kwargs):
+        """
+        makes a scaleConstraint
+        """
+        return self.make_constraint('scaleConstraint', args, kwargs)
+
+    def select(self, *args, **kwargs):
+        """
+        changes the selection
+        """
+        flags = get_flags('select', kwargs)
+        if flags.get('clear'):
+            self.scene.selection = []
+            return
+        nodes = self.get_nodes(args) if flatten(args) else []
+        if flags.get('add'):
+            self.scene.selection.extend([node for node in nodes
+                                         if node not in self.scene.selection])
+        elif flags.get('deselect'):
+            self.scene.selection = [node for node in self.scene.selection
+                                    if node not in nodes]
+        else:
+            self.scene.selection = nodes
+
+    def setAttr(self, plug, *values, **kwargs):
+        """
+        sets the value, lock, keyable or channelBox of an attribute
+        """
+        flags = get_flags('setAttr', kwargs)
+        node, attr = self.scene.get_plug(plug)
+        if values:
+            if flags.get('type') == 'string':
+                value = values[0]
+            elif flags.get('type') == 'matrix':
+                value = list(flatten(values))
+            elif len(values) > 1:
+                value = list(values)
+            elif isinstance(values[0], (list, tuple)) and len(values[0]) and \
+                    isinstance(values[0][0], (list, tuple)):
+                value = list(values[0][0])
+            else:
+                value = values[0]
+            if flags.get('type') in ('double3', 'float3') and attr not in COMPOUND_ATTRS:
+                if not self.scene.has_attr(node, attr):
+                    raise ValueError('No object matches name: %s' % plug)
+                for axis, child_value in zip('XYZ', value):
+                    node.attrs[attr + axis] = float(child_value)
+                node.attrs[attr] = [float(child_value) for child_value in value]
+            else:
+                self.scene.set_attr(node, attr, value)
+        elif not self.scene.has_attr(node, attr):
+            raise ValueError('No object matches name: %s' % plug)
+        if 'lock' in flags:
+            attrs = [attr]
+            if flags['lock']:
+                node.locked.update(attrs)
+            else:
+                node.locked.difference_update(attrs + COMPOUND_ATTRS.get(attr, []))
+        if 'keyable' in flags or 'channelBox' in flags:
+            current = node.hidden_channels.get(attr, [True, False])
+            if 'keyable' in flags:
+                current = [bool(flags['keyable']), current[1]]
+            if 'channelBox' in flags:
+                current = [current[0], bool(flags['channelBox'])]
+            node.hidden_channels[attr] = current
+
+    def setKeyframe(self, *args, **kwargs):
+        """
+        keys an attribute, keys are linear
+        """
+        flags = get_flags('setKeyframe', kwargs)
+        attr = get_long_attr(flags['attribute'])
+        time = float(flags.get('time', self.scene.time))
+        for node in self.get_nodes(args):
+            source = node.inputs.get(attr)
+            if source is not None and 'keys' in source[0].data:
+                anim_curve = source[0]
+            else:
+                curve_type = {'translate': 'animCurveTL',
+                              'rotate': 'animCurveTA'}.get(COMPOUND_PARENTS.get(attr),
+                                                           'animCurveTU')
+                anim_curve = self.scene.create_node(curve_type,
+                                                    '%s_%s' % (node.name, attr))
+                anim_curve.data['keys'] = {}
+                self.scene.connect(anim_curve, 'output', node, attr)
+                node.data.setdefault('dependents', []).append(anim_curve)
+            value = flags.get('value', node.attrs.get(attr, 0.0))
+            anim_curve.data['keys'][time] = float(value)
+            if time == self.scene.time:
+                self.scene.set_attr(node, attr, value, False)
+        return len(self.get_nodes(args))
+
+    def shadingNode(self, node_type, **kwargs):
+        """
+        makes a utility node
+        """
+        flags = get_flags('shadingNode', kwargs)
+        node = self.scene.create_node(node_type, flags.get('name'))
+        if not flags.get('skipSelect'):
+            self.select_nodes([node])
+        return node.name
+
+    def skinCluster(self, *args, **kwargs):
+        """
+        makes a skinCluster connected to its joints, no weights are worked out, unbind
+        deletes it and leaves the geometry as it is
+        """
+        flags = get_flags('skinCluster', kwargs)
+        if flags.get('unbind'):
+            skin = self.scene.get_node(flatten(args)[0])
+            for shape, attr in skin.outputs.get('outputGeometry[0]', []):
+                shape.data['history'].remove(skin)
+            self.scene.delete_nodes([skin])
+            return []
+        nodes = self.get_nodes(args)
+        influences, geometry = nodes[:-1], nodes[-1]
+        skin = self.scene.create_node('skinCluster', flags.get('name', 'skinCluster1'))
+        for index, influence in enumerate(influences):
+            self.scene.connect(influence, 'worldMatrix[0]', skin, 'matrix[%d]' % index)
+        shapes = [geometry] if geometry.is_shape else \
+            [child for child in geometry.children if child.is_shape]
+        for shape in shapes:
+            self.scene.connect(skin, 'outputGeometry[0]', shape, 'create', force=True)
+            shape.data.setdefault('history', []).append(skin)
+        skin.attrs['maxInfluences'] = int(flags.get('maximumInfluences', 5))
+        skin.attrs['bindMethod'] = int(flags.get('bindMethod', 0))
+        return [skin.name]
+
+    def spaceLocator(self, *args, **kwargs):
+        """
+        makes a locator
+        """
+        flags = get_flags('spaceLocator', kwargs)
+        transform = self.scene.create_node('transform', flags.get('name', 'locator1'))
+        shape = self.make_shape(transform, 'locator')
+        for axis, value in zip('XYZ', flags.get('position', (0.0, 0.0, 0.0))):
+            shape.attrs['localPosition' + axis] = float(value)
+        self.select_nodes([transform])
+        return [transform.name]
+
+    def transformLimits(self, *args, **kwargs):
+        """
+        stores the limits on the node
+        """
+        flags = get_flags('transformLimits', kwargs)
+        short_types = {'translation': 'Trans', 'rotation': 'Rot', 'scale': 'Scale'}
+        for node in self.get_nodes(args):
+            for flag, value in flags.items():
+                limit_type = flag[6:-1].lower() if flag.startswith('enable') else \
+                    flag[:-1]
+                attr = short_types[limit_type] + flag[-1]
+                if flag.startswith('enable'):
+                    node.attrs['min%sLimitEnable' % attr] = bool(value[0])
+                    node.attrs['max%sLimitEnable' % attr] = bool(value[1])
+                else:
+                    node.attrs['min%sLimit' % attr] = float(value[0])
+                    node.attrs['max%sLimit' % attr] = float(value[1])
+
+    def undoInfo(self, **kwargs):
+        """
+        queries or sets the undo state and counts open chunks
+        """
+        flags = get_flags('undoInfo', kwargs)
+        if flags.get('query'):
+            return self.undo_state
+        if 'state' in flags:
+            self.undo_state = bool(flags['state'])
+        if 'stateWithoutFlush' in flags:
+            self.undo_state = bool(flags['stateWithoutFlush'])
+        if flags.get('openChunk'):
+            self.undo_chunks += 1
+        if flags.get('closeChunk'):
+            self.undo_chunks = max(self.undo_chunks - 1, 0)
+
+    def xform(self, *args, **kwargs):
+        """
+        queries or moves transforms and cvs
+        """
+        flags = get_flags('xform', kwargs)
+        names = flatten(args) or [node.name for node in self.scene.selection]
+        world_space = flags.get('worldSpace', False)
+        if flags.get('query'):
+            return self.query_xform(self.scene.get_node(names[0]), flags)
+        for name in names:
+            components = self.get_components(name)
+            if components is not None:
+                self.xform_components(components, flags)
+            else:
+                self.edit_xform(self.scene.get_node(name), flags, world_space)
+
+    def query_xform(self, node, flags):
+        """
+        answers xform -query
+
+        :param node: the node
+        :type: SceneNode
+
+        :param flags: the xform flags by long name
+        :type: dict
+
+        :return: the queried values
+        :type: list
+        """
+        world_space = flags.get('worldSpace', False)
+        attrs = node.attrs
+        if flags.get('matrix'):
+            if world_space:
+                return list(self.scene.get_world_matrix(node))
+            return list(self.scene.get_local_matrix(node))
+        if flags.get('translation'):
+            if world_space:
+                return list(self.scene.get_world_matrix(node)[12:15])
+            return [attrs['translate' + axis] for axis in 'XYZ']
+        if flags.get('rotation'):
+            if world_space:
+                return matrix_to_euler(self.scene.get_world_rotation(node),
+                                       attrs['rotateOrder'])
+            return [attrs['rotate' + axis] for axis in 'XYZ']
+        if flags.get('scale'):
+            if world_space:
+                return decompose_matrix(self.scene.get_world_matrix(node))[0]
+            return [attrs['scale' + axis] for axis in 'XYZ']
+        if flags.get('pivots') or flags.get('rotatePivot') or flags.get('scalePivot'):
+            pivots = []
+            for pivot in ['rotatePivot', 'scalePivot']:
+                point = [attrs[pivot + axis] for axis in 'XYZ']
+                if world_space:
+                    point = transform_point(point, self.scene.get_world_matrix(node))
+                pivots.append(point)
+            if flags.get('pivots'):
+                return pivots[0] + pivots[1]
+            return pivots[0] if flags.get('rotatePivot') else pivots[1]
+        if flags.get('boundingBox'):
+            return self.exactWorldBoundingBox(node.name)
+        if flags.get('rotateOrder'):
+            return ROTATE_ORDERS[attrs['rotateOrder']]
+        raise RuntimeError('xform -query needs something to query')
+
+    def edit_xform(self, node, flags, world_space):
+        """
+        moves a transform for xform
+
+        :param node: the transform
+        :type: SceneNode
+
+        :param flags: the xform flags by long name
+        :type: dict
+
+        :param world_space: the values are in world space
+        :type: bool
+        """
+        scene = self.scene
+        attrs = node.attrs
+        relative = flags.get('relative', False)
+        if 'rotateOrder' in flags:
+            scene.set_channels(node, {'rotateOrder':
+                                      ROTATE_ORDERS.index(flags['rotateOrder'])})
+        if flags.get('centerPivots') or 'pivots' in flags:
+            if flags.get('centerPivots'):
+                points = scene.get_shape_points(
+                    node, inverse_matrix(scene.get_world_matrix(node)))
+                if not points:
+                    points = [[0.0, 0.0, 0.0]]
+                pivot = [(min([point[index] for point in points]) +
+                          max([point[index] for point in points])) / 2.0
+                         for index in range(3)]
+            else:
+                pivot = list(flags['pivots'])
+                if world_space:
+                    pivot = transform_point(pivot, inverse_matrix(
+                        scene.get_world_matrix(node)))
+            before = scene.get_local_matrix(node)[12:15]
+            channels = {}
+            for axis, value in zip('XYZ', pivot):
+                channels['rotatePivot' + axis] = value
+                channels['scalePivot' + axis] = value
+            scene.set_channels(node, channels)
+            after = scene.get_local_matrix(node)[12:15]
+            scene.set_channels(node, dict([
+                ('rotatePivotTranslate' + axis, attrs['rotatePivotTranslate' + axis] +
+                 before[index] - after[index]) for index, axis in enumerate('XYZ')]))
+
+        if flags.get('matrix'):
+            if world_space:
+                scene.set_world_matrix(node, list(flags['matrix']))
+            else:
+                scene.set_local_matrix(node, list(flags['matrix']))
+
+        if 'translation' in flags:
+            value = list(flags['translation'])
+            parent_inverse = inverse_matrix(scene.get_parent_matrix(node))
+            if relative:
+                if world_space:
+                    value = transform_vector(value, parent_inverse)
+                value = [attrs['translate' + axis] + value[index]
+                         for index, axis in enumerate('XYZ')]
+            elif world_space:
+                value = transform_point(value, parent_inverse)
+            scene.set_channels(node, dict([('translate' + axis, float(value[index]))
+                                           for index, axis in enumerate('XYZ')]))
+
+        if 'rotation' in flags:
+            value = list(flags['rotation'])
+            if relative:
+                value = [attrs['rotate' + axis] + value[index]
+                         for index, axis in enumerate('XYZ')]
+                scene.set_channels(node, dict([('rotate' + axis, float(value[index]))
+                                               for index, axis in enumerate('XYZ')]))
+            elif world_space:
+                parent_rotation = decompose_matrix(scene.get_parent_matrix(node))[1]
+                local = mult_matrix(rotation_matrix(value, attrs['rotateOrder']),
+                                    inverse_matrix(parent_rotation))
+                scene.set_channels(node, scene.set_local_rotation(node, local))
+            else:
+                scene.set_channels(node, dict([('rotate' + axis, float(value[index]))
+                                               for index, axis in enumerate('XYZ')]))
+
+        if 'scale' in flags:
+            value = list(flags['scale'])
+            if relative:
+                value = [attrs['scale' + axis] * value[index]
+                         for index, axis in enumerate('XYZ')]
+            scene.set_channels(node, dict([('scale' + axis, float(value[index]))
+                                           for index, axis in enumerate('XYZ')]))
+
+    def xform_components(self, components, flags):
+        """
+        moves cvs for xform
+
+        :param components: [shape node, indices]
+        :type: list
+
+        :param flags: the xform flags by long name
+        :type: dict
+        """
+        shape, indices = components
+        rows = shape.data.get('rows')
+        if rows is not None:
+            #a surface's cvs are its rows one after the other, u runs down the rows when
+            # the uvs are swapped and along them when they arent
+            size = len(rows[0])
+            cvs = [cv for row in rows for cv in row]
+            indices = [u * size + v if shape.data['swap_uv'] else v * size + u
+                       for u, v in indices]
+        else:
+            cvs = shape.data['cvs']
+        world_inverse = inverse_matrix(self.scene.get_world_matrix(shape))
+        world_space = flags.get('worldSpace', False)
+        if 'translation' in flags:
+            value = list(flags['translation'])
+            for index in indices:
+                if flags.get('relative'):
+                    offset = transform_vector(value, world_inverse) if world_space \
+                        else value
+                    cvs[index] = [cvs[index][axis] + offset[axis] for axis in range(3)]
+                else:
+                    cvs[index] = transform_point(value, world_inverse) if world_space \
+                        else list(value)
+        if 'rotation' in flags:
+            rotation = rotation_matrix(list(flags['rotation']))
+            for index in indices:
+                cvs[index] = transform_point(cvs[index], rotation)
+        if rows is not None:
+            shape.data['rows'] = [cvs[index:index + size]
+                                  for index in range(0, len(cvs), size)]
+        elif 'scale' in flags:
+            self.scale_components(components, list(flags['scale']))
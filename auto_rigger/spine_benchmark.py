@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+#SETMODE 777
+
+#----------------------------------------------------------------------------------------#
+#------------------------------------------------------------------------------ HEADER --#
+
+"""
+:author:
+    Nick Lormand & Blake Day
+
+:synopsis:
+    compares the ribbon spine and the lean spine
+
+:description:
+    builds the whole rig once for each spine mode in a new scene, records the nodes and
+    the time setup_spine takes, then animates the spine controls and times how long maya
+    takes to evaluate each frame. run it in maya with run_benchmark()
+
+:applications:
+    Maya
+
+:see_also:
+    step_one
+    step_two
+    step_three
+    gen_utils
+"""
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- IMPORTS --#
+
+# Default Python Imports
+import time
+
+# Imports That You Wrote
+from auto_rigger.cmds_backend import cmds
+import auto_rigger.gen_utils as gu
+import auto_rigger.step_one as step_one
+import auto_rigger.step_two as step_two
+import auto_rigger.step_three as step_three
+from maya_enums import NamingConventionEnums
+#----------------------------------------------------------------------------------------#
+#--------------------------------------------------------------------------- FUNCTIONS --#
+def run_benchmark(num_vertebrae=5, num_frames=100):
+    """
+    builds the rig with each spine mode and prints the node counts and timings
+
+    :param num_vertebrae: number of vertebrae to build the spines with
+    :type: int
+
+    :param num_frames: number of frames to evaluate for the timing
+    :type: int
+
+    :return: results for each spine mode -> {mode: {'nodes': {type: count}, ...}}
+    :type: dict
+    """
+    results = {}
+    for spine_mode in NamingConventionEnums.SPINE_MODES:
+        spine_info = build_rig(spine_mode, num_vertebrae)
+        spine_info['frame_time'] = time_evaluation(num_frames)
+        results[spine_mode] = spine_info
+
+    #print the results side by side
+    print('%-10s %8s %12s %14s' % ('spine', 'nodes', 'build (s)', 'frame (ms)'))
+    for spine_mode in NamingConventionEnums.SPINE_MODES:
+        spine_info = results[spine_mode]
+        print('%-10s %8d %12.3f %14.3f' % (spine_mode,
+                                           sum(spine_info['nodes'].values()),
+                                           spine_info['build_time'],
+                                           spine_info['frame_time'] * 1000.0))
+    for spine_mode in NamingConventionEnums.SPINE_MODES:
+        print('%s nodes by type:' % spine_mode)
+        node_types = results[spine_mode]['nodes']
+        for node_type in sorted(node_types):
+            print('    %-24s %d' % (node_type, node_types[node_type]))
+
+    return results
+
+def build_rig(spine_mode, num_vertebrae=5, num_fingers=5, num_toes=0):
+    """
+    builds the whole rig in a new scene and records what setup_spine made
+
+    :param spine_mode: which spine to build, one of NamingConventionEnums.SPINE_MODES
+    :type: str
+
+    :param num_vertebrae: number of vertebrae
+    :type: int
+
+    :param num_fingers: number of fingers
+    :type: int
+
+    :param num_toes: number of toes
+    :type: int
+
+    :return: {'nodes': {node type: count}, 'build_time': seconds in setup_spine}
+    :type: dict
+    """
+    cmds.file(new=True, force=True)
+
+    #wrap setup_spine so we can see the nodes it makes, uuids dont change on rename or
+    # reparent so they are safe to compare
+    spine_info = {}
+    original_setup_spine = step_three.setup_spine
+
+    def recorded_setup_spine(*args, **kwargs):
+        before = set(cmds.ls(uuid=True))
+        start = time.time()
+        original_setup_spine(*args, **kwargs)
+        spine_info['build_time'] = time.time() - start
+        new_nodes = cmds.ls(list(set(cmds.ls(uuid=True)) - before))
+        node_types = {}
+        for node in new_nodes:
+            node_type = cmds.nodeType(node)
+            node_types[node_type] = node_types.get(node_type, 0) + 1
+        spine_info['nodes'] = node_types
+
+    step_three.setup_spine = recorded_setup_spine
+    try:
+        #run the three steps the same way the gui does
+        root = step_one.read_xml()
+        step_one.Skeleton(root, num_fingers, num_toes,
+                          num_vertebrae).joint_structure.group()
+        cc_list = step_two.run_step(gu.get_joint_list(), 'Blue', 'Red', 'Yellow',
+                                    'Circle', '4-Point Star', num_vertebrae)
+        gu.create_hierarchy()
+        step_three.run_step(cc_list, num_vertebrae, spine_mode)
+    finally:
+        step_three.setup_spine = original_setup_spine
+
+    return spine_info
+
+def time_evaluation(num_frames):
+    """
+    keys the spine controls and the back attrs then times stepping through the frames
+
+    :param num_frames: number of frames to evaluate
+    :type: int
+
+    :return: average seconds per frame
+    :type: float
+    """
+    back_cc = 'back' + NamingConventionEnums.CONTROL_CURVE_SUFFIX
+    for name in NamingConventionEnums.SPINE_CTRLS:
+        control_name = name + NamingConventionEnums.CONTROL_CURVE_SUFFIX
+        cmds.setKeyframe(control_name, attribute='rotateZ', time=1, value=0)
+        cmds.setKeyframe(control_name, attribute='rotateZ', time=num_frames, value=30)
+        cmds.setKeyframe(control_name, attribute='translateX', time=1, value=0)
+        cmds.setKeyframe(control_name, attribute='translateX', time=num_frames, value=5)
+    for attr_set in NamingConventionEnums.BACK_ATTRS:
+        cmds.setKeyframe(back_cc, attribute=attr_set[1], time=1, value=0)
+        cmds.setKeyframe(back_cc, attribute=attr_set[1], time=num_frames, value=20)
+
+    #query the bind joints every frame so the spine has to evaluate
+    bind_jnts = [jnt for jnt in cmds.ls(type='joint')
+                 if jnt.endswith(NamingConventionEnums.BIND_JOINT_SUFFIX) and
+                 (jnt.startswith('spine') or jnt.startswith('pelvis'))]
+
+    start = time.time()
+    for frame in range(1, num_frames + 1):
+        cmds.currentTime(frame, update=True)
+        for jnt in bind_jnts:
+            cmds.xform(jnt, query=True, worldSpace=True, matrix=True)
+    return (time.time() - start) / num_frames
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- CLASSES --#
@@ -37,21 +37,21 @@
 # Imports That You Wrote
 import os
 import xml.etree.ElementTree as et
-import maya.cmds as cmds
+from auto_rigger.cmds_backend import cmds
+from auto_rigger.build_profiler import profiled
 import auto_rigger.gen_utils as gu
+from auto_rigger.naming_context import DEFAULT_NAMING, NamingContext
 from maya_enums import MayaCommandEnums, NamingConventionEnums
 #----------------------------------------------------------------------------------------#
 #--------------------------------------------------------------------------- FUNCTIONS --#
 
-def read_xml():
+def read_xml(file_path = None):
     """
     Finds the XML file in the XML_utils folder and parses it
+    :param file_path: a template to read instead of biped.xml
     :return: xml root object
     """
-    prog_dir = os.path.abspath(os.path.dirname(__file__))
-    os.chdir(prog_dir)
-    #print prog_dir
-    file_path = "%s/xml_utils/biped.xml" % (prog_dir)
+    file_path = get_template_path(file_path)
     if file_path:
         xml_fh = et.parse(file_path)
         root = xml_fh.getroot()
@@ -60,6 +60,89 @@ def read_xml():
         print "the biped.xml file is missing"
         return None
 
+def get_template_path(file_path = None):
+    """
+    gets the template step one builds from
+    :param file_path: a template to use instead of biped.xml
+    :return: path of the xml file
+    """
+    if not file_path:
+        prog_dir = os.path.abspath(os.path.dirname(__file__))
+        file_path = "%s/xml_utils/biped.xml" % (prog_dir)
+    return file_path
+
+def get_inputs(num_fingers, num_toes, num_vertebrae, left_prefix, right_prefix,
+               left_color, right_color, center_color, file_path = None):
+    """
+    gets everything step one is built from, the template by its contents so an edit
+    to the file counts as a change
+    :param num_fingers: number of fingers on each hand
+    :param num_toes: number of toes on each foot
+    :param num_vertebrae: number of vertebrae
+    :param left_prefix: prefix for the left side
+    :param right_prefix: prefix for the right side
+    :param left_color: color for left side objs
+    :param right_color: color for right side objs
+    :param center_color: color for the middle objs
+    :param file_path: a template to build instead of biped.xml
+    :return: dict of the inputs for gu.get_input_hash
+    """
+    return {'template': gu.get_file_hash(get_template_path(file_path)),
+            'fingers': num_fingers, 'toes': num_toes, 'vertebrae': num_vertebrae,
+            'left_prefix': left_prefix, 'right_prefix': right_prefix,
+            'left_color': left_color, 'right_color': right_color,
+            'center_color': center_color}
+
+def run_step(num_fingers, num_toes, num_vertebrae, left_prefix, right_prefix,
+             left_color, right_color, center_color, file_path = None):
+    """
+    builds the fake skeleton from the template, colors it by side and saves the
+    settings on the main control so the later steps and the gui can read them back
+    :param num_fingers: number of fingers on each hand
+    :param num_toes: number of toes on each foot
+    :param num_vertebrae: number of vertebrae
+    :param left_prefix: prefix for the left side
+    :param right_prefix: prefix for the right side
+    :param left_color: color for left side objs
+    :param right_color: color for right side objs
+    :param center_color: color for the middle objs
+    :param file_path: a template to build instead of biped.xml
+    :return: FakeJointStructure of the pelvis
+    """
+    #the naming convention of this build
+    naming = NamingContext(left_prefix, right_prefix)
+
+    root = read_xml(file_path)
+    joint_structure = Skeleton(root, num_fingers, num_toes,
+                               num_vertebrae, naming).joint_structure
+    joint_structure.group()
+
+    #loop through joint list to color the joints based on side
+    side_colors = {naming.left: left_color, naming.right: right_color, '': center_color}
+    for item in joint_structure.get_joint_list():
+        gu.set_color(item, side_colors[naming.get_side(item)])
+
+    #add the user inputs to the main_cc so that if closed and reopened we
+    #can still read it
+    main_cc = 'fake_rig' + NamingConventionEnums.CONTROL_CURVE_SUFFIX
+    cmds.addAttr('|' + main_cc, longName='num_vertebrae', attributeType='float')
+    cmds.setAttr(main_cc + '.num_vertebrae', num_vertebrae)
+    for attr, value in [('left_side_color', left_color),
+                        ('right_side_color', right_color),
+                        ('center_color', center_color),
+                        ('left_prefix', left_prefix),
+                        ('right_prefix', right_prefix)]:
+        cmds.addAttr('|' + main_cc, longName=attr, dataType='string')
+        cmds.setAttr(main_cc + '.' + attr, value, type='string')
+
+    #save the hash of the inputs so a re-run can tell if step one needs rebuilding
+    inputs = get_inputs(num_fingers, num_toes, num_vertebrae, left_prefix, right_prefix,
+                        left_color, right_color, center_color, file_path)
+    gu.set_string_attr('|' + main_cc, NamingConventionEnums.STEP_ONE_HASH_ATTR,
+                       gu.get_input_hash(inputs))
+
+    return joint_structure
+
 #----------------------------------------------------------------------------------------#
 #----------------------------------------------------------------------------- CLASSES --#
 
@@ -83,6 +166,7 @@ class FakeJointStructure(object):
         self.children = []
 
 
+    @profiled
     def group(self):
         """
         selects and groups the list returned from get_hierarchy_list()
@@ -96,10 +180,14 @@ class FakeJointStructure(object):
         cmds.parent('connectors'+NamingConventionEnums.GROUP_SUFFIX, "fake_rig"
                     +NamingConventionEnums.CONTROL_CURVE_SUFFIX)
 
-        handles = cmds.ls('*Handle*', transforms = True)
+        #skip the handle groups of a finished rig, the fake rig is built again to
+        # rebuild some of its modules
+        handles = [handle for handle in cmds.ls('*Handle*', transforms=True, long=True)
+                   if not handle.startswith(NamingConventionEnums.RIG_HIERARCHY[0] + '|')]
         for handle in handles:
             gu.scale_const("fake_rig" +NamingConventionEnums.CONTROL_CURVE_SUFFIX, handle,
-                           handle + "_scale" + NamingConventionEnums.CONSTRAIN_SUFFIX)
+                           handle.split('|')[-1] + "_scale" +
+                           NamingConventionEnums.CONSTRAIN_SUFFIX)
 
         #add global attr
         cmds.addAttr('|fake_rig'+NamingConventionEnums.CONTROL_CURVE_SUFFIX,
@@ -134,26 +222,32 @@ class Skeleton(object):
     Class that builds a skeleton of fake joints. Has a Fake_joint_structure as an
     attribute. Has number of fingers passed in from the gui.
     """
-    def __init__(self, root, num_fingers = 5, num_toes = 5, num_vertabrae = 7):
+    def __init__(self, root, num_fingers = 5, num_toes = 5, num_vertabrae = 7,
+                 naming = DEFAULT_NAMING):
         # get the list of xml objects that are children to the root
         children = root.getchildren()
 
         # starts with the pelvis
         node = children[0]
 
-        #create a group for the connectors
-        connector_grp = cmds.group(empty=True,
-                                   name='connectors'+NamingConventionEnums.GROUP_SUFFIX)
-        cmds.setAttr(connector_grp + '.inheritsTransform', 0)
-
         self.number_of_fingers = num_fingers
         self.number_of_vertebrae = num_vertabrae-1
         self.number_of_toes = num_toes
-        self.joint_structure = self.create_fake_skeleton(node)
+        self.naming = naming
+
+        #build the fake skeleton as one undo chunk without refreshing maya
+        with gu.build_session('step one'):
+            #create a group for the connectors
+            connector_grp = cmds.group(empty=True,
+                                   name='connectors'+NamingConventionEnums.GROUP_SUFFIX)
+            cmds.setAttr(connector_grp + '.inheritsTransform', 0)
+
+            self.joint_structure = self.create_fake_skeleton(node)
         self.vertebrae_count = 0
         self.base_vertebrae_height = None
 
 
+    @profiled
     def create_fake_skeleton(self, node, new_name = None):
         """
         this module recursively goes through the xml data to get the translation values
@@ -207,9 +301,9 @@ class Skeleton(object):
 
         # takes out left and right prefixes and replaces with enum
         if "__LEFT__" in name:
-            name = name.replace("__LEFT__", NamingConventionEnums.LEFT)
+            name = name.replace("__LEFT__", self.naming.left)
         if "__RIGHT__" in name:
-            name = name.replace("__RIGHT__", NamingConventionEnums.RIGHT)
+            name = name.replace("__RIGHT__", self.naming.right)
 
         name = name.replace("__JOINT__", NamingConventionEnums.FAKE_JOINT_SUFFIX)
 
@@ -317,7 +411,8 @@ class Skeleton(object):
                     temp_child = self.create_fake_skeleton(child, new_name)
                     list_of_children.append(temp_child)
                     node_joint.connector = gu.create_connection_curve(node_joint.name,
-                                                                      temp_child.name)
+                                                                      temp_child.name,
+                                                                      self.naming)
                     # adding connectors to connectors group
                     cmds.parent(node_joint.connector, "connectors"
                                 + NamingConventionEnums.GROUP_SUFFIX)
@@ -343,7 +438,8 @@ class Skeleton(object):
                     temp_child = self.create_fake_skeleton(child, new_name)
                     list_of_children.append(temp_child)
                     node_joint.connector = gu.create_connection_curve(node_joint.name,
-                                                                      temp_child.name)
+                                                                      temp_child.name,
+                                                                      self.naming)
                     # adding connectors to connectors group
                     cmds.parent(node_joint.connector, "connectors"
                                 + NamingConventionEnums.GROUP_SUFFIX)
@@ -367,7 +463,8 @@ class Skeleton(object):
                     temp_child = self.create_fake_skeleton(child, new_name)
                     list_of_children.append(temp_child)
                     node_joint.connector = gu.create_connection_curve(node_joint.name,
-                                                                      temp_child.name)
+                                                                      temp_child.name,
+                                                                      self.naming)
                     # adding connectors to connectors group
                     cmds.parent(node_joint.connector, "connectors"
                                 + NamingConventionEnums.GROUP_SUFFIX)
@@ -389,7 +486,8 @@ class Skeleton(object):
                     temp_child = self.create_fake_skeleton(child, new_name)
                     list_of_children.append(temp_child)
                     node_joint.connector = gu.create_connection_curve(node_joint.name,
-                                                                      temp_child.name)
+                                                                      temp_child.name,
+                                                                      self.naming)
                     # adding connectors to connectors group
                     cmds.parent(node_joint.connector, "connectors"
                                 + NamingConventionEnums.GROUP_SUFFIX)
@@ -409,7 +507,8 @@ class Skeleton(object):
                     temp_child = self.create_fake_skeleton(child, new_name)
                     list_of_children.append(temp_child)
                     node_joint.connector = gu.create_connection_curve(node_joint.name,
-                                                                      temp_child.name)
+                                                                      temp_child.name,
+                                                                      self.naming)
                     # adding connectors to connectors group
                     cmds.parent(node_joint.connector, "connectors"
                                 + NamingConventionEnums.GROUP_SUFFIX)
@@ -427,7 +526,8 @@ class Skeleton(object):
                     temp_child = self.create_fake_skeleton(child, new_name)
                     list_of_children.append(temp_child)
                     node_joint.connector = gu.create_connection_curve(node_joint.name,
-                                                                      temp_child.name)
+                                                                      temp_child.name,
+                                                                      self.naming)
                     # adding connectors to connectors group
                     cmds.parent(node_joint.connector, "connectors"
                                 + NamingConventionEnums.GROUP_SUFFIX)
@@ -437,7 +537,8 @@ class Skeleton(object):
                     temp_child = self.create_fake_skeleton(child_node)
                     list_of_children.append(temp_child)
                     node_joint.connector = gu.create_connection_curve(node_joint.name,
-                                                                temp_child.name)
+                                                                temp_child.name,
+                                                                self.naming)
                     # adding connectors to connectors group
                     cmds.parent(node_joint.connector, "connectors"
                                 +NamingConventionEnums.GROUP_SUFFIX)
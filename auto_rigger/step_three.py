@@ -13,7 +13,8 @@
 
 :description:
     takes in a list of joints, and controls and then creates a rig from those. Sets up the
-    ik/fk arms and legs, the hands, reverse feet, head, and ribbon spine
+    ik/fk arms and legs, the hands, reverse feet, head, and either a ribbon spine or a
+    lean matrix blended spine
 
 :applications:
     Maya
@@ -30,85 +31,157 @@
 #----------------------------------------------------------------------------- IMPORTS --#
 
 # Default Python Imports
-import maya.cmds as cmds
-import maya.mel as mel
 import math
 
 # Imports That You Wrote
+from auto_rigger.cmds_backend import cmds
+import auto_rigger.build_profiler as build_profiler
+from auto_rigger.build_profiler import profiled
 import auto_rigger.gen_utils as gu
+from auto_rigger.naming_context import get_rig_naming
 from maya_enums import MayaCommandEnums, NamingConventionEnums
 import auto_rigger.step_one as step_one
 #----------------------------------------------------------------------------------------#
 #--------------------------------------------------------------------------- FUNCTIONS --#
-def run_step(control_list, num_vertebrae):
+def run_step(control_list, num_vertebrae, spine_mode='Ribbon', blend_mode='Classic',
+             modules=None, undo=True, naming=None):
     """
-    adds box control curves to all joints
+    runs build_modules in a build session so it is one undo chunk and maya doesnt
+    refresh or evaluate while it builds
 
     :param control_list: list of the controls in the scene
     :type: list
 
     :param num_vertebrae: number of vertebrae to help with spine creation
     :type: int
+
+    :param spine_mode: which spine to build, one of NamingConventionEnums.SPINE_MODES
+    :type: str
+
+    :param blend_mode: how to build the ik fk blends, one of
+                       NamingConventionEnums.IK_FK_BLEND_MODES
+    :type: str
+
+    :param modules: the modules to build from get_rig_modules(), the ones that are built
+                    already are torn down and built again. None builds the ones that
+                    arent built yet
+    :type: list
+
+    :param undo: False turns undo off while it builds
+    :type: bool
+
+    :param naming: the NamingContext of the build, defaults to the rig's
+    :type: NamingContext
+
+    :return: the ik fk utility nodes made for each limb -> {limb root jnt: [nodes]}
+    :type: dict
     """
-    # loop through controls and 0 transforms then lock scale
-    for control in control_list:
-        #0 transforms
-        if control.find('FK') == -1:
-            gu.create_buffer(control)
+    with gu.build_session('step three', undo):
+        return build_modules(control_list, num_vertebrae, spine_mode, blend_mode,
+                             modules, naming)
 
-        #delete history on the curve
-        cmds.select(control)
-        cmds.DeleteHistory()
+def build_modules(control_list, num_vertebrae, spine_mode='Ribbon', blend_mode='Classic',
+                  modules=None, naming=None):
+    """
+    adds box control curves to all joints. the first run turns the fake rig into real
+    joints, every run then builds the given modules and leaves the rest of the scene as
+    it is, so the rig can be built a few modules at a time. while modules are left for
+    later a module that is built already can be torn down and built again from the
+    joints and controls it was built from, the other modules hang off the spine so
+    building it again builds them too
 
-        #lock channels
-        for cc_type in NamingConventionEnums.LOCK_CHANNLES:
-            if control.find(cc_type) != -1:
-                for channel in NamingConventionEnums.LOCK_CHANNLES[cc_type]:
-                    gu.lock_channels(control, channel)
-        #add the extra attrs to the controls that have them
-        for cc_type in NamingConventionEnums.EXTRA_ATTRS:
-            if control.find(cc_type) != -1:
-                for attr in NamingConventionEnums.EXTRA_ATTRS[cc_type]:
-                    cmds.addAttr(control, longName = attr, attributeType='float')
-                    cmds.setAttr(control + '.' + attr, keyable = True)
-        #lock the visibility and scale of all controls
-        gu.lock_channels(control, 'visibility')
-        for channel in MayaCommandEnums.SCALE:
-            gu.lock_channels(control, channel)
+    :param control_list: list of the controls in the scene
+    :type: list
 
-    # replicate joint structure with real joints
-    cmds.select(d=True)
-    gu.create_real_skeleton()
+    :param num_vertebrae: number of vertebrae to help with spine creation
+    :type: int
 
-    joint_list = cmds.listRelatives('pelvis' + NamingConventionEnums.JOINT_SUFFIX,
-                                         children=True, shapes=False, allDescendents=True)
-    joint_list.append('pelvis' + NamingConventionEnums.JOINT_SUFFIX)
-    joint_list.reverse()
+    :param spine_mode: which spine to build, one of NamingConventionEnums.SPINE_MODES
+    :type: str
 
-    cmds.parent('pelvis'+NamingConventionEnums.JOINT_SUFFIX,
-                'joints'+NamingConventionEnums.GROUP_SUFFIX)
+    :param blend_mode: how to build the ik fk blends, one of
+                       NamingConventionEnums.IK_FK_BLEND_MODES
+    :type: str
 
+    :param modules: the modules to build from get_rig_modules(), the ones that are built
+                    already are torn down and built again. None builds the ones that
+                    arent built yet
+    :type: list
 
-    # delete old structure
-    cmds.delete('connectors' + NamingConventionEnums.GROUP_SUFFIX)
-    cmds.delete('pelvis'+NamingConventionEnums.FAKE_JOINT_SUFFIX)
+    :param naming: the NamingContext of the build, defaults to the rig's
+    :type: NamingContext
+
+    :return: the ik fk utility nodes made for each limb -> {limb root jnt: [nodes]}
+    :type: dict
+    """
+    naming = naming or get_rig_naming()
+    selection = gu.get_selection()
+
+    #the fake rig is only there before the first run
+    if cmds.objExists('pelvis' + NamingConventionEnums.FAKE_JOINT_SUFFIX):
+        joint_modules = prepare_rig(control_list, naming)
+    else:
+        joint_modules = get_joint_modules()
+
+    # only build the modules that were asked for, tearing down the ones that are built
+    built_modules = get_built_modules()
+    if modules is None:
+        modules = [module for module in get_rig_modules(naming)
+                   if module not in built_modules]
+    elif 'spine' in modules and 'spine' in built_modules:
+        modules = list(modules) + [module for module in built_modules
+                                   if module not in modules]
+    to_rebuild = [module for module in modules if module in built_modules]
+    if to_rebuild:
+        unstashed = [module for module in to_rebuild
+                     if not cmds.objExists(get_stash(module))]
+        if unstashed:
+            raise RuntimeError('%s cant be built again once every module is built' %
+                               ', '.join(unstashed))
+        teardown_modules(to_rebuild)
+        built_modules = get_built_modules()
+    to_build = [module for module in modules if module not in built_modules]
+
+    #only a build that leaves modules for later needs copies to build them again from
+    if [module for module in get_rig_modules(naming)
+            if module not in built_modules and module not in to_build]:
+        stash_modules(to_build)
+    elif cmds.objExists(get_stash()):
+        cmds.delete(get_stash())
+    joint_list = [jnt for jnt, module in joint_modules if module in to_build]
 
     # loop through the joints and calls the necessary functions to make the rig
+    limb_nodes = {}
+    jnt_modules = dict(joint_modules)
+    module_nodes = get_module_nodes()
+    current_module, scene_nodes = None, None
     for jnt_name in joint_list:
+        #profile each joint under the module it belongs to
+        module_span = build_profiler.open_span(jnt_modules[jnt_name], 'module')
+
+        #keep the nodes each module makes so a teardown can find them
+        if jnt_modules[jnt_name] != current_module:
+            if current_module:
+                module_nodes[current_module].extend(get_new_nodes(scene_nodes))
+            current_module = jnt_modules[jnt_name]
+            module_nodes.setdefault(current_module, [])
+            scene_nodes = set(cmds.ls(uuid=True))
 
         #check if the joint needs an ik fk switch
         for ik_obj in NamingConventionEnums.IK_JOINTS:
             if jnt_name.find(ik_obj) != -1:
 
                 #check side of joint first
-                side = jnt_name.split('_')[0]
+                side = naming.get_side(jnt_name)
 
                 #checks what obj has the ik fk switch
-                switch_jnt = (side + '_' + NamingConventionEnums.IK_JOINTS[ik_obj] +
-                        NamingConventionEnums.JOINT_SUFFIX)
+                switch_jnt = naming.get_name(side,
+                                             NamingConventionEnums.IK_JOINTS[ik_obj],
+                                             NamingConventionEnums.JOINT_SUFFIX)
 
                 #call the make_ik_fk
-                make_ik_fk(jnt_name, switch_jnt)
+                chains = make_ik_fk(jnt_name, switch_jnt, blend_mode)
+                limb_nodes[jnt_name] = chains['nodes']
 
         #check if its the head joint and calls the set up for it
         if jnt_name.find('head') != -1 and jnt_name.find('Tip') == -1:
@@ -122,55 +195,32 @@ def run_step(control_list, num_vertebrae):
                                          NamingConventionEnums.BIND_JOINT_SUFFIX)
             cmds.rename(jnt_name, bind_name)
 
-        # Constrain left hand_cc_GRP to wrist_cc
-        if jnt_name.find('palm') != -1 and \
-                jnt_name.find(NamingConventionEnums.LEFT) != -1:
-            palm_cc_grp = NamingConventionEnums.LEFT + 'palm' \
-          + NamingConventionEnums.CONTROL_CURVE_SUFFIX+ NamingConventionEnums.GROUP_SUFFIX
-            cmds.parent(palm_cc_grp, jnt_name)
-            cmds.select(clear=True)
-            cmds.group(name=NamingConventionEnums.LEFT+'digits'
-                            +NamingConventionEnums.GROUP_SUFFIX, empty = True)
-            cmds.parent(NamingConventionEnums.LEFT + 'digits'
-                        +NamingConventionEnums.GROUP_SUFFIX, jnt_name)
+        # left or right side enum
+        side = naming.get_side(jnt_name)
+
+        # Constrain the side's hand_cc_GRP to wrist_cc
+        if jnt_name.find('palm') != -1 and side:
+            cmds.parent(naming.get_name(side, 'palm',
+                                        NamingConventionEnums.CONTROL_CURVE_SUFFIX,
+                                        NamingConventionEnums.GROUP_SUFFIX), jnt_name)
+            digits_grp = naming.get_name(side, 'digits',
+                                         NamingConventionEnums.GROUP_SUFFIX)
+            cmds.group(name=digits_grp, empty = True)
+            cmds.parent(digits_grp, jnt_name)
 
             # rename the palm to bind suffix
             bind_name = jnt_name.replace(NamingConventionEnums.JOINT_SUFFIX,
                                          NamingConventionEnums.BIND_JOINT_SUFFIX)
             cmds.rename(jnt_name, bind_name)
 
-        # Constrain left hand_cc_GRP to wrist_cc
-        if jnt_name.find('palm') != -1 and \
-                jnt_name.find(NamingConventionEnums.RIGHT) != -1:
-            palm_cc_grp = NamingConventionEnums.RIGHT + 'palm' \
-          + NamingConventionEnums.CONTROL_CURVE_SUFFIX+ NamingConventionEnums.GROUP_SUFFIX
-            cmds.parent(palm_cc_grp, jnt_name)
-            cmds.select(clear=True)
-            cmds.group(name=NamingConventionEnums.RIGHT + 'digits'
-                            +NamingConventionEnums.GROUP_SUFFIX, empty = True)
-            cmds.parent(NamingConventionEnums.RIGHT + 'digits'
-                        +NamingConventionEnums.GROUP_SUFFIX, jnt_name)
-
-            #rename the palm to bind suffix
-            bind_name = jnt_name.replace(NamingConventionEnums.JOINT_SUFFIX,
-                                         NamingConventionEnums.BIND_JOINT_SUFFIX)
-            cmds.rename(jnt_name, bind_name)
-
-        # left or right side enum
-        side = ''
-
         # Connects all of the attributes in the hand_CC to the finger rotations
         for digit in NamingConventionEnums.DIGITS:
             # if the digit is not a toe or tip
             if jnt_name.find(digit) != -1 and jnt_name.find('Tip') == -1 \
                     and jnt_name.find('Toe') == -1:
                 # Calls setup_digits for each side to setup the hierarchy and lock values
-                if jnt_name.find(NamingConventionEnums.LEFT) != -1:
-                    setup_digits(jnt_name, NamingConventionEnums.LEFT)
-                    side = NamingConventionEnums.LEFT
-                if jnt_name.find(NamingConventionEnums.RIGHT)!= -1:
-                    setup_digits(jnt_name, NamingConventionEnums.RIGHT)
-                    side = NamingConventionEnums.RIGHT
+                if side:
+                    setup_digits(jnt_name, side)
 
                 # Connects the attributes for the index finger to the hand_CC
                 if jnt_name.find('index_1') != -1:
@@ -265,26 +315,24 @@ def run_step(control_list, num_vertebrae):
             elif jnt_name.find(digit) != -1 and jnt_name.find('Tip') == -1 \
                     and jnt_name.find('Toe') != -1:
                 # calls setup toes for each side
-                if jnt_name.find(NamingConventionEnums.LEFT) != -1:
-                    setup_toes(jnt_name, NamingConventionEnums.LEFT)
-                    side = NamingConventionEnums.LEFT
-                if jnt_name.find(NamingConventionEnums.RIGHT) != -1:
-                    setup_toes(jnt_name, NamingConventionEnums.RIGHT)
-                    side = NamingConventionEnums.RIGHT
+                if side:
+                    setup_toes(jnt_name, side)
 
 
         #checks if its the foot joint and calls the reverse foot
         if jnt_name.find('ball') != -1:
-            setup_reverse_foot(jnt_name)
+            foot_nodes = setup_reverse_foot(jnt_name, blend_mode, naming)
+            #add the foot nodes to the leg they belong to
+            for limb_root in limb_nodes:
+                if side and limb_root.startswith(naming.get_name(side, 'hip')):
+                    limb_nodes[limb_root].extend(foot_nodes)
 
         #call the spine set up
         if jnt_name.find('pelvis') != -1:
             #fix the pelvis orientation
             control_name = 'pelvis' + NamingConventionEnums.CONTROL_CURVE_SUFFIX
             gu.unlock_all_channels(control_name)
-            cmds.select(control_name)
-            cmds.pickWalk(direction='up')
-            control_buffer = cmds.ls(selection=True)
+            control_buffer = cmds.listRelatives(control_name, parent=True)
             cmds.makeIdentity(control_buffer, apply=True, translate=True, rotate=True,
                               scale=True, normal=False, preserveNormals=1)
 
@@ -292,11 +340,24 @@ def run_step(control_list, num_vertebrae):
                 gu.lock_channels(control_name, channel)
 
             #call the spine setup
-            setup_spine(jnt_name, num_vertebrae)
+            setup_spine(jnt_name, num_vertebrae, spine_mode)
+
+        build_profiler.close_span(module_span)
+
+    if current_module:
+        module_nodes[current_module].extend(get_new_nodes(scene_nodes))
 
     #connect the arms and legs to the spine
-    #make a list with the arms and legs the parent them to the right spot
-    clavicles = cmds.ls('*clavicle*', type = 'transform')
+    #make a list with the arms and legs that were just built then parent them to the
+    # right spot
+    clavicles = []
+    legs = []
+    for module in to_build:
+        side, part = split_module(module)
+        if part == 'arm':
+            clavicles.extend(cmds.ls(side + '*clavicle*', type = 'transform'))
+        elif part == 'leg':
+            legs.extend(cmds.ls(side + '*leg*', type='transform'))
     #unlock the clavicles so they can be parented
     for clav in clavicles:
         gu.unlock_all_channels(clav)
@@ -308,9 +369,9 @@ def run_step(control_list, num_vertebrae):
         for channel in MayaCommandEnums.TRANSLATION:
             gu.lock_channels(clav, channel)
     #parent the legs
-    legs = cmds.ls('*leg*', type='transform')
-    cmds.parent(legs, NamingConventionEnums.SPINE_CTRLS[0] +
-                NamingConventionEnums.CONTROL_CURVE_SUFFIX)
+    if legs:
+        cmds.parent(legs, NamingConventionEnums.SPINE_CTRLS[0] +
+                    NamingConventionEnums.CONTROL_CURVE_SUFFIX)
 
 
     #rename all of the fingers to bind suffix
@@ -319,8 +380,9 @@ def run_step(control_list, num_vertebrae):
         for digit in digits:
             digit_bind_name = digit.replace(NamingConventionEnums.JOINT_SUFFIX,
                                             NamingConventionEnums.BIND_JOINT_SUFFIX)
-            #skips the tips
-            if cmds.objExists(digit) and digit.find('Tip') == -1:
+            #skips the tips and the digits of modules that werent built
+            if cmds.objExists(digit) and digit.find('Tip') == -1 and \
+                    digit in joint_list:
                 cmds.rename(digit, digit_bind_name)
 
 
@@ -330,8 +392,508 @@ def run_step(control_list, num_vertebrae):
     cmds.setAttr(NamingConventionEnums.RIG_HIERARCHY[11] + '.visibility', 0)
     cmds.setAttr(NamingConventionEnums.RIG_HIERARCHY[12] + '.visibility', 0)
 
+    set_built_modules(built_modules + to_build)
+    set_module_hashes(to_build, spine_mode, blend_mode)
+    set_module_nodes(module_nodes)
+
+    gu.restore_selection(selection)
+
+    return limb_nodes
+
+@profiled
+def finish_rig():
+    """
+    once every module is built, swaps the fake rig control for the global move scale
+    rotate control and cleans the outliner
+    """
+    # create the move scale rotate control
+    delete_fake_rig()
+
+    # create global controller and set color
+    new_cc_name = "moveScaleRotate01_shape"
+    gu.create_four_point_arrow(new_cc_name)
+    gu.set_color(new_cc_name, 'green')
+
+    # rescale global controller based off of pelvis_CC
+    pelvis_bbox = cmds.exactWorldBoundingBox('pelvis_CC')
+    cc_bbox = cmds.exactWorldBoundingBox(new_cc_name)
+
+    x_scale = (pelvis_bbox[3]-pelvis_bbox[0])/(cc_bbox[3]-cc_bbox[0])
+    cmds.xform(new_cc_name, scale = (x_scale, 1, x_scale), relative = True)
+    cmds.makeIdentity(new_cc_name, apply=True, translate=1, rotate=1, scale=1,
+                      normal=0)
+
+    # parent controller scape to moveScaleRotate01 and delete leftover curve
+    obj_shape = cmds.listRelatives(new_cc_name, shapes=True)
+    cmds.parent(obj_shape, 'moveScaleRotate01', add=True, shape=True)
+    cmds.delete("moveScaleRotate01_shape")
+
+    #clean the outliner
+    cmds.delete(cmds.ls('transform*', assemblies=True))
+
+def delete_fake_rig():
+    """
+    deletes the fake rig control and the copies of the unbuilt modules, the modules
+    cant be built again without the fake rig
+    """
+    main_cc = 'fake_rig' + NamingConventionEnums.CONTROL_CURVE_SUFFIX
+    cmds.delete(main_cc)
+    stash_grp = get_stash()
+    if cmds.objExists(stash_grp):
+        cmds.delete(stash_grp)
+
+@profiled
+def prepare_rig(control_list, naming=None):
+    """
+    zeros and locks the controls, replaces the fake joints with real ones and works out
+    which module each joint belongs to. it only runs once, before the first module is
+    built
+
+    :param control_list: list of the controls in the scene
+    :type: list
+
+    :param naming: the NamingContext of the build, defaults to the rig's
+    :type: NamingContext
 
-def make_ik_fk(blend_root, switch_jnt):
+    :return: the joints in build order with their modules -> [(jnt, module), ...]
+    :type: list
+    """
+    naming = naming or get_rig_naming()
+    prepare_controls(control_list)
+
+    # replicate joint structure with real joints
+    gu.create_real_skeleton()
+
+    joint_list = cmds.listRelatives('pelvis' + NamingConventionEnums.JOINT_SUFFIX,
+                                         children=True, shapes=False, allDescendents=True)
+    joint_list.append('pelvis' + NamingConventionEnums.JOINT_SUFFIX)
+    joint_list.reverse()
+
+    cmds.parent('pelvis'+NamingConventionEnums.JOINT_SUFFIX,
+                'joints'+NamingConventionEnums.GROUP_SUFFIX)
+
+
+    # delete old structure
+    cmds.delete('connectors' + NamingConventionEnums.GROUP_SUFFIX)
+    cmds.delete('pelvis'+NamingConventionEnums.FAKE_JOINT_SUFFIX)
+
+    # save the modules on the master node so later runs can find them
+    joint_modules = [(jnt, get_module(jnt, naming)) for jnt in joint_list]
+    master = NamingConventionEnums.RIG_HIERARCHY[0]
+    cmds.addAttr(master, longName=NamingConventionEnums.JOINT_MODULES_ATTR,
+                 dataType='string')
+    cmds.setAttr(master + '.' + NamingConventionEnums.JOINT_MODULES_ATTR,
+                 ' '.join([jnt + ':' + module for jnt, module in joint_modules]),
+                 type='string')
+
+    # copy what steps one and two were built from so it outlives the main cc
+    main_cc = naming.main_cc
+    for attr in ['left_prefix', 'right_prefix', NamingConventionEnums.STEP_ONE_HASH_ATTR,
+                 NamingConventionEnums.STEP_TWO_HASH_ATTR,
+                 NamingConventionEnums.GUIDE_HASHES_ATTR,
+                 NamingConventionEnums.GUIDES_ATTR]:
+        value = gu.get_string_attr(main_cc, attr)
+        if value is not None:
+            gu.set_string_attr(master, attr, value)
+
+    # save the joints and controls of each module so a teardown can find them
+    save_unbuilt_nodes(joint_modules, gu.get_dict_attr(
+        main_cc, NamingConventionEnums.CONTROL_JOINTS_ATTR))
+
+    return joint_modules
+
+def prepare_controls(control_list):
+    """
+    zeros the controls that arent fk in a buffer, locks their channels and adds the
+    extra attrs to the ones that have them
+
+    :param control_list: list of the controls to prepare
+    :type: list
+    """
+    # loop through controls and 0 transforms then lock scale
+    for control in control_list:
+        #0 transforms
+        if control.find('FK') == -1:
+            gu.create_buffer(control)
+
+        #delete history on the curve
+        cmds.delete(control, constructionHistory=True)
+
+        #lock channels
+        for cc_type in NamingConventionEnums.LOCK_CHANNLES:
+            if control.find(cc_type) != -1:
+                for channel in NamingConventionEnums.LOCK_CHANNLES[cc_type]:
+                    gu.lock_channels(control, channel)
+        #add the extra attrs to the controls that have them
+        for cc_type in NamingConventionEnums.EXTRA_ATTRS:
+            if control.find(cc_type) != -1:
+                for attr in NamingConventionEnums.EXTRA_ATTRS[cc_type]:
+                    cmds.addAttr(control, longName = attr, attributeType='float')
+                    cmds.setAttr(control + '.' + attr, keyable = True)
+        #lock the visibility and scale of all controls
+        gu.lock_channels(control, 'visibility')
+        for channel in MayaCommandEnums.SCALE:
+            gu.lock_channels(control, channel)
+
+def get_rig_modules(naming=None):
+    """
+    gets the names of all the modules step three can build, the arms and legs get the
+    side prefixes
+
+    :param naming: the NamingContext of the build, defaults to the rig's
+    :type: NamingContext
+
+    :return: list of the module names, like L_arm or spine
+    :type: list
+    """
+    return list((naming or get_rig_naming()).modules)
+
+def split_module(module):
+    """
+    splits a module name into its side prefix and the part of the body
+
+    :param module: name of the module, like L_arm
+    :type: str
+
+    :return: the side prefix, empty for the middle modules, and the part
+    :type: str, str
+    """
+    for part in NamingConventionEnums.RIG_MODULES:
+        if module.endswith(part):
+            return module[:-len(part)], part
+    return '', module
+
+def get_module(jnt, naming=None):
+    """
+    finds the module of the given joint by walking up to the first module root above
+    it, anything not under a root is part of the spine
+
+    :param jnt: name of the joint
+    :type: str
+
+    :param naming: the NamingContext of the build, defaults to the rig's
+    :type: NamingContext
+
+
+    :return: name of the module
+    :type: str
+    """
+    naming = naming or get_rig_naming()
+    parent = jnt
+    while parent:
+        for root in NamingConventionEnums.MODULE_ROOTS:
+            if parent.find(root) != -1:
+                part = NamingConventionEnums.MODULE_ROOTS[root]
+                if part not in NamingConventionEnums.SIDED_MODULES:
+                    return part
+                side = naming.get_side(parent)
+                if side:
+                    return naming.get_name(side, part)
+        parent = (cmds.listRelatives(parent, parent=True) or [None])[0]
+    return 'spine'
+
+def get_joint_modules():
+    """
+    gets the joints and their modules that the first run saved on the master node
+
+    :return: the joints in build order with their modules -> [(jnt, module), ...]
+    :type: list
+    """
+    saved = cmds.getAttr(NamingConventionEnums.RIG_HIERARCHY[0] + '.' +
+                         NamingConventionEnums.JOINT_MODULES_ATTR)
+    return [tuple(item.split(':')) for item in saved.split()]
+
+def get_built_modules():
+    """
+    gets the modules that have already been built
+
+    :return: list of module names
+    :type: list
+    """
+    master = NamingConventionEnums.RIG_HIERARCHY[0]
+    if not cmds.objExists(master) or not cmds.attributeQuery(
+            NamingConventionEnums.BUILT_MODULES_ATTR, node=master, exists=True):
+        return []
+    built = cmds.getAttr(master + '.' + NamingConventionEnums.BUILT_MODULES_ATTR)
+    return built.split() if built else []
+
+def set_built_modules(modules):
+    """
+    saves the built modules on the master node
+
+    :param modules: list of module names
+    :type: list
+    """
+    master = NamingConventionEnums.RIG_HIERARCHY[0]
+    if not cmds.attributeQuery(NamingConventionEnums.BUILT_MODULES_ATTR, node=master,
+                               exists=True):
+        cmds.addAttr(master, longName=NamingConventionEnums.BUILT_MODULES_ATTR,
+                     dataType='string')
+    cmds.setAttr(master + '.' + NamingConventionEnums.BUILT_MODULES_ATTR,
+                 ' '.join(modules), type='string')
+
+def get_module_hash(module, spine_mode='Ribbon', blend_mode='Classic'):
+    """
+    hashes what a module is built from, the hash of step two, the hash of the module's
+    guides and the modes that change how it is built
+
+    :param module: name of the module, like L_arm
+    :type: str
+
+    :param spine_mode: which spine to build, one of NamingConventionEnums.SPINE_MODES
+    :type: str
+
+    :param blend_mode: how to build the ik fk blends, one of
+                       NamingConventionEnums.IK_FK_BLEND_MODES
+    :type: str
+
+    :return: sha1 hex digest
+    :type: str
+    """
+    master = NamingConventionEnums.RIG_HIERARCHY[0]
+    guide_hashes = gu.get_dict_attr(master, NamingConventionEnums.GUIDE_HASHES_ATTR)
+    inputs = {'step_two': gu.get_string_attr(master,
+                                             NamingConventionEnums.STEP_TWO_HASH_ATTR),
+              'guides': guide_hashes.get(module)}
+    part = split_module(module)[1]
+    if part == 'spine':
+        inputs['spine_mode'] = spine_mode
+    elif part in NamingConventionEnums.SIDED_MODULES:
+        inputs['blend_mode'] = blend_mode
+    return gu.get_input_hash(inputs)
+
+def set_module_hashes(modules, spine_mode='Ribbon', blend_mode='Classic'):
+    """
+    saves the hashes of the modules that were just built on the master node
+
+    :param modules: the module names
+    :type: list
+
+    :param spine_mode: which spine was built
+    :type: str
+
+    :param blend_mode: how the ik fk blends were built
+    :type: str
+    """
+    master = NamingConventionEnums.RIG_HIERARCHY[0]
+    module_hashes = gu.get_dict_attr(master, NamingConventionEnums.MODULE_HASHES_ATTR)
+    for module in modules:
+        module_hashes[module] = get_module_hash(module, spine_mode, blend_mode)
+    gu.set_dict_attr(master, NamingConventionEnums.MODULE_HASHES_ATTR, module_hashes)
+
+def get_stale_modules(spine_mode='Ribbon', blend_mode='Classic'):
+    """
+    finds the built modules that would be built differently now
+
+    :param spine_mode: which spine would be built
+    :type: str
+
+    :param blend_mode: how the ik fk blends would be built
+    :type: str
+
+    :return: list of module names
+    :type: list
+    """
+    master = NamingConventionEnums.RIG_HIERARCHY[0]
+    module_hashes = gu.get_dict_attr(master, NamingConventionEnums.MODULE_HASHES_ATTR)
+    return [module for module in get_built_modules()
+            if module_hashes.get(module) != get_module_hash(module, spine_mode,
+                                                            blend_mode)]
+
+def get_new_nodes(scene_nodes):
+    """
+    gets the nodes made since the scene was listed
+
+    :param scene_nodes: uuids of the nodes that were in the scene
+    :type: set
+
+    :return: uuids of the new nodes
+    :type: list
+    """
+    return [node for node in cmds.ls(uuid=True) if node not in scene_nodes]
+
+def get_module_nodes():
+    """
+    gets the nodes each module was built from and made, saved on the master node
+
+    :return: {module: [uuid, ...]}
+    :type: dict
+    """
+    saved = gu.get_dict_attr(NamingConventionEnums.RIG_HIERARCHY[0],
+                             NamingConventionEnums.MODULE_NODES_ATTR)
+    return dict([(module, saved[module].split(',')) for module in saved])
+
+def set_module_nodes(module_nodes):
+    """
+    saves the nodes of each module on the master node
+
+    :param module_nodes: {module: [uuid, ...]}
+    :type: dict
+    """
+    gu.set_dict_attr(NamingConventionEnums.RIG_HIERARCHY[0],
+                     NamingConventionEnums.MODULE_NODES_ATTR,
+                     dict([(module, ','.join(module_nodes[module]))
+                           for module in module_nodes if module_nodes[module]]))
+
+def save_unbuilt_nodes(joint_modules, control_joints):
+    """
+    adds the joints of each module and the controls made for them, with their buffers,
+    to the nodes of the modules
+
+    :param joint_modules: the joints with their modules -> [(jnt, module), ...]
+    :type: list
+
+    :param control_joints: the fake joint each control was made for -> {cc: jnt}
+    :type: dict
+    """
+    jnt_modules = dict(joint_modules)
+    module_nodes = get_module_nodes()
+    for jnt, module in joint_modules:
+        module_nodes.setdefault(module, []).extend(cmds.ls(jnt, uuid=True))
+    for control in sorted(control_joints):
+        jnt = control_joints[control].replace(NamingConventionEnums.FAKE_JOINT_SUFFIX,
+                                              NamingConventionEnums.JOINT_SUFFIX)
+        nodes = [node for node in [control, control + NamingConventionEnums.GROUP_SUFFIX]
+                 if cmds.objExists(node)]
+        if jnt in jnt_modules and nodes:
+            module_nodes.setdefault(jnt_modules[jnt], []).extend(
+                cmds.ls(nodes, uuid=True))
+    set_module_nodes(module_nodes)
+
+def get_stash(module=None):
+    """
+    gets the hidden group with the copies of the unbuilt modules, or the group of one
+    module in it
+
+    :param module: name of the module, None gets the group of all of them
+    :type: str
+
+    :return: full name of the group
+    :type: str
+    """
+    stash_grp = NamingConventionEnums.RIG_HIERARCHY[0] + '|' + \
+        NamingConventionEnums.STASH_GROUP
+    if module is None:
+        return stash_grp
+    return stash_grp + '|stashed_' + module + NamingConventionEnums.GROUP_SUFFIX
+
+@profiled
+def stash_modules(modules):
+    """
+    keeps a copy of the joints and controls of each module before it is built, so
+    teardown_modules can put them back. the copies get plain names so the build cant
+    find them, the names they had are saved on the module's group
+
+    :param modules: the module names
+    :type: list
+    """
+    stash_grp = get_stash()
+    if modules and not cmds.objExists(stash_grp):
+        cmds.group(empty=True, name=NamingConventionEnums.STASH_GROUP)
+        cmds.parent('|' + NamingConventionEnums.STASH_GROUP,
+                    NamingConventionEnums.RIG_HIERARCHY[0])
+        cmds.setAttr(stash_grp + '.visibility', 0)
+
+    module_nodes = get_module_nodes()
+    for module in modules:
+        if cmds.objExists(get_stash(module)):
+            cmds.delete(get_stash(module))
+        uuids = module_nodes.get(module)
+        nodes = set(cmds.ls(uuids, uuid=True)) if uuids else set()
+        if not nodes:
+            continue
+        module_grp = cmds.group(empty=True, name='stashed_' + module +
+                                NamingConventionEnums.GROUP_SUFFIX)
+        cmds.parent(module_grp, stash_grp)
+
+        names = {}
+        parents = {}
+        for node in nodes:
+            node_name = cmds.ls(node, long=True)[0]
+            parent = (cmds.listRelatives(node_name, parent=True, fullPath=True) or
+                      [None])[0]
+            if parent and cmds.ls(parent, uuid=True)[0] in nodes:
+                continue
+
+            #copy the whole branch then drop what isnt part of the module, shapes go
+            # with the node they are under
+            copy = cmds.duplicate(node_name)[0]
+            originals = [node_name] + (cmds.listRelatives(
+                node_name, allDescendents=True, fullPath=True) or [])
+            copies = [cmds.ls(copied, uuid=True)[0] for copied in [copy] + (
+                cmds.listRelatives(copy, allDescendents=True, fullPath=True) or [])]
+            kept = []
+            for original, copied in zip(originals, copies):
+                owner = original
+                if cmds.ls(original, shapes=True):
+                    owner = cmds.listRelatives(original, parent=True, fullPath=True)[0]
+                if cmds.ls(owner, uuid=True)[0] in nodes:
+                    kept.append((original.split('|')[-1], copied))
+                elif cmds.ls(copied):
+                    cmds.delete(cmds.ls(copied, long=True))
+
+            for original, copied in kept:
+                names[cmds.rename(cmds.ls(copied, long=True)[0], 'stashed',
+                                  ignoreShape=True)] = original
+            copy_name = cmds.ls(kept[0][1], long=True)[0]
+            if parent:
+                parents[copy_name.split('|')[-1]] = parent.split('|')[-1]
+            cmds.parent(copy_name, get_stash(module))
+
+        gu.set_dict_attr(get_stash(module), NamingConventionEnums.STASHED_NAMES_ATTR,
+                         names)
+        gu.set_dict_attr(get_stash(module), NamingConventionEnums.STASHED_PARENTS_ATTR,
+                         parents)
+
+@profiled
+def teardown_modules(modules):
+    """
+    deletes the nodes the modules were built from and made and puts back the copies
+    stash_modules kept, so the modules can be built again. a module without a copy is
+    only deleted
+
+    :param modules: the module names
+    :type: list
+    """
+    module_nodes = get_module_nodes()
+    uuids = [node for module in modules for node in module_nodes.pop(module, [])]
+    nodes = cmds.ls(uuids, long=True) if uuids else []
+    if nodes:
+        cmds.delete(nodes)
+
+    #the spine first, the other modules go back under its joints
+    for module in sorted(modules, key=lambda module: module != 'spine'):
+        module_grp = get_stash(module)
+        if not cmds.objExists(module_grp):
+            continue
+        names = gu.get_dict_attr(module_grp, NamingConventionEnums.STASHED_NAMES_ATTR)
+        parents = gu.get_dict_attr(module_grp,
+                                   NamingConventionEnums.STASHED_PARENTS_ATTR)
+        restored = [(cmds.ls(stashed, uuid=True)[0], names[stashed])
+                    for stashed in sorted(names)]
+        for stashed in sorted(names):
+            if stashed not in parents:
+                continue
+            if cmds.objExists(parents[stashed]):
+                cmds.parent(stashed, parents[stashed])
+            else:
+                cmds.parent(stashed, world=True)
+        for node, name in restored:
+            cmds.rename(cmds.ls(node, long=True)[0], name, ignoreShape=True)
+        cmds.delete(module_grp)
+        module_nodes[module] = [node for node, name in restored]
+    set_module_nodes(module_nodes)
+
+    set_built_modules([module for module in get_built_modules()
+                       if module not in modules])
+    master = NamingConventionEnums.RIG_HIERARCHY[0]
+    module_hashes = gu.get_dict_attr(master, NamingConventionEnums.MODULE_HASHES_ATTR)
+    gu.set_dict_attr(master, NamingConventionEnums.MODULE_HASHES_ATTR,
+                     dict([(module, module_hashes[module]) for module in module_hashes
+                           if module not in modules]))
+
+@profiled
+def make_ik_fk(blend_root, switch_jnt, blend_mode='Classic'):
     """
     this code takes the blend root joint and makes an ik fk switch out of it
 
@@ -341,67 +903,79 @@ def make_ik_fk(blend_root, switch_jnt):
     :param switch_jnt: name of the obj to have the ik and fk switch on it
     :type: str
 
-    """
-    # unparents the jnt at the end of the chain so it isnt duped
-
-    cmds.select(switch_jnt)
-    cmds.pickWalk(direction='up')
-    to_parent = cmds.ls(selection=True)
-    cmds.parent(switch_jnt, world=True)
+    :param blend_mode: how to build the blend, one of
+                       NamingConventionEnums.IK_FK_BLEND_MODES
+    :type: str
 
+    :return: the blend, ik and fk chains and the blend utility nodes ->
+             {'blend': [...], 'ik': [...], 'fk': [...], 'nodes': [...]}
+    :type: dict
+    """
     # get the obj with the ik/fk switch
     switch_obj_temp = switch_jnt.replace(NamingConventionEnums.JOINT_SUFFIX,
                                     NamingConventionEnums.CONTROL_CURVE_SUFFIX)
     switch_obj = switch_obj_temp.replace('ball', 'foot')
 
-    # duplicate IKs
-    ik_children = cmds.duplicate(blend_root, renameChildren=True)
-    # duplicate FKs
-    fk_children = cmds.duplicate(blend_root, renameChildren=True)
-
-    # makes a list of the 3 blend joints
-    blend_objs = [blend_root]
-    blend_children = cmds.listRelatives(blend_root, allDescendents=True)
-    blend_children.reverse()
-    blend_objs.extend(blend_children)
+    # build the ik and fk chains next to the blend chain
+    chains = create_ik_fk_chains(blend_root, switch_jnt)
+    blend_objs = chains['blend']
 
     # get the pole vector obj
     pv_obj = blend_objs[1].replace(NamingConventionEnums.JOINT_SUFFIX,
                                    '_PV' + NamingConventionEnums.CONTROL_CURVE_SUFFIX)
 
     # calls the ik_fk_switch in gen utils
-    gu.ik_fk_switch(blend_objs, ik_children, fk_children, switch_obj, pv_obj)
+    chains['nodes'] = gu.ik_fk_switch(blend_objs, chains['ik'], chains['fk'], switch_obj,
+                                      pv_obj, blend_mode)
 
     cmds.setAttr(switch_obj + ".ikFkSwitch", 1)
-    cmds.setAttr(ik_children[0] + '.visibility', 0)
-
-    # rename ik_children
-    for joint in ik_children:
-        if '1' in joint:
-            cmds.rename(joint,
-                        joint.rsplit(NamingConventionEnums.JOINT_SUFFIX)[0]
-                        + '_IK' + NamingConventionEnums.JOINT_SUFFIX)
-    # rename fk_children
-    for joint in fk_children:
-        if '2' in joint:
-            cmds.rename(joint,
-                        joint.rsplit(NamingConventionEnums.JOINT_SUFFIX)[0]
-                        + '_FK' + NamingConventionEnums.JOINT_SUFFIX)
-
-    # re-parent the switch obj
-    cmds.parent(switch_jnt, to_parent)
+    cmds.setAttr(chains['ik'][0] + '.visibility', 0)
 
     #rename the bind joints
+    bind_objs = []
     for joint in blend_objs:
         bind_jnt = joint.replace(NamingConventionEnums.JOINT_SUFFIX,
                                           NamingConventionEnums.BIND_JOINT_SUFFIX)
         if joint.find('ankle') == -1:
-            cmds.rename(joint, bind_jnt)
+            bind_jnt = cmds.rename(joint, bind_jnt)
+        else:
+            bind_jnt = joint
+        bind_objs.append(bind_jnt)
+    chains['blend'] = bind_objs
+
+    return chains
+
+@profiled
+def create_ik_fk_chains(blend_root, end_jnt):
+    """
+    gets the blend chain from the blend root down to the end jnt and builds the ik and
+    fk chains next to it with their final names
 
+    :param blend_root: name of the root joint
+    :type: str
+
+    :param end_jnt: name of the joint below the last joint of the chain, it is left out
+    :type: str
+
+    :return: the lined up chains -> {'blend': [...], 'ik': [...], 'fk': [...]}
+    :type: dict
+    """
+    # walk up from the end jnt to the root to get the blend chain
+    blend_objs = []
+    joint = cmds.listRelatives(end_jnt, parent=True)[0]
+    while joint != blend_root:
+        blend_objs.insert(0, joint)
+        joint = cmds.listRelatives(joint, parent=True)[0]
+    blend_objs.insert(0, blend_root)
+
+    return {'blend': blend_objs,
+            'ik': gu.clone_joint_chain(blend_objs, '_IK'),
+            'fk': gu.clone_joint_chain(blend_objs, '_FK')}
 
 
 
 
+@profiled
 def setup_head(head_jnt):
     """
     sets up the head controls
@@ -410,9 +984,7 @@ def setup_head(head_jnt):
     :type: str
     """
     #get the neck joint
-    cmds.select(head_jnt)
-    cmds.pickWalk(direction='up')
-    neck_jnt = cmds.ls(selection=True)[0]
+    neck_jnt = cmds.listRelatives(head_jnt, parent=True)[0]
 
     #get the neck controller
     neck_cc = neck_jnt.replace(NamingConventionEnums.JOINT_SUFFIX,
@@ -429,9 +1001,7 @@ def setup_head(head_jnt):
     neck_buffer = gu.create_buffer(neck_cc)
 
     #create the hierarchy
-    cmds.select(neck_jnt)
-    cmds.pickWalk(direction='up')
-    to_parent = cmds.ls(selection=True)[0]
+    to_parent = cmds.listRelatives(neck_jnt, parent=True)[0]
 
     cmds.parent(neck_jnt, neck_cc)
     cmds.parent(head_jnt, head_cc)
@@ -486,6 +1056,7 @@ def setup_head(head_jnt):
     cmds.setAttr(head_loc[0] + '.visibility', 0)
     cmds.setAttr(neck_loc[0] + '.visibility', 0)
 
+@profiled
 def setup_digits(digit_jnt, side):
     """
     sets up the finger controls
@@ -527,6 +1098,7 @@ def setup_digits(digit_jnt, side):
         for channel in NamingConventionEnums.LOCK_CHANNLES['digits']:
             gu.lock_channels(joint_cc, channel)
 
+@profiled
 def setup_toes(digit_jnt, side):
     """
     sets up the finger controls
@@ -555,12 +1127,23 @@ def setup_toes(digit_jnt, side):
         for channel in NamingConventionEnums.LOCK_CHANNLES['digits']:
             gu.lock_channels(joint_cc, channel)
 
-def setup_reverse_foot(ball_jnt):
+@profiled
+def setup_reverse_foot(ball_jnt, blend_mode='Classic', naming=None):
     """
     makes the reverse foot
 
     :param ball_jnt: name of the ball joint
     :type: str
+
+    :param blend_mode: 'Lean' connects the ik fk switch straight into the mult nodes
+                       instead of going through a pass node
+    :type: str
+
+    :param naming: the NamingContext of the build, defaults to the rig's
+    :type: NamingContext
+
+    :return: the utility nodes made for the foot
+    :type: list
     """
     #gets the children of the ball joint
     all_children = cmds.listRelatives(ball_jnt, allDescendents =True)
@@ -624,8 +1207,9 @@ def setup_reverse_foot(ball_jnt):
     cmds.parent(rev_grp, ik_cc)
 
     #get the foot controller with the rev controls on it and parent it to the ankle
-    side = ball_jnt.split('_', 1)[0]
-    foot_cc = side + '_foot' + NamingConventionEnums.CONTROL_CURVE_SUFFIX
+    naming = naming or get_rig_naming()
+    foot_cc = naming.get_name(naming.get_side(ball_jnt), 'foot',
+                              NamingConventionEnums.CONTROL_CURVE_SUFFIX)
     foot_cc_grp = cmds.listRelatives(foot_cc, parent = True)[0]
 
     #dupelicate the ankle joint and parent the dupe and ball under the old ankle
@@ -645,8 +1229,14 @@ def setup_reverse_foot(ball_jnt):
     fk_ankle = ankle_jnt.replace(NamingConventionEnums.JOINT_SUFFIX,
                                  '_FK' + NamingConventionEnums.JOINT_SUFFIX)
 
-    #get the reverse node from the ikfk switch
-    rev_node = ankle_jnt + '_REV'
+    #get whatever gives the inverse of the ikfk switch to the fk visibility, its a
+    # reverse node or a pairBlend depending on the blend mode
+    fk_root = fk_ankle
+    while cmds.listRelatives(fk_root, parent=True)[0].endswith(
+            '_FK' + NamingConventionEnums.JOINT_SUFFIX):
+        fk_root = cmds.listRelatives(fk_root, parent=True)[0]
+    fk_weight = cmds.listConnections(fk_root + '.visibility', source=True,
+                                     destination=False, plugs=True)[0]
 
     #get the ball controller and make a buffer group for it
     ball_cc = ball_jnt.replace(NamingConventionEnums.JOINT_SUFFIX, '_FK' +
@@ -657,9 +1247,8 @@ def setup_reverse_foot(ball_jnt):
         gu.lock_channels(ball_cc, channel)
 
     #makes the single chain ik solver on the foot so the ball follows properly
-    cmds.select(ball_jnt, replace=True)
-    cmds.select(ankle_dupe, add=True)
-    ik_names = cmds.ikHandle(solver = 'ikSCsolver')
+    ik_names = cmds.ikHandle(startJoint=ball_jnt, endEffector=ankle_dupe,
+                             solver = 'ikSCsolver')
     #rename the ikhandle and the effector
     base = ball_jnt.rsplit('_', 1)[0]
     ik_handle = cmds.rename(ik_names[0], base + '_SCIK')
@@ -670,7 +1259,7 @@ def setup_reverse_foot(ball_jnt):
                     maintain_offset = True)
     #connect the weights of the two constraints to the ik fk switch
     cmds.connectAttr(foot_cc + '.ikFkSwitch', const_name + '.' + rev_grps['ball'] + 'W1')
-    cmds.connectAttr(rev_node + '.outputX', const_name + '.' + fk_ankle + 'W0')
+    cmds.connectAttr(fk_weight, const_name + '.' + fk_ankle + 'W0')
 
     #constrain the ball control to the ball jnt
     gu.orient_const(ball_cc, ball_jnt, ball_jnt + NamingConventionEnums.CONSTRAIN_SUFFIX,
@@ -680,21 +1269,32 @@ def setup_reverse_foot(ball_jnt):
                     maintain_offset = True)
     #connect the weights of the ball grp's two constraints to the ik fk switch
     cmds.connectAttr(foot_cc + '.ikFkSwitch', ball_grp_const+ '.'+ rev_grps['toe'] + 'W1')
-    cmds.connectAttr(rev_node + '.outputX', ball_grp_const + '.' + fk_ankle + 'W0')
+    cmds.connectAttr(fk_weight, ball_grp_const + '.' + fk_ankle + 'W0')
 
-    #connect all of the rev attrs from the foot control to the objs
-    #create a new plusMinusAverage node so i dont have have to connect ikfk switch
-    # into all 3 channels on the multiplyDivide nodes everytime
-    pass_node = cmds.shadingNode('plusMinusAverage', asUtility=True,
-                              name=foot_cc + '_Pass_PMA')
-    cmds.connectAttr(foot_cc + '.ikFkSwitch', pass_node + '.input3D[0].input3Dx')
-    cmds.connectAttr(foot_cc + '.ikFkSwitch', pass_node + '.input3D[0].input3Dy')
-    cmds.connectAttr(foot_cc + '.ikFkSwitch', pass_node + '.input3D[0].input3Dz')
-
-    #make first mult and connect the ikfk pass node to it
+    #make the two mults that turn the rev attrs off in fk
     mult01 = cmds.shadingNode('multiplyDivide', asUtility=True,
                               name=foot_cc + '_onOff_MULT')
-    cmds.connectAttr(pass_node + '.output3D', mult01 + '.input2')
+    mult02 = cmds.shadingNode('multiplyDivide', asUtility=True,
+                              name=foot_cc + '_onOff_MULT')
+    foot_nodes = [mult01, mult02]
+    if blend_mode == 'Lean':
+        #connect the switch straight into all 3 channels of both mults
+        for mult in [mult01, mult02]:
+            for axis in ['X', 'Y', 'Z']:
+                cmds.connectAttr(foot_cc + '.ikFkSwitch', mult + '.input2' + axis)
+    else:
+        #create a new plusMinusAverage node so i dont have have to connect ikfk switch
+        # into all 3 channels on the multiplyDivide nodes everytime
+        pass_node = cmds.shadingNode('plusMinusAverage', asUtility=True,
+                                  name=foot_cc + '_Pass_PMA')
+        cmds.connectAttr(foot_cc + '.ikFkSwitch', pass_node + '.input3D[0].input3Dx')
+        cmds.connectAttr(foot_cc + '.ikFkSwitch', pass_node + '.input3D[0].input3Dy')
+        cmds.connectAttr(foot_cc + '.ikFkSwitch', pass_node + '.input3D[0].input3Dz')
+        cmds.connectAttr(pass_node + '.output3D', mult01 + '.input2')
+        cmds.connectAttr(pass_node + '.output3D', mult02 + '.input2')
+        foot_nodes.append(pass_node)
+
+    #connect all of the rev attrs from the foot control to the objs
     #connect the rev controls to the mult now and the mult to the group
     #ball roll
     cmds.connectAttr(foot_cc + '.ballRoll', mult01 + '.input1X')
@@ -709,11 +1309,7 @@ def setup_reverse_foot(ball_jnt):
     cmds.connectAttr(mult01 + '.outputZ',
                      rev_grps['heel'] + '.' + MayaCommandEnums.ROTATION_X)
 
-    #make a new mult node
-    mult02 = cmds.shadingNode('multiplyDivide', asUtility=True,
-                              name=foot_cc + '_onOff_MULT')
-    cmds.connectAttr(pass_node + '.output3D', mult02 + '.input2')
-
+    #second mult
     #toe pivot
     cmds.connectAttr(foot_cc + '.toePivot', mult02 + '.input1X')
     cmds.connectAttr(mult02 + '.outputX',
@@ -730,7 +1326,7 @@ def setup_reverse_foot(ball_jnt):
                      rev_grps['bankOut'] + '.' + MayaCommandEnums.ROTATION_Z)
     #lock the transforms on the bank so it works and the right side is locked inverse
 
-    if foot_cc.startswith(NamingConventionEnums.RIGHT):
+    if foot_cc.startswith(naming.right):
         cmds.transformLimits(rev_grps['bankIn'], enableRotationZ=(False, True),
                              rotationZ=(0, 0))
         cmds.transformLimits(rev_grps['bankOut'], enableRotationZ=(True, False),
@@ -750,8 +1346,11 @@ def setup_reverse_foot(ball_jnt):
                                  NamingConventionEnums.BIND_JOINT_SUFFIX)
     cmds.rename(ball_jnt, bind_name)
 
+    return foot_nodes
+
 
-def setup_spine(pelvis_jnt, num_vertebrae):
+@profiled
+def setup_spine(pelvis_jnt, num_vertebrae, spine_mode='Ribbon'):
     """
     sets up the spine rig
 
@@ -760,36 +1359,31 @@ def setup_spine(pelvis_jnt, num_vertebrae):
 
     :param num_vertebrae: number of vertebrae
     :type: int
+
+    :param spine_mode: 'Ribbon' for the lofted ribbon spine or 'Lean' for the lighter
+        matrix blended spine, see setup_lean_spine
+    :type: str
     """
+    if spine_mode == 'Lean':
+        setup_lean_spine(pelvis_jnt, num_vertebrae)
+        return
+
     pelvis_cc = 'pelvis' + NamingConventionEnums.CONTROL_CURVE_SUFFIX
 
     num_vertebrae -=1
 
     mid = int(math.ceil(num_vertebrae/2.0))
     #get all the spine joints and add them to a list
-    spine_jnts = [pelvis_jnt]
-    cmds.select(pelvis_jnt)
-    for i in range(0, num_vertebrae):
-        cmds.pickWalk(direction = 'down')
-        spine_jnts.extend(cmds.ls(selection = True))
+    spine_jnts = get_spine_jnts(pelvis_jnt, num_vertebrae)
 
-    #create the curve that will be lofted
-    crv_name = 'spine_CRV'
-    points = 'point = ['
-    count = 0
+    #get the world position of each spine joint once, used for the curve and the uvs
+    jnt_positions = []
     for jnt in spine_jnts:
-        pos = cmds.xform(jnt, query = True, worldSpace = True, translation = True)
-        if count != 0:
-            points += ',(' + str(pos[0]) + ',' + str(pos[1]) + ',' + str(pos[2]) + ')'
-            count += 1
-        else:
-            points += '(' + str(pos[0]) + ',' + str(pos[1]) + ',' + str(pos[2]) + ')'
-            count += 1
+        jnt_positions.append(tuple(cmds.xform(jnt, query = True, worldSpace = True,
+                                              translation = True)))
 
-
-    points += ']'
-    to_run = 'cmds.curve(degree=3,' + points + ',name = \''+crv_name+'\')'
-    exec to_run
+    #create the curve that will be lofted
+    crv_name = cmds.curve(degree=3, point=jnt_positions, name='spine_CRV')
 
     #dupe the crv then move both to loft the crv to create the ribbon
     ribbon_name = 'spine_ribbon_SRFC'
@@ -803,127 +1397,43 @@ def setup_spine(pelvis_jnt, num_vertebrae):
               reverseSurfaceNormals = True, name = ribbon_name)
 
     #make the follicles on the surface
-    #get the locations of the joints to make the follicles right on their pos
     #use closest point on surface to get the uv cords of the joints on the lofted surface
-    closest_point_node = cmds.createNode("closestPointOnSurface",
-                                         name = 'temp_closest_point')
-    #connect the lofted surface into the closest point node
-    cmds.connectAttr(ribbon_name +'Shape.worldSpace[0]',
-                     closest_point_node+'.inputSurface')
-
-    #get a decompose matrix node to get the joints world positions and connect that to the
-    #closest point node
-    decomp_matrix_node = cmds.shadingNode('decomposeMatrix', asUtility = True)
-
-    cmds.connectAttr(decomp_matrix_node+'.outputTranslate',
-                     closest_point_node+'.inPosition')
-
-    #for each joint connect it to the decomp matrix and save the uv cords of the ribbon
-    pos_list = []
-    for jnt in spine_jnts:
-        cmds.connectAttr(jnt + '.worldMatrix[0]' ,decomp_matrix_node + '.inputMatrix',
-                         force = True)
-        uv = []
-        uv.append(cmds.getAttr(closest_point_node + '.parameterU'))
-        uv.append(cmds.getAttr(closest_point_node + '.parameterV'))
-        pos_list.append(uv)
-
-    #select all the surface points from the list
-    for pos in pos_list:
-        cmds.select(ribbon_name + '.uv[' + str(pos[0]) + '][' + str(pos[1]) + ']',
-                    add = True)
-
-    #create the hair at the selected postions
-    mel.eval('createHair '+str(num_vertebrae)+' 1 10 0 0 1 1 5 0 2 2 2')
-
-    #delete the extra stuff that was made and rename the stuff we want
-    cmds.delete('hairSystem1', 'hairSystem1OutputCurves', 'nucleus1')
-    follicle_grp = cmds.rename('hairSystem1Follicles', 'spine_follicles' +
-                               NamingConventionEnums.GROUP_SUFFIX)
-    follicles_list = cmds.listRelatives(follicle_grp, children=True)
-    bind_jnts = []
-
+    #then make a follicle right at each of those uvs
+    uv_list = gu.get_surface_uv(ribbon_name, jnt_positions)
+
+    follicle_grp = cmds.group(empty=True, name='spine_follicles' +
+                                               NamingConventionEnums.GROUP_SUFFIX)
+    follicles_list = []
+    for i in range(len(spine_jnts)):
+        fol_name = spine_jnts[i].replace(NamingConventionEnums.JOINT_SUFFIX, '_FOL')
+        follicles_list.append(gu.create_follicle(ribbon_name, uv_list[i][0],
+                                                 uv_list[i][1], fol_name, follicle_grp))
+
+    #make the bind joints and parent them under the follicles
+    bind_jnts = create_spine_bind_jnts(spine_jnts)
     for i in range(len(follicles_list)):
-        #duplicate each jnt and parent them under the follicle and rename the new joints
-        dupe = cmds.duplicate(spine_jnts[i], renameChildren=True)[0]
-        to_delete_dupe = cmds.listRelatives(dupe, allDescendents = True)
-        cmds.delete(to_delete_dupe)
-        new_name = dupe.replace(NamingConventionEnums.JOINT_SUFFIX,
-                               NamingConventionEnums.BIND_JOINT_SUFFIX)
-        new_name = new_name.rstrip('1')
-        cmds.rename(dupe, new_name)
-
-        #parent the joint under the follicle and delete the extra node that is left over
-        # from the creation
-        to_delete_curve = cmds.listRelatives(follicles_list[i], allDescendents=True,
-                                             type = 'transform')
-        cmds.delete(to_delete_curve)
-        cmds.parent(new_name, follicles_list[i])
-        bind_jnts.append(new_name)
+        cmds.parent(bind_jnts[i], follicles_list[i])
 
     #create the 3 joints that will be bound to the ribbon
-    controls_list = []
-    controls_buffer_list = []
+    controls_list, controls_buffer_list = zero_spine_controls()
     ribbon_jnts = []
     for name in NamingConventionEnums.SPINE_CTRLS:
         control_name = name + NamingConventionEnums.CONTROL_CURVE_SUFFIX
         jnt_name = name + '_IK' + NamingConventionEnums.JOINT_SUFFIX
-
-        #reorient the control to the world
-        gu.unlock_all_channels(control_name)
-        cmds.select(control_name)
-        cmds.pickWalk(direction = 'up')
-        control_buffer = cmds.ls(selection = True)
-        cmds.makeIdentity(control_buffer, apply=True, translate=True, rotate=True,
-                          scale=True, normal=False, preserveNormals=1)
-
-        for channel in MayaCommandEnums.SCALE:
-            gu.lock_channels(control_name, channel)
-
-        cmds.select(clear=True)
-        controls_list.append(control_name)
-        controls_buffer_list.append(control_buffer)
         ribbon_jnts.append(jnt_name)
 
-        cmds.joint(name = jnt_name, position = (0,0,0))
+        cmds.createNode('joint', name = jnt_name)
         gu.place_on(jnt_name, control_name)
         cmds.parent(jnt_name, control_name)
 
     #bind the ribbon jnts to the ribbon
-    #select the joints
-    for jnt in ribbon_jnts:
-        cmds.select(jnt, add= True)
-    #select the ribbon
-    cmds.select(ribbon_name, add = True)
-    cmds.skinCluster(toSelectedBones = True, bindMethod = 0, maximumInfluences = 2)
+    cmds.skinCluster(ribbon_jnts, ribbon_name, toSelectedBones = True, bindMethod = 0,
+                     maximumInfluences = 2)
 
     #add the back controls
-    #lock the controls
     back_cc = 'back' + NamingConventionEnums.CONTROL_CURVE_SUFFIX
-    gu.unlock_all_channels(back_cc)
-    back_buffer = cmds.listRelatives(back_cc, parent = True)[0]
-    gu.lock_all_channels(back_cc)
-
-    #add all the attrs for the back control
-    back_attrs = [['backLoCurl', 'backMidCurl', 'backHiCurl'],
-                  ['backLoSide', 'backMidSide', 'backHiSide'],
-                  ['backLoTwist', 'backMidTwist', 'backHiTwist'],
-                  ['revBackLoCurl', 'revBackMidCurl', 'revBackHiCurl'],
-                  ['revBackLoSide', 'revBackMidSide', 'revBackHiSide'],
-                  ['revBackLoTwist', 'revBackMidTwist', 'revBackHiTwist']]
-    count = 5
-    for attr_set in back_attrs:
-        for attr in attr_set:
-            cmds.addAttr(back_cc, longName=attr, attributeType='float')
-            cmds.setAttr(back_cc + '.' + attr, keyable=True)
-        #add a filler line to make it pretty
-        temp = ''
-        temp = temp.zfill(count)
-        temp = temp.replace('0', '_')
-        cmds.addAttr(back_cc, longName=temp, attributeType='float')
-        cmds.setAttr(back_cc + '.' + temp, keyable=False, channelBox = True)
-        count+=1
-    cmds.deleteAttr(back_cc + '.' + temp)
+    back_buffer = add_back_attrs(back_cc)
+    back_attrs = NamingConventionEnums.BACK_ATTRS
 
     #make the rev spine joints
     rev_jnts = []
@@ -949,8 +1459,7 @@ def setup_spine(pelvis_jnt, num_vertebrae):
     cmds.delete(to_delete_dupe)
 
     #flip the reverse joints and parent it under the original spine
-    cmds.select(rev_jnts[0])
-    cmds.RerootSkeleton()
+    cmds.reroot(rev_jnts[0])
 
     cmds.parent(rev_jnts[0], spine_jnts[-1])
 
@@ -987,13 +1496,7 @@ def setup_spine(pelvis_jnt, num_vertebrae):
             #make the attr string
             attr = back_cc + '.' + back_attrs[i][j]
             #get which channel to connect to based on the order of back attrs
-            channel = ''
-            if i % 3 == 0:
-                channel = 'z'
-            elif i % 3 == 1:
-                channel = 'y'
-            else:
-                channel = 'x'
+            channel = get_back_attr_channel(i)
 
             #for the first 3 loops connect to the regular spine then last 3 iterations
             # to the reverse spine
@@ -1029,3 +1532,320 @@ def setup_spine(pelvis_jnt, num_vertebrae):
     cmds.parent(pelvis_jnt, pelvis_cc)
     #parent the pelvis cc into the rig hierarchy
     cmds.parent(pelvis_buffer, NamingConventionEnums.RIG_HIERARCHY[7])
+
+@profiled
+def setup_lean_spine(pelvis_jnt, num_vertebrae):
+    """
+    sets up a spine with the same controls and back attrs as the ribbon spine but with
+    far fewer nodes to evaluate. each bind joint is driven by a weighted blend of the
+    spine controls' matrices instead of a skinned ribbon and follicles, the forward back
+    attrs rotate the spine joints and the reverse back attrs rotate three pivot groups
+    above the hips so there are no follow networks
+
+    :param pelvis_jnt: name of the pelvis joint
+    :type: str
+
+    :param num_vertebrae: number of vertebrae
+    :type: int
+    """
+    #the matrix nodes live in a plugin
+    cmds.loadPlugin('matrixNodes', quiet=True)
+
+    pelvis_cc = 'pelvis' + NamingConventionEnums.CONTROL_CURVE_SUFFIX
+
+    num_vertebrae -= 1
+
+    mid = int(math.ceil(num_vertebrae/2.0))
+    #get all the spine joints and add them to a list
+    spine_jnts = get_spine_jnts(pelvis_jnt, num_vertebrae)
+
+    #get how far along the spine each joint is
+    jnt_positions = []
+    jnt_lengths = []
+    for jnt in spine_jnts:
+        pos = cmds.xform(jnt, query=True, worldSpace=True, translation=True)
+        if jnt_positions:
+            jnt_lengths.append(jnt_lengths[-1] + get_distance(jnt_positions[-1], pos))
+        else:
+            jnt_lengths.append(0.0)
+        jnt_positions.append(pos)
+
+    #zero the controls, each one sits on the joint step two made it on, the hips on the
+    # pelvis, the spine mid on the middle vertebra and the chest on the last one
+    controls_list, controls_buffer_list = zero_spine_controls()
+    control_indices = [0, int(math.ceil((num_vertebrae + 1)/2.0)) - 1, num_vertebrae]
+    control_jnts = []
+    control_lengths = []
+    control_matrices = []
+    for control_name, index in zip(controls_list, control_indices):
+        control_jnts.append(spine_jnts[index])
+        control_lengths.append(jnt_lengths[index])
+        control_matrices.append(cmds.xform(control_name, query=True, worldSpace=True,
+                                           matrix=True))
+
+    #make the bind joints and put them in their own group
+    bind_jnts = create_spine_bind_jnts(spine_jnts)
+    bind_grp = cmds.group(empty=True, world=True,
+                          name='spine_bind' + NamingConventionEnums.GROUP_SUFFIX)
+    for bind_jnt in bind_jnts:
+        cmds.parent(bind_jnt, bind_grp)
+
+    #drive each bind jnt with the blend of the two controls around it
+    for i in range(len(bind_jnts)):
+        bind_jnt = bind_jnts[i]
+        weights = get_spine_weights(jnt_lengths[i], control_lengths)
+
+        #save where the joint is then clear the orient so the decomposed rotation is the
+        # whole rotation
+        jnt_matrix = cmds.xform(bind_jnt, query=True, worldSpace=True, matrix=True)
+        cmds.setAttr(bind_jnt + '.jointOrient', 0, 0, 0)
+
+        #only blend the controls that have a weight
+        drivers = []
+        for j in range(len(weights)):
+            if weights[j] > 0:
+                drivers.append(j)
+
+        if len(drivers) == 1:
+            rest_matrix = control_matrices[drivers[0]]
+            blend_attr = controls_list[drivers[0]] + '.worldMatrix[0]'
+        else:
+            wt_add = cmds.shadingNode('wtAddMatrix', asUtility=True,
+                                      name=bind_jnt + '_Blend_WAM')
+            for index, j in enumerate(drivers):
+                cmds.connectAttr(controls_list[j] + '.worldMatrix[0]',
+                                 wt_add + '.wtMatrix[%d].matrixIn' % index)
+                cmds.setAttr(wt_add + '.wtMatrix[%d].weightIn' % index, weights[j])
+            rest_matrix = gu.blend_matrices([control_matrices[j] for j in drivers],
+                                            [weights[j] for j in drivers])
+            blend_attr = wt_add + '.matrixSum'
+
+        #offset the blend so the joint stays where it is at bind time
+        offset = gu.mult_matrix(jnt_matrix, gu.inverse_matrix(rest_matrix))
+        mult = cmds.shadingNode('multMatrix', asUtility=True,
+                                name=bind_jnt + '_Offset_MM')
+        cmds.setAttr(mult + '.matrixIn[0]', offset, type='matrix')
+        cmds.connectAttr(blend_attr, mult + '.matrixIn[1]')
+        cmds.connectAttr(bind_jnt + '.parentInverseMatrix[0]', mult + '.matrixIn[2]')
+
+        decomp = cmds.shadingNode('decomposeMatrix', asUtility=True,
+                                  name=bind_jnt + '_DCM')
+        cmds.connectAttr(mult + '.matrixSum', decomp + '.inputMatrix')
+        cmds.connectAttr(decomp + '.outputTranslate', bind_jnt + '.translate')
+        cmds.connectAttr(decomp + '.outputRotate', bind_jnt + '.rotate')
+
+    #add the back controls
+    back_cc = 'back' + NamingConventionEnums.CONTROL_CURVE_SUFFIX
+    back_buffer = add_back_attrs(back_cc)
+    back_attrs = NamingConventionEnums.BACK_ATTRS
+
+    #make the reverse pivots from the top down, hi -> mid -> lo, at the same joints the
+    # ribbon's reverse spine uses
+    rev_pivot_jnts = [spine_jnts[num_vertebrae - mid - 1],
+                      spine_jnts[num_vertebrae - mid],
+                      spine_jnts[num_vertebrae - mid + 1]]
+    rev_pivots = [None, None, None]
+    pivot_parent = pelvis_cc
+    for j in [2, 1, 0]:
+        pivot = cmds.group(empty=True, world=True,
+                           name=back_attrs[3][j].replace('Curl', '') + '_PIV')
+        gu.place_on(pivot, rev_pivot_jnts[j])
+        pivot_buffer = gu.create_buffer(pivot)
+        cmds.parent(pivot_buffer, pivot_parent)
+        pivot_parent = pivot
+        rev_pivots[j] = pivot
+
+    #the hips hang off the lowest pivot, the other controls ride the spine they sit on
+    cmds.parent(controls_buffer_list[0], rev_pivots[0])
+    cmds.parent(controls_buffer_list[1], control_jnts[1])
+    cmds.parent(controls_buffer_list[2], control_jnts[2])
+
+    #connect the back attrs straight into the spine joints and the pivots
+    back_jnts = [[spine_jnts[mid - 1], spine_jnts[mid], spine_jnts[mid + 1]], rev_pivots]
+    for i in range(len(back_attrs)):
+        for j in range(len(back_attrs[i])):
+            attr = back_cc + '.' + back_attrs[i][j]
+            channel = get_back_attr_channel(i)
+            cmds.connectAttr(attr, back_jnts[i // 3][j] + '.r' + channel)
+
+    #parent the back control under the pelvis control
+    cmds.parent(back_buffer, pelvis_cc)
+
+    #parent the spine into the rig hierarchy
+    spine_extra_grp = cmds.group(bind_grp,
+                                 name='spine_extra' + NamingConventionEnums.GROUP_SUFFIX)
+    cmds.parent(spine_extra_grp, NamingConventionEnums.RIG_HIERARCHY[12])
+
+    #parent the joints under the pelvis control
+    pelvis_buffer = cmds.listRelatives(pelvis_cc, parent = True)[0]
+    cmds.parent(pelvis_jnt, pelvis_cc)
+    #parent the pelvis cc into the rig hierarchy
+    cmds.parent(pelvis_buffer, NamingConventionEnums.RIG_HIERARCHY[7])
+
+def get_spine_jnts(pelvis_jnt, num_vertebrae):
+    """
+    walks down from the pelvis to get the list of spine joints
+
+    :param pelvis_jnt: name of the pelvis joint
+    :type: str
+
+    :param num_vertebrae: number of joints to walk down, not counting the pelvis
+    :type: int
+
+    :return: list of the pelvis and spine joints, bottom to top
+    :type: list
+    """
+    spine_jnts = [pelvis_jnt]
+    for i in range(0, num_vertebrae):
+        #the first child is the next joint up the spine, the same one pickWalk goes to
+        spine_jnts.append(cmds.listRelatives(spine_jnts[-1], children=True,
+                                             type='joint')[0])
+    return spine_jnts
+
+@profiled
+def create_spine_bind_jnts(spine_jnts):
+    """
+    duplicates each spine joint on its own to make the spine bind joints
+
+    :param spine_jnts: list of the spine joints
+    :type: list
+
+    :return: list of the bind joints
+    :type: list
+    """
+    bind_jnts = []
+    for jnt in spine_jnts:
+        #duplicate the jnt, delete its children and rename it
+        dupe = cmds.duplicate(jnt, renameChildren=True)[0]
+        to_delete_dupe = cmds.listRelatives(dupe, allDescendents = True)
+        if to_delete_dupe:
+            cmds.delete(to_delete_dupe)
+        new_name = dupe.replace(NamingConventionEnums.JOINT_SUFFIX,
+                               NamingConventionEnums.BIND_JOINT_SUFFIX)
+        new_name = new_name.rstrip('1')
+        bind_jnts.append(cmds.rename(dupe, new_name))
+    return bind_jnts
+
+@profiled
+def zero_spine_controls():
+    """
+    reorients the hips, spineMid and chest controls to the world by freezing their buffers
+
+    :return: list of the controls and list of their buffers
+    :type: list, list
+    """
+    controls_list = []
+    controls_buffer_list = []
+    for name in NamingConventionEnums.SPINE_CTRLS:
+        control_name = name + NamingConventionEnums.CONTROL_CURVE_SUFFIX
+
+        #reorient the control to the world
+        gu.unlock_all_channels(control_name)
+        control_buffer = cmds.listRelatives(control_name, parent=True)
+        cmds.makeIdentity(control_buffer, apply=True, translate=True, rotate=True,
+                          scale=True, normal=False, preserveNormals=1)
+
+        for channel in MayaCommandEnums.SCALE:
+            gu.lock_channels(control_name, channel)
+
+        controls_list.append(control_name)
+        controls_buffer_list.append(control_buffer)
+    return controls_list, controls_buffer_list
+
+def add_back_attrs(back_cc):
+    """
+    locks the back control and adds all of the back attrs to it
+
+    :param back_cc: name of the back control
+    :type: str
+
+    :return: name of the back control's buffer
+    :type: str
+    """
+    #lock the controls
+    gu.unlock_all_channels(back_cc)
+    back_buffer = cmds.listRelatives(back_cc, parent = True)[0]
+    gu.lock_all_channels(back_cc)
+
+    #add all the attrs for the back control
+    count = 5
+    for attr_set in NamingConventionEnums.BACK_ATTRS:
+        for attr in attr_set:
+            cmds.addAttr(back_cc, longName=attr, attributeType='float')
+            cmds.setAttr(back_cc + '.' + attr, keyable=True)
+        #add a filler line to make it pretty
+        temp = ''
+        temp = temp.zfill(count)
+        temp = temp.replace('0', '_')
+        cmds.addAttr(back_cc, longName=temp, attributeType='float')
+        cmds.setAttr(back_cc + '.' + temp, keyable=False, channelBox = True)
+        count+=1
+    cmds.deleteAttr(back_cc + '.' + temp)
+    return back_buffer
+
+def get_back_attr_channel(attr_set_index):
+    """
+    gets the rotate channel a set of back attrs drives, curl -> z, side -> y, twist -> x
+
+    :param attr_set_index: index of the set in NamingConventionEnums.BACK_ATTRS
+    :type: int
+
+    :return: 'x', 'y' or 'z'
+    :type: str
+    """
+    if attr_set_index % 3 == 0:
+        return 'z'
+    elif attr_set_index % 3 == 1:
+        return 'y'
+    return 'x'
+
+def get_spine_weights(length, control_lengths):
+    """
+    gets how much a spine joint follows each spine control based on how far along the
+    spine it is, it only ever follows the two controls around it
+
+    :param length: distance along the spine of the joint
+    :type: float
+
+    :param control_lengths: distance along the spine of each control, bottom to top
+    :type: list
+
+    :return: a weight for each control that add up to 1
+    :type: list
+    """
+    weights = [0.0] * len(control_lengths)
+    #past the ends it just follows the end control
+    if length <= control_lengths[0]:
+        weights[0] = 1.0
+        return weights
+    if length >= control_lengths[-1]:
+        weights[-1] = 1.0
+        return weights
+
+    for i in range(len(control_lengths) - 1):
+        low = control_lengths[i]
+        high = control_lengths[i + 1]
+        if low <= length <= high:
+            if high == low:
+                weights[i] = 1.0
+            else:
+                weights[i + 1] = (length - low) / (high - low)
+                weights[i] = 1.0 - weights[i + 1]
+            break
+    return weights
+
+def get_distance(pos_a, pos_b):
+    """
+    gets the distance between two positions
+
+    :param pos_a: first position -> [x, y, z]
+    :type: list
+
+    :param pos_b: second position -> [x, y, z]
+    :type: list
+
+    :return: distance between them
+    :type: float
+    """
+    return math.sqrt((pos_a[0] - pos_b[0]) ** 2 + (pos_a[1] - pos_b[1]) ** 2 +
+                     (pos_a[2] - pos_b[2]) ** 2)
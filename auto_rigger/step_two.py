@@ -30,17 +30,74 @@
 #----------------------------------------------------------------------------- IMPORTS --#
 
 # Default Python Imports
-import maya.cmds as cmds
+import json
 import math
 
 # Imports That You Wrote
+from auto_rigger.cmds_backend import cmds
+from auto_rigger.build_profiler import profiled
 import auto_rigger.gen_utils as gu
+from auto_rigger.naming_context import get_rig_naming
 from maya_enums import MayaCommandEnums, NamingConventionEnums
 import auto_rigger.step_one as step_one
+import auto_rigger.step_three as step_three
 #----------------------------------------------------------------------------------------#
 #--------------------------------------------------------------------------- FUNCTIONS --#
 def run_step(joint_list, right_color, left_color, center_color, fk_style, ik_style,
-             num_vertebrae):
+             num_vertebrae, undo=True, naming=None):
+    """
+    runs build_controls in a build session so it is one undo chunk and maya doesnt
+    refresh or evaluate while it builds. if step two already ran it runs
+    update_controls instead so only the controls whose inputs changed are rebuilt
+
+    :param joint_list: list of joints to put controls on
+    :type: list
+
+    :param right_color: color for right side objs
+    :type: str
+
+    :param left_color: color for left side objs
+    :type: str
+
+    :param fk_style: style for the fk controls
+    :type: str
+
+    :param ik_style: style for the ik controls
+    :type: str
+
+    :param num_vertebrae: number of vertebrae total so we can only make 3 controls
+    :type: int
+
+    :param undo: False turns undo off while it builds
+    :type: bool
+
+    :param naming: the NamingContext of the build, defaults to the rig's
+    :type: NamingContext
+
+    :return: list of ccs
+    """
+    naming = naming or get_rig_naming()
+    with gu.build_session('step two', undo):
+        if is_built():
+            return update_controls(joint_list, right_color, left_color, center_color,
+                                   fk_style, ik_style, num_vertebrae, naming)
+        return build_controls(joint_list, right_color, left_color, center_color,
+                              fk_style, ik_style, num_vertebrae, naming)
+
+def is_built():
+    """
+    checks if step two has run on the fake rig
+
+    :return: if the main cc has the step two attr
+    :type: bool
+    """
+    main_cc = 'fake_rig' + NamingConventionEnums.CONTROL_CURVE_SUFFIX
+    return cmds.objExists(main_cc) and cmds.attributeQuery(
+        NamingConventionEnums.STEP_TWO_ATTR, node=main_cc, exists=True)
+
+@profiled
+def build_controls(joint_list, right_color, left_color, center_color, fk_style, ik_style,
+                   num_vertebrae, naming=None):
     """
     adds box control curves to all joints
 
@@ -62,21 +119,302 @@ def run_step(joint_list, right_color, left_color, center_color, fk_style, ik_sty
     :param num_vertebrae: number of vertebrae total so we can only make 3 controls
     :type: int
 
+    :param naming: the NamingContext of the build, defaults to the rig's
+    :type: NamingContext
+
+    :return: list of ccs
+    """
+    naming = naming or get_rig_naming()
+    main_cc = naming.main_cc
+    control_joints = make_controls(joint_list, fk_style, ik_style, num_vertebrae, naming)
+    cc_list = [cc for cc, jnt in control_joints]
+    style_controls(cc_list, right_color, left_color, center_color, naming)
+    #move the controls under the main_cc
+    cc_grp = cmds.group(cc_list, name = 'controls' + NamingConventionEnums.GROUP_SUFFIX)
+    cmds.parent(cc_grp, main_cc)
+    cmds.select(clear = True)
+
+    # add global attr
+    cmds.addAttr('|' + main_cc,
+                 longName=NamingConventionEnums.STEP_TWO_ATTR, attributeType='bool')
+    save_inputs(control_joints, right_color, left_color, center_color, fk_style,
+                ik_style, num_vertebrae, naming)
+
+    return cc_list
+
+@profiled
+def update_controls(joint_list, right_color, left_color, center_color, fk_style,
+                    ik_style, num_vertebrae, naming=None):
+    """
+    rebuilds the controls whose inputs changed since step two ran. a change to the
+    colors, the styles or step one rebuilds all of them, a moved guide only rebuilds the
+    controls of the modules it is in
+
+    :param joint_list: list of joints to put controls on
+    :type: list
+
+    :param right_color: color for right side objs
+    :type: str
+
+    :param left_color: color for left side objs
+    :type: str
+
+    :param fk_style: style for the fk controls
+    :type: str
+
+    :param ik_style: style for the ik controls
+    :type: str
+
+    :param num_vertebrae: number of vertebrae total so we can only make 3 controls
+    :type: int
+
+    :param naming: the NamingContext of the build, defaults to the rig's
+    :type: NamingContext
+
     :return: list of ccs
     """
+    naming = naming or get_rig_naming()
+    main_cc = naming.main_cc
+    modules = get_changed_modules(joint_list, right_color, left_color, center_color,
+                                  fk_style, ik_style, num_vertebrae, naming)
+    if modules is None:
+        to_rebuild = joint_list
+    else:
+        to_rebuild = [jnt for jnt in joint_list
+                      if step_three.get_module(jnt, naming) in modules]
+
+    #swap the old controls of the joints for new ones
+    control_joints = get_control_joints()
+    old_controls = [cc for cc, jnt in control_joints if jnt in to_rebuild]
+    if old_controls:
+        cmds.delete(old_controls)
+    new_controls = make_controls(to_rebuild, fk_style, ik_style, num_vertebrae, naming)
+    if new_controls:
+        new_list = [cc for cc, jnt in new_controls]
+        style_controls(new_list, right_color, left_color, center_color, naming)
+        cmds.parent(new_list, naming.get_name(main_cc, '|', naming.controls_group))
+    cmds.select(clear = True)
+
+    #keep the controls in the order of the joints they were made for
+    joint_order = dict([(jnt, index) for index, jnt in enumerate(joint_list)])
+    control_joints = [(cc, jnt) for cc, jnt in control_joints if jnt not in to_rebuild]
+    control_joints.extend(new_controls)
+    control_joints.sort(key=lambda control_joint: joint_order.get(control_joint[1], -1))
+    save_inputs(control_joints, right_color, left_color, center_color, fk_style,
+                ik_style, num_vertebrae, naming)
+
+    return [cc for cc, jnt in control_joints]
+
+def get_changed_modules(joint_list, right_color, left_color, center_color, fk_style,
+                        ik_style, num_vertebrae, naming=None):
+    """
+    compares the inputs with the hashes step two saved on the main cc
+
+    :param joint_list: list of joints that have controls
+    :type: list
+
+    :param right_color: color for right side objs
+    :type: str
+
+    :param left_color: color for left side objs
+    :type: str
+
+    :param fk_style: style for the fk controls
+    :type: str
+
+    :param ik_style: style for the ik controls
+    :type: str
+
+    :param num_vertebrae: number of vertebrae total so we can only make 3 controls
+    :type: int
+
+    :param naming: the NamingContext of the build, defaults to the rig's
+    :type: NamingContext
+
+    :return: the modules whose guides moved, or None if every control has to be
+             rebuilt
+    :type: list
+    """
+    naming = naming or get_rig_naming()
     main_cc = 'fake_rig' + NamingConventionEnums.CONTROL_CURVE_SUFFIX
-    cc_list = create_cc(joint_list, fk_style, ik_style, num_vertebrae)
-    buffer_list = []
+    inputs = get_inputs(gu.get_string_attr(main_cc,
+                                           NamingConventionEnums.STEP_ONE_HASH_ATTR),
+                        right_color, left_color, center_color, fk_style, ik_style,
+                        num_vertebrae)
+    if gu.get_string_attr(main_cc, NamingConventionEnums.STEP_TWO_HASH_ATTR) != \
+            gu.get_input_hash(inputs):
+        return None
+    saved_hashes = gu.get_dict_attr(main_cc, NamingConventionEnums.GUIDE_HASHES_ATTR)
+    guide_hashes = get_guide_hashes(gu.get_guides(joint_list), naming)
+    return [module for module in sorted(guide_hashes)
+            if saved_hashes.get(module) != guide_hashes[module]]
+
+def get_inputs(step_one_hash, right_color, left_color, center_color, fk_style,
+               ik_style, num_vertebrae):
+    """
+    gets everything step two is built from besides the guides, which are hashed per
+    module. it has step one's hash so a rebuilt fake rig rebuilds the controls
+
+    :param step_one_hash: the hash of step one's inputs
+    :type: str
+
+    :param right_color: color for right side objs
+    :type: str
+
+    :param left_color: color for left side objs
+    :type: str
+
+    :param fk_style: style for the fk controls
+    :type: str
+
+    :param ik_style: style for the ik controls
+    :type: str
+
+    :param num_vertebrae: number of vertebrae total so we can only make 3 controls
+    :type: int
+
+    :return: dict of the inputs for gu.get_input_hash
+    :type: dict
+    """
+    return {'step_one': step_one_hash, 'right_color': right_color,
+            'left_color': left_color, 'center_color': center_color,
+            'fk_style': fk_style, 'ik_style': ik_style, 'vertebrae': num_vertebrae}
+
+def get_guide_hashes(guides, naming=None):
+    """
+    hashes the guides of each module. a module also gets the joints right under its
+    joints, a control is aimed at the first child of its joint
+
+    :param guides: {fake joint: [x, y, z]} from gu.get_guides
+    :type: dict
+
+    :param naming: the NamingContext of the build, defaults to the rig's
+    :type: NamingContext
+
+    :return: {module: hash}
+    :type: dict
+    """
+    naming = naming or get_rig_naming()
+    module_guides = {}
+    for jnt in guides:
+        module = module_guides.setdefault(step_three.get_module(jnt, naming), {})
+        module[jnt] = guides[jnt]
+        for child in cmds.listRelatives(jnt, children=True, type='transform') or []:
+            if child in guides:
+                module[child] = guides[child]
+    return dict([(module, gu.get_input_hash(module_guides[module]))
+                 for module in module_guides])
+
+def save_inputs(control_joints, right_color, left_color, center_color, fk_style,
+                ik_style, num_vertebrae, naming=None):
+    """
+    saves the hashes of what step two was built from on the main cc, with the joint
+    each control was made for and the guide positions
+
+    :param control_joints: the controls and their joints -> [(cc, jnt), ...]
+    :type: list
+
+    :param right_color: color for right side objs
+    :type: str
+
+    :param left_color: color for left side objs
+    :type: str
+
+    :param fk_style: style for the fk controls
+    :type: str
+
+    :param ik_style: style for the ik controls
+    :type: str
+
+    :param num_vertebrae: number of vertebrae total so we can only make 3 controls
+    :type: int
+
+    :param naming: the NamingContext of the build, defaults to the rig's
+    :type: NamingContext
+    """
+    naming = naming or get_rig_naming()
+    main_cc = naming.get_name('|', naming.main_cc)
+    inputs = get_inputs(gu.get_string_attr(main_cc,
+                                           NamingConventionEnums.STEP_ONE_HASH_ATTR),
+                        right_color, left_color, center_color, fk_style, ik_style,
+                        num_vertebrae)
+    guides = gu.get_guides()
+    gu.set_string_attr(main_cc, NamingConventionEnums.STEP_TWO_HASH_ATTR,
+                       gu.get_input_hash(inputs))
+    gu.set_dict_attr(main_cc, NamingConventionEnums.GUIDE_HASHES_ATTR,
+                     get_guide_hashes(guides, naming))
+    gu.set_string_attr(main_cc, NamingConventionEnums.GUIDES_ATTR,
+                       json.dumps(guides, sort_keys=True))
+    gu.set_string_attr(main_cc, NamingConventionEnums.CONTROL_JOINTS_ATTR,
+                       ' '.join([cc + ':' + jnt for cc, jnt in control_joints]))
+
+def get_control_joints():
+    """
+    gets the controls step two made and the joint each one was made for
+
+    :return: the controls and their joints -> [(cc, jnt), ...]
+    :type: list
+    """
+    main_cc = 'fake_rig' + NamingConventionEnums.CONTROL_CURVE_SUFFIX
+    saved = gu.get_string_attr(main_cc, NamingConventionEnums.CONTROL_JOINTS_ATTR)
+    return [tuple(item.split(':')) for item in saved.split()] if saved else []
+
+def make_controls(joint_list, fk_style, ik_style, num_vertebrae, naming=None):
+    """
+    makes the controls one joint at a time so each control knows its joint
+
+    :param joint_list: list of joints to put controls on
+    :type: list
+
+    :param fk_style: style for the fk controls
+    :type: str
+
+    :param ik_style: style for the ik controls
+    :type: str
+
+    :param num_vertebrae: number of vertebrae total so we can only make 3 controls
+    :type: int
+
+    :param naming: the NamingContext of the build, defaults to the rig's
+    :type: NamingContext
+
+    :return: the controls and their joints -> [(cc, jnt), ...]
+    :type: list
+    """
+    naming = naming or get_rig_naming()
+    control_joints = []
+    for jnt in joint_list:
+        control_joints.extend([(cc, jnt) for cc in create_cc([jnt], fk_style, ik_style,
+                                                             num_vertebrae, naming)])
+    return control_joints
+
+def style_controls(cc_list, right_color, left_color, center_color, naming=None):
+    """
+    colors the controls by side and scales them with the main cc
+
+    :param cc_list: the controls
+    :type: list
+
+    :param right_color: color for right side objs
+    :type: str
+
+    :param left_color: color for left side objs
+    :type: str
+
+    :param center_color: color for the middle objs
+    :type: str
+
+    :param naming: the NamingContext of the build, defaults to the rig's
+    :type: NamingContext
+    """
+    naming = naming or get_rig_naming()
+    main_cc = naming.main_cc
+    side_colors = {naming.right: right_color, naming.left: left_color,
+                   '': center_color}
     for cc in cc_list:
         #sets color based on side
         if cc.find('pelvis') == -1:
-            if cc.startswith(NamingConventionEnums.RIGHT):
-                gu.set_color(cc, right_color)
-                #cmds.xform(cc, rotation=(0, 0, -180), relative=True)
-            elif cc.startswith(NamingConventionEnums.LEFT):
-                gu.set_color(cc, left_color)
-            else:
-                gu.set_color(cc, center_color)
+            gu.set_color(cc, side_colors[naming.get_side(cc)])
         #colors and scales the pelvis differently
         else:
             gu.set_color(cc, 'green')
@@ -86,18 +424,9 @@ def run_step(joint_list, right_color, left_color, center_color, fk_style, ik_sty
         main_scale = cmds.xform(main_cc, scale = True, query = True, relative = True)
         cmds.xform(cc, scale = (cc_scale[0] * main_scale[0], cc_scale[1] * main_scale[1],
                                 cc_scale[2] * main_scale[2]))
-    #move the controls under the main_cc
-    cc_grp = cmds.group(cc_list, name = 'controls' + NamingConventionEnums.GROUP_SUFFIX)
-    cmds.parent(cc_grp, main_cc)
-    cmds.select(clear = True)
 
-    # add global attr
-    cmds.addAttr('|' + main_cc,
-                 longName=NamingConventionEnums.STEP_TWO_ATTR, attributeType='bool')
-
-    return cc_list
-
-def create_cc(joint_list, fk_style, ik_style, num_vertebrae):
+@profiled
+def create_cc(joint_list, fk_style, ik_style, num_vertebrae, naming=None):
     """
     based on this given joint name makes the appropriate control
 
@@ -113,8 +442,12 @@ def create_cc(joint_list, fk_style, ik_style, num_vertebrae):
     :param num_vertebrae: number of vertebrae total so we can only make 3 controls
     :type: int
 
+    :param naming: the NamingContext of the build, defaults to the rig's
+    :type: NamingContext
+
     :return: list of the controls made
     """
+    naming = naming or get_rig_naming()
     #creates a cc_list that will be returned
     cc_list = []
 
@@ -174,7 +507,7 @@ def create_cc(joint_list, fk_style, ik_style, num_vertebrae):
                     cc_list.append(cc_name)
 
                     #flip fingers on right side
-                    if jnt_name.startswith(NamingConventionEnums.RIGHT):
+                    if jnt_name.startswith(naming.right):
                         cmds.xform(cc_name, scale = (0, -1, 0), relative = True)
 
             #checks if its hand/foot to apply a box
@@ -297,21 +630,7 @@ def call_utils(obj_name, style):
     :param style: what way to make the obj
     :type: str
     """
-    #checks the style then calls corresponding gen_util create function
-    if style == 'Circle':
-        gu.create_circle(obj_name, normal_x = 1)
-    elif style == '4-Point Star':
-        gu.create_star_control(obj_name)
-    elif style == '4-Point Arrow':
-        gu.create_four_point_arrow(obj_name)
-    elif style == 'Box':
-        gu.create_box(obj_name)
-    elif style == 'finger':
-        gu.create_finger_tweaker(obj_name)
-    elif style == 'PV':
-        gu.create_box(obj_name)
-    elif style == 'Foot':
-        gu.create_foot_CC(obj_name)
+    gu.create_control(obj_name, style)
 
 #----------------------------------------------------------------------------------------#
 #----------------------------------------------------------------------------- CLASSES --#
@@ -0,0 +1,362 @@
+#!/usr/bin/env python
+#SETMODE 777
+
+#----------------------------------------------------------------------------------------#
+#------------------------------------------------------------------------------ HEADER --#
+
+"""
+:author:
+    Nick Lormand & Blake Day
+
+:synopsis:
+    builds every finger, toe and vertebrae count the gui allows
+
+:description:
+    the gui takes 0-5 fingers, 0-5 toes and 3-7 vertebrae, 180 variants of the template.
+    the sweep builds each one through steps one to three in a process pool, every build
+    in its own in memory scene. each variant gets the time of each step, its node count
+    by type and a fingerprint, a hash of every node's path, type and connections, so two
+    sweeps show which variants changed structure. a variant that errors gets the
+    traceback and the sweep keeps going.
+
+        python -m auto_rigger.variant_sweep --out sweep.json
+        python -m auto_rigger.variant_sweep --out new.json --compare sweep.json
+
+    the fingerprint has the node names, so a change to the order nodes are made in that
+    changes the number maya gives a default name changes the fingerprint too
+
+:applications:
+    plain python
+
+:see_also:
+    scaling_benchmark
+    scene_cmds
+"""
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- IMPORTS --#
+
+# Default Python Imports
+import argparse
+import hashlib
+import json
+import multiprocessing
+import sys
+import time
+import traceback
+
+# Imports That You Wrote
+import auto_rigger.cmds_backend as cmds_backend
+from auto_rigger.cmds_backend import cmds
+import auto_rigger.gen_utils as gu
+import auto_rigger.step_one as step_one
+import auto_rigger.step_two as step_two
+import auto_rigger.step_three as step_three
+from maya_enums import NamingConventionEnums
+
+#the steps that are timed, in the order they run
+STEPS = ['step_one', 'step_two', 'step_three']
+
+#----------------------------------------------------------------------------------------#
+#--------------------------------------------------------------------------- FUNCTIONS --#
+
+def get_variants():
+    """
+    gets every finger, toe and vertebrae count the gui allows
+
+    :return: list of {'fingers', 'toes', 'vertebrae'}
+    :type: list
+    """
+    variants = []
+    for fingers in get_range(NamingConventionEnums.FINGER_RANGE):
+        for toes in get_range(NamingConventionEnums.TOE_RANGE):
+            for vertebrae in get_range(NamingConventionEnums.VERTEBRAE_RANGE):
+                variants.append({'fingers': fingers, 'toes': toes,
+                                 'vertebrae': vertebrae})
+    return variants
+
+def get_range(count_range):
+    """
+    gets the counts in a range from maya_enums, the max is included
+
+    :param count_range: (min, max)
+    :type: tuple
+
+    :return: list of counts
+    :type: list
+    """
+    return list(range(count_range[0], count_range[1] + 1))
+
+def get_variant_name(variant):
+    """
+    gets the name of a variant
+
+    :param variant: a variant from get_variants
+    :type: dict
+
+    :return: like f5_t0_v7
+    :type: str
+    """
+    return 'f%d_t%d_v%d' % (variant['fingers'], variant['toes'], variant['vertebrae'])
+
+def run_sweep(variants=None, processes=None, spine_mode='Ribbon', blend_mode='Classic'):
+    """
+    builds the variants in a process pool
+
+    :param variants: variants like get_variants gives, defaults to all of them
+    :type: list
+
+    :param processes: number of worker processes, defaults to the number of cpus, 1
+                      builds them in this process
+    :type: int
+
+    :param spine_mode: which spine to build, one of NamingConventionEnums.SPINE_MODES
+    :type: str
+
+    :param blend_mode: how to build the ik fk blends, one of
+                       NamingConventionEnums.IK_FK_BLEND_MODES
+    :type: str
+
+    :return: a result per variant from build_variant, in the order of the variants
+    :type: list
+    """
+    if variants is None:
+        variants = get_variants()
+    jobs = [(variant, spine_mode, blend_mode) for variant in variants]
+    start = time.time()
+    if processes == 1:
+        results = [build_job(job) for job in jobs]
+    else:
+        pool = multiprocessing.Pool(processes)
+        try:
+            results = pool.map(build_job, jobs, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+    print('built %d variants in %.3f s, %d failed' %
+          (len(results), time.time() - start,
+           len([result for result in results if result['error']])))
+    return results
+
+def build_job(job):
+    """
+    builds one variant for the pool, pool workers only take one argument
+
+    :param job: (variant, spine_mode, blend_mode)
+    :type: tuple
+
+    :return: the result from build_variant
+    :type: dict
+    """
+    return build_variant(*job)
+
+def build_variant(variant, spine_mode='Ribbon', blend_mode='Classic'):
+    """
+    builds a variant through all of the steps in a new in memory scene
+
+    :param variant: a variant from get_variants
+    :type: dict
+
+    :param spine_mode: which spine to build, one of NamingConventionEnums.SPINE_MODES
+    :type: str
+
+    :param blend_mode: how to build the ik fk blends, one of
+                       NamingConventionEnums.IK_FK_BLEND_MODES
+    :type: str
+
+    :return: {'name', 'fingers', 'toes', 'vertebrae', 'times': {step: seconds}, 'nodes',
+              'node_types': {type: count}, 'fingerprint', 'error'}
+    :type: dict
+    """
+    result = dict(variant)
+    result.update({'name': get_variant_name(variant), 'times': {}, 'nodes': 0,
+                   'node_types': {}, 'fingerprint': None, 'error': None})
+    vertebrae = variant['vertebrae']
+    with cmds_backend.using_backend('scene'):
+        try:
+            start = time.time()
+            step_one.Skeleton(step_one.read_xml(), variant['fingers'], variant['toes'],
+                              vertebrae).joint_structure.group()
+            result['times']['step_one'] = time.time() - start
+
+            start = time.time()
+            cc_list = step_two.run_step(gu.get_joint_list(), 'Blue', 'Red', 'Yellow',
+                                        'Circle', '4-Point Star', vertebrae, False)
+            result['times']['step_two'] = time.time() - start
+
+            start = time.time()
+            gu.create_hierarchy()
+            step_three.run_step(cc_list, vertebrae, spine_mode, blend_mode, undo=False)
+            result['times']['step_three'] = time.time() - start
+        except Exception:
+            result['error'] = traceback.format_exc()
+
+        #the copies step three keeps to build modules again arent part of the rig
+        stash_grp = step_three.get_stash()
+        nodes = [node for node in cmds.ls(long=True) or []
+                 if node != stash_grp and not node.startswith(stash_grp + '|')]
+        result['nodes'] = len(nodes)
+        for node in nodes:
+            node_type = cmds.nodeType(node)
+            result['node_types'][node_type] = result['node_types'].get(node_type, 0) + 1
+        result['fingerprint'] = get_fingerprint(nodes)
+    return result
+
+def get_fingerprint(nodes=None):
+    """
+    hashes the structure of the scene, the path and type of each node and the
+    connections out of it, so it doesnt change with the transforms
+
+    :param nodes: long names of the nodes to hash, defaults to the whole scene
+    :type: list
+
+    :return: sha1 hex digest
+    :type: str
+    """
+    if nodes is None:
+        nodes = cmds.ls(long=True) or []
+    lines = []
+    for node in nodes:
+        lines.append('%s %s' % (node, cmds.nodeType(node)))
+        connections = cmds.listConnections(node, source=False, destination=True,
+                                           plugs=True, connections=True) or []
+        for index in range(0, len(connections), 2):
+            lines.append('%s -> %s' % (connections[index], connections[index + 1]))
+    return hashlib.sha1('\n'.join(sorted(lines)).encode('utf-8')).hexdigest()
+
+def save_sweep(results, path):
+    """
+    saves the results of a sweep as json
+
+    :param results: results from run_sweep
+    :type: list
+
+    :param path: where to save it
+    :type: str
+    """
+    with open(path, 'w') as sweep_file:
+        json.dump(results, sweep_file, indent=2, sort_keys=True, separators=(',', ': '))
+        sweep_file.write('\n')
+
+def load_sweep(path):
+    """
+    loads the results of a sweep
+
+    :param path: the json file save_sweep wrote
+    :type: str
+
+    :return: the results
+    :type: list
+    """
+    with open(path) as sweep_file:
+        return json.load(sweep_file)
+
+def compare_sweeps(old_results, new_results):
+    """
+    finds the variants that changed between two sweeps
+
+    :param old_results: results of the older sweep
+    :type: list
+
+    :param new_results: results of the newer sweep
+    :type: list
+
+    :return: a message for each variant that changed structure, started failing or was
+             only in one of the sweeps
+    :type: list
+    """
+    old_by_name = dict([(result['name'], result) for result in old_results])
+    new_by_name = dict([(result['name'], result) for result in new_results])
+    changes = []
+    for name in sorted(set(old_by_name) | set(new_by_name)):
+        old, new = old_by_name.get(name), new_by_name.get(name)
+        if not old or not new:
+            changes.append('%s is only in the %s sweep' % (name, 'new' if new else 'old'))
+        elif new['error'] and not old['error']:
+            changes.append('%s fails now: %s' % (name, get_error_line(new)))
+        elif old['error'] and not new['error']:
+            changes.append('%s builds now' % name)
+        elif old['error'] and new['error']:
+            if get_error_line(old) != get_error_line(new):
+                changes.append('%s fails differently now: %s' % (name,
+                                                                 get_error_line(new)))
+        elif old['fingerprint'] != new['fingerprint']:
+            types = sorted(set(old['node_types']) | set(new['node_types']))
+            counts = ['%s %+d' % (node_type, new['node_types'].get(node_type, 0) -
+                                  old['node_types'].get(node_type, 0))
+                      for node_type in types
+                      if new['node_types'].get(node_type) !=
+                      old['node_types'].get(node_type)]
+            changes.append('%s changed structure %s' % (name, ', '.join(counts)))
+    return changes
+
+def get_error_line(result):
+    """
+    gets the last line of a failed variant's traceback
+
+    :param result: a result from build_variant
+    :type: dict
+
+    :return: the error, like ValueError: No object matches name: ...
+    :type: str
+    """
+    return result['error'].strip().split('\n')[-1]
+
+def print_results(results):
+    """
+    prints the time, node count and fingerprint of each variant
+
+    :param results: results from run_sweep
+    :type: list
+    """
+    print('%-12s' % 'variant' + ''.join(['%12s' % step for step in STEPS]) +
+          '%8s  %s' % ('nodes', 'fingerprint'))
+    for result in results:
+        if result['error']:
+            print('%-12s FAILED %s' % (result['name'], get_error_line(result)))
+            continue
+        print('%-12s' % result['name'] +
+              ''.join(['%12.3f' % result['times'][step] for step in STEPS]) +
+              '%8d  %s' % (result['nodes'], result['fingerprint'][:12]))
+
+def main(args=None):
+    """
+    runs the sweep from the command line
+
+    :param args: the command line arguments, defaults to sys.argv
+    :type: list
+
+    :return: 1 if a variant failed or changed from the compared sweep, else 0
+    :type: int
+    """
+    parser = argparse.ArgumentParser(description='builds every template variant')
+    parser.add_argument('--out', help='json file to save the results to')
+    parser.add_argument('--compare', help='json file of an older sweep to compare to')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='worker processes, defaults to the number of cpus')
+    parser.add_argument('--spine-mode', default='Ribbon',
+                        choices=NamingConventionEnums.SPINE_MODES)
+    parser.add_argument('--blend-mode', default='Classic',
+                        choices=NamingConventionEnums.IK_FK_BLEND_MODES)
+    options = parser.parse_args(args)
+
+    results = run_sweep(processes=options.processes, spine_mode=options.spine_mode,
+                        blend_mode=options.blend_mode)
+    print_results(results)
+    if options.out:
+        save_sweep(results, options.out)
+
+    failed = [result for result in results if result['error']]
+    changes = []
+    if options.compare:
+        changes = compare_sweeps(load_sweep(options.compare), results)
+        for change in changes:
+            print(change)
+        print('%d variants changed' % len(changes))
+    return 1 if failed or changes else 0
+
+#----------------------------------------------------------------------------------------#
+#----------------------------------------------------------------------------- CLASSES --#
+
+if __name__ == '__main__':
+    sys.exit(main())